@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import AgentTask, Prompt, AIProvider, AgentExecution
+from .models import (
+    AgentTask, Prompt, AIProvider, AgentExecution, BugSignature, CrashGroup, KnowledgeChunk,
+    ConversationSession, TaskBatch
+)
 
 
 @admin.register(AgentTask)
@@ -7,10 +10,16 @@ class AgentTaskAdmin(admin.ModelAdmin):
     list_display = ['id', 'title', 'agent_type', 'status', 'priority', 'created_by', 'created_at']
     list_filter = ['agent_type', 'status', 'priority', 'created_at']
     search_fields = ['title', 'description']
-    raw_id_fields = ['created_by', 'assigned_to', 'parent_task']
+    raw_id_fields = ['created_by', 'assigned_to', 'parent_task', 'batch']
     readonly_fields = ['tokens_used', 'execution_time_seconds', 'created_at', 'updated_at']
 
 
+@admin.register(TaskBatch)
+class TaskBatchAdmin(admin.ModelAdmin):
+    list_display = ['id', 'created_by', 'total', 'created_at']
+    raw_id_fields = ['created_by']
+
+
 @admin.register(Prompt)
 class PromptAdmin(admin.ModelAdmin):
     list_display = ['id', 'agent_type', 'name', 'version', 'is_active', 'created_at']
@@ -34,3 +43,34 @@ class AgentExecutionAdmin(admin.ModelAdmin):
         if obj:
             return [f.name for f in self.model._meta.fields]
         return []
+
+
+@admin.register(BugSignature)
+class BugSignatureAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'created_at']
+    raw_id_fields = ['task']
+    readonly_fields = ['minhash', 'frames', 'created_at']
+
+
+@admin.register(CrashGroup)
+class CrashGroupAdmin(admin.ModelAdmin):
+    list_display = ['id', 'exception_type', 'fingerprint', 'status', 'report_count', 'updated_at']
+    list_filter = ['status', 'updated_at']
+    search_fields = ['fingerprint', 'exception_type']
+    raw_id_fields = ['leader', 'tasks']
+
+
+@admin.register(KnowledgeChunk)
+class KnowledgeChunkAdmin(admin.ModelAdmin):
+    list_display = ['id', 'source', 'title', 'task', 'path', 'created_at']
+    list_filter = ['source', 'task_type', 'created_at']
+    search_fields = ['title', 'question', 'path']
+    raw_id_fields = ['task']
+
+
+@admin.register(ConversationSession)
+class ConversationSessionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'thread_id', 'agent_type', 'turn_count', 'updated_at']
+    list_filter = ['agent_type', 'updated_at']
+    search_fields = ['thread_id', 'user__email']
+    raw_id_fields = ['user']
@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable
 from django.utils import timezone
 from libs.ai_providers import AIProviderBase
 from libs.ai_providers.base import Message
 from .models import AgentTask, AgentExecution, Prompt, AIProvider, AgentType
+from .exceptions import TaskDeferred
+from .sessions import ConversationMemory
+from .single_flight import SingleFlight
+import json
 import logging
+import threading
 import time
 
 logger = logging.getLogger(__name__)
@@ -20,11 +25,21 @@ class BaseAgent(ABC):
     agent_name: str = "Base Agent"
     agent_description: str = "Base agent class"
     capabilities: List[str] = []
+    # JSON schema of the agent's structured output (input_data['output_mode'] == 'structured').
+    output_schema: Optional[Dict[str, Any]] = None
 
     def __init__(self, provider: AIProviderBase, prompt: Prompt):
         self.provider = provider
         self.prompt = prompt
         self.conversation_history: List[Message] = []
+        # Provider tokens spent by the current task, charged to its creator.
+        self.tokens_used = 0
+        self._usage_lock = threading.Lock()
+
+    def record_usage(self, tokens: int):
+        """Add tokens spent on a provider call; safe to call from worker threads."""
+        with self._usage_lock:
+            self.tokens_used += tokens or 0
 
     @abstractmethod
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
@@ -43,7 +58,8 @@ class BaseAgent(ABC):
         self,
         user_message: str,
         context: Optional[Dict[str, Any]] = None,
-        stream: bool = False
+        stream: bool = False,
+        on_chunk: Optional[Callable[[str], Any]] = None
     ) -> str:
         """
         Generate a response using the AI provider.
@@ -52,6 +68,8 @@ class BaseAgent(ABC):
             user_message: The user's message/input
             context: Optional context dictionary
             stream: Whether to stream the response
+            on_chunk: Optional callback receiving each chunk of text as it
+                arrives (the full response once when not streaming)
 
         Returns:
             The generated response text
@@ -64,19 +82,84 @@ class BaseAgent(ABC):
                 enhanced_message = f"{context_str}\n\n{user_message}"
                 self.conversation_history[-1].content = enhanced_message
 
-            response = self.provider.generate(
+            if stream:
+                chunks = []
+                for chunk in self.provider.stream_generate(
+                    messages=self.conversation_history,
+                    system_prompt=self.prompt.system_prompt
+                ):
+                    chunks.append(chunk)
+                    if on_chunk:
+                        on_chunk(chunk)
+                content = ''.join(chunks)
+                # Streams do not report usage; estimate it from the text sent and received.
+                self.record_usage(sum(
+                    self.provider.count_tokens(text)
+                    for text in [self.prompt.system_prompt or '', content]
+                    + [message.content for message in self.conversation_history]
+                ))
+            else:
+                response = self.provider.generate(
+                    messages=self.conversation_history,
+                    system_prompt=self.prompt.system_prompt
+                )
+                content = response.content
+                self.record_usage(response.tokens_used)
+                if on_chunk:
+                    on_chunk(content)
+
+            self.conversation_history.append(
+                Message(role="assistant", content=content)
+            )
+
+            return content
+
+        except Exception as e:
+            logger.error(f"Error generating response: {str(e)}")
+            raise
+
+    def generate_structured_response(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]] = None,
+        schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a response decoded and validated against a JSON schema.
+
+        Args:
+            user_message: The user's message/input
+            context: Optional context dictionary
+            schema: JSON schema to use instead of the agent's output_schema
+
+        Returns:
+            The decoded, schema-valid response
+        """
+        schema = schema or self.output_schema
+        if not schema:
+            raise ValueError(f"{self.agent_name} does not declare an output schema")
+
+        try:
+            if context:
+                user_message = f"{self._format_context(context)}\n\n{user_message}"
+            self.conversation_history.append(Message(role="user", content=user_message))
+
+            response = self.provider.generate_structured(
                 messages=self.conversation_history,
-                system_prompt=self.prompt.system_prompt
+                schema=schema,
+                system_prompt=self.prompt.system_prompt,
+                schema_name=f"{str(self.agent_type).lower()}_result"
             )
+            self.record_usage(response.tokens_used)
 
             self.conversation_history.append(
-                Message(role="assistant", content=response.content)
+                Message(role="assistant", content=json.dumps(response.parsed))
             )
 
-            return response.content
+            return response.parsed
 
         except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
+            logger.error(f"Error generating structured response: {str(e)}")
             raise
 
     def _format_context(self, context: Dict[str, Any]) -> str:
@@ -86,6 +169,47 @@ class BaseAgent(ABC):
             lines.append(f"- {key}: {value}")
         return "\n".join(lines)
 
+    def partial_result_publisher(
+        self,
+        task: AgentTask,
+        field: str
+    ) -> Callable[[Dict[str, Any]], None]:
+        """
+        Build a callback that publishes parsed items on the task while the
+        response is still streaming, so clients polling the task see them early.
+        """
+        items: List[Dict[str, Any]] = []
+
+        def publish(item: Dict[str, Any]):
+            items.append(item)
+            if task.pk:
+                AgentTask.objects.filter(pk=task.pk).update(
+                    output_data={'partial': True, field: items}
+                )
+
+        return publish
+
+    def on_task_completed(self, task: AgentTask, result: Dict[str, Any]):
+        """
+        Hook called by run_with_tracking once a task has been stored as
+        completed, e.g. to index its result. Errors are logged, not raised.
+        """
+        pass
+
+    def session_message(self, task: AgentTask) -> str:
+        """
+        The user's input as stored in the task's conversation session: the
+        free-text field of input_data rather than the expanded prompt.
+        """
+        for key in ('message', 'issue', 'question', 'requirements', 'description', 'request', 'code'):
+            value = task.input_data.get(key)
+            if isinstance(value, str) and value:
+                return value
+        return json.dumps(
+            {key: value for key, value in task.input_data.items() if key != 'thread_id'},
+            default=str
+        )
+
     def clear_history(self):
         """Clear the conversation history."""
         self.conversation_history = []
@@ -94,6 +218,12 @@ class BaseAgent(ABC):
         """
         Execute task with full tracking and logging.
 
+        Identical tasks executing at the same time are coalesced (see
+        SingleFlight): only one of them calls the provider and is charged the
+        tokens, the others are deferred and completed with its result. A task deferred by its
+        agent (TaskDeferred) is left in progress for the execution that will
+        complete it, and ``{'deferred': reason}`` is returned.
+
         Args:
             task: The AgentTask to execute
             provider_instance: The AIProvider model instance
@@ -113,38 +243,90 @@ class BaseAgent(ABC):
         task.started_at = timezone.now()
         task.save()
 
+        memory = ConversationMemory()
+        session = memory.open(task)
+        if session:
+            self.conversation_history = memory.history(session)
+
+        self.tokens_used = 0
         try:
-            result = self.execute_task(task)
+            flight = SingleFlight()
+            result, leader_id = flight.run(
+                task,
+                None if session else flight.fingerprint(task, self.prompt, provider_instance),
+                lambda: self.execute_task(task)
+            )
+            if leader_id is not None:
+                result = {**result, 'coalesced_with': leader_id}
 
             execution_time = time.time() - start_time
             execution.execution_time_seconds = execution_time
             execution.success = True
+            execution.total_tokens = self.tokens_used
             execution.raw_response = result
             execution.save()
 
             task.status = 'COMPLETED'
             task.completed_at = timezone.now()
             task.execution_time_seconds = execution_time
+            task.tokens_used = self.tokens_used
             task.output_data = result
             task.save()
 
+            if task.created_by and self.tokens_used:
+                task.created_by.increment_token_usage(self.tokens_used)
+
+            try:
+                self.on_task_completed(task, result)
+            except Exception as e:
+                logger.warning(f"Completion hook of task {task.id} failed: {str(e)}")
+
+            if session:
+                try:
+                    memory.record(
+                        session, task, self.session_message(task),
+                        str(result.get('output', '')), self.provider.count_tokens
+                    )
+                except Exception as e:
+                    logger.warning(f"Could not record task {task.id} in its conversation: {str(e)}")
+
             logger.info(f"Task {task.id} completed successfully in {execution_time:.2f}s")
             return result
 
+        except TaskDeferred as e:
+            # The task row may already have been completed by the other
+            # execution, so only the execution is saved.
+            execution.execution_time_seconds = time.time() - start_time
+            execution.success = True
+            execution.total_tokens = self.tokens_used
+            execution.raw_response = {'deferred': str(e)}
+            execution.save()
+
+            if task.created_by and self.tokens_used:
+                task.created_by.increment_token_usage(self.tokens_used)
+
+            logger.info(f"Task {task.id} deferred: {str(e)}")
+            return {'deferred': str(e)}
+
         except Exception as e:
             execution_time = time.time() - start_time
             error_msg = str(e)
 
             execution.execution_time_seconds = execution_time
             execution.success = False
+            execution.total_tokens = self.tokens_used
             execution.error_message = error_msg
             execution.save()
 
             task.status = 'FAILED'
             task.error_message = error_msg
             task.execution_time_seconds = execution_time
+            task.tokens_used = self.tokens_used
             task.save()
 
+            if task.created_by and self.tokens_used:
+                task.created_by.increment_token_usage(self.tokens_used)
+
             logger.error(f"Task {task.id} failed: {error_msg}")
             raise
 
@@ -166,7 +348,7 @@ class AgentFactory:
             DevOpsAgent, QAAgent, ProjectManagerAgent, ScrumMasterAgent,
             ReleaseManagerAgent, BugTriageAgent, SecurityAgent,
             PerformanceAgent, DocumentationAgent, UIUXAgent,
-            DataAnalystAgent, SupportAgent
+            DataAnalystAgent, SupportAgent, EnsembleReviewAgent
         )
 
         cls._agent_registry = {
@@ -185,6 +367,7 @@ class AgentFactory:
             AgentType.UI_UX: UIUXAgent,
             AgentType.DATA_ANALYST: DataAnalystAgent,
             AgentType.SUPPORT: SupportAgent,
+            AgentType.REVIEW_ENSEMBLE: EnsembleReviewAgent,
         }
         cls._initialized = True
 
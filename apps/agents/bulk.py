@@ -0,0 +1,107 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from .models import AgentTask, TaskBatch, TaskStatus
+from .routing import TaskRouter
+from .serializers import AgentTaskSerializer
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BulkTaskSubmission:
+    """
+    Creates many agent tasks from one request as a TaskBatch.
+
+    Items are validated one at a time as they are read, so a JSON Lines body
+    is never held in memory whole, and valid tasks are inserted with
+    ``bulk_create`` every ``batch_size`` items. The submission is atomic: if
+    any item is invalid nothing is created and the errors of the first
+    ``max_errors`` invalid items are reported. Once committed, the tasks are
+    enqueued as one Celery group of chunks (see TaskRouter.dispatch_many).
+
+    Attributes:
+        batch_size: Tasks inserted per INSERT
+        max_tasks: Maximum number of tasks in one submission
+        max_errors: Number of invalid items reported before validation stops
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_tasks: Optional[int] = None,
+        max_errors: int = 50
+    ):
+        self.batch_size = batch_size or getattr(settings, 'AGENT_BULK_BATCH_SIZE', 500)
+        self.max_tasks = max_tasks or getattr(settings, 'AGENT_BULK_MAX_TASKS', 10000)
+        self.max_errors = max_errors
+
+    def submit(self, items: Iterable[Any], user) -> TaskBatch:
+        """
+        Validate and create the tasks, then enqueue them after commit.
+
+        Args:
+            items: Task objects, or lines of JSON Lines (str or bytes) to parse;
+                blank lines are skipped
+            user: The user creating the tasks
+
+        Raises:
+            ValidationError: If the submission is empty, too large, or has invalid items
+        """
+        serializer = AgentTaskSerializer()
+        errors: List[Dict[str, Any]] = []
+        pending: List[AgentTask] = []
+        total = 0
+
+        with transaction.atomic():
+            batch = TaskBatch.objects.create(created_by=user)
+            for index, item in enumerate(items):
+                if isinstance(item, (bytes, str)):
+                    if not item.strip():
+                        continue
+                    try:
+                        item = json.loads(item)
+                    except ValueError as e:
+                        errors.append({'index': index, 'errors': [f"Invalid JSON: {e}"]})
+                        item = None
+
+                if item is not None:
+                    try:
+                        data = serializer.run_validation(item)
+                    except ValidationError as e:
+                        errors.append({'index': index, 'errors': e.detail})
+                    else:
+                        pending.append(AgentTask(**data, created_by=user, batch=batch))
+
+                total += 1
+                if total > self.max_tasks:
+                    raise ValidationError({'detail': f"A batch can hold at most {self.max_tasks} tasks"})
+                if len(errors) >= self.max_errors:
+                    break
+                if errors:
+                    # Nothing will be created; keep validating only to report errors.
+                    pending = []
+                elif len(pending) >= self.batch_size:
+                    AgentTask.objects.bulk_create(pending)
+                    pending = []
+
+            if errors:
+                raise ValidationError({'errors': errors})
+            if not total:
+                raise ValidationError({'detail': "No tasks submitted"})
+
+            AgentTask.objects.bulk_create(pending)
+            batch.total = total
+            batch.save(update_fields=['total'])
+            transaction.on_commit(lambda: self.enqueue(batch))
+
+        logger.info(f"Created batch {batch.pk} of {total} tasks")
+        return batch
+
+    @staticmethod
+    def enqueue(batch: TaskBatch) -> int:
+        """Send the batch's pending tasks to their queues; returns the number of messages."""
+        tasks = batch.tasks.filter(status=TaskStatus.PENDING).order_by('pk').only('pk', 'agent_type', 'priority')
+        return TaskRouter().dispatch_many(tasks)
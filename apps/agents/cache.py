@@ -0,0 +1,75 @@
+import hashlib
+import json
+from typing import Dict, Any, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(*parts: Any) -> str:
+    """
+    Compute a stable SHA-256 hash over the given parts.
+
+    Strings are hashed as-is, anything else is JSON-encoded with sorted keys
+    so that equal dictionaries always produce the same hash.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Namespaced, versioned cache for agent results stored in the Django cache.
+
+    Bumping ``version`` invalidates every entry of the namespace, which is how
+    prompt template changes are rolled out without a manual flush.
+    """
+
+    def __init__(self, namespace: str, version: str = '1', timeout: Optional[int] = None):
+        self.namespace = namespace
+        self.version = str(version)
+        self.timeout = timeout if timeout is not None else getattr(
+            settings, 'AGENT_RESULT_CACHE_TIMEOUT', 60 * 60 * 24 * 7
+        )
+
+    def make_key(self, digest: str) -> str:
+        return f"agents:{self.namespace}:v{self.version}:{digest}"
+
+    def get(self, digest: str) -> Optional[Any]:
+        try:
+            return cache.get(self.make_key(digest))
+        except Exception as e:
+            logger.warning(f"Result cache read failed for {self.namespace}: {str(e)}")
+            return None
+
+    def get_many(self, digests: List[str]) -> Dict[str, Any]:
+        """Fetch several entries in one round-trip, keyed by digest."""
+        keys = {self.make_key(digest): digest for digest in digests}
+        try:
+            found = cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f"Result cache read failed for {self.namespace}: {str(e)}")
+            return {}
+        return {keys[key]: value for key, value in found.items()}
+
+    def set(self, digest: str, value: Any):
+        try:
+            cache.set(self.make_key(digest), value, self.timeout)
+        except Exception as e:
+            logger.warning(f"Result cache write failed for {self.namespace}: {str(e)}")
+
+    def set_many(self, values: Dict[str, Any]):
+        try:
+            cache.set_many(
+                {self.make_key(digest): value for digest, value in values.items()},
+                self.timeout
+            )
+        except Exception as e:
+            logger.warning(f"Result cache write failed for {self.namespace}: {str(e)}")
@@ -0,0 +1,168 @@
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import AgentTask, CrashGroup, TaskStatus
+from libs.stacktrace import StackTrace
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CrashGrouper:
+    """
+    Coalesces bursts of bug reports with the same stack trace fingerprint.
+
+    The first task of a burst becomes the group's leader and is triaged
+    normally. Tasks with the same fingerprint that arrive while the leader is
+    running are deferred instead of waiting on a worker: they stay in
+    progress and receive the leader's result when it completes, and tasks
+    arriving within ``window`` seconds after it finished reuse the result
+    directly. Only tasks of the current burst receive its result; if the
+    leader fails, the burst's deferred tasks are dispatched again to triage
+    by themselves.
+
+    Attributes:
+        window: Seconds after a burst started during which its result is reused
+        wait_timeout: Seconds after which a running leader is presumed lost
+    """
+
+    def __init__(self, window: Optional[int] = None, wait_timeout: Optional[int] = None):
+        self.window = window if window is not None else getattr(settings, 'CRASH_GROUP_WINDOW', 600)
+        self.wait_timeout = wait_timeout if wait_timeout is not None else getattr(
+            settings, 'CRASH_GROUP_WAIT_TIMEOUT', 120
+        )
+
+    def join(self, task: AgentTask, trace: StackTrace) -> Tuple[CrashGroup, bool]:
+        """
+        Add a task to the crash group of its stack trace.
+
+        Returns:
+            Tuple of (group, whether the task leads a new burst and must triage)
+        """
+        now = timezone.now()
+
+        with transaction.atomic():
+            group, _ = CrashGroup.objects.select_for_update().get_or_create(
+                fingerprint=trace.fingerprint,
+                defaults={
+                    'exception_type': trace.exception_type[:255],
+                    'frames': [frame.key for frame in trace.signature_frames],
+                }
+            )
+
+            in_burst = group.burst_started_at is not None and (
+                now - group.burst_started_at < timedelta(seconds=self.window)
+            )
+            # A leader that has been running longer than wait_timeout is presumed lost.
+            leader_alive = group.status == TaskStatus.IN_PROGRESS and group.burst_started_at is not None and (
+                now - group.burst_started_at < timedelta(seconds=self.wait_timeout)
+            )
+            is_leader = not (leader_alive or (group.status == TaskStatus.COMPLETED and in_burst))
+
+            if is_leader:
+                if group.status != TaskStatus.IN_PROGRESS:
+                    group.burst_task_ids = []
+                # Otherwise the leader was lost and its deferred tasks are taken over.
+                group.status = TaskStatus.IN_PROGRESS
+                group.leader = task
+                group.burst_started_at = now
+                group.result = {}
+
+            group.burst_task_ids = group.burst_task_ids + [task.pk]
+            group.report_count += 1
+            group.save()
+            group.tasks.add(task)
+
+        logger.info(
+            f"Task {task.pk} joined crash group {group.pk} "
+            f"({'leader' if is_leader else 'follower'}, {group.report_count} reports)"
+        )
+        return group, is_leader
+
+    def result_for(self, group: CrashGroup) -> Optional[Dict[str, Any]]:
+        """The result of the group's current burst, or None while its leader is running."""
+        return group.result if group.status == TaskStatus.COMPLETED else None
+
+    def complete(self, group: CrashGroup, result: Dict[str, Any]) -> int:
+        """
+        Store the leader's result and fan it out to the tasks of the burst
+        still waiting for a triage.
+
+        Returns:
+            Number of tasks the result was written to
+        """
+        with transaction.atomic():
+            locked = CrashGroup.objects.select_for_update().get(pk=group.pk)
+            group.report_count = locked.report_count
+            group.burst_task_ids = locked.burst_task_ids
+            group.status = TaskStatus.COMPLETED
+            group.result = result
+            group.save(update_fields=['status', 'result', 'updated_at'])
+
+            waiting = self._waiting(group)
+
+            fanned_out = 0
+            for task in waiting:
+                task.output_data = self.member_result(group, result)
+                task.status = TaskStatus.COMPLETED
+                task.completed_at = timezone.now()
+                task.save(update_fields=['output_data', 'status', 'completed_at', 'updated_at'])
+                fanned_out += 1
+
+        logger.info(f"Crash group {group.pk} triaged, result fanned out to {fanned_out} tasks")
+        return fanned_out
+
+    def fail(self, group: CrashGroup) -> int:
+        """
+        Release a burst whose leader failed: its deferred tasks are dispatched
+        again and triage by themselves (the first one leading a new burst).
+
+        Returns:
+            Number of tasks dispatched again
+        """
+        from .routing import TaskRouter
+
+        with transaction.atomic():
+            locked = CrashGroup.objects.select_for_update().get(pk=group.pk)
+            if locked.status != TaskStatus.IN_PROGRESS or locked.leader_id != group.leader_id:
+                return 0
+            locked.status = TaskStatus.FAILED
+            locked.save(update_fields=['status', 'updated_at'])
+
+            waiting = list(self._waiting(locked).filter(status=TaskStatus.IN_PROGRESS))
+            AgentTask.objects.filter(
+                pk__in=[task.pk for task in waiting], status=TaskStatus.IN_PROGRESS
+            ).update(status=TaskStatus.PENDING)
+
+        router = TaskRouter()
+        for task in waiting:
+            transaction.on_commit(lambda task=task: router.dispatch(task))
+        logger.warning(f"Crash group {group.pk} leader failed, dispatched {len(waiting)} reports again")
+        return len(waiting)
+
+    @staticmethod
+    def _waiting(group: CrashGroup):
+        return AgentTask.objects.filter(
+            pk__in=group.burst_task_ids,
+            status__in=[TaskStatus.PENDING, TaskStatus.IN_PROGRESS]
+        ).exclude(pk=group.leader_id)
+
+    def member_result(self, group: CrashGroup, result: Dict[str, Any]) -> Dict[str, Any]:
+        """The leader's result as returned for another task of the group."""
+        return {
+            **result,
+            'crash_group': self.describe(group),
+            'coalesced': True,
+        }
+
+    @staticmethod
+    def describe(group: CrashGroup) -> Dict[str, Any]:
+        return {
+            'id': group.pk,
+            'fingerprint': group.fingerprint,
+            'exception_type': group.exception_type,
+            'leader_task_id': group.leader_id,
+            'report_count': group.report_count,
+        }
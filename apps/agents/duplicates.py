@@ -0,0 +1,130 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from django.db import transaction
+from .models import AgentTask, AgentType, BugSignature, BugSignatureBucket, TaskStatus
+from libs.similarity import MinHasher, estimate_jaccard, jaccard, lsh_buckets, shingles
+from libs.stacktrace import parse_frames
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BugFingerprint:
+    """MinHash signature, LSH buckets and normalized frames of one bug report."""
+    minhash: List[int]
+    buckets: List[str]
+    frames: List[str] = field(default_factory=list)
+
+
+class BugDuplicateIndex:
+    """
+    Near-duplicate index over triaged bug reports.
+
+    Reports are reduced to a MinHash signature of their normalized text and the
+    set of their normalized stack frames. Signatures are split into LSH band
+    buckets stored in an indexed table, so finding candidates is a single
+    indexed lookup regardless of how many bugs have been triaged; only the
+    candidates are then scored.
+
+    Changing ``NUM_PERM``, ``BANDS`` or ``SEED`` makes stored signatures
+    incomparable; rebuild the index with ``manage.py rebuild_bug_index``.
+    """
+
+    NUM_PERM = 64
+    BANDS = 16
+    SEED = 1
+    # Weight of the stack frame overlap when both reports contain a stack trace.
+    FRAME_WEIGHT = 0.5
+
+    def __init__(self):
+        self.hasher = MinHasher(num_perm=self.NUM_PERM, seed=self.SEED)
+
+    def fingerprint(self, bug_report: str, code: str = '') -> BugFingerprint:
+        text = f"{bug_report}\n{code}" if code else bug_report
+        minhash = self.hasher.signature(shingles(text))
+        frames = list(dict.fromkeys(frame.key for frame in parse_frames(text)))
+        return BugFingerprint(minhash=minhash, buckets=lsh_buckets(minhash, self.BANDS), frames=frames)
+
+    def similarity(self, first: BugFingerprint, second_minhash: List[int], second_frames: List[str]) -> float:
+        text_similarity = estimate_jaccard(first.minhash, second_minhash)
+        if first.frames and second_frames:
+            frame_similarity = jaccard(set(first.frames), set(second_frames))
+            return (1 - self.FRAME_WEIGHT) * text_similarity + self.FRAME_WEIGHT * frame_similarity
+        return text_similarity
+
+    def find_similar(
+        self,
+        fingerprint: BugFingerprint,
+        limit: int = 5,
+        min_similarity: float = 0.3,
+        exclude_task_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find completed triage tasks whose reports are similar to the fingerprint.
+
+        Returns:
+            Matches ordered by descending similarity, each with 'task_id',
+            'title', 'similarity', 'severity' and 'priority' of the prior triage
+        """
+        candidates = BugSignature.objects.filter(
+            id__in=BugSignatureBucket.objects.filter(
+                key__in=fingerprint.buckets
+            ).values('signature_id'),
+            task__status=TaskStatus.COMPLETED
+        ).select_related('task')
+
+        if exclude_task_id is not None:
+            candidates = candidates.exclude(task_id=exclude_task_id)
+
+        matches = []
+        for candidate in candidates:
+            score = self.similarity(fingerprint, candidate.minhash, candidate.frames)
+            if score < min_similarity:
+                continue
+            output = candidate.task.output_data or {}
+            matches.append({
+                'task_id': candidate.task_id,
+                'title': candidate.task.title,
+                'similarity': round(score, 3),
+                'severity': output.get('severity'),
+                'priority': output.get('priority'),
+            })
+
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches[:limit]
+
+    def add(self, task: AgentTask, fingerprint: BugFingerprint):
+        """Index a triaged task, replacing any previous signature it had."""
+        with transaction.atomic():
+            BugSignature.objects.filter(task=task).delete()
+            signature = BugSignature.objects.create(
+                task=task,
+                minhash=fingerprint.minhash,
+                frames=fingerprint.frames
+            )
+            BugSignatureBucket.objects.bulk_create([
+                BugSignatureBucket(signature=signature, key=key) for key in fingerprint.buckets
+            ])
+
+    def rebuild(self, batch_size: int = 500) -> int:
+        """Re-index every completed, non-duplicate TRIAGE task. Returns the number indexed."""
+        BugSignature.objects.all().delete()
+        count = 0
+        tasks = AgentTask.objects.filter(
+            agent_type=AgentType.BUG_TRIAGE,
+            status=TaskStatus.COMPLETED
+        ).only('id', 'input_data', 'output_data')
+
+        for task in tasks.iterator(chunk_size=batch_size):
+            input_data = task.input_data or {}
+            if input_data.get('task_type', 'TRIAGE') != 'TRIAGE' or (task.output_data or {}).get('duplicate_of'):
+                continue
+            bug_report = input_data.get('bug_report', '')
+            if not bug_report:
+                continue
+            self.add(task, self.fingerprint(bug_report, input_data.get('code', '')))
+            count += 1
+
+        logger.info(f"Rebuilt bug duplicate index with {count} tasks")
+        return count
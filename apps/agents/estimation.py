@@ -0,0 +1,121 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db.models import Count, Max
+from apps.projects.models import Story
+from libs.estimation import KNNEstimator
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StoryEstimator:
+    """
+    Story point estimates from the team's completed stories.
+
+    A kNN model over hashed TF-IDF features of the title, description and
+    acceptance criteria of completed, pointed stories is kept per process and
+    refitted only when that history changes (checked with one aggregate
+    query). Estimates come with a confidence so the caller can send only the
+    uncertain stories to the model.
+
+    Attributes:
+        k: Number of similar stories each estimate is based on
+        min_confidence: Estimates below this confidence should be escalated
+        min_history: Fewer completed stories than this and every estimate has zero confidence
+        history_limit: Most recent completed stories used for training
+    """
+
+    _shared: Optional['StoryEstimator'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        k: Optional[int] = None,
+        min_confidence: Optional[float] = None,
+        min_history: Optional[int] = None,
+        history_limit: Optional[int] = None
+    ):
+        self.k = k or getattr(settings, 'STORY_ESTIMATE_NEIGHBORS', 7)
+        self.min_confidence = min_confidence if min_confidence is not None else getattr(
+            settings, 'STORY_ESTIMATE_MIN_CONFIDENCE', 0.35
+        )
+        self.min_history = min_history if min_history is not None else getattr(
+            settings, 'STORY_ESTIMATE_MIN_HISTORY', 20
+        )
+        self.history_limit = history_limit or getattr(settings, 'STORY_ESTIMATE_HISTORY_LIMIT', 5000)
+        self.model = KNNEstimator(self.k)
+        self._stories: List[Tuple[str, str, int]] = []
+        self._version = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'StoryEstimator':
+        """The process-wide estimator."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def history(self):
+        return Story.objects.filter(status='DONE', story_points__isnull=False, story_points__gt=0)
+
+    def sync(self):
+        """Refit the model if completed stories were added or changed since the last fit."""
+        stats = self.history().aggregate(count=Count('id'), updated=Max('updated_at'))
+        version = (stats['count'], stats['updated'])
+
+        with self._lock:
+            if version == self._version:
+                return
+            rows = list(
+                self.history().order_by('-updated_at')
+                .values_list('key', 'title', 'description', 'acceptance_criteria', 'story_points')
+                [:self.history_limit]
+            )
+            self.model = KNNEstimator(self.k).fit(
+                [self.story_text(title, description, criteria) for _, title, description, criteria, _ in rows],
+                [points for *_, points in rows]
+            )
+            self._stories = [(key, title, points) for key, title, _, _, points in rows]
+            self._version = version
+        logger.info(f"Story estimator fitted on {len(rows)} completed stories")
+
+    def estimate(self, stories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Estimate each story ({title, description, acceptance_criteria}).
+
+        Each estimate has 'story_points', 'confidence', 'escalate' (confidence
+        below ``min_confidence``) and the most 'similar' past stories.
+        """
+        self.sync()
+        with self._lock:
+            model, past = self.model, self._stories
+        trusted = len(past) >= self.min_history
+
+        predictions = model.predict([
+            self.story_text(story.get('title', ''), story.get('description', ''), story.get('acceptance_criteria'))
+            for story in stories
+        ])
+
+        estimates = []
+        for prediction in predictions:
+            confidence = prediction.confidence if trusted else 0.0
+            estimates.append({
+                'story_points': prediction.points,
+                'confidence': confidence,
+                'escalate': confidence < self.min_confidence,
+                'similar': [
+                    {'key': past[index][0], 'title': past[index][1], 'story_points': past[index][2],
+                     'similarity': similarity}
+                    for index, similarity in zip(prediction.neighbors[:3], prediction.similarities[:3])
+                ],
+            })
+        return estimates
+
+    @staticmethod
+    def story_text(title: str, description: str, acceptance_criteria: Any) -> str:
+        if isinstance(acceptance_criteria, (list, tuple)):
+            acceptance_criteria = "\n".join(str(criterion) for criterion in acceptance_criteria)
+        # The title is repeated so it weighs as much as a typically longer description.
+        return f"{title}\n{title}\n{description or ''}\n{acceptance_criteria or ''}"
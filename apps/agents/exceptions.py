@@ -0,0 +1,6 @@
+class TaskDeferred(Exception):
+    """
+    Raised by an agent when another execution will complete the task, e.g.
+    the leader of a crash group. The task is left in progress and the worker
+    is released instead of waiting for that execution.
+    """
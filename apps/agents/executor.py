@@ -0,0 +1,220 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from .base_agent import AgentFactory
+from .models import AgentTask, AIProvider, Prompt, TaskStatus
+from .routing import TaskRouter
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAgentExecutor:
+    """
+    Runs many agent tasks concurrently in one process on an asyncio loop.
+
+    Agent tasks spend nearly all their time waiting on the model provider,
+    so a process serving one task at a time is mostly idle. Here every task
+    is a coroutine: claiming, loading and bookkeeping use Django's async ORM,
+    and the agent itself, whose code is synchronous, runs on a thread of a
+    pool sized to the concurrency limit, where the provider SDKs release the
+    GIL while they wait. A semaphore bounds the number of tasks in flight, so
+    a few processes can keep many provider requests open without exceeding
+    the quota they are sized for.
+
+    Tasks are claimed with a conditional update from PENDING (or FAILED, for
+    retries) to IN_PROGRESS, so a task is executed once even when several
+    executors or Celery workers are handed the same id. A batch sent by
+    TaskRouter only claims tasks not dispatched again since (see
+    TaskRouter.claim_filter). ``serve`` only picks up tasks that were
+    dispatched, and stamps a new dispatch time when it claims one, so the
+    task's queued message is skipped even if this execution fails.
+
+    Attributes:
+        concurrency: Maximum number of tasks executing at once
+        poll_interval: Seconds between checks for new tasks in ``serve``
+        queues: Queues (see TaskRouter) whose tasks ``serve`` executes; all when empty
+        prompt_ttl: Seconds an agent type's active prompt is reused before it is looked up again
+    """
+
+    CLAIMABLE_STATUSES = (TaskStatus.PENDING, TaskStatus.FAILED)
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        queues: Optional[List[str]] = None,
+        prompt_ttl: Optional[float] = None
+    ):
+        self.queues = queues or []
+        default = getattr(settings, 'AGENT_EXECUTOR_CONCURRENCY', 32)
+        if self.queues and not concurrency:
+            pools = getattr(settings, 'AGENT_QUEUE_CONCURRENCY', {})
+            default = sum(pools.get(queue, default) for queue in self.queues)
+        self.concurrency = max(1, concurrency or default)
+        self.poll_interval = poll_interval or getattr(settings, 'AGENT_EXECUTOR_POLL_INTERVAL', 1.0)
+        self.prompt_ttl = prompt_ttl or getattr(settings, 'AGENT_EXECUTOR_PROMPT_TTL', 60)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._prompts: Dict[str, Tuple[asyncio.Future, float]] = {}
+
+    def run(self, task_ids: Iterable[int], dispatched_at: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Execute the tasks from synchronous code, e.g. a Celery task, and wait for all of them."""
+        return asyncio.run(self.execute_many(task_ids, dispatched_at))
+
+    async def execute_many(self, task_ids: Iterable[int], dispatched_at: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Execute the tasks concurrently; returns one result summary per id, in order."""
+        async with self._running():
+            return await asyncio.gather(*(self.execute(task_id, dispatched_at) for task_id in task_ids))
+
+    async def serve(self, stop: Optional[asyncio.Event] = None):
+        """
+        Keep executing pending tasks of the executor's queues, highest
+        priority first, until ``stop`` is set.
+
+        New tasks are claimed whenever a slot frees up, or every
+        ``poll_interval`` seconds while the executor is idle.
+        """
+        stop = stop or asyncio.Event()
+        running: Set[asyncio.Task] = set()
+
+        async with self._running():
+            logger.info(f"Agent executor serving with concurrency {self.concurrency}")
+            while not stop.is_set():
+                claimed = 0
+                for task_id in await self._pending(self.concurrency - len(running)):
+                    if await self._claim(task_id, serving=True):
+                        job = asyncio.create_task(self._execute_claimed(task_id))
+                        running.add(job)
+                        job.add_done_callback(running.discard)
+                        claimed += 1
+
+                if len(running) >= self.concurrency:
+                    await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                elif not claimed:
+                    try:
+                        await asyncio.wait_for(stop.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+
+            if running:
+                await asyncio.wait(running)
+
+    async def execute(self, task_id: int, dispatched_at: Optional[str] = None) -> Dict[str, Any]:
+        """Claim and execute one task; failures are recorded on the task and summarized, not raised."""
+        async with self._semaphore:
+            if not await self._claim(task_id, dispatched_at):
+                return {'task_id': task_id, 'status': 'skipped'}
+            return await self._execute_claimed(task_id)
+
+    async def _execute_claimed(self, task_id: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            task = await AgentTask.objects.aget(pk=task_id)
+            provider = await self._provider()
+            prompt = await self._prompt(task.agent_type)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._pool, self._run_agent, task, provider, prompt)
+        except Exception as e:
+            logger.error(f"Task {task_id} failed in the async executor: {str(e)}")
+            await AgentTask.objects.filter(pk=task_id).exclude(status=TaskStatus.FAILED).aupdate(
+                status=TaskStatus.FAILED, error_message=str(e)
+            )
+            return {'task_id': task_id, 'status': 'failed', 'error': str(e)}
+
+        return {
+            'task_id': task_id,
+            'status': 'completed',
+            'execution_time': round(time.perf_counter() - start, 3),
+        }
+
+    @asynccontextmanager
+    async def _running(self):
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='agent')
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._prompts = {}
+        try:
+            yield
+        finally:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def _pending(self, limit: int) -> List[int]:
+        if limit <= 0:
+            return []
+        pending = AgentTask.objects.filter(status=TaskStatus.PENDING, dispatched_at__isnull=False)
+        if self.queues:
+            pending = pending.filter(TaskRouter().queue_filter(self.queues))
+        return [
+            task_id async for task_id in
+            pending.order_by('priority', 'created_at').values_list('pk', flat=True)[:limit]
+        ]
+
+    async def _claim(self, task_id: int, dispatched_at: Optional[str] = None, serving: bool = False) -> bool:
+        now = timezone.now()
+        if serving:
+            # Only tasks still waiting for their message, which this claim supersedes.
+            claimed = await AgentTask.objects.filter(pk=task_id, status=TaskStatus.PENDING).aupdate(
+                status=TaskStatus.IN_PROGRESS, started_at=now, dispatched_at=now
+            )
+        else:
+            claimed = await AgentTask.objects.filter(
+                TaskRouter.claim_filter(dispatched_at), pk=task_id, status__in=self.CLAIMABLE_STATUSES
+            ).aupdate(status=TaskStatus.IN_PROGRESS, started_at=now)
+        return claimed == 1
+
+    async def _provider(self) -> AIProvider:
+        provider = await AIProvider.objects.filter(is_active=True, provider_type='OPENAI').afirst()
+        if provider is None:
+            provider = await AIProvider.objects.filter(is_active=True).afirst()
+        if provider is None:
+            raise ValueError("No active AI provider found")
+        return provider
+
+    async def _prompt(self, agent_type: str) -> Prompt:
+        # Concurrent tasks of one agent type share a single lookup, so the
+        # default prompt is created once. The lookup is repeated after
+        # prompt_ttl, so a serving executor picks up new and edited prompts,
+        # and at once after a failure, which is not shared with later tasks.
+        cached = self._prompts.get(agent_type)
+        if cached is None or cached[1] <= time.monotonic():
+            future = asyncio.ensure_future(self._load_prompt(agent_type))
+            future.add_done_callback(lambda done: self._forget_failed_prompt(agent_type, done))
+            cached = self._prompts[agent_type] = (future, time.monotonic() + self.prompt_ttl)
+        return await cached[0]
+
+    def _forget_failed_prompt(self, agent_type: str, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None:
+            return
+        if self._prompts.get(agent_type, (None,))[0] is future:
+            del self._prompts[agent_type]
+
+    @staticmethod
+    async def _load_prompt(agent_type: str) -> Prompt:
+        prompt = await Prompt.objects.filter(agent_type=agent_type, is_active=True).afirst()
+        if prompt is None:
+            from .tasks import _create_default_prompt
+            prompt = await sync_to_async(_create_default_prompt)(agent_type)
+        return prompt
+
+    @staticmethod
+    def _run_agent(task: AgentTask, provider: AIProvider, prompt: Prompt):
+        """Runs on a pool thread, with that thread's own database connection."""
+        from .tasks import get_ai_provider_instance
+
+        close_old_connections()
+        try:
+            agent = AgentFactory.create_agent(
+                agent_type=task.agent_type,
+                provider=get_ai_provider_instance(provider),
+                prompt=prompt
+            )
+            agent.run_with_tracking(task, provider)
+        finally:
+            connection.close()
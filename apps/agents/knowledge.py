@@ -0,0 +1,175 @@
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .models import AgentTask, KnowledgeChunk, KnowledgeSource
+from libs.retrieval import BM25Index, chunk_text
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeBase:
+    """
+    BM25 retrieval over resolved tasks and project documentation.
+
+    Chunks are stored in the KnowledgeChunk table, which all worker processes
+    share; each process keeps an in-memory BM25 index over them. Before every
+    search the index pulls only the chunks added since its last sync, so
+    indexing a completed task costs one small query on the next search.
+    Removing or replacing chunks bumps a generation counter in the cache,
+    which makes the other processes rebuild their index once.
+    """
+
+    GENERATION_KEY = 'agents:knowledge:generation'
+
+    _shared: Optional['KnowledgeBase'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.index = BM25Index()
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._generation = None
+
+    @classmethod
+    def shared(cls) -> 'KnowledgeBase':
+        """The process-wide knowledge base."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def sync(self):
+        """Bring the in-memory index up to date with the KnowledgeChunk table."""
+        generation = cache.get(self.GENERATION_KEY, 0)
+
+        with self._lock:
+            if generation != self._generation:
+                self.index = BM25Index()
+                self._last_id = 0
+                self._generation = generation
+
+            added = 0
+            for chunk in KnowledgeChunk.objects.filter(id__gt=self._last_id).order_by('id').iterator():
+                self.index.add(chunk.id, self._index_text(chunk), self._describe(chunk))
+                self._last_id = chunk.id
+                added += 1
+
+        if added:
+            logger.debug(f"Knowledge index synced {added} chunks ({len(self.index)} total)")
+
+    def search(self, query: str, k: int = 5, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the ``k`` chunks most relevant to the query, best first, each
+        with its BM25 'score'.
+        """
+        self.sync()
+        where = (lambda chunk: chunk['source'] == source) if source else None
+        return [
+            {**self.index.metadata(chunk_id), 'score': round(score, 3)}
+            for chunk_id, score in self.index.search(query, k, where=where)
+        ]
+
+    def best_resolution(self, issue: str, task_type: str, candidates: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        The resolved task whose issue is most similar to this one, with its
+        'confidence': the TF-IDF cosine similarity of the two issues (0-1).
+        """
+        hits = [
+            hit for hit in self.search(issue, candidates, source=KnowledgeSource.TASK)
+            if hit['task_type'] == task_type and hit['question']
+        ]
+        if not hits:
+            return None
+
+        for hit in hits:
+            hit['confidence'] = round(self.index.similarity(issue, hit['question']), 3)
+        return max(hits, key=lambda hit: hit['confidence'])
+
+    def index_task(self, task: AgentTask, question: str, answer: str, task_type: str = ''):
+        """Add a resolved task. Documentation tasks may be split into several chunks."""
+        if not answer:
+            return
+
+        sections = chunk_text(answer, self._chunk_size()) if not question else [('', answer)]
+        with transaction.atomic():
+            replaced, _ = KnowledgeChunk.objects.filter(task=task).delete()
+            KnowledgeChunk.objects.bulk_create([
+                KnowledgeChunk(
+                    source=KnowledgeSource.TASK,
+                    task=task,
+                    title=(f"{task.title} - {heading}" if heading else task.title)[:255],
+                    question=question,
+                    content=content,
+                    task_type=task_type
+                )
+                for heading, content in sections
+            ])
+        if replaced:
+            self._invalidate()
+
+    def index_document(self, path: str, text: str) -> int:
+        """Add or replace the chunks of a documentation file. Returns the number of chunks."""
+        sections = chunk_text(text, self._chunk_size())
+        title = Path(path).stem.replace('_', ' ').replace('-', ' ')
+        with transaction.atomic():
+            replaced, _ = KnowledgeChunk.objects.filter(source=KnowledgeSource.DOCUMENT, path=path).delete()
+            KnowledgeChunk.objects.bulk_create([
+                KnowledgeChunk(
+                    source=KnowledgeSource.DOCUMENT,
+                    path=path,
+                    title=(f"{title} - {heading}" if heading else title)[:255],
+                    content=content
+                )
+                for heading, content in sections
+            ])
+        if replaced:
+            self._invalidate()
+        return len(sections)
+
+    def index_documents(self, paths: Iterable[str]) -> int:
+        """Index Markdown/text files, expanding directories. Returns the number of files indexed."""
+        files = 0
+        for entry in paths:
+            root = Path(entry)
+            candidates = [root] if root.is_file() else sorted(
+                path for pattern in ('*.md', '*.rst', '*.txt') for path in root.rglob(pattern)
+            )
+            for path in candidates:
+                try:
+                    text = path.read_text(encoding='utf-8', errors='replace')
+                except OSError as e:
+                    logger.warning(f"Could not read {path}: {str(e)}")
+                    continue
+                self.index_document(str(path), text)
+                files += 1
+        return files
+
+    def _invalidate(self):
+        try:
+            cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            cache.set(self.GENERATION_KEY, 1, None)
+
+    def _chunk_size(self) -> int:
+        return getattr(settings, 'KNOWLEDGE_CHUNK_CHARS', 1500)
+
+    @staticmethod
+    def _index_text(chunk: KnowledgeChunk) -> str:
+        return f"{chunk.title}\n{chunk.question}\n{chunk.content}"
+
+    @staticmethod
+    def _describe(chunk: KnowledgeChunk) -> Dict[str, Any]:
+        return {
+            'id': chunk.id,
+            'source': chunk.source,
+            'task_id': chunk.task_id,
+            'task_type': chunk.task_type,
+            'path': chunk.path,
+            'title': chunk.title,
+            'question': chunk.question,
+            'content': chunk.content,
+        }
@@ -0,0 +1,190 @@
+import time
+from typing import Any, Callable, Dict, List
+from django.core.management.base import BaseCommand
+from apps.agents.specialized import (
+    QAAgent, SecurityAgent, PerformanceAgent, BusinessAnalystAgent, CodeReviewAgent
+)
+
+
+def _legacy_test_cases(response: str) -> List[Dict[str, Any]]:
+    test_cases = []
+    current_case = {}
+    for line in response.split('\n'):
+        line = line.strip()
+        if line.startswith('**Test Case ID'):
+            if current_case:
+                test_cases.append(current_case)
+            current_case = {'id': line.split(':')[-1].strip()}
+        elif line.startswith('**Test Case Title'):
+            current_case['title'] = line.split(':')[-1].strip()
+        elif line.startswith('**Priority'):
+            current_case['priority'] = line.split(':')[-1].strip()
+    if current_case:
+        test_cases.append(current_case)
+    return test_cases
+
+
+def _legacy_vulnerabilities(response: str) -> List[Dict[str, Any]]:
+    vulnerabilities = []
+    current_vuln = {}
+    for line in response.split('\n'):
+        line = line.strip()
+        if '**Severity**:' in line or '**severity**:' in line:
+            if current_vuln:
+                vulnerabilities.append(current_vuln)
+            current_vuln = {'severity': line.split(':')[-1].strip()}
+        elif '**Description**:' in line:
+            current_vuln['description'] = line.split(':')[-1].strip()
+        elif '**Impact**:' in line:
+            current_vuln['impact'] = line.split(':')[-1].strip()
+    if current_vuln:
+        vulnerabilities.append(current_vuln)
+    return vulnerabilities
+
+
+def _legacy_optimizations(response: str) -> List[Dict[str, Any]]:
+    optimizations = []
+    current_opt = {}
+    for line in response.split('\n'):
+        line = line.strip()
+        if line.startswith('**') and 'Optimization' in line:
+            if current_opt:
+                optimizations.append(current_opt)
+            current_opt = {'title': line.strip('*').strip()}
+        elif 'Impact:' in line:
+            current_opt['impact'] = line.split('Impact:')[-1].strip()
+        elif 'Effort:' in line:
+            current_opt['effort'] = line.split('Effort:')[-1].strip()
+    if current_opt:
+        optimizations.append(current_opt)
+    return optimizations
+
+
+def _legacy_stories(response: str) -> List[Dict[str, Any]]:
+    stories = []
+    current_story = {}
+    for line in response.split('\n'):
+        line = line.strip()
+        if line.startswith('**Story'):
+            if current_story:
+                stories.append(current_story)
+            current_story = {'description': line}
+        elif line.startswith('**Epic'):
+            if current_story:
+                current_story['epic'] = line.replace('**Epic**:', '').strip()
+        elif line.startswith('**Acceptance Criteria'):
+            current_story['has_acceptance_criteria'] = True
+    if current_story:
+        stories.append(current_story)
+    return stories
+
+
+def _legacy_scores(response: str) -> Dict[str, float]:
+    scores = {}
+    for line in response.split('\n'):
+        for pillar in CodeReviewAgent.REVIEW_PILLARS:
+            if pillar.lower() in line.lower() and '/10' in line:
+                try:
+                    scores[pillar] = float(line.split('/10')[0].strip().split()[-1])
+                except (ValueError, IndexError):
+                    pass
+    return scores
+
+
+def _sample_responses(items: int) -> Dict[str, str]:
+    """Synthesize large agent responses in the formats the prompts request."""
+    filler = "Some explanatory prose that the parsers have to skip over quickly.\n" * 8
+    return {
+        'test_cases': ''.join(
+            f"**Test Case ID**: TC_{i:05d}\n**Test Case Title**: Case {i}\n"
+            f"**Priority**: High\n**Test Steps**:\n1. Do it\n{filler}"
+            for i in range(items)
+        ),
+        'vulnerabilities': ''.join(
+            f"- **Severity**: High\n- **Description**: Issue {i}\n"
+            f"- **Impact**: Data exposure\n- **Fix**: Validate input\n{filler}"
+            for i in range(items)
+        ),
+        'optimizations': ''.join(
+            f"**Optimization {i}: Cache lookups**\nImpact: High\nEffort: Low\n{filler}"
+            for i in range(items)
+        ),
+        'stories': ''.join(
+            f"**Epic**: Epic {i // 10}\n**Story**: As a user I want feature {i}\n"
+            f"**Acceptance Criteria**:\n- [ ] Works\n{filler}"
+            for i in range(items)
+        ),
+        'scores': ''.join(
+            f"- {pillar}: {i % 10}/10\n{filler}"
+            for i in range(items)
+            for pillar in CodeReviewAgent.REVIEW_PILLARS
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the streaming agent output parsers against the previous split-based parsers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=5000, help='Items per synthetic response')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per parser (best is reported)')
+        parser.add_argument('--chunk-size', type=int, default=16, help='Characters per streamed chunk')
+
+    def handle(self, *args, **options):
+        responses = _sample_responses(options['items'])
+        chunk_size = options['chunk_size']
+
+        def streamed(build_parser: Callable) -> Callable[[str], Any]:
+            def run(text: str):
+                parser = build_parser()
+                for start in range(0, len(text), chunk_size):
+                    parser.feed(text[start:start + chunk_size])
+                return parser.close()
+            return run
+
+        cases = [
+            ('test_cases', _legacy_test_cases, QAAgent.test_case_parser),
+            ('vulnerabilities', _legacy_vulnerabilities, SecurityAgent.vulnerability_parser),
+            ('optimizations', _legacy_optimizations, PerformanceAgent.optimization_parser),
+            ('stories', _legacy_stories, BusinessAnalystAgent.story_parser),
+            ('scores', _legacy_scores, CodeReviewAgent.score_parser),
+        ]
+
+        self.stdout.write(
+            f"{'parser':<16}{'size (KB)':>10}{'legacy (ms)':>14}"
+            f"{'single pass (ms)':>18}{'streamed (ms)':>15}"
+            f"{'first item (KB)':>17}{'items':>8}"
+        )
+
+        for name, legacy, build_parser in cases:
+            text = responses[name]
+            legacy_ms = self._best_of(legacy, text, options['repeat'])
+            single_ms = self._best_of(lambda t: build_parser().parse(t), text, options['repeat'])
+            stream_ms = self._best_of(streamed(build_parser), text, options['repeat'])
+            items = len(build_parser().parse(text))
+            self.stdout.write(
+                f"{name:<16}{len(text) / 1024:>10.0f}{legacy_ms:>14.1f}"
+                f"{single_ms:>18.1f}{stream_ms:>15.1f}"
+                f"{self._first_item_offset(build_parser, text, chunk_size) / 1024:>17.1f}{items:>8}"
+            )
+
+        self.stdout.write(
+            "\nThe legacy parsers only produce results once the whole response "
+            "has arrived; 'first item' is how much of the stream the streaming "
+            "parser needed before publishing its first result."
+        )
+
+    def _first_item_offset(self, build_parser: Callable, text: str, chunk_size: int) -> int:
+        parser = build_parser()
+        for start in range(0, len(text), chunk_size):
+            if parser.feed(text[start:start + chunk_size]):
+                return start + chunk_size
+        return len(text)
+
+    def _best_of(self, func: Callable[[str], Any], text: str, repeat: int) -> float:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(text)
+            best = min(best, time.perf_counter() - start)
+        return best * 1000
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.agents.knowledge import KnowledgeBase
+from apps.agents.models import AgentTask, AgentType, TaskStatus
+
+
+class Command(BaseCommand):
+    help = 'Index project documentation and completed support/documentation tasks for SupportAgent retrieval.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Documentation files or directories (defaults to KNOWLEDGE_DOC_PATHS)'
+        )
+        parser.add_argument('--skip-tasks', action='store_true', help='Only index documentation files')
+
+    def handle(self, *args, **options):
+        knowledge = KnowledgeBase.shared()
+
+        paths = options['paths'] or getattr(settings, 'KNOWLEDGE_DOC_PATHS', [])
+        files = knowledge.index_documents(paths)
+        self.stdout.write(f"Indexed {files} documentation files")
+
+        if options['skip_tasks']:
+            return
+
+        tasks = AgentTask.objects.filter(
+            agent_type__in=[AgentType.SUPPORT, AgentType.DOCUMENTATION],
+            status=TaskStatus.COMPLETED
+        ).only('id', 'title', 'agent_type', 'input_data', 'output_data')
+
+        count = 0
+        for task in tasks.iterator(chunk_size=500):
+            output = task.output_data or {}
+            if output.get('answered_from'):
+                continue
+            if task.agent_type == AgentType.SUPPORT:
+                question, answer = task.input_data.get('issue', ''), output.get('resolution', '')
+                if not question:
+                    continue
+            else:
+                question, answer = '', output.get('documentation', '')
+            knowledge.index_task(task, question, answer, output.get('task_type', ''))
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} completed tasks"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from apps.agents.duplicates import BugDuplicateIndex
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the near-duplicate index over completed bug triage tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Tasks loaded per query')
+
+    def handle(self, *args, **options):
+        count = BugDuplicateIndex().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} triaged bug reports"))
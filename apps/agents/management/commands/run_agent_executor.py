@@ -0,0 +1,45 @@
+import asyncio
+import signal
+from django.core.management.base import BaseCommand, CommandError
+from apps.agents.executor import AsyncAgentExecutor
+from apps.agents.routing import TaskRouter
+
+
+class Command(BaseCommand):
+    help = 'Execute pending agent tasks concurrently on an asyncio loop until interrupted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Tasks executed at once (defaults to the AGENT_QUEUE_CONCURRENCY of the queues, '
+                 'or AGENT_EXECUTOR_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--queue', action='append', dest='queues', default=[],
+            help='Only execute tasks routed to this queue; repeatable (defaults to all queues)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help='Seconds between checks for new tasks while idle (defaults to AGENT_EXECUTOR_POLL_INTERVAL)'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['queues']) - set(TaskRouter().queues)
+        if unknown:
+            raise CommandError(f"Unknown queues: {', '.join(sorted(unknown))}")
+
+        executor = AsyncAgentExecutor(options['concurrency'], options['poll_interval'], options['queues'])
+        self.stdout.write(f"Executing agent tasks with concurrency {executor.concurrency}; Ctrl-C to stop")
+        asyncio.run(self._serve(executor))
+        self.stdout.write(self.style.SUCCESS("Agent executor stopped"))
+
+    @staticmethod
+    async def _serve(executor: AsyncAgentExecutor):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+        await executor.serve(stop)
@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0003_add_security_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BugSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minhash', models.JSONField(default=list, help_text='MinHash signature of the normalized report text')),
+                ('frames', models.JSONField(default=list, help_text='Normalized stack frame keys')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='bug_signature', to='agents.agenttask')),
+            ],
+            options={
+                'db_table': 'bug_signatures',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BugSignatureBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32)),
+                ('signature', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='agents.bugsignature')),
+            ],
+            options={
+                'db_table': 'bug_signature_buckets',
+                'indexes': [models.Index(fields=['key'], name='bug_bucket_key_idx')],
+            },
+        ),
+    ]
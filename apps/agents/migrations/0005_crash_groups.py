@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0004_bug_signatures'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrashGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True)),
+                ('exception_type', models.CharField(blank=True, max_length=255)),
+                ('frames', models.JSONField(default=list, help_text='Normalized frames the fingerprint is computed from')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('CANCELLED', 'Cancelled')], default='PENDING', max_length=20)),
+                ('result', models.JSONField(blank=True, default=dict, help_text='Triage result of the latest burst')),
+                ('report_count', models.IntegerField(default=0)),
+                ('burst_started_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('leader', models.ForeignKey(blank=True, help_text='Task triaging the current burst', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='led_crash_groups', to='agents.agenttask')),
+                ('tasks', models.ManyToManyField(blank=True, related_name='crash_groups', to='agents.agenttask')),
+            ],
+            options={
+                'db_table': 'crash_groups',
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
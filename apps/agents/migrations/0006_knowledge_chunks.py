@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0005_crash_groups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KnowledgeChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('TASK', 'Resolved Task'), ('DOCUMENT', 'Documentation')], max_length=20)),
+                ('path', models.CharField(blank=True, help_text='Source file of documentation chunks', max_length=500)),
+                ('title', models.CharField(max_length=255)),
+                ('question', models.TextField(blank=True, help_text='Issue a resolved task answered')),
+                ('content', models.TextField()),
+                ('task_type', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='knowledge_chunks', to='agents.agenttask')),
+            ],
+            options={
+                'db_table': 'knowledge_chunks',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['source', 'path'], name='knowledge_source_path_idx')],
+            },
+        ),
+    ]
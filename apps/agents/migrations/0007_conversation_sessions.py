@@ -0,0 +1,51 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0006_knowledge_chunks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('thread_id', models.CharField(max_length=100)),
+                ('agent_type', models.CharField(choices=[('CODING', 'Coding Agent'), ('CODE_REVIEW', 'Code Reviewer'), ('DEVOPS', 'DevOps Agent'), ('QA', 'QA Agent'), ('BA', 'Business Analyst'), ('PM', 'Project Manager'), ('SCRUM_MASTER', 'Scrum Master'), ('RELEASE_MANAGER', 'Release Manager'), ('BUG_TRIAGE', 'Bug Triage Agent'), ('SECURITY', 'Security Agent'), ('PERFORMANCE', 'Performance Agent'), ('DOCUMENTATION', 'Documentation Agent'), ('UI_UX', 'UI/UX Agent'), ('DATA_ANALYST', 'Data Analyst'), ('SUPPORT', 'Support Agent')], max_length=50)),
+                ('summary', models.TextField(blank=True)),
+                ('summarized_through', models.IntegerField(default=-1, help_text='Index of the last turn folded into the summary')),
+                ('turn_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'conversation_sessions',
+                'ordering': ['-updated_at'],
+                'unique_together': {('user', 'thread_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ConversationTurn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.IntegerField()),
+                ('role', models.CharField(max_length=20)),
+                ('content', models.TextField()),
+                ('tokens', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turns', to='agents.conversationsession')),
+                ('task', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='agents.agenttask')),
+            ],
+            options={
+                'db_table': 'conversation_turns',
+                'ordering': ['session', 'index'],
+                'unique_together': {('session', 'index')},
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0007_conversation_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='agentexecution',
+            name='agent_type',
+            field=models.CharField(choices=[('CODING', 'Coding Agent'), ('CODE_REVIEW', 'Code Reviewer'), ('DEVOPS', 'DevOps Agent'), ('QA', 'QA Agent'), ('BA', 'Business Analyst'), ('PM', 'Project Manager'), ('SCRUM_MASTER', 'Scrum Master'), ('RELEASE_MANAGER', 'Release Manager'), ('BUG_TRIAGE', 'Bug Triage Agent'), ('SECURITY', 'Security Agent'), ('PERFORMANCE', 'Performance Agent'), ('DOCUMENTATION', 'Documentation Agent'), ('UI_UX', 'UI/UX Agent'), ('DATA_ANALYST', 'Data Analyst'), ('SUPPORT', 'Support Agent'), ('REVIEW_ENSEMBLE', 'Review Ensemble')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='agenttask',
+            name='agent_type',
+            field=models.CharField(choices=[('CODING', 'Coding Agent'), ('CODE_REVIEW', 'Code Reviewer'), ('DEVOPS', 'DevOps Agent'), ('QA', 'QA Agent'), ('BA', 'Business Analyst'), ('PM', 'Project Manager'), ('SCRUM_MASTER', 'Scrum Master'), ('RELEASE_MANAGER', 'Release Manager'), ('BUG_TRIAGE', 'Bug Triage Agent'), ('SECURITY', 'Security Agent'), ('PERFORMANCE', 'Performance Agent'), ('DOCUMENTATION', 'Documentation Agent'), ('UI_UX', 'UI/UX Agent'), ('DATA_ANALYST', 'Data Analyst'), ('SUPPORT', 'Support Agent'), ('REVIEW_ENSEMBLE', 'Review Ensemble')], help_text='Type of agent to handle this task', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='conversationsession',
+            name='agent_type',
+            field=models.CharField(choices=[('CODING', 'Coding Agent'), ('CODE_REVIEW', 'Code Reviewer'), ('DEVOPS', 'DevOps Agent'), ('QA', 'QA Agent'), ('BA', 'Business Analyst'), ('PM', 'Project Manager'), ('SCRUM_MASTER', 'Scrum Master'), ('RELEASE_MANAGER', 'Release Manager'), ('BUG_TRIAGE', 'Bug Triage Agent'), ('SECURITY', 'Security Agent'), ('PERFORMANCE', 'Performance Agent'), ('DOCUMENTATION', 'Documentation Agent'), ('UI_UX', 'UI/UX Agent'), ('DATA_ANALYST', 'Data Analyst'), ('SUPPORT', 'Support Agent'), ('REVIEW_ENSEMBLE', 'Review Ensemble')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='prompt',
+            name='agent_type',
+            field=models.CharField(choices=[('CODING', 'Coding Agent'), ('CODE_REVIEW', 'Code Reviewer'), ('DEVOPS', 'DevOps Agent'), ('QA', 'QA Agent'), ('BA', 'Business Analyst'), ('PM', 'Project Manager'), ('SCRUM_MASTER', 'Scrum Master'), ('RELEASE_MANAGER', 'Release Manager'), ('BUG_TRIAGE', 'Bug Triage Agent'), ('SECURITY', 'Security Agent'), ('PERFORMANCE', 'Performance Agent'), ('DOCUMENTATION', 'Documentation Agent'), ('UI_UX', 'UI/UX Agent'), ('DATA_ANALYST', 'Data Analyst'), ('SUPPORT', 'Support Agent'), ('REVIEW_ENSEMBLE', 'Review Ensemble')], help_text='Agent type this prompt belongs to', max_length=50),
+        ),
+    ]
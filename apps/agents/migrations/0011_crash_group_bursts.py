@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0010_task_dispatches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crashgroup',
+            name='burst_task_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Tasks that joined the latest burst'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('agents', '0011_crash_group_bursts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agenttask',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, help_text='When the task was last sent for execution; unset until it is enqueued', null=True),
+        ),
+    ]
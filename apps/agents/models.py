@@ -19,6 +19,7 @@ class AgentType(models.TextChoices):
     UI_UX = 'UI_UX', _('UI/UX Agent')
     DATA_ANALYST = 'DATA_ANALYST', _('Data Analyst')
     SUPPORT = 'SUPPORT', _('Support Agent')
+    REVIEW_ENSEMBLE = 'REVIEW_ENSEMBLE', _('Review Ensemble')
 
 
 class TaskStatus(models.TextChoices):
@@ -29,6 +30,39 @@ class TaskStatus(models.TextChoices):
     CANCELLED = 'CANCELLED', _('Cancelled')
 
 
+class TaskBatch(models.Model):
+    """A group of agent tasks submitted together through the bulk endpoint."""
+    created_by = models.ForeignKey(
+        HishamOSUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='task_batches'
+    )
+    total = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'agent_task_batches'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Batch {self.pk} ({self.total} tasks)"
+
+    def progress(self):
+        """Task counts by status, with the number and percentage of finished tasks."""
+        counts = {status: 0 for status in TaskStatus.values}
+        counts.update(
+            self.tasks.order_by().values_list('status').annotate(count=models.Count('id'))
+        )
+        finished = counts[TaskStatus.COMPLETED] + counts[TaskStatus.FAILED] + counts[TaskStatus.CANCELLED]
+        return {
+            'total': self.total,
+            'finished': finished,
+            'percent': round(100 * finished / self.total, 1) if self.total else 100.0,
+            'by_status': counts,
+        }
+
+
 class AgentTask(models.Model):
     agent_type = models.CharField(
         max_length=50,
@@ -73,11 +107,23 @@ class AgentTask(models.Model):
         blank=True,
         related_name='subtasks'
     )
+    batch = models.ForeignKey(
+        TaskBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tasks'
+    )
     tokens_used = models.IntegerField(default=0)
     execution_time_seconds = models.FloatField(default=0.0)
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    dispatched_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('When the task was last sent for execution; unset until it is enqueued')
+    )
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
@@ -94,6 +140,32 @@ class AgentTask(models.Model):
         return f"[{self.agent_type}] {self.title} - {self.status}"
 
 
+class TaskDispatch(models.Model):
+    """
+    A request to execute an agent task, identified by the client's idempotency
+    key, so a retried request returns the original dispatch instead of
+    enqueuing the task again.
+    """
+    task = models.ForeignKey(AgentTask, on_delete=models.CASCADE, related_name='dispatches')
+    idempotency_key = models.CharField(max_length=255)
+    requested_by = models.ForeignKey(
+        HishamOSUser,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    celery_task_id = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'agent_task_dispatches'
+        unique_together = ['task', 'idempotency_key']
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.task_id} / {self.idempotency_key}"
+
+
 class Prompt(models.Model):
     agent_type = models.CharField(
         max_length=50,
@@ -167,3 +239,155 @@ class AgentExecution(models.Model):
 
     def __str__(self):
         return f"{self.agent_type} - {self.task.title} - {'Success' if self.success else 'Failed'}"
+
+
+class BugSignature(models.Model):
+    """MinHash signature and stack frames of a triaged bug report, for duplicate detection."""
+    task = models.OneToOneField(AgentTask, on_delete=models.CASCADE, related_name='bug_signature')
+    minhash = models.JSONField(default=list, help_text=_('MinHash signature of the normalized report text'))
+    frames = models.JSONField(default=list, help_text=_('Normalized stack frame keys'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'bug_signatures'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Signature of task {self.task_id}"
+
+
+class BugSignatureBucket(models.Model):
+    """LSH band bucket of a BugSignature; signatures sharing a bucket are duplicate candidates."""
+    signature = models.ForeignKey(BugSignature, on_delete=models.CASCADE, related_name='buckets')
+    key = models.CharField(max_length=32)
+
+    class Meta:
+        db_table = 'bug_signature_buckets'
+        indexes = [
+            models.Index(fields=['key'], name='bug_bucket_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} -> {self.signature_id}"
+
+
+class CrashGroup(models.Model):
+    """
+    Bug reports sharing a stack trace fingerprint.
+
+    The first report of a burst triages the crash; the others joining while it
+    runs (or within the burst window afterwards) receive its result.
+    """
+    fingerprint = models.CharField(max_length=64, unique=True)
+    exception_type = models.CharField(max_length=255, blank=True)
+    frames = models.JSONField(default=list, help_text=_('Normalized frames the fingerprint is computed from'))
+    status = models.CharField(
+        max_length=20,
+        choices=TaskStatus.choices,
+        default=TaskStatus.PENDING
+    )
+    leader = models.ForeignKey(
+        AgentTask,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='led_crash_groups',
+        help_text=_('Task triaging the current burst')
+    )
+    tasks = models.ManyToManyField(AgentTask, related_name='crash_groups', blank=True)
+    result = models.JSONField(default=dict, blank=True, help_text=_('Triage result of the latest burst'))
+    burst_task_ids = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_('Tasks that joined the latest burst')
+    )
+    report_count = models.IntegerField(default=0)
+    burst_started_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'crash_groups'
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"{self.exception_type or 'Crash'} {self.fingerprint[:12]} ({self.report_count} reports)"
+
+
+class KnowledgeSource(models.TextChoices):
+    TASK = 'TASK', _('Resolved Task')
+    DOCUMENT = 'DOCUMENT', _('Documentation')
+
+
+class KnowledgeChunk(models.Model):
+    """A passage of past resolutions or documentation retrievable by the SupportAgent."""
+    source = models.CharField(max_length=20, choices=KnowledgeSource.choices)
+    task = models.ForeignKey(
+        AgentTask,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='knowledge_chunks'
+    )
+    path = models.CharField(max_length=500, blank=True, help_text=_('Source file of documentation chunks'))
+    title = models.CharField(max_length=255)
+    question = models.TextField(blank=True, help_text=_('Issue a resolved task answered'))
+    content = models.TextField()
+    task_type = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'knowledge_chunks'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['source', 'path'], name='knowledge_source_path_idx'),
+        ]
+
+    def __str__(self):
+        return f"[{self.source}] {self.title}"
+
+
+class ConversationSession(models.Model):
+    """
+    A multi-turn conversation of a user with an agent, identified by a client thread id.
+
+    Older turns are folded into ``summary`` in the background, so only the
+    summary and the recent turns are sent with each follow-up.
+    """
+    user = models.ForeignKey(HishamOSUser, on_delete=models.CASCADE, related_name='conversation_sessions')
+    thread_id = models.CharField(max_length=100)
+    agent_type = models.CharField(max_length=50, choices=AgentType.choices)
+    summary = models.TextField(blank=True)
+    summarized_through = models.IntegerField(
+        default=-1,
+        help_text=_('Index of the last turn folded into the summary')
+    )
+    turn_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'conversation_sessions'
+        unique_together = ['user', 'thread_id']
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"{self.user} / {self.thread_id} ({self.turn_count} turns)"
+
+
+class ConversationTurn(models.Model):
+    session = models.ForeignKey(ConversationSession, on_delete=models.CASCADE, related_name='turns')
+    index = models.IntegerField()
+    role = models.CharField(max_length=20)
+    content = models.TextField()
+    tokens = models.IntegerField(default=0)
+    task = models.ForeignKey(AgentTask, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'conversation_turns'
+        unique_together = ['session', 'index']
+        ordering = ['session', 'index']
+
+    def __str__(self):
+        return f"{self.session_id}#{self.index} {self.role}"
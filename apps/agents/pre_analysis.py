@@ -0,0 +1,122 @@
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from .cache import content_hash
+from libs.static_analysis import AnalysisReport, analyze_files, summarize_reports
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PreAnalyzer:
+    """
+    Local static analysis run before the CodeReview and Security agents call
+    the provider.
+
+    Findings a linter would report (hardcoded secrets, eval/exec, SQL built
+    from strings, unsafe deserialization, shell commands, complex functions)
+    are detected with the Python AST and pattern rules, attached to the
+    task's output and listed in the prompt so the model can concentrate on
+    design and logic. Inputs that are small and have no findings do not need
+    the provider at all.
+
+    Attributes:
+        complexity_threshold: Cyclomatic complexity above which a function is reported
+        skip_max_lines: Clean inputs up to this many lines skip the provider (0 disables)
+        max_workers: Size of the analysis process pool
+    """
+
+    # Recent analyses, so agents reviewing the same input (e.g. an ensemble) analyze it once.
+    MEMO_SIZE = 32
+    _memo: 'OrderedDict[str, List[AnalysisReport]]' = OrderedDict()
+    _memo_lock = threading.Lock()
+
+    def __init__(
+        self,
+        complexity_threshold: Optional[int] = None,
+        skip_max_lines: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.complexity_threshold = complexity_threshold if complexity_threshold is not None else getattr(
+            settings, 'STATIC_ANALYSIS_COMPLEXITY_THRESHOLD', 10
+        )
+        self.skip_max_lines = skip_max_lines if skip_max_lines is not None else getattr(
+            settings, 'STATIC_ANALYSIS_SKIP_MAX_LINES', 30
+        )
+        self.max_workers = max_workers if max_workers is not None else getattr(
+            settings, 'STATIC_ANALYSIS_WORKERS', None
+        )
+
+    def analyze(
+        self,
+        code: str = '',
+        language: Optional[str] = None,
+        files: Optional[List[Dict[str, Any]]] = None
+    ) -> List[AnalysisReport]:
+        """
+        Analyze the task's code, or its files ({path, content | diff, language}
+        entries). Diffs are analyzed on their added lines only.
+        """
+        key = content_hash(code, language, files or [], self.complexity_threshold)
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        entries = []
+        for index, file in enumerate(files or []):
+            path = file.get('path') or f"file_{index + 1}"
+            if 'content' in file:
+                source = file.get('content') or ''
+            else:
+                source = self._added_lines(file.get('diff', ''))
+            entries.append((path, source, file.get('language', language)))
+        if code:
+            entries.append(('', code, language))
+
+        reports = analyze_files(entries, self.complexity_threshold, self.max_workers)
+        with self._memo_lock:
+            self._memo[key] = reports
+            while len(self._memo) > self.MEMO_SIZE:
+                self._memo.popitem(last=False)
+        logger.info(
+            f"Static pre-analysis: {len(reports)} sources, "
+            f"{sum(len(report.findings) for report in reports)} findings"
+        )
+        return reports
+
+    def can_skip_llm(self, reports: List[AnalysisReport]) -> bool:
+        """Whether the input is small and clean enough to answer without the provider."""
+        return bool(reports) and self.skip_max_lines > 0 and all(
+            report.is_clean for report in reports
+        ) and sum(report.lines for report in reports) <= self.skip_max_lines
+
+    def prompt_section(self, reports: List[AnalysisReport]) -> str:
+        if not reports:
+            return ''
+        return (
+            "Static Analysis (already detected locally; do not repeat these, "
+            "focus on design, logic and issues a linter cannot find):\n"
+            f"{summarize_reports(reports)}\n"
+        )
+
+    @staticmethod
+    def output(reports: List[AnalysisReport]) -> Dict[str, Any]:
+        """The analysis as stored in the task's output_data."""
+        findings = [finding for report in reports for finding in report.findings]
+        return {
+            'findings': [finding.to_dict() for finding in findings],
+            'counts': dict(Counter(finding.severity for finding in findings)),
+            'files': [
+                {'path': report.path, 'language': report.language, 'metrics': report.metrics}
+                for report in reports
+            ],
+        }
+
+    @staticmethod
+    def _added_lines(diff: str) -> str:
+        return "\n".join(
+            line[1:] for line in diff.splitlines()
+            if line.startswith('+') and not line.startswith('+++')
+        )
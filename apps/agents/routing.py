@@ -0,0 +1,248 @@
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import AgentTask, TaskDispatch, TaskStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Celery tasks that execute agent tasks and are routed by the agent task's priority and type.
+EXECUTION_TASKS = ('apps.agents.tasks.execute_agent_task', 'apps.agents.tasks.execute_agent_tasks')
+
+
+class TaskRouter:
+    """
+    Maps agent tasks to Celery queues and broker priorities.
+
+    Agent types listed in ``type_queues`` always go to their own queue, e.g.
+    nightly documentation jobs to a batch queue served by a small worker
+    pool; every other task goes to the queue of its priority band. Within a
+    queue, the broker delivers higher-priority messages first where it
+    supports priorities.
+
+    Starvation protection: a task left pending for ``starvation_seconds``
+    after it was dispatched is promoted by one priority step and dispatched
+    again, which can move it into a faster queue. Tasks that were created but
+    never dispatched are left alone. Every message carries the dispatch time
+    it was sent for (see claim_filter) and claims the task only while that is
+    still the task's latest dispatch, so the stale message is skipped when it
+    is eventually delivered, even if the promoted execution has failed.
+
+    Attributes:
+        priority_queues: (highest priority of the band, queue) pairs, in order
+        type_queues: Queue of each agent type with a dedicated queue
+        starvation_seconds: Pending time after which a task is promoted
+    """
+
+    def __init__(
+        self,
+        priority_queues: Optional[Sequence[Tuple[int, str]]] = None,
+        type_queues: Optional[Dict[str, str]] = None,
+        starvation_seconds: Optional[int] = None
+    ):
+        self.priority_queues = sorted(priority_queues or getattr(
+            settings, 'AGENT_PRIORITY_QUEUES', [(3, 'agents.high'), (7, 'agents.default'), (10, 'agents.low')]
+        ))
+        self.type_queues = type_queues if type_queues is not None else getattr(settings, 'AGENT_TYPE_QUEUES', {})
+        self.starvation_seconds = starvation_seconds or getattr(settings, 'AGENT_TASK_STARVATION_SECONDS', 600)
+
+    @property
+    def queues(self) -> List[str]:
+        return list(dict.fromkeys(
+            [queue for _, queue in self.priority_queues] + list(self.type_queues.values())
+        ))
+
+    def queue(self, agent_type: str, priority: int) -> str:
+        if agent_type in self.type_queues:
+            return self.type_queues[agent_type]
+        for bound, queue in self.priority_queues:
+            if priority <= bound:
+                return queue
+        return self.priority_queues[-1][1]
+
+    @staticmethod
+    def broker_priority(priority: int) -> int:
+        """
+        The message priority for the broker. Task priority 1 is the highest;
+        Redis treats 0 as the highest priority and RabbitMQ the largest number.
+        """
+        priority = min(max(int(priority), 1), 10)
+        if getattr(settings, 'CELERY_BROKER_URL', '').startswith(('amqp', 'pyamqp')):
+            return 10 - priority
+        return priority - 1
+
+    def route(self, task: AgentTask) -> Dict[str, Any]:
+        """Celery options for executing the task."""
+        return {
+            'queue': self.queue(task.agent_type, task.priority),
+            'priority': self.broker_priority(task.priority),
+        }
+
+    def queue_filter(self, queues: Iterable[str]) -> Q:
+        """The tasks routed to any of the queues, as a query filter."""
+        queues = set(queues)
+        dedicated = [agent_type for agent_type, queue in self.type_queues.items() if queue in queues]
+        condition = Q(agent_type__in=dedicated) if dedicated else Q(pk__in=[])
+
+        lower = 1
+        for bound, queue in self.priority_queues:
+            if queue in queues:
+                band = Q(priority__gte=lower) if bound == self.priority_queues[-1][0] else Q(
+                    priority__gte=lower, priority__lte=bound
+                )
+                condition |= band & ~Q(agent_type__in=list(self.type_queues))
+            lower = bound + 1
+        return condition
+
+    def dispatch(self, task: AgentTask):
+        """Send the task to its queue for execution."""
+        from .tasks import execute_agent_tasks
+
+        options = self.route(task)
+        dispatched_at = self.mark_dispatched([task.pk])
+        execute_agent_tasks.apply_async(([task.pk], dispatched_at), **options)
+        logger.info(f"Dispatched task {task.pk} to {options['queue']} at broker priority {options['priority']}")
+
+    def dispatch_once(self, task: AgentTask, idempotency_key: str, user=None) -> Tuple[Optional[TaskDispatch], bool]:
+        """
+        Dispatch ``execute_agent_task`` for the task unless a dispatch with the
+        same idempotency key exists.
+
+        The task row is locked while the key is checked and stored, and the
+        message is sent only once the dispatch is committed, so concurrent or
+        retried requests with one key enqueue the task once. Requests with
+        different keys are still executed once, as the Celery task claims the
+        task before running it.
+
+        Returns:
+            (dispatch, created): the new or existing dispatch, or (None, False)
+            when the task is neither pending nor failed and cannot be executed
+        """
+        from .tasks import execute_agent_task
+
+        try:
+            with transaction.atomic():
+                task = AgentTask.objects.select_for_update().get(pk=task.pk)
+                existing = TaskDispatch.objects.filter(task=task, idempotency_key=idempotency_key).first()
+                if existing:
+                    return existing, False
+                if task.status not in (TaskStatus.PENDING, TaskStatus.FAILED):
+                    return None, False
+
+                dispatch = TaskDispatch.objects.create(
+                    task=task,
+                    idempotency_key=idempotency_key,
+                    requested_by=user,
+                    celery_task_id=str(uuid.uuid4())
+                )
+                dispatched_at = self.mark_dispatched([task.pk])
+                options = self.route(task)
+                transaction.on_commit(lambda: execute_agent_task.apply_async(
+                    (task.pk, dispatched_at), task_id=dispatch.celery_task_id, **options
+                ))
+        except IntegrityError:
+            # Databases without row locks (SQLite) can race to the unique key.
+            return TaskDispatch.objects.get(task=task, idempotency_key=idempotency_key), False
+
+        logger.info(f"Dispatched task {task.pk} with idempotency key {idempotency_key}")
+        return dispatch, True
+
+    def dispatch_many(self, tasks: Iterable[AgentTask], chunk_size: Optional[int] = None) -> int:
+        """
+        Send many tasks as one Celery group: tasks are grouped by queue and
+        broker priority and each group member executes a chunk of up to
+        ``chunk_size`` of them on one executor loop.
+
+        Returns:
+            Number of messages sent
+        """
+        from celery import group
+        from .tasks import execute_agent_tasks
+
+        chunk_size = chunk_size or getattr(settings, 'AGENT_BULK_ENQUEUE_CHUNK', 25)
+        routes: Dict[Tuple[str, int], List[int]] = {}
+        for task in tasks:
+            options = self.route(task)
+            routes.setdefault((options['queue'], options['priority']), []).append(task.pk)
+
+        dispatched_at = self.mark_dispatched([pk for ids in routes.values() for pk in ids])
+        signatures = [
+            execute_agent_tasks.signature(
+                (ids[start:start + chunk_size], dispatched_at), queue=queue, priority=priority
+            )
+            for (queue, priority), ids in routes.items()
+            for start in range(0, len(ids), chunk_size)
+        ]
+        if signatures:
+            group(signatures).apply_async()
+            logger.info(f"Dispatched {sum(map(len, routes.values()))} tasks in {len(signatures)} chunks")
+        return len(signatures)
+
+    @staticmethod
+    def mark_dispatched(task_ids: Iterable[int]) -> str:
+        """
+        Record that the tasks are being sent for execution, which makes them
+        eligible for promotion; returns the dispatch time for the message.
+        """
+        now = timezone.now()
+        task_ids = list(task_ids)
+        if task_ids:
+            AgentTask.objects.filter(pk__in=task_ids).update(dispatched_at=now)
+        return now.isoformat()
+
+    @staticmethod
+    def claim_filter(dispatched_at: Optional[str]) -> Q:
+        """
+        The tasks a message sent at ``dispatched_at`` may still claim: those
+        not dispatched again since. Messages without a dispatch time (sent
+        directly, e.g. with ``delay``) are not restricted.
+        """
+        return Q(dispatched_at=parse_datetime(dispatched_at)) if dispatched_at else Q()
+
+    def promote_starved(self, limit: int = 500) -> int:
+        """
+        Raise the priority of tasks still pending ``starvation_seconds`` after
+        they were dispatched by one step and dispatch them again.
+
+        Dispatching again restarts the period, so each task is promoted at most
+        once per period.
+        """
+        threshold = timezone.now() - timedelta(seconds=self.starvation_seconds)
+        starved = list(
+            AgentTask.objects.filter(status=TaskStatus.PENDING, dispatched_at__lt=threshold, priority__gt=1)
+            .order_by('priority', 'created_at').values_list('pk', flat=True)[:limit]
+        )
+        if not starved:
+            return 0
+
+        AgentTask.objects.filter(pk__in=starved, status=TaskStatus.PENDING).update(
+            priority=Greatest(F('priority') - 1, 1), updated_at=timezone.now()
+        )
+        for task in AgentTask.objects.filter(pk__in=starved, status=TaskStatus.PENDING).only(
+            'pk', 'agent_type', 'priority'
+        ):
+            self.dispatch(task)
+        logger.warning(f"Promoted {len(starved)} tasks pending for over {self.starvation_seconds}s")
+        return len(starved)
+
+
+def route_task(name, args, kwargs, options, task=None, **kw) -> Optional[Dict[str, Any]]:
+    """
+    Celery router (CELERY_TASK_ROUTES) for executions sent without a queue,
+    e.g. ``execute_agent_task.delay(task_id)``: looks up the agent task and
+    routes it by type and priority. Other tasks use the default queue.
+    """
+    if name not in EXECUTION_TASKS or not args or options.get('queue'):
+        return None
+    task_id = args[0][0] if isinstance(args[0], (list, tuple)) else args[0]
+    agent_task = AgentTask.objects.filter(pk=task_id).only('agent_type', 'priority').first()
+    if agent_task is None:
+        return None
+    return TaskRouter().route(agent_task)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import AgentTask, Prompt, AIProvider, AgentExecution
+from .models import AgentTask, Prompt, AIProvider, AgentExecution, TaskBatch
 
 
 class AgentTaskSerializer(serializers.ModelSerializer):
@@ -11,17 +11,29 @@ class AgentTaskSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'agent_type', 'title', 'description', 'input_data',
             'output_data', 'status', 'priority', 'created_by', 'created_by_name',
-            'assigned_to', 'assigned_to_name', 'parent_task', 'tokens_used',
+            'assigned_to', 'assigned_to_name', 'parent_task', 'batch', 'tokens_used',
             'execution_time_seconds', 'error_message', 'created_at', 'updated_at',
             'started_at', 'completed_at'
         ]
         read_only_fields = [
-            'id', 'created_by', 'output_data', 'tokens_used',
+            'id', 'created_by', 'batch', 'output_data', 'tokens_used',
             'execution_time_seconds', 'error_message', 'created_at',
             'updated_at', 'started_at', 'completed_at'
         ]
 
 
+class TaskBatchSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TaskBatch
+        fields = ['id', 'created_by', 'total', 'progress', 'created_at']
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        return obj.progress()
+
+
 class PromptSerializer(serializers.ModelSerializer):
     class Meta:
         model = Prompt
@@ -0,0 +1,189 @@
+from typing import Any, Callable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+from .models import AgentTask, ConversationSession, ConversationTurn
+from libs.ai_providers.base import Message
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+SUMMARY_SYSTEM_PROMPT = """You maintain the running summary of a conversation between a user and an assistant.
+Merge the new turns into the existing summary. Keep facts, decisions, open questions,
+identifiers, code names and anything the user asked to remember; drop pleasantries
+and repetition. Answer with the updated summary only."""
+
+
+class ConversationMemory:
+    """
+    Bounded conversation history for multi-turn agent tasks.
+
+    Each exchange is stored as two compact turns (the user's input as sent,
+    not the expanded prompt template, and the agent's output). The prompt of
+    a follow-up holds the rolling summary of older turns plus the most recent
+    turns that fit into ``recent_tokens``, so its size stays constant however
+    long the conversation gets. Once the turns not yet summarized exceed
+    ``summary_threshold`` tokens, the ``summarize_conversation`` task folds
+    them into the summary in the background.
+
+    Attributes:
+        recent_tokens: Token budget of the verbatim recent turns sent with a prompt
+        summary_threshold: Unsummarized tokens that trigger a new summary
+        keep_turns: Turns left out of the summary so that they stay verbatim
+    """
+
+    LOCK_TIMEOUT = 300
+
+    def __init__(
+        self,
+        recent_tokens: Optional[int] = None,
+        summary_threshold: Optional[int] = None,
+        keep_turns: Optional[int] = None
+    ):
+        self.recent_tokens = recent_tokens if recent_tokens is not None else getattr(
+            settings, 'SESSION_RECENT_TOKENS', 2000
+        )
+        self.summary_threshold = summary_threshold if summary_threshold is not None else getattr(
+            settings, 'SESSION_SUMMARY_THRESHOLD', 3000
+        )
+        self.keep_turns = keep_turns if keep_turns is not None else getattr(
+            settings, 'SESSION_RECENT_TURNS', 4
+        )
+
+    def open(self, task: AgentTask) -> Optional[ConversationSession]:
+        """The session of the task's thread, or None if the task is not part of one."""
+        thread_id = str(task.input_data.get('thread_id') or '')[:100]
+        if not thread_id or not task.created_by_id:
+            return None
+        session, _ = ConversationSession.objects.get_or_create(
+            user_id=task.created_by_id,
+            thread_id=thread_id,
+            defaults={'agent_type': task.agent_type}
+        )
+        return session
+
+    def history(self, session: ConversationSession) -> List[Message]:
+        """The summary and the recent unsummarized turns, as messages to prime an agent with."""
+        turns = []
+        budget = self.recent_tokens
+        recent = ConversationTurn.objects.filter(
+            session=session, index__gt=session.summarized_through
+        ).order_by('-index').only(
+            'index', 'role', 'content', 'tokens'
+        )
+        for turn in recent.iterator():
+            if turns and turn.tokens > budget:
+                break
+            budget -= turn.tokens
+            turns.append(turn)
+            if budget <= 0:
+                break
+        turns.reverse()
+
+        # Providers expect the history to start with a user message.
+        while turns and turns[0].role != 'user':
+            turns.pop(0)
+
+        messages = []
+        if session.summary:
+            messages.append(Message(role='user', content=f"Summary of our conversation so far:\n{session.summary}"))
+            messages.append(Message(role='assistant', content='Understood, I will take it into account.'))
+        messages.extend(Message(role=turn.role, content=turn.content) for turn in turns)
+        return messages
+
+    def record(
+        self,
+        session: ConversationSession,
+        task: AgentTask,
+        user_message: str,
+        response: str,
+        count_tokens: Callable[[str], Any]
+    ):
+        """Append an exchange to the session and schedule a summary if needed."""
+        with transaction.atomic():
+            locked = ConversationSession.objects.select_for_update().get(pk=session.pk)
+            index = locked.turn_count
+            ConversationTurn.objects.bulk_create([
+                ConversationTurn(
+                    session=locked, index=index + offset, role=role, content=content,
+                    tokens=self._count(count_tokens, content), task=task
+                )
+                for offset, (role, content) in enumerate((('user', user_message), ('assistant', response)))
+            ])
+            ConversationSession.objects.filter(pk=session.pk).update(turn_count=F('turn_count') + 2)
+            session.turn_count = index + 2
+
+        if self.unsummarized_tokens(session) > self.summary_threshold:
+            self.schedule_summary(session)
+
+    def unsummarized_tokens(self, session: ConversationSession) -> int:
+        return ConversationTurn.objects.filter(
+            session=session, index__gt=session.summarized_through
+        ).aggregate(total=Sum('tokens'))['total'] or 0
+
+    def schedule_summary(self, session: ConversationSession):
+        """Queue a summary of the session unless one is already pending."""
+        from .tasks import summarize_conversation
+
+        if not cache.add(self._lock_key(session.pk), True, self.LOCK_TIMEOUT):
+            return
+        try:
+            summarize_conversation.delay(session.pk)
+        except Exception as e:
+            cache.delete(self._lock_key(session.pk))
+            logger.warning(f"Could not schedule summary of session {session.pk}: {str(e)}")
+
+    def summarize(self, session_id: int, generate: Callable[[List[Message], str], str]) -> bool:
+        """
+        Fold the turns that are neither summarized nor among the last
+        ``keep_turns`` into the session's summary.
+
+        Args:
+            session_id: ConversationSession ID
+            generate: Callable taking messages and a system prompt, returning the reply text
+
+        Returns:
+            Whether the summary was updated
+        """
+        try:
+            session = ConversationSession.objects.get(pk=session_id)
+            through = session.turn_count - self.keep_turns - 1
+            # Summarize up to the end of an exchange so a question is never cut from its answer.
+            if through % 2 == 0:
+                through -= 1
+            turns = list(ConversationTurn.objects.filter(
+                session=session, index__gt=session.summarized_through, index__lte=through
+            ).order_by('index'))
+            if not turns:
+                return False
+
+            transcript = "\n\n".join(f"{turn.role.upper()}: {turn.content}" for turn in turns)
+            summary = generate(
+                [Message(role='user', content=(
+                    f"Current summary:\n{session.summary or '(none)'}\n\n"
+                    f"New turns:\n{transcript}\n\nUpdated summary:"
+                ))],
+                SUMMARY_SYSTEM_PROMPT
+            ).strip()
+
+            ConversationSession.objects.filter(pk=session.pk).update(
+                summary=summary,
+                summarized_through=turns[-1].index
+            )
+            logger.info(f"Summarized {len(turns)} turns of conversation session {session.pk}")
+            return True
+        finally:
+            cache.delete(self._lock_key(session_id))
+
+    @staticmethod
+    def _count(count_tokens: Callable[[str], Any], text: str) -> int:
+        try:
+            return int(count_tokens(text))
+        except Exception:
+            return int(len(text.split()) * 1.3)
+
+    @staticmethod
+    def _lock_key(session_id: int) -> str:
+        return f"agents:session:{session_id}:summarizing"
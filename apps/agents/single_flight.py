@@ -0,0 +1,228 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .cache import content_hash
+from .exceptions import TaskDeferred
+from .models import AgentTask, AIProvider, Prompt, TaskStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescedTaskFailed(Exception):
+    """The execution a task was coalesced with failed."""
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class SingleFlight:
+    """
+    Coalesces identical agent tasks that execute at the same time.
+
+    Tasks are identical when their fingerprint matches: agent type,
+    description, normalized input data, prompt version and provider model.
+    The first task to arrive takes a lock in the shared cache and runs; the
+    others, its followers, register with it and are deferred (TaskDeferred)
+    instead of holding a worker while it runs. When the leader finishes it
+    publishes its outcome and completes its followers with its result, or
+    fails them with its error, so a failing request is not repeated by every
+    follower; retries start a new flight. Followers of a leader that was
+    itself deferred or interrupted are dispatched again, and a task arriving
+    just as the leader finishes takes its outcome directly.
+
+    Tasks setting ``input_data['single_flight']`` to false always run by
+    themselves, as do tasks continuing a conversation (see
+    BaseAgent.run_with_tracking), whose result depends on its history.
+
+    Attributes:
+        timeout: Seconds a lock and the followers' registrations are kept at most
+    """
+
+    # Seconds an outcome stays readable by followers after the lock is released.
+    OUTCOME_TIMEOUT = 60
+
+    # Attempts at leading or following before running without coalescing.
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, timeout: Optional[int] = None):
+        self.timeout = timeout or getattr(settings, 'AGENT_SINGLE_FLIGHT_TIMEOUT', 900)
+
+    @staticmethod
+    def fingerprint(task: AgentTask, prompt: Prompt, provider: AIProvider) -> Optional[str]:
+        """The task's request fingerprint, or None when it must not be coalesced."""
+        if not getattr(settings, 'AGENT_SINGLE_FLIGHT_ENABLED', True):
+            return None
+        input_data = task.input_data or {}
+        if input_data.get('single_flight') is False:
+            return None
+        return content_hash(
+            task.agent_type,
+            task.description.strip(),
+            _normalize(input_data),
+            prompt.pk, prompt.version, prompt.system_prompt,
+            getattr(provider, 'pk', None), getattr(provider, 'model_name', '')
+        )
+
+    def run(
+        self,
+        task: AgentTask,
+        fingerprint: Optional[str],
+        work: Callable[[], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Optional[int]]:
+        """
+        Run ``work`` for the task, or defer it to an identical task running it.
+
+        Returns:
+            (result, leader task id): the id is None when ``work`` ran here
+
+        Raises:
+            TaskDeferred: If an identical task is running; it completes this one
+            CoalescedTaskFailed: If the leader's execution failed
+        """
+        if fingerprint is None:
+            return work(), None
+
+        lock_key = f"agents:single_flight:{fingerprint}"
+        outcome_key = f"{lock_key}:outcome"
+
+        for _ in range(self.MAX_ATTEMPTS):
+            if self._acquire(lock_key, task.pk):
+                return self._lead(task, lock_key, outcome_key, work), None
+
+            leader_id = self._get(lock_key)
+            if leader_id is None or leader_id == task.pk:
+                continue
+            # Registered before the outcome is checked: the leader publishes
+            # its outcome before reading the followers, so one of the two sees the other.
+            self._register(lock_key, task.pk)
+            outcome = self._get(outcome_key)
+            if outcome and outcome.get('task_id') == leader_id:
+                if outcome['status'] == 'failed':
+                    raise CoalescedTaskFailed(f"Identical task {leader_id} failed: {outcome['error']}")
+                return outcome['result'], leader_id
+            if self._get(lock_key) == leader_id:
+                logger.info(f"Task {task.pk} deferred to identical task {leader_id}")
+                raise TaskDeferred(f"Waiting for identical task {leader_id}")
+
+        logger.warning(f"Task {task.pk} could not join a flight of identical tasks; running by itself")
+        return work(), None
+
+    def _lead(self, task: AgentTask, lock_key: str, outcome_key: str, work: Callable[[], Dict[str, Any]]):
+        self._delete(outcome_key)
+        outcome: Optional[Dict[str, Any]] = None
+        try:
+            result = work()
+            outcome = {'task_id': task.pk, 'status': 'completed', 'result': result}
+            return result
+        except TaskDeferred:
+            # Not an outcome: the followers are dispatched again below.
+            raise
+        except Exception as e:
+            outcome = {'task_id': task.pk, 'status': 'failed', 'error': str(e)}
+            raise
+        finally:
+            if outcome is not None:
+                self._set(outcome_key, outcome, self.OUTCOME_TIMEOUT)
+            if self._get(lock_key) == task.pk:
+                self._delete(lock_key)
+            try:
+                self._release_followers(task, lock_key, outcome)
+            except Exception as e:
+                logger.error(f"Could not release the followers of task {task.pk}: {str(e)}")
+
+    def _register(self, lock_key: str, task_id: int):
+        counter_key = f"{lock_key}:followers"
+        try:
+            cache.add(counter_key, 0, self.timeout)
+            index = cache.incr(counter_key)
+            cache.set(f"{counter_key}:{index}", task_id, self.timeout)
+        except Exception as e:
+            logger.warning(f"Single-flight registration failed: {str(e)}")
+
+    def _followers(self, lock_key: str) -> List[int]:
+        counter_key = f"{lock_key}:followers"
+        count = self._get(counter_key) or 0
+        if not count:
+            return []
+        try:
+            registered = cache.get_many([f"{counter_key}:{index}" for index in range(1, count + 1)])
+        except Exception as e:
+            logger.warning(f"Single-flight read failed: {str(e)}")
+            return []
+        return sorted(set(registered.values()))
+
+    def _release_followers(self, leader: AgentTask, lock_key: str, outcome: Optional[Dict[str, Any]]):
+        """
+        Complete or fail the deferred followers with the leader's outcome, or
+        dispatch them again when there is none. Registrations of earlier
+        flights are included; only tasks still in progress are touched.
+        """
+        from .routing import TaskRouter
+
+        waiting = AgentTask.objects.filter(
+            pk__in=self._followers(lock_key), status=TaskStatus.IN_PROGRESS
+        ).exclude(pk=leader.pk)
+        if outcome is None:
+            released = list(waiting.only('pk', 'agent_type', 'priority'))
+            AgentTask.objects.filter(
+                pk__in=[task.pk for task in released], status=TaskStatus.IN_PROGRESS
+            ).update(status=TaskStatus.PENDING)
+            router = TaskRouter()
+            for task in released:
+                transaction.on_commit(lambda task=task: router.dispatch(task))
+            count = len(released)
+        elif outcome['status'] == 'completed':
+            count = waiting.update(
+                status=TaskStatus.COMPLETED,
+                output_data={**outcome['result'], 'coalesced_with': leader.pk},
+                completed_at=timezone.now(),
+                updated_at=timezone.now()
+            )
+        else:
+            count = waiting.update(
+                status=TaskStatus.FAILED,
+                error_message=f"Identical task {leader.pk} failed: {outcome['error']}",
+                updated_at=timezone.now()
+            )
+        if count:
+            logger.info(f"Task {leader.pk} released {count} identical tasks")
+
+    def _acquire(self, key: str, task_id: int) -> bool:
+        try:
+            return cache.add(key, task_id, self.timeout)
+        except Exception as e:
+            # Without the cache nothing can be coalesced; run as before.
+            logger.warning(f"Single-flight lock failed: {str(e)}")
+            return True
+
+    @staticmethod
+    def _get(key: str) -> Any:
+        try:
+            return cache.get(key)
+        except Exception as e:
+            logger.warning(f"Single-flight read failed: {str(e)}")
+            return None
+
+    @staticmethod
+    def _set(key: str, value: Any, timeout: int):
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.warning(f"Single-flight write failed: {str(e)}")
+
+    @staticmethod
+    def _delete(key: str):
+        try:
+            cache.delete(key)
+        except Exception as e:
+            logger.warning(f"Single-flight write failed: {str(e)}")
@@ -13,6 +13,7 @@ from .documentation_agent import DocumentationAgent
 from .uiux_agent import UIUXAgent
 from .data_analyst_agent import DataAnalystAgent
 from .support_agent import SupportAgent
+from .ensemble_review_agent import EnsembleReviewAgent
 
 __all__ = [
     'CodingAgent',
@@ -30,4 +31,5 @@ __all__ = [
     'UIUXAgent',
     'DataAnalystAgent',
     'SupportAgent',
+    'EnsembleReviewAgent',
 ]
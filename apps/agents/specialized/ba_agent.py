@@ -1,6 +1,10 @@
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Tuple
 from apps.agents.base_agent import BaseAgent
+from apps.agents.estimation import StoryEstimator
 from apps.agents.models import AgentTask, AgentType
+from libs.estimation import snap_to_scale
+from libs.parsing import LineRule, StreamingLineParser
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,34 @@ class BusinessAnalystAgent(BaseAgent):
         "EPIC_BREAKDOWN"
     ]
 
+    output_schema = {
+        "type": "object",
+        "properties": {
+            "output": {"type": "string", "description": "Full markdown answer"},
+            "stories": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "epic": {"type": "string"},
+                        "title": {"type": "string"},
+                        "description": {
+                            "type": "string",
+                            "description": "As a [user type], I want [goal] so that [benefit]"
+                        },
+                        "acceptance_criteria": {"type": "array", "items": {"type": "string"}},
+                        "story_points": {"type": "integer", "enum": [1, 2, 3, 5, 8, 13]},
+                        "priority": {"type": "string", "enum": ["Must Have", "Should Have", "Could Have"]},
+                        "technical_notes": {"type": "string"},
+                        "dependencies": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["title", "description", "acceptance_criteria", "story_points"]
+                }
+            }
+        },
+        "required": ["output", "stories"]
+    }
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a BA task.
@@ -32,23 +64,34 @@ class BusinessAnalystAgent(BaseAgent):
             - idea: Project/feature idea
             - existing_requirements: (optional) Existing requirements
             - context: (optional) Additional context
+            - stream: (optional) Stream the response and publish stories on
+              the task as soon as each one is parsed
+            - output_mode: (optional) 'structured' to request schema-validated
+              JSON for GENERATE_STORIES and BREAKDOWN_EPIC
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'GENERATE_STORIES')
         idea = input_data.get('idea', '')
         existing_requirements = input_data.get('existing_requirements', '')
         context = input_data.get('context', {})
+        on_story = (
+            self.partial_result_publisher(task, 'stories')
+            if input_data.get('stream', False) else None
+        )
+        structured = input_data.get('output_mode') == 'structured'
 
         logger.info(f"Executing BA task: {task_type}")
 
         if task_type == 'ELICIT_REQUIREMENTS':
             return self._elicit_requirements(idea, context)
         elif task_type == 'GENERATE_STORIES':
-            return self._generate_user_stories(idea, existing_requirements, context)
+            return self._generate_user_stories(
+                idea, existing_requirements, context, on_story, structured
+            )
         elif task_type == 'ESTIMATE':
             return self._estimate_stories(input_data.get('stories', []))
         elif task_type == 'BREAKDOWN_EPIC':
-            return self._breakdown_epic(idea, context)
+            return self._breakdown_epic(idea, context, on_story, structured)
         else:
             raise ValueError(f"Unknown BA task type: {task_type}")
 
@@ -104,7 +147,9 @@ Please be thorough and ask clarifying questions if needed.
         self,
         idea: str,
         existing_requirements: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        on_story=None,
+        structured: bool = False
     ) -> Dict[str, Any]:
         """Generate user stories from idea/requirements."""
 
@@ -145,9 +190,7 @@ Please:
 6. Identify dependencies between stories
 """
 
-        response = self.generate_response(user_message, context)
-
-        stories = self._parse_stories(response)
+        response, stories = self._request_stories(user_message, context, on_story, structured)
 
         return {
             'stories': stories,
@@ -156,39 +199,96 @@ Please:
         }
 
     def _estimate_stories(self, stories: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Estimate story points for given stories."""
+        """
+        Estimate story points for given stories.
 
-        stories_text = "\n\n".join([
-            f"**Story {i+1}**: {story.get('title', story.get('description', ''))}"
-            for i, story in enumerate(stories)
-        ])
+        Stories are first estimated from similar completed stories; only those
+        the history cannot estimate confidently are sent to the model, all in
+        one prompt, with their closest past stories as reference points.
+        """
+        estimates = StoryEstimator.shared().estimate(stories)
+        for estimate in estimates:
+            estimate['source'] = 'history'
+        escalated = [index for index, estimate in enumerate(estimates) if estimate['escalate']]
+
+        response = ''
+        if escalated:
+            response = self.generate_response(self._build_estimate_prompt(stories, estimates, escalated))
+            for index, points in self._parse_estimates(response, escalated).items():
+                estimates[index].update(story_points=points, source='model')
+
+        lines = ["| # | Story | Points | Source | Confidence |", "|---|-------|--------|--------|------------|"]
+        for i, (story, estimate) in enumerate(zip(stories, estimates)):
+            title = story.get('title', story.get('description', ''))[:80]
+            lines.append(
+                f"| {i+1} | {title} | {estimate['story_points']} | {estimate['source']} | {estimate['confidence']:.2f} |"
+            )
+        summary = "\n".join(lines)
+
+        logger.info(f"Estimated {len(stories) - len(escalated)} stories from history, escalated {len(escalated)}")
 
-        user_message = f"""
+        return {
+            'estimates': f"{summary}\n\n{response}" if response else summary,
+            'story_estimates': estimates,
+            'stories_count': len(stories),
+            'escalated_count': len(escalated)
+        }
+
+    def _build_estimate_prompt(
+        self,
+        stories: List[Dict[str, Any]],
+        estimates: List[Dict[str, Any]],
+        escalated: List[int]
+    ) -> str:
+        blocks = []
+        for number, index in enumerate(escalated, 1):
+            story = stories[index]
+            block = f"**Story {number}**: {story.get('title', story.get('description', ''))}"
+            if story.get('title') and story.get('description'):
+                block += f"\n{story['description']}"
+            similar = [past for past in estimates[index]['similar'] if past['similarity'] > 0]
+            if similar:
+                block += "\nSimilar completed stories: " + "; ".join(
+                    f"{past['title']} ({past['story_points']} points)" for past in similar
+                )
+            blocks.append(block)
+        stories_text = "\n\n".join(blocks)
+
+        return f"""
 Please estimate the following user stories using Fibonacci scale (1, 2, 3, 5, 8, 13):
 
 {stories_text}
 
-For each story, provide:
-1. Story Points (Fibonacci: 1, 2, 3, 5, 8, 13)
-2. Reasoning for the estimate
-3. Risk factors
-4. Assumptions
+Start the answer for each story with a line "**Story N**: P points", then provide:
+1. Reasoning for the estimate
+2. Risk factors
+3. Assumptions
 
 Consider:
 - Complexity
 - Uncertainty
 - Amount of work
 - Dependencies
+- How the similar completed stories were sized
 """
 
-        response = self.generate_response(user_message)
-
-        return {
-            'estimates': response,
-            'stories_count': len(stories)
-        }
-
-    def _breakdown_epic(self, epic: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _parse_estimates(response: str, escalated: List[int]) -> Dict[int, int]:
+        """Map story indexes to the points the model gave them."""
+        points = {}
+        for number, value in re.findall(r'Story\s*(\d+)\W{0,6}?(\d+)\s*(?:story\s*)?points?', response, re.IGNORECASE):
+            number = int(number)
+            if 1 <= number <= len(escalated) and escalated[number - 1] not in points:
+                points[escalated[number - 1]] = snap_to_scale(int(value)) if int(value) > 0 else 1
+        return points
+
+    def _breakdown_epic(
+        self,
+        epic: str,
+        context: Dict[str, Any],
+        on_story=None,
+        structured: bool = False
+    ) -> Dict[str, Any]:
         """Break down an epic into smaller stories."""
 
         user_message = f"""
@@ -213,9 +313,7 @@ Ensure stories are:
 - Valuable
 """
 
-        response = self.generate_response(user_message, context)
-
-        stories = self._parse_stories(response)
+        response, stories = self._request_stories(user_message, context, on_story, structured)
 
         return {
             'epic': epic,
@@ -224,32 +322,51 @@ Ensure stories are:
             'total_stories': len(stories)
         }
 
+    def _request_stories(
+        self,
+        user_message: str,
+        context: Dict[str, Any],
+        on_story=None,
+        structured: bool = False
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """Request stories from the model, returning the raw output and parsed stories."""
+        if structured:
+            result = self.generate_structured_response(user_message, context)
+            return result['output'], result['stories']
+
+        parser = self.story_parser(on_item=on_story)
+        response = self.generate_response(
+            user_message, context, stream=on_story is not None, on_chunk=parser.feed
+        )
+        return response, parser.close()
+
+    @staticmethod
+    def story_parser(on_item=None) -> StreamingLineParser:
+        """
+        Build an incremental parser emitting one dict per user story.
+
+        Epic headers apply to the stories that follow them.
+        """
+        return StreamingLineParser([
+            LineRule.prefix(
+                '**Story Points', 'story_points',
+                extract=lambda line: line.replace('**Story Points**:', '').strip()
+            ),
+            LineRule.prefix('**Story', 'description', extract=lambda line: line, starts_item=True),
+            LineRule.prefix(
+                '**Epic', 'epic',
+                extract=lambda line: line.replace('**Epic**:', '').strip(),
+                sticky=True
+            ),
+            LineRule.prefix(
+                '**Acceptance Criteria', 'has_acceptance_criteria',
+                extract=lambda line: True
+            ),
+        ], on_item=on_item)
+
     def _parse_stories(self, response: str) -> List[Dict[str, Any]]:
         """Parse user stories from the response text."""
-        stories = []
-        current_story = {}
-
-        lines = response.split('\n')
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith('**Story'):
-                if current_story:
-                    stories.append(current_story)
-                current_story = {'description': line}
-            elif line.startswith('**Epic'):
-                if current_story:
-                    current_story['epic'] = line.replace('**Epic**:', '').strip()
-            elif line.startswith('**Story Points'):
-                if current_story:
-                    current_story['story_points'] = line.replace('**Story Points**:', '').strip()
-            elif line.startswith('**Acceptance Criteria'):
-                current_story['has_acceptance_criteria'] = True
-
-        if current_story:
-            stories.append(current_story)
-
-        return stories
+        return self.story_parser().parse(response)
 
     def _check_needs_clarification(self, response: str) -> bool:
         """Check if the requirements need clarification."""
@@ -1,6 +1,11 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
+from apps.agents.crash_groups import CrashGrouper
+from apps.agents.exceptions import TaskDeferred
+from apps.agents.duplicates import BugDuplicateIndex
 from apps.agents.models import AgentTask, AgentType
+from libs.stacktrace import parse_stacktrace
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,35 +37,135 @@ class BugTriageAgent(BaseAgent):
             - bug_report: Bug details
             - code: (optional) Related code
             - context: Additional context
+            - check_duplicates: (optional) TRIAGE only; look the report up in the
+              duplicate index first, default True
+            - duplicate_threshold: (optional) Similarity (0-1) above which a prior
+              triage is reused instead of calling the provider
+            - group_crashes: (optional) TRIAGE only; coalesce reports with the same
+              stack trace fingerprint into one triage, default True
+
+        TRIAGE reports containing a Python, JavaScript or Java stack trace are
+        grouped by crash fingerprint first: during a burst only the first
+        report is triaged; the others are deferred and receive its result
+        when it completes.
+        Reports that are near-duplicates of an already triaged bug get that
+        bug's severity and priority and a link to its task without a provider
+        call; other reports are triaged normally, with similar past bugs
+        listed in the prompt, and added to the index.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'TRIAGE')
         bug_report = input_data.get('bug_report', '')
         code = input_data.get('code', '')
-        context = input_data.get('context', {})
 
         logger.info(f"Executing Bug Triage task: {task_type}")
 
-        user_message = self._build_triage_prompt(task_type, bug_report, code, context)
+        trace = None
+        if task_type == 'TRIAGE' and task.pk and input_data.get('group_crashes', True):
+            trace = parse_stacktrace(f"{bug_report}\n{code}")
+
+        if trace is None:
+            return self._triage(task, task_type)
+
+        grouper = CrashGrouper()
+        group, is_leader = grouper.join(task, trace)
+
+        if not is_leader:
+            result = grouper.result_for(group)
+            if result is None:
+                raise TaskDeferred(f"Waiting for the triage of crash group {group.pk} by task {group.leader_id}")
+            logger.info(f"Reusing triage of crash group {group.pk} for task {task.pk}")
+            return grouper.member_result(group, result)
+
+        try:
+            result = self._triage(task, task_type)
+        except Exception:
+            grouper.fail(group)
+            raise
+
+        grouper.complete(group, result)
+        result['crash_group'] = grouper.describe(group)
+        return result
+
+    def _triage(self, task: AgentTask, task_type: str) -> Dict[str, Any]:
+        """Triage a single report, reusing the triage of a near-duplicate if there is one."""
+        input_data = task.input_data
+        bug_report = input_data.get('bug_report', '')
+        code = input_data.get('code', '')
+        context = input_data.get('context', {})
+
+        index = fingerprint = None
+        similar: List[Dict[str, Any]] = []
+        if task_type == 'TRIAGE' and bug_report and input_data.get('check_duplicates', True):
+            index = BugDuplicateIndex()
+            fingerprint = index.fingerprint(bug_report, code)
+            similar = index.find_similar(fingerprint, exclude_task_id=task.pk)
+
+            threshold = input_data.get(
+                'duplicate_threshold', getattr(settings, 'BUG_DUPLICATE_THRESHOLD', 0.8)
+            )
+            if similar and similar[0]['similarity'] >= threshold and similar[0]['severity']:
+                return self._duplicate_result(task_type, similar)
+
+        user_message = self._build_triage_prompt(task_type, bug_report, code, context, similar)
 
         response = self.generate_response(user_message, context)
 
-        return {
+        if fingerprint is not None and task.pk:
+            index.add(task, fingerprint)
+
+        result = {
             'output': response,
             'task_type': task_type,
             'severity': self._extract_severity(response),
             'priority': self._extract_priority(response)
         }
 
+        if similar:
+            result['similar_bugs'] = similar
+
+        return result
+
+    def _duplicate_result(self, task_type: str, similar: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the triage result of a report that duplicates an earlier bug."""
+        original = similar[0]
+        logger.info(
+            f"Bug report matches task {original['task_id']} "
+            f"(similarity {original['similarity']}), reusing its triage"
+        )
+
+        return {
+            'output': (
+                f"Likely duplicate of task #{original['task_id']} ({original['title']}), "
+                f"similarity {original['similarity']:.0%}.\n\n"
+                f"**Severity**: {original['severity']}\n"
+                f"**Priority**: {original['priority']}\n\n"
+                "Severity and priority were carried over from the original triage."
+            ),
+            'task_type': task_type,
+            'severity': original['severity'],
+            'priority': original['priority'],
+            'duplicate_of': original['task_id'],
+            'similarity': original['similarity'],
+            'similar_bugs': similar
+        }
+
     def _build_triage_prompt(
         self,
         task_type: str,
         bug_report: str,
         code: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        similar: List[Dict[str, Any]] = None
     ) -> str:
         """Build the prompt for bug triage task."""
 
+        related = "\n".join(
+            f"- Task #{bug['task_id']}: {bug['title']} (similarity {bug['similarity']:.0%}, "
+            f"severity {bug['severity']}, priority {bug['priority']})"
+            for bug in similar or []
+        )
+
         if task_type == 'TRIAGE':
             return f"""
 I need you to triage this bug report.
@@ -70,6 +175,8 @@ Bug Report:
 
 {f"Related Code:\n```\n{code}\n```\n" if code else ""}
 
+{f"Similar Previously Triaged Bugs:\n{related}\n" if related else ""}
+
 Please provide comprehensive bug triage:
 
 1. **Bug Summary**
@@ -1,6 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from apps.agents.base_agent import BaseAgent
+from apps.agents.cache import ResultCache, content_hash
 from apps.agents.models import AgentTask, AgentType
+from apps.agents.pre_analysis import PreAnalyzer
+from libs.parsing import LineRule, StreamingLineParser
 import logging
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,28 @@ class CodeReviewAgent(BaseAgent):
         'Scalability'
     ]
 
+    output_schema = {
+        "type": "object",
+        "properties": {
+            "review": {"type": "string", "description": "Full markdown review"},
+            "scores": {
+                "type": "object",
+                "properties": {
+                    pillar: {"type": "number", "minimum": 0, "maximum": 10}
+                    for pillar in REVIEW_PILLARS
+                },
+                "required": REVIEW_PILLARS
+            },
+            "overall_score": {"type": "number", "minimum": 0, "maximum": 10}
+        },
+        "required": ["review", "scores", "overall_score"]
+    }
+
+    # Bump whenever _build_review_prompt changes so cached file reviews are invalidated.
+    REVIEW_PROMPT_VERSION = '2'
+
+    SKIPPED_REVIEW = "Static analysis found no issues in this small change; no model review was needed."
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a code review task.
@@ -44,27 +69,201 @@ class CodeReviewAgent(BaseAgent):
             - language: Programming language
             - context: (optional) Additional context
             - focus_areas: (optional) Specific areas to focus on
+            - files: (optional) List of {path, content | diff, language} entries.
+              Each file is reviewed separately and cached by content hash, so
+              re-reviews only send changed files to the provider.
+            - output_mode: (optional) 'structured' to request schema-validated JSON
+            - pre_analysis: (optional) Run the local static analysis first, default True
+
+        The static analysis findings are returned under 'static_analysis' and
+        listed in the prompt; small inputs without findings are not sent to
+        the provider.
         """
         input_data = task.input_data
         code = input_data.get('code', '')
         language = input_data.get('language', 'Python')
         context = input_data.get('context', {})
         focus_areas = input_data.get('focus_areas', self.REVIEW_PILLARS)
+        files = input_data.get('files')
+        structured = input_data.get('output_mode') == 'structured'
+        analyzer = PreAnalyzer() if input_data.get('pre_analysis', True) else None
+
+        if files:
+            return self._review_files(files, language, focus_areas, context, structured, analyzer)
 
         logger.info(f"Executing code review for {language} code")
 
-        user_message = self._build_review_prompt(code, language, focus_areas, context)
+        reports = analyzer.analyze(code, language) if analyzer and code else []
+        if analyzer and analyzer.can_skip_llm(reports):
+            logger.info("Static analysis found no issues, skipping the model review")
+            return {
+                'review': self.SKIPPED_REVIEW,
+                'language': language,
+                'focus_areas': focus_areas,
+                'scores': {},
+                'static_analysis': analyzer.output(reports),
+                'llm_skipped': True
+            }
 
-        response = self.generate_response(
+        user_message = self._build_review_prompt(
+            code, language, focus_areas, context,
+            analyzer.prompt_section(reports) if analyzer else ''
+        )
+        review = self._request_review(
             user_message,
-            context={'language': language, 'focus_areas': focus_areas}
+            {'language': language, 'focus_areas': focus_areas},
+            structured
         )
 
-        return {
-            'review': response,
+        result = {
+            'review': review['review'],
+            'language': language,
+            'focus_areas': focus_areas,
+            'scores': review['scores']
+        }
+        if analyzer:
+            result['static_analysis'] = analyzer.output(reports)
+        return result
+
+    def _request_review(
+        self,
+        user_message: str,
+        prompt_context: Dict[str, Any],
+        structured: bool = False
+    ) -> Dict[str, Any]:
+        """Request one review, returning its markdown and pillar scores."""
+        if structured:
+            result = self.generate_structured_response(user_message, context=prompt_context)
+            return {'review': result['review'], 'scores': result['scores']}
+
+        response = self.generate_response(user_message, context=prompt_context)
+        return {'review': response, 'scores': self._extract_scores(response)}
+
+    def _review_files(
+        self,
+        files: List[Dict[str, Any]],
+        language: str,
+        focus_areas: list,
+        context: Dict[str, Any],
+        structured: bool = False,
+        analyzer: Optional[PreAnalyzer] = None
+    ) -> Dict[str, Any]:
+        """Review a set of files, reusing cached per-file results."""
+
+        review_cache = ResultCache(
+            'code_review',
+            version=f"{self.REVIEW_PROMPT_VERSION}-{self.prompt.version}"
+        )
+
+        entries = []
+        for index, file in enumerate(files):
+            path = file.get('path') or f"file_{index + 1}"
+            file_language = file.get('language', language)
+            is_diff = 'diff' in file and 'content' not in file
+            source = file.get('diff', '') if is_diff else file.get('content', '')
+            entries.append({
+                'path': path,
+                'language': file_language,
+                'is_diff': is_diff,
+                'source': source,
+                # Structured and pre-analysed reviews differ in form and may skip
+                # the model, so both modes are part of the key.
+                'content_hash': content_hash(
+                    path, file_language, is_diff, source,
+                    focus_areas, context, self.prompt.system_prompt,
+                    structured, analyzer is not None
+                ),
+            })
+
+        reports = analyzer.analyze(language=language, files=files) if analyzer else []
+        for entry, report in zip(entries, reports):
+            entry['report'] = report
+
+        cached = review_cache.get_many([entry['content_hash'] for entry in entries])
+
+        logger.info(
+            f"Executing incremental code review: {len(entries)} files, "
+            f"{len(cached)} cached"
+        )
+
+        fresh = {}
+        skipped = 0
+        file_results = []
+        for entry in entries:
+            result = cached.get(entry['content_hash'])
+            is_cached = result is not None
+
+            if not is_cached:
+                result = fresh.get(entry['content_hash'])
+
+            if result is None and analyzer and analyzer.can_skip_llm([entry['report']]):
+                result = {'review': self.SKIPPED_REVIEW, 'scores': {}}
+                fresh[entry['content_hash']] = result
+                skipped += 1
+
+            if result is None:
+                # Each file is a standalone request; carrying earlier files in the
+                # history would make token usage grow with the size of the PR.
+                self.clear_history()
+                code = entry['source']
+                if entry['is_diff']:
+                    code = f"# Diff of {entry['path']}\n{code}"
+                user_message = self._build_review_prompt(
+                    code, entry['language'], focus_areas, context,
+                    analyzer.prompt_section([entry['report']]) if analyzer else ''
+                )
+                result = self._request_review(
+                    user_message,
+                    {
+                        'language': entry['language'],
+                        'focus_areas': focus_areas,
+                        'path': entry['path']
+                    },
+                    structured
+                )
+                fresh[entry['content_hash']] = result
+
+            file_results.append({
+                'path': entry['path'],
+                'language': entry['language'],
+                'content_hash': entry['content_hash'],
+                'review': result['review'],
+                'scores': result['scores'],
+                'cached': is_cached,
+            })
+
+        if fresh:
+            review_cache.set_many(fresh)
+
+        output = {
+            'review': "\n\n".join(
+                f"## {result['path']}\n\n{result['review']}" for result in file_results
+            ),
             'language': language,
             'focus_areas': focus_areas,
-            'scores': self._extract_scores(response)
+            'scores': self._aggregate_scores([result['scores'] for result in file_results]),
+            'files': file_results,
+            'cache_stats': {
+                'total_files': len(file_results),
+                'cached_files': sum(1 for result in file_results if result['cached']),
+                'reviewed_files': len(fresh) - skipped,
+                'skipped_files': skipped,
+            }
+        }
+        if analyzer:
+            output['static_analysis'] = analyzer.output(reports)
+        return output
+
+    def _aggregate_scores(self, file_scores: List[Dict[str, float]]) -> Dict[str, float]:
+        """Average each pillar score across the files that reported it."""
+        totals: Dict[str, List[float]] = {}
+        for scores in file_scores:
+            for pillar, score in scores.items():
+                totals.setdefault(pillar, []).append(score)
+
+        return {
+            pillar: round(sum(values) / len(values), 2)
+            for pillar, values in totals.items()
         }
 
     def _build_review_prompt(
@@ -72,7 +271,8 @@ class CodeReviewAgent(BaseAgent):
         code: str,
         language: str,
         focus_areas: list,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        static_analysis: str = ''
     ) -> str:
         """Build the prompt for code review."""
 
@@ -88,6 +288,7 @@ Focus Areas: {', '.join(focus_areas)}
 
 Additional Context: {context if context else 'None'}
 
+{static_analysis}
 Please provide:
 
 1. **Overall Score** (0-10 scale)
@@ -112,19 +313,32 @@ Please provide:
 Be strict but constructive. Provide concrete examples and explain the "why" behind each issue.
 """
 
+    @classmethod
+    def score_parser(cls, on_item=None) -> StreamingLineParser:
+        """Build an incremental parser emitting one {pillar, score} dict per score line."""
+        return StreamingLineParser([
+            LineRule.contains(['/10'], None, extract=cls._parse_score, starts_item=True),
+        ], on_item=on_item)
+
+    @classmethod
+    def _parse_score(cls, line: str):
+        """Parse '<pillar> ... <n>/10' into a {pillar, score} dict, or None."""
+        lowered = line.lower()
+        pillar = next((p for p in cls.REVIEW_PILLARS if p.lower() in lowered), None)
+        if pillar is None:
+            return None
+
+        words = line.split('/10')[0].split()
+        if not words:
+            return None
+        try:
+            return {'pillar': pillar, 'score': float(words[-1].strip('*'))}
+        except ValueError:
+            return None
+
     def _extract_scores(self, response: str) -> Dict[str, float]:
         """Extract numerical scores from the review response."""
-        scores = {}
-        try:
-            for line in response.split('\n'):
-                for pillar in self.REVIEW_PILLARS:
-                    if pillar.lower() in line.lower() and '/10' in line:
-                        score_str = line.split('/10')[0].strip().split()[-1]
-                        try:
-                            scores[pillar] = float(score_str)
-                        except ValueError:
-                            pass
-        except Exception as e:
-            logger.warning(f"Could not extract scores: {str(e)}")
-
-        return scores
+        return {
+            item['pillar']: item['score']
+            for item in self.score_parser().parse(response)
+        }
@@ -1,6 +1,11 @@
-from typing import Dict, Any
+import ast
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from libs.sandbox import SOLUTION_MODULE, SandboxLimits, format_test_report, run_tests
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +28,9 @@ class CodingAgent(BaseAgent):
         "CODE_EXPLANATION"
     ]
 
+    _CODE_BLOCK_RE = re.compile(r'```(?:python|py)?[ \t]*\n(.*?)```', re.DOTALL)
+    _TEST_MARKERS = ('def test', 'unittest', 'import pytest')
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a coding task.
@@ -33,6 +41,18 @@ class CodingAgent(BaseAgent):
             - requirements: Task requirements
             - existing_code: (optional) Existing code to modify
             - context: (optional) Additional context
+            - verify: (optional) Python only; run the generated code against tests
+              in the sandbox and ask the model to fix failures, default False
+            - tests: (optional) Test module the code must pass, importing from `solution`
+            - max_rounds: (optional) Generate-and-test rounds in verify mode,
+              at most and by default CODING_VERIFY_MAX_ROUNDS
+
+        When verification was requested but cannot run (another language, or
+        AGENT_SANDBOX_ENABLED is off), the result's 'verification' says why.
+
+        In verify mode the model writes the solution and its tests; both run in
+        resource-limited, network-less subprocesses, and failures are fed back
+        within the same conversation until the tests pass or the rounds run out.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'NEW_BUILD')
@@ -56,15 +76,160 @@ class CodingAgent(BaseAgent):
             task_type, language, requirements, existing_code, context
         )
 
+        skipped = None
+        if input_data.get('verify', False):
+            if language.lower() != 'python':
+                skipped = f"verification supports Python only, not {language}"
+            elif not getattr(settings, 'AGENT_SANDBOX_ENABLED', False):
+                skipped = 'sandbox disabled'
+            if skipped:
+                logger.warning(f"Not verifying the code of task {task.pk}: {skipped}")
+        verify = input_data.get('verify', False) and not skipped
+        if verify:
+            user_message += self._verification_instructions(input_data.get('tests', ''))
+
+        started = time.perf_counter()
         response = self.generate_response(user_message, context=prompt_context)
+        generate_seconds = time.perf_counter() - started
 
-        return {
+        result = {
             'code': response,
             'language': language,
             'task_type': task_type,
             'agent_notes': self._extract_notes(response)
         }
 
+        if skipped:
+            result['verification'] = {'verified': False, 'skipped': skipped}
+        if verify:
+            limit = getattr(settings, 'CODING_VERIFY_MAX_ROUNDS', 3)
+            try:
+                max_rounds = min(int(input_data.get('max_rounds') or limit), limit)
+            except (TypeError, ValueError):
+                max_rounds = limit
+            response, verification = self._generate_and_verify(
+                response, generate_seconds, input_data.get('tests', ''), prompt_context, max(1, max_rounds)
+            )
+            result.update({
+                'code': response,
+                'agent_notes': self._extract_notes(response),
+                'solution': verification.pop('solution'),
+                'tests': verification.pop('tests'),
+                'verification': verification,
+            })
+
+        return result
+
+    def _verification_instructions(self, tests: str) -> str:
+        provided = (
+            f"\nThe solution must also pass these tests, which import from `{SOLUTION_MODULE}`:\n"
+            f"```python\n{tests}\n```\n"
+        ) if tests else ""
+        return f"""
+The code will be executed against tests in a sandbox without network access.
+{provided}
+Format your answer with:
+- **Solution**: the complete code in a single ```python block, importable as the module `{SOLUTION_MODULE}`
+- **Tests**: one ```python block of tests importing from `{SOLUTION_MODULE}`, as unittest
+  TestCase classes or plain test_* functions using assert, using only the standard library
+"""
+
+    def _extract_blocks(self, response: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return the solution and test code blocks of a response."""
+        heading = response.find('Tests**')
+        blocks = [
+            (match.start(), match.group(1)) for match in self._CODE_BLOCK_RE.finditer(response)
+            if self._is_python(match.group(1))
+        ]
+
+        tests = next((code for start, code in blocks if heading != -1 and start > heading), None)
+        if tests is None:
+            tests = next((code for _, code in blocks if any(m in code for m in self._TEST_MARKERS)), None)
+        solution = next((code for _, code in blocks if code is not tests), None)
+        return solution, tests
+
+    @staticmethod
+    def _is_python(code: str) -> bool:
+        if not code or not code.strip():
+            return False
+        try:
+            ast.parse(code)
+        except (SyntaxError, ValueError):
+            return False
+        return True
+
+    def _generate_and_verify(
+        self,
+        response: str,
+        generate_seconds: float,
+        provided_tests: str,
+        context: Dict[str, Any],
+        max_rounds: int
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Run the code of the response against its tests and the provided ones,
+        asking the model to fix failures for up to ``max_rounds`` rounds in total.
+
+        Returns:
+            Tuple of (final response, verification dict)
+        """
+        limits = SandboxLimits.from_dict(getattr(settings, 'AGENT_SANDBOX_LIMITS', None))
+        workers = getattr(settings, 'CODING_VERIFY_WORKERS', 2)
+        rounds: List[Dict[str, Any]] = []
+
+        while True:
+            solution, tests = self._extract_blocks(response)
+            modules = {'test_provided.py': provided_tests} if provided_tests else {}
+            if tests:
+                modules['test_generated.py'] = tests
+
+            started = time.perf_counter()
+            if solution is None:
+                report = None
+                feedback = "No runnable Python code block was found for the **Solution**."
+            elif not modules:
+                report = None
+                feedback = "No tests were found: add a **Tests** block importing from the solution."
+            else:
+                report = run_tests(solution, modules, limits, workers)
+                feedback = format_test_report(report)
+            test_seconds = time.perf_counter() - started
+
+            passed = bool(report and report['passed'])
+            rounds.append({
+                'round': len(rounds) + 1,
+                'generate_seconds': round(generate_seconds, 3),
+                'test_seconds': round(test_seconds, 3),
+                'passed': passed,
+                'tests': report['total'] if report else 0,
+                'failed': report['failed'] if report else 0,
+                'error': '' if passed else feedback.splitlines()[0],
+            })
+            logger.info(f"Verification round {len(rounds)}: {rounds[-1]['error'] or 'tests passed'}")
+
+            if passed or len(rounds) >= max_rounds:
+                return response, {
+                    'verified': passed,
+                    'rounds': rounds,
+                    'report': report,
+                    'solution': solution or '',
+                    'tests': tests or '',
+                }
+
+            started = time.perf_counter()
+            response = self.generate_response(
+                f"""
+Running the code in the sandbox failed:
+
+{feedback}
+
+Please fix it. Answer in the same format, with the complete corrected code under
+**Solution** and the tests under **Tests**. Only change a test if the test itself is wrong.
+""",
+                context
+            )
+            generate_seconds = time.perf_counter() - started
+
     def _build_coding_prompt(
         self,
         task_type: str,
@@ -1,6 +1,7 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from libs.tabular import parse_table, profile_table, format_profile
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,9 @@ class DataAnalystAgent(BaseAgent):
         "INSIGHTS_GENERATION"
     ]
 
+    # Tables up to this many rows are sent verbatim; larger ones are profiled locally.
+    INLINE_ROW_LIMIT = 50
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a Data Analyst task.
@@ -32,6 +36,11 @@ class DataAnalystAgent(BaseAgent):
             - data: Data to analyze
             - question: Analysis question
             - context: Additional context
+            - profile: (optional) auto | always | never. CSV/JSON tables are
+              profiled locally and only the profile plus sampled rows are sent;
+              'auto' does so above INLINE_ROW_LIMIT rows
+            - group_by: (optional) Columns to aggregate numeric columns by
+            - sample_rows: (optional) Number of sampled rows to include (default 10)
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'ANALYZE')
@@ -41,15 +50,56 @@ class DataAnalystAgent(BaseAgent):
 
         logger.info(f"Executing Data Analyst task: {task_type}")
 
-        user_message = self._build_analyst_prompt(task_type, data, question, context)
+        prompt_data, data_profile = self._prepare_data(
+            data,
+            mode=input_data.get('profile', 'auto'),
+            group_by=input_data.get('group_by'),
+            sample_rows=input_data.get('sample_rows', 10)
+        )
+
+        user_message = self._build_analyst_prompt(task_type, prompt_data, question, context)
 
         response = self.generate_response(user_message, context)
 
-        return {
+        result = {
             'output': response,
             'task_type': task_type,
             'analysis': response
         }
+        if data_profile:
+            result['data_profile'] = data_profile
+        return result
+
+    def _prepare_data(
+        self,
+        data: Any,
+        mode: str = 'auto',
+        group_by: Optional[list] = None,
+        sample_rows: int = 10
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Replace large tabular data with a locally computed profile.
+
+        Returns:
+            The text to put in the prompt and the profile (None if not profiled)
+        """
+        if mode == 'never':
+            return data if isinstance(data, str) else str(data), None
+
+        table = parse_table(data)
+        if table is None or (mode == 'auto' and table.row_count <= self.INLINE_ROW_LIMIT):
+            return data if isinstance(data, str) else str(data), None
+
+        if isinstance(group_by, str):
+            group_by = [group_by]
+
+        profile = profile_table(table, group_by=group_by, sample_rows=sample_rows)
+
+        logger.info(
+            f"Profiled {table.row_count} rows x {len(table.columns)} columns locally"
+        )
+
+        return format_profile(profile, table.columns), profile
 
     def _build_analyst_prompt(
         self,
@@ -1,6 +1,9 @@
 from typing import Dict, Any
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
+from apps.agents.cache import ResultCache, content_hash
 from apps.agents.models import AgentTask, AgentType
+from libs.artifacts import canonicalize, make_template, render_template, validate_artifacts
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +26,12 @@ class DevOpsAgent(BaseAgent):
         "TROUBLESHOOTING"
     ]
 
+    # Task types producing reusable configuration files, served from the artifact cache.
+    CACHED_TASK_TYPES = ('CI_CD', 'DEPLOY', 'MONITOR')
+
+    # Bump when the prompts or the template format change so cached artifacts are regenerated.
+    ARTIFACT_PROMPT_VERSION = '2'
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a DevOps task.
@@ -32,6 +41,14 @@ class DevOpsAgent(BaseAgent):
             - technology: Docker, Kubernetes, AWS, etc.
             - requirements: Task requirements
             - context: Additional context
+            - use_cache: (optional) Serve CI_CD, DEPLOY and MONITOR artifacts from
+              the artifact cache, default True
+
+        Dockerfiles and YAML files in the response are syntax-checked. Outputs
+        whose artifacts are all valid are cached as templates of the request's
+        parameters (names, domains, ports, runtime versions), so a request that
+        differs from an earlier one only in those values is answered from the
+        cache with its own values filled in.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'DEPLOY')
@@ -41,16 +58,60 @@ class DevOpsAgent(BaseAgent):
 
         logger.info(f"Executing DevOps task: {task_type}")
 
+        use_cache = (
+            task_type in self.CACHED_TASK_TYPES
+            and input_data.get('use_cache', True)
+            and getattr(settings, 'DEVOPS_ARTIFACT_CACHE_ENABLED', True)
+        )
+        if use_cache:
+            request = canonicalize(requirements)
+            artifact_cache = ResultCache(
+                'devops_artifacts',
+                version=f"{self.ARTIFACT_PROMPT_VERSION}-{self.prompt.version}"
+            )
+            digest = content_hash(
+                task_type, ' '.join(technology.lower().split()), request.canonical,
+                context, self.prompt.system_prompt
+            )
+            cached = artifact_cache.get(digest)
+            if cached is not None:
+                response = render_template(cached['template'], request.parameters)
+                validation = validate_artifacts(response)
+                if all(check['valid'] for check in validation):
+                    logger.info(f"Serving DevOps {task_type} artifacts from cache")
+                    return {
+                        'output': response,
+                        'task_type': task_type,
+                        'technology': technology,
+                        'validation': validation,
+                        'cache': {'hit': True, 'parameters': request.parameters},
+                    }
+
         user_message = self._build_devops_prompt(task_type, technology, requirements, context)
 
         response = self.generate_response(user_message, context)
+        validation = validate_artifacts(response)
+        for check in validation:
+            if not check['valid']:
+                logger.warning(f"Generated {check['kind']} is invalid: {check['error']} (line {check['line']})")
 
-        return {
+        result = {
             'output': response,
             'task_type': task_type,
-            'technology': technology
+            'technology': technology,
+            'validation': validation
         }
 
+        if use_cache:
+            template = None
+            if validation and all(check['valid'] for check in validation):
+                template = make_template(response, request.parameters)
+            if template is not None:
+                artifact_cache.set(digest, {'template': template})
+            result['cache'] = {'hit': False, 'stored': template is not None, 'parameters': request.parameters}
+
+        return result
+
     def _build_devops_prompt(
         self,
         task_type: str,
@@ -1,6 +1,12 @@
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
+from apps.agents.cache import ResultCache, content_hash
+from apps.agents.knowledge import KnowledgeBase
 from apps.agents.models import AgentTask, AgentType
+from libs.ai_providers.base import Message
+from libs.parsing import CodeUnit, extract_units
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +29,12 @@ class DocumentationAgent(BaseAgent):
         "README_CREATION"
     ]
 
+    # Task types that can be documented unit by unit.
+    INCREMENTAL_TASK_TYPES = ('CODE_DOCS', 'API_DOCS')
+
+    # Bump whenever _build_unit_prompt changes so cached sections are invalidated.
+    UNIT_PROMPT_VERSION = '1'
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a Documentation task.
@@ -32,15 +44,37 @@ class DocumentationAgent(BaseAgent):
             - code: (optional) Code to document
             - system: System description
             - context: Additional context
+            - files: (optional) List of {path, content} entries to document
+              incrementally (CODE_DOCS and API_DOCS)
+            - incremental: (optional) Document ``code`` incrementally, default False
+            - path: (optional) Path of ``code`` in incremental mode
+            - max_concurrency: (optional) Parallel provider requests, default DOCS_MAX_CONCURRENCY
+
+        In incremental mode Python sources are split into module, class and
+        function units. Each unit's section is cached by the hash of its
+        signature and body, only new or changed units are sent to the
+        provider (in parallel), and the document is stitched together from
+        fresh and cached sections in source order. Other files are treated as
+        a single unit.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'CODE_DOCS')
         code = input_data.get('code', '')
         system = input_data.get('system', '')
         context = input_data.get('context', {})
+        files = input_data.get('files')
 
         logger.info(f"Executing Documentation task: {task_type}")
 
+        if task_type in self.INCREMENTAL_TASK_TYPES and (files or input_data.get('incremental')):
+            return self._document_incrementally(
+                task_type,
+                files or [{'path': input_data.get('path', 'module.py'), 'content': code}],
+                system,
+                context,
+                input_data.get('max_concurrency', getattr(settings, 'DOCS_MAX_CONCURRENCY', 4))
+            )
+
         user_message = self._build_docs_prompt(task_type, code, system, context)
 
         response = self.generate_response(user_message, context)
@@ -51,6 +85,169 @@ class DocumentationAgent(BaseAgent):
             'documentation': response
         }
 
+    def on_task_completed(self, task: AgentTask, result: Dict[str, Any]):
+        """Make the generated documentation retrievable by the SupportAgent."""
+        KnowledgeBase.shared().index_task(
+            task, question='', answer=result.get('documentation', ''), task_type=result.get('task_type', '')
+        )
+
+    def _document_incrementally(
+        self,
+        task_type: str,
+        files: List[Dict[str, Any]],
+        system: str,
+        context: Dict[str, Any],
+        max_concurrency: int
+    ) -> Dict[str, Any]:
+        """Document files unit by unit, regenerating only units that changed."""
+
+        section_cache = ResultCache(
+            'documentation',
+            version=f"{self.UNIT_PROMPT_VERSION}-{self.prompt.version}"
+        )
+
+        documents = []
+        for index, file in enumerate(files):
+            path = file.get('path') or f"file_{index + 1}"
+            documents.append((path, self._split_units(path, file.get('content', ''))))
+
+        keys = {}
+        for _, units in documents:
+            for unit in units:
+                keys[unit.digest] = content_hash(
+                    unit.digest, task_type, system, context, self.prompt.system_prompt
+                )
+
+        cached = section_cache.get_many(list(set(keys.values())))
+        missing = {}
+        for _, units in documents:
+            for unit in units:
+                if keys[unit.digest] not in cached:
+                    missing.setdefault(keys[unit.digest], unit)
+
+        logger.info(
+            f"Executing incremental documentation: {len(keys)} units, "
+            f"{len(keys) - len(missing)} unchanged"
+        )
+
+        fresh = {}
+        errors = []
+        if missing:
+            workers = max(1, min(int(max_concurrency), len(missing)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    key: executor.submit(self._document_unit, unit, task_type, system, context)
+                    for key, unit in missing.items()
+                }
+                for key, future in futures.items():
+                    try:
+                        fresh[key] = future.result()
+                    except Exception as e:
+                        errors.append(f"{missing[key].path}:{missing[key].name}: {str(e)}")
+
+            # Keep what was generated so a retry only redoes the failed units.
+            if fresh:
+                section_cache.set_many(fresh)
+            if errors:
+                raise RuntimeError(f"Documentation failed for {len(errors)} units: {'; '.join(errors[:3])}")
+
+        sections = {**cached, **fresh}
+        parts = []
+        unit_results = []
+        for path, units in documents:
+            parts.append(f"## {path}")
+            for unit in units:
+                key = keys[unit.digest]
+                heading = '' if unit.kind in ('module', 'file') else (
+                    f"### `{unit.qualname}`\n\n`{unit.signature}`\n\n"
+                )
+                parts.append(f"{heading}{sections[key].strip()}")
+                unit_results.append({
+                    'path': path,
+                    'kind': unit.kind,
+                    'name': unit.qualname,
+                    'line': unit.lineno,
+                    'digest': unit.digest,
+                    'cached': key in cached,
+                })
+
+        documentation = "\n\n".join(parts)
+        return {
+            'output': documentation,
+            'task_type': task_type,
+            'documentation': documentation,
+            'units': unit_results,
+            'cache_stats': {
+                'total_units': len(unit_results),
+                'cached_units': sum(1 for unit in unit_results if unit['cached']),
+                'generated_units': len(fresh),
+            }
+        }
+
+    def _split_units(self, path: str, content: str) -> List[CodeUnit]:
+        if path.endswith('.py'):
+            try:
+                return extract_units(content, path)
+            except SyntaxError as e:
+                logger.warning(f"Could not parse {path}, documenting it as a whole: {str(e)}")
+        return [CodeUnit(path=path, kind='file', qualname='', signature=path, source=content, lineno=1)]
+
+    def _document_unit(
+        self,
+        unit: CodeUnit,
+        task_type: str,
+        system: str,
+        context: Dict[str, Any]
+    ) -> str:
+        """Document one unit in a standalone request; runs in a worker thread."""
+        response = self.provider.generate(
+            messages=[Message(role="user", content=self._build_unit_prompt(unit, task_type, system, context))],
+            system_prompt=self.prompt.system_prompt
+        )
+        self.record_usage(response.tokens_used)
+        return response.content
+
+    def _build_unit_prompt(
+        self,
+        unit: CodeUnit,
+        task_type: str,
+        system: str,
+        context: Dict[str, Any]
+    ) -> str:
+        """Build the prompt documenting a single code unit."""
+
+        focus = (
+            "Describe it as part of the API: endpoints or entry points it exposes, "
+            "parameters, request/response formats, errors and an example call."
+            if task_type == 'API_DOCS' else
+            "Describe its purpose, parameters, return value, raised exceptions, "
+            "notable logic and a short usage example where useful."
+        )
+
+        if unit.kind in ('module', 'file'):
+            subject = f"the file `{unit.path}` (module docstring, imports and top-level code)"
+            instruction = "Write an overview of the file: what it is for, its dependencies and its top-level objects."
+        else:
+            subject = f"the {unit.kind} `{unit.qualname}` from `{unit.path}`"
+            instruction = focus
+
+        parent = f"It is defined in class `{unit.parent}`.\n" if unit.parent else ""
+        system_section = f"System:\n{system}\n\n" if system else ""
+
+        return f"""
+Document {subject}. Bodies of nested definitions documented separately are shown as `...`.
+{parent}
+{system_section}Code:
+```
+{unit.source}
+```
+
+{instruction}
+Answer in Markdown without a top-level heading; this section is stitched into a larger document.
+
+Context: {context if context else 'None'}
+"""
+
     def _build_docs_prompt(
         self,
         task_type: str,
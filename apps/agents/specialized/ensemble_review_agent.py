@@ -0,0 +1,294 @@
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from django.db import connection
+from django.utils import timezone
+from apps.agents.base_agent import AgentFactory, BaseAgent
+from apps.agents.models import AgentTask, AgentType, Prompt, TaskStatus
+from apps.agents.pre_analysis import PreAnalyzer
+from libs.retrieval import tokenize
+from libs.static_analysis import SEVERITIES
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EnsembleReviewAgent(BaseAgent):
+    """
+    Review Ensemble Agent
+    Runs the code review, security and performance agents concurrently on the
+    same input and merges their findings into one report.
+    """
+
+    agent_type = AgentType.REVIEW_ENSEMBLE
+    agent_name = "Review Ensemble"
+    agent_description = "Runs code review, security and performance reviews in parallel"
+    capabilities = [
+        "CODE_REVIEW",
+        "SECURITY_AUDIT",
+        "PERFORMANCE_ANALYSIS",
+        "FINDING_DEDUPLICATION"
+    ]
+
+    MEMBERS = (AgentType.CODE_REVIEW, AgentType.SECURITY, AgentType.PERFORMANCE)
+
+    # Findings whose titles share this fraction of terms (at the same location) are merged.
+    DUPLICATE_SIMILARITY = 0.6
+
+    def execute_task(self, task: AgentTask) -> Dict[str, Any]:
+        """
+        Execute an ensemble review.
+
+        Expected input_data:
+            - code: Code to review
+            - language: Programming language
+            - files: (optional) List of {path, content | diff, language} entries
+            - context: (optional) Additional context
+            - agents: (optional) Subset of CODE_REVIEW, SECURITY and PERFORMANCE, default all
+            - focus_areas: (optional) Passed to the code review
+
+        Each member agent runs in its own thread with its own active prompt
+        and is recorded as a subtask. The static pre-analysis is run once and
+        shared by the members. The result holds the merged, deduplicated
+        findings, each member's output and per-agent timings; the ensemble
+        takes as long as its slowest member. Each member's provider tokens are
+        recorded on its subtask and charged with the ensemble task.
+        """
+        input_data = task.input_data
+        code = input_data.get('code', '')
+        language = input_data.get('language', 'Python')
+        files = input_data.get('files')
+        context = input_data.get('context', {})
+        members = [str(member) for member in input_data.get('agents', self.MEMBERS) if member in self.MEMBERS]
+        if not members:
+            raise ValueError(f"No ensemble members selected; choose from {', '.join(self.MEMBERS)}")
+
+        if not code and files:
+            code = "\n\n".join(
+                f"# File: {file.get('path', f'file_{index + 1}')}\n{file.get('content') or file.get('diff', '')}"
+                for index, file in enumerate(files)
+            )
+
+        logger.info(f"Executing review ensemble with {', '.join(members)}")
+
+        # Warm the shared analysis so the code review and security members reuse it.
+        if input_data.get('pre_analysis', True) and (code or files):
+            PreAnalyzer().analyze(input_data.get('code', ''), language, files)
+
+        runs = []
+        for member in members:
+            subtask = AgentTask(
+                agent_type=member,
+                title=f"{task.title} [{member}]"[:255],
+                description=task.description,
+                input_data=self._member_input(member, input_data, code, language, files, context),
+                status=TaskStatus.IN_PROGRESS,
+                priority=task.priority,
+                created_by=task.created_by,
+                parent_task=task if task.pk else None,
+                started_at=timezone.now()
+            )
+            if task.pk:
+                subtask.save()
+            runs.append((member, subtask, AgentFactory.create_agent(member, self.provider, self._member_prompt(member))))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+            outcomes = list(executor.map(lambda run: self._run_member(run[2], run[1]), runs))
+        wall_time = time.perf_counter() - started
+
+        agents = {}
+        for (member, subtask, agent), (result, error, seconds) in zip(runs, outcomes):
+            self.record_usage(agent.tokens_used)
+            agents[member] = {
+                'status': TaskStatus.FAILED if error else TaskStatus.COMPLETED,
+                'seconds': round(seconds, 3),
+                'task_id': subtask.pk,
+                'result': result,
+            }
+            if error:
+                agents[member]['error'] = error
+            if subtask.pk:
+                subtask.status = agents[member]['status']
+                subtask.output_data = result or {}
+                subtask.error_message = error or ''
+                subtask.execution_time_seconds = seconds
+                subtask.tokens_used = agent.tokens_used
+                subtask.completed_at = timezone.now()
+                subtask.save()
+
+        if all(agent['status'] == TaskStatus.FAILED for agent in agents.values()):
+            raise RuntimeError("; ".join(f"{member}: {agent['error']}" for member, agent in agents.items()))
+
+        findings = self._merge_findings(agents)
+        timing = {
+            'wall_seconds': round(wall_time, 3),
+            'sum_seconds': round(sum(agent['seconds'] for agent in agents.values()), 3),
+            'per_agent': {member: agent['seconds'] for member, agent in agents.items()},
+        }
+
+        return {
+            'output': self._build_report(agents, findings, timing),
+            'findings': findings,
+            'agents': agents,
+            'timing': timing,
+            'scores': (agents.get(AgentType.CODE_REVIEW, {}).get('result') or {}).get('scores', {}),
+        }
+
+    def _member_input(
+        self,
+        member: str,
+        input_data: Dict[str, Any],
+        code: str,
+        language: str,
+        files: Optional[List[Dict[str, Any]]],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        shared = {'language': language, 'context': context}
+        if 'pre_analysis' in input_data:
+            shared['pre_analysis'] = input_data['pre_analysis']
+
+        if member == AgentType.CODE_REVIEW:
+            member_input = {**shared, 'code': input_data.get('code', '') or code}
+            if files:
+                member_input['files'] = files
+            if 'focus_areas' in input_data:
+                member_input['focus_areas'] = input_data['focus_areas']
+            return member_input
+        if member == AgentType.SECURITY:
+            if files:
+                # An audit scans the files for secrets; the model sees them joined.
+                return {**shared, 'task_type': 'AUDIT', 'code': input_data.get('code', '') or code, 'files': files}
+            return {**shared, 'task_type': 'CODE_REVIEW', 'code': code}
+        return {**shared, 'task_type': 'ANALYZE', 'code': code}
+
+    def _member_prompt(self, member: str) -> Prompt:
+        from apps.agents.tasks import _create_default_prompt
+
+        return Prompt.objects.filter(agent_type=member, is_active=True).first() or _create_default_prompt(member)
+
+    @staticmethod
+    def _run_member(agent: BaseAgent, subtask: AgentTask) -> Tuple[Optional[Dict[str, Any]], Optional[str], float]:
+        """Run one member in a worker thread; returns (result, error, seconds)."""
+        started = time.perf_counter()
+        try:
+            return agent.execute_task(subtask), None, time.perf_counter() - started
+        except Exception as e:
+            logger.error(f"Ensemble member {agent.agent_type} failed: {str(e)}")
+            return None, str(e), time.perf_counter() - started
+        finally:
+            connection.close()
+
+    def _merge_findings(self, agents: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Collect the members' findings, merging duplicates, most severe first."""
+        candidates = []
+        for member, agent in agents.items():
+            result = agent['result'] or {}
+            for finding in (result.get('static_analysis') or {}).get('findings', []):
+                candidates.append(self._finding(
+                    member, finding['severity'], finding['message'], finding['snippet'],
+                    finding['path'], finding['line'], finding['rule'], 'static'
+                ))
+            for vulnerability in result.get('vulnerabilities', []):
+                candidates.append(self._finding(
+                    member, vulnerability.get('severity'), vulnerability.get('description', ''),
+                    vulnerability.get('impact', ''), vulnerability.get('file', ''), vulnerability.get('line'),
+                    vulnerability.get('rule', ''), vulnerability.get('source', 'model')
+                ))
+            for optimization in result.get('optimizations', []):
+                candidates.append(self._finding(
+                    member, optimization.get('impact'), optimization.get('title', ''),
+                    optimization.get('effort', ''), '', None, '', 'model', category='performance'
+                ))
+
+        merged: List[Dict[str, Any]] = []
+        for candidate in candidates:
+            duplicate = next((finding for finding in merged if self._is_duplicate(finding, candidate)), None)
+            if duplicate is None:
+                merged.append(candidate)
+                continue
+            for member in candidate['agents']:
+                if member not in duplicate['agents']:
+                    duplicate['agents'].append(member)
+            if SEVERITIES.index(candidate['severity']) < SEVERITIES.index(duplicate['severity']):
+                duplicate['severity'] = candidate['severity']
+
+        for finding in merged:
+            finding.pop('_terms')
+        return sorted(merged, key=lambda finding: SEVERITIES.index(finding['severity']))
+
+    @staticmethod
+    def _finding(
+        member: str,
+        severity: Optional[str],
+        title: str,
+        detail: str,
+        path: str,
+        line: Optional[int],
+        rule: str,
+        source: str,
+        category: str = ''
+    ) -> Dict[str, Any]:
+        words = re.findall(r'[a-z]+', (severity or '').lower())
+        normalized = next((level for level in SEVERITIES if level.lower() in words), 'Medium')
+        # Static findings carry their location in the description; compare titles without it.
+        title = re.sub(r'\s*\([^()]*:\d+\)$|\s*\(line \d+\)$', '', (title or '').strip())
+        return {
+            'severity': normalized,
+            'title': title,
+            'detail': detail or '',
+            'file': path or '',
+            'line': line,
+            'rule': rule or '',
+            'category': category,
+            'source': source,
+            'agents': [member],
+            '_terms': set(tokenize(title)),
+        }
+
+    def _is_duplicate(self, first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+        if first['line'] != second['line'] or first['file'] != second['file']:
+            return False
+        if first['rule'] and first['rule'] == second['rule']:
+            return True
+        terms = first['_terms'] | second['_terms']
+        return bool(terms) and len(first['_terms'] & second['_terms']) / len(terms) >= self.DUPLICATE_SIMILARITY
+
+    def _build_report(
+        self,
+        agents: Dict[str, Dict[str, Any]],
+        findings: List[Dict[str, Any]],
+        timing: Dict[str, Any]
+    ) -> str:
+        lines = [
+            "# Review Ensemble Report",
+            "",
+            "| Agent | Status | Seconds |",
+            "|-------|--------|---------|",
+        ]
+        lines += [f"| {member} | {agent['status']} | {agent['seconds']} |" for member, agent in agents.items()]
+        lines += [
+            "",
+            f"Wall time {timing['wall_seconds']}s (members sum {timing['sum_seconds']}s).",
+            "",
+            f"## Findings ({len(findings)})",
+            "",
+        ]
+        for finding in findings:
+            location = f" `{finding['file'] or 'code'}:{finding['line']}`" if finding['line'] else ''
+            lines.append(
+                f"- **{finding['severity']}**{location} {finding['title']} "
+                f"_({', '.join(finding['agents'])})_"
+            )
+        if not findings:
+            lines.append("No findings.")
+
+        for member, agent in agents.items():
+            lines += ["", f"## {member}", ""]
+            if agent.get('error'):
+                lines.append(f"Failed: {agent['error']}")
+            else:
+                result = agent['result']
+                lines.append(result.get('review') or result.get('output', ''))
+        return "\n".join(lines)
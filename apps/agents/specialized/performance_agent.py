@@ -1,6 +1,13 @@
-from typing import Dict, Any, List
+import ast
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from libs.parsing import LineRule, StreamingLineParser
+from libs.sandbox import (
+    SandboxLimits, compare_reports, compare_snippets, format_measurements, profile_snippet
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +30,39 @@ class PerformanceAgent(BaseAgent):
         "SCALABILITY_ASSESSMENT"
     ]
 
+    # Task types whose prompt receives sandbox measurements of the supplied code.
+    MEASURED_TASK_TYPES = ('ANALYZE', 'OPTIMIZE', 'PROFILE')
+
+    # A claimed speedup counts as verified when the measured one reaches this
+    # fraction of it; timings of small snippets are noisy.
+    SPEEDUP_TOLERANCE = 0.5
+
+    _CODE_BLOCK_RE = re.compile(r'```(?:python|py)?[ \t]*\n(.*?)```', re.DOTALL)
+    _CLAIMED_SPEEDUP_RE = re.compile(
+        r'Expected speedup\**\s*:?\s*\**\s*~?\s*([0-9]+(?:\.[0-9]+)?)\s*[x×]', re.IGNORECASE
+    )
+
+    output_schema = {
+        "type": "object",
+        "properties": {
+            "output": {"type": "string", "description": "Full markdown analysis"},
+            "optimizations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "impact": {"type": "string"},
+                        "effort": {"type": "string"},
+                        "description": {"type": "string"}
+                    },
+                    "required": ["title", "impact", "effort"]
+                }
+            }
+        },
+        "required": ["output", "optimizations"]
+    }
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a Performance task.
@@ -33,6 +73,20 @@ class PerformanceAgent(BaseAgent):
             - metrics: (optional) Performance metrics
             - system: System description
             - context: Additional context
+            - stream: (optional) Stream the response and publish optimizations
+              on the task as soon as each one is parsed
+            - output_mode: (optional) 'structured' to request schema-validated JSON
+            - language: (optional) Language of the code, default 'python'
+            - setup: (optional) Python code preparing inputs for the code, e.g. test data
+            - optimized_code: (optional) Candidate optimization measured against the code
+            - measure: (optional) Execute Python code in the sandbox, default True
+            - verification_rounds: (optional) OPTIMIZE only; how many times the model is
+              asked to revise an optimization whose speedup could not be verified, default 1
+
+        Python code is executed in a resource-limited, network-less subprocess
+        under cProfile and timeit, and the measured timings and hotspots are
+        included in the prompt. For OPTIMIZE tasks the optimized code from the
+        response is measured as well and its claimed speedup verified.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'ANALYZE')
@@ -40,29 +94,206 @@ class PerformanceAgent(BaseAgent):
         metrics = input_data.get('metrics', {})
         system = input_data.get('system', '')
         context = input_data.get('context', {})
+        stream = input_data.get('stream', False)
+        setup = input_data.get('setup', '')
 
         logger.info(f"Executing Performance task: {task_type}")
 
-        user_message = self._build_performance_prompt(task_type, code, metrics, system, context)
-
-        response = self.generate_response(user_message, context)
-
-        return {
-            'output': response,
+        measure = (
+            task_type in self.MEASURED_TASK_TYPES
+            and input_data.get('measure', True)
+            and getattr(settings, 'AGENT_SANDBOX_ENABLED', False)
+            and input_data.get('language', 'python').lower() == 'python'
+            and self._is_python(code)
+            and (not setup or self._is_python(setup))
+        )
+
+        measurements = self._measure(code, setup, input_data.get('optimized_code', '')) if measure else None
+        user_message = self._build_performance_prompt(
+            task_type, code, metrics, system, context,
+            self._format_measurements(measurements) if measurements else ''
+        )
+
+        if input_data.get('output_mode') == 'structured':
+            result = self.generate_structured_response(user_message, context)
+            output, optimizations = result['output'], result['optimizations']
+        else:
+            parser = self.optimization_parser(
+                on_item=self.partial_result_publisher(task, 'optimizations') if stream else None
+            )
+            output = self.generate_response(
+                user_message, context, stream=stream, on_chunk=parser.feed
+            )
+            optimizations = parser.close()
+
+        result = {
+            'output': output,
             'task_type': task_type,
-            'optimizations': self._extract_optimizations(response)
+            'optimizations': optimizations
         }
 
+        if measurements:
+            result['measurements'] = measurements
+
+        if measure and task_type == 'OPTIMIZE':
+            # Revisions are free-form replies, so structured results are verified but not revised.
+            rounds = 0 if input_data.get('output_mode') == 'structured' else input_data.get('verification_rounds', 1)
+            result['output'], result['verification'] = self._verify_optimization(
+                measurements['before'], setup, output, context, rounds
+            )
+
+        return result
+
+    def _sandbox_limits(self) -> SandboxLimits:
+        return SandboxLimits.from_dict(getattr(settings, 'AGENT_SANDBOX_LIMITS', None))
+
+    @staticmethod
+    def _is_python(code: str) -> bool:
+        if not code or not code.strip():
+            return False
+        try:
+            ast.parse(code)
+        except (SyntaxError, ValueError):
+            return False
+        return True
+
+    def _measure(self, code: str, setup: str, optimized_code: str = '') -> Dict[str, Any]:
+        """Profile the code, and the supplied optimized version if any, in the sandbox."""
+        limits = self._sandbox_limits()
+
+        if optimized_code and self._is_python(optimized_code):
+            comparison = compare_snippets(code, optimized_code, setup, limits)
+            logger.info(f"Measured supplied optimization: speedup {comparison['speedup']}")
+            return comparison
+
+        report = profile_snippet(code, setup, limits)
+        logger.info(f"Measured code in sandbox: ok={report['ok']}, wall time {report['wall_time']}s")
+        return {'before': report}
+
+    def _format_measurements(self, measurements: Dict[str, Any]) -> str:
+        sections = [format_measurements(measurements['before'], 'Original code')]
+        if 'after' in measurements:
+            sections.append(format_measurements(measurements['after'], 'Optimized code'))
+            if measurements['speedup'] is not None:
+                sections.append(f"Measured speedup: {measurements['speedup']}x")
+            if measurements['equivalent'] is not None:
+                sections.append(
+                    "Both versions produce the same `result`."
+                    if measurements['equivalent'] else
+                    "The versions produce DIFFERENT `result` values."
+                )
+        return "\n\n".join(sections)
+
+    def _extract_optimized_code(self, response: str) -> Optional[str]:
+        """Return the first Python code block after the Optimized Code heading."""
+        heading = response.find('Optimized Code')
+        for block in self._CODE_BLOCK_RE.findall(response, max(heading, 0)):
+            if self._is_python(block):
+                return block
+        return None
+
+    def _extract_claimed_speedup(self, response: str) -> Optional[float]:
+        match = self._CLAIMED_SPEEDUP_RE.search(response)
+        return float(match.group(1)) if match else None
+
+    def _verify_optimization(
+        self,
+        original: Dict[str, Any],
+        setup: str,
+        response: str,
+        context: Dict[str, Any],
+        rounds: int
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Measure the optimized code from the response against the original's
+        profile report and check the claimed speedup, asking the model to
+        revise it for up to ``rounds`` more attempts when it fails, is not
+        equivalent or is slower than claimed.
+
+        Returns:
+            Tuple of (final response, verification dict)
+        """
+        limits = self._sandbox_limits()
+        attempts = []
+
+        while True:
+            optimized = self._extract_optimized_code(response)
+            claimed = self._extract_claimed_speedup(response)
+
+            if optimized is None:
+                verification = {
+                    'verified': False,
+                    'reason': 'No runnable Python code block found in the response',
+                    'claimed_speedup': claimed,
+                }
+            else:
+                comparison = compare_reports(original, profile_snippet(optimized, setup, limits))
+                measured = comparison['speedup']
+                required = max(1.0, claimed * self.SPEEDUP_TOLERANCE) if claimed else 1.0
+
+                if not comparison['after']['ok']:
+                    reason = f"Optimized code failed: {format_measurements(comparison['after'], 'run')}"
+                elif comparison['equivalent'] is False:
+                    reason = 'Optimized code produces a different result'
+                elif measured is None or measured < required:
+                    reason = f"Measured speedup {measured}x is below the required {required}x"
+                else:
+                    reason = ''
+
+                verification = {
+                    'verified': not reason,
+                    'reason': reason or 'Speedup confirmed by measurement',
+                    'claimed_speedup': claimed,
+                    'measured_speedup': measured,
+                    'equivalent': comparison['equivalent'],
+                    'before': comparison['before'],
+                    'after': comparison['after'],
+                }
+
+            attempts.append({key: verification.get(key) for key in (
+                'verified', 'reason', 'claimed_speedup', 'measured_speedup'
+            )})
+            logger.info(f"Optimization verification: {verification['reason']}")
+
+            if verification['verified'] or len(attempts) > rounds:
+                verification['attempts'] = attempts
+                return response, verification
+
+            feedback = verification['reason']
+            if optimized is not None:
+                feedback += "\n\n" + self._format_measurements(comparison)
+            response = self.generate_response(
+                f"""
+The optimized code could not be verified when executed in a sandbox:
+
+{feedback}
+
+Please revise it. Keep the same structure as before, with the complete optimized
+code in a single ```python block under **Optimized Code**, setting the same
+variables as the original, and state an **Expected speedup** consistent with
+these measurements.
+""",
+                context
+            )
+
     def _build_performance_prompt(
         self,
         task_type: str,
         code: str,
         metrics: Dict[str, Any],
         system: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        measurements: str = ''
     ) -> str:
         """Build the prompt for performance task."""
 
+        measured = (
+            f"Measured Profile (executed in a sandbox):\n{measurements}\n"
+            "Base your analysis on these measurements rather than estimates. Optimized code "
+            "is measured the same way, so keep it a runnable Python snippet that uses the same "
+            "setup and assigns the same variables.\n"
+        ) if measurements else ""
+
         if task_type == 'ANALYZE':
             return f"""
 I need you to perform comprehensive performance analysis.
@@ -74,6 +305,7 @@ System:
 
 {f"Current Metrics:\n{metrics}\n" if metrics else ""}
 
+{measured}
 Please analyze:
 
 1. **Time Complexity Analysis** ⏱️
@@ -131,6 +363,7 @@ System:
 
 {f"Current Metrics:\n{metrics}\n" if metrics else ""}
 
+{measured}
 Please provide:
 
 1. **Optimized Code** ✨
@@ -271,6 +504,7 @@ System:
 
 {f"Current Metrics:\n{metrics}\n" if metrics else ""}
 
+{measured}
 Please provide:
 
 1. **Profiling Strategy** 🔍
@@ -310,25 +544,26 @@ Context: {context if context else 'None'}
         else:
             return system or code
 
+    @staticmethod
+    def optimization_parser(on_item=None) -> StreamingLineParser:
+        """Build an incremental parser emitting one dict per optimization."""
+        return StreamingLineParser([
+            LineRule.contains(
+                ['Optimization'], 'title',
+                match=lambda line: line.startswith('**'),
+                extract=lambda line: line.strip('*').strip(),
+                starts_item=True
+            ),
+            LineRule.contains(
+                ['Impact:'], 'impact',
+                extract=lambda line: line.rpartition('Impact:')[2].strip()
+            ),
+            LineRule.contains(
+                ['Effort:'], 'effort',
+                extract=lambda line: line.rpartition('Effort:')[2].strip()
+            ),
+        ], on_item=on_item)
+
     def _extract_optimizations(self, response: str) -> List[Dict[str, Any]]:
         """Extract optimization recommendations from response."""
-        optimizations = []
-        current_opt = {}
-
-        lines = response.split('\n')
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith('**') and 'Optimization' in line:
-                if current_opt:
-                    optimizations.append(current_opt)
-                current_opt = {'title': line.strip('*').strip()}
-            elif 'Impact:' in line:
-                current_opt['impact'] = line.split('Impact:')[-1].strip()
-            elif 'Effort:' in line:
-                current_opt['effort'] = line.split('Effort:')[-1].strip()
-
-        if current_opt:
-            optimizations.append(current_opt)
-
-        return optimizations
+        return self.optimization_parser().parse(response)
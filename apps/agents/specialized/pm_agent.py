@@ -1,6 +1,9 @@
+from datetime import date
 from typing import Dict, Any
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from apps.projects.scheduling import ProjectScheduler
+from libs.scheduling import CycleError
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +26,8 @@ class ProjectManagerAgent(BaseAgent):
         "STAKEHOLDER_MANAGEMENT"
     ]
 
+    SCHEDULED_TASK_TYPES = ('PLAN', 'TIMELINE', 'RISKS', 'RESOURCES')
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a PM task.
@@ -32,6 +37,15 @@ class ProjectManagerAgent(BaseAgent):
             - project: Project details
             - requirements: Requirements
             - context: Additional context
+            - project_id: (optional) Tracker project to schedule for PLAN, TIMELINE,
+              RISKS and RESOURCES
+            - start_date: (optional) ISO date the schedule starts on, default today
+            - team_size: (optional) People sharing unassigned work, default the project's members
+
+        With a project_id the critical path, slack and resource-leveled dates
+        are computed from the project's epics, stories and tasks and the model
+        is asked to narrate that schedule instead of inventing one. The
+        schedule is returned under 'schedule'.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'PLAN')
@@ -41,15 +55,38 @@ class ProjectManagerAgent(BaseAgent):
 
         logger.info(f"Executing PM task: {task_type}")
 
+        schedule, schedule_section = None, ''
+        if input_data.get('project_id') and task_type in self.SCHEDULED_TASK_TYPES:
+            try:
+                start = input_data.get('start_date')
+                schedule = ProjectScheduler().schedule(
+                    input_data['project_id'],
+                    date.fromisoformat(start) if start else None,
+                    input_data.get('team_size')
+                )
+                schedule_section = (
+                    "Computed Schedule (from the tracker's estimates and dependencies; "
+                    "present these dates and this critical path, do not invent others):\n"
+                    f"{ProjectScheduler.summary(schedule)}"
+                )
+            except CycleError as e:
+                schedule_section = f"The tracker's dependencies cannot be scheduled: {str(e)}. Point out this cycle."
+
+        if schedule_section:
+            project = f"{project}\n\n{schedule_section}".strip()
+
         user_message = self._build_pm_prompt(task_type, project, requirements, context)
 
         response = self.generate_response(user_message, context)
 
-        return {
+        result = {
             'output': response,
             'task_type': task_type,
-            'project': project
+            'project': input_data.get('project', '')
         }
+        if schedule:
+            result['schedule'] = schedule
+        return result
 
     def _build_pm_prompt(
         self,
@@ -1,6 +1,13 @@
-from typing import Dict, Any, List
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from apps.projects.models import Story
+from libs.ai_providers.base import Message
+from libs.parsing import LineRule, StreamingLineParser
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +30,33 @@ class QAAgent(BaseAgent):
         "QUALITY_METRICS"
     ]
 
+    _STORY_KEY_RE = re.compile(r'\b[A-Z][A-Z0-9]{0,9}-\d+\b')
+
+    output_schema = {
+        "type": "object",
+        "properties": {
+            "output": {"type": "string", "description": "Full markdown answer"},
+            "test_cases": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "title": {"type": "string"},
+                        "priority": {"type": "string", "enum": ["High", "Medium", "Low"]},
+                        "preconditions": {"type": "string"},
+                        "steps": {"type": "array", "items": {"type": "string"}},
+                        "expected_result": {"type": "string"},
+                        "test_data": {"type": "string"},
+                        "type": {"type": "string"}
+                    },
+                    "required": ["id", "title", "priority", "steps", "expected_result"]
+                }
+            }
+        },
+        "required": ["output", "test_cases"]
+    }
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a QA task.
@@ -32,26 +66,198 @@ class QAAgent(BaseAgent):
             - feature: Feature to test
             - requirements: Requirements
             - context: Additional context
+            - stream: (optional) Stream the response and publish test cases
+              on the task as soon as each one is parsed
+            - output_mode: (optional) 'structured' to request schema-validated JSON
+            - story_ids / sprint_id: (optional) TEST_CASES only; generate test cases
+              for these stories, or every story of the sprint, in batches
+            - token_budget: (optional) Story tokens packed into one request,
+              default QA_BATCH_TOKEN_BUDGET
+            - save: (optional) Store each story's test cases on the story, default True
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'TEST_CASES')
         feature = input_data.get('feature', '')
         requirements = input_data.get('requirements', '')
         context = input_data.get('context', {})
+        stream = input_data.get('stream', False)
 
         logger.info(f"Executing QA task: {task_type}")
 
+        if task_type == 'TEST_CASES' and (input_data.get('story_ids') or input_data.get('sprint_id')):
+            return self._generate_story_test_cases(input_data, context)
+
         user_message = self._build_qa_prompt(task_type, feature, requirements, context)
 
-        response = self.generate_response(user_message, context)
+        if input_data.get('output_mode') == 'structured':
+            result = self.generate_structured_response(user_message, context)
+            return {
+                'output': result['output'],
+                'task_type': task_type,
+                'feature': feature,
+                'test_cases': result['test_cases']
+            }
+
+        parser = self.test_case_parser(
+            on_item=self.partial_result_publisher(task, 'test_cases') if stream else None
+        )
+
+        response = self.generate_response(
+            user_message,
+            context,
+            stream=stream,
+            on_chunk=parser.feed if task_type == 'TEST_CASES' else None
+        )
 
         return {
             'output': response,
             'task_type': task_type,
             'feature': feature,
-            'test_cases': self._extract_test_cases(response) if task_type == 'TEST_CASES' else []
+            'test_cases': parser.close() if task_type == 'TEST_CASES' else []
+        }
+
+    def _generate_story_test_cases(self, input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate test cases for many stories with one request per batch.
+
+        Stories are packed into batches up to a token budget, so the system
+        prompt and instructions are sent once per batch rather than once per
+        story, and the batches are requested in parallel. The response marks
+        each story with a heading, which attributes the parsed test cases to
+        their story. Stories a batch left without test cases (e.g. because the
+        response was cut short) are retried once in smaller batches.
+        """
+        stories = Story.objects.order_by('id').only('id', 'key', 'title', 'description', 'acceptance_criteria')
+        if input_data.get('story_ids'):
+            stories = stories.filter(pk__in=input_data['story_ids'])
+        else:
+            stories = stories.filter(sprint_id=input_data['sprint_id'])
+        stories = list(stories)
+
+        budget = input_data.get('token_budget') or getattr(settings, 'QA_BATCH_TOKEN_BUDGET', 4000)
+        max_stories = getattr(settings, 'QA_BATCH_MAX_STORIES', 8)
+        outputs, test_cases, batches = self._run_batches(
+            self._pack_stories(stories, budget, max_stories), input_data.get('feature', ''), context
+        )
+
+        missing = [story for story in stories if not test_cases.get(story.key)]
+        if missing and len(stories) > 1:
+            logger.info(f"Retrying {len(missing)} stories without test cases")
+            retried = self._run_batches(
+                self._pack_stories(missing, budget, max(1, max_stories // 2)), input_data.get('feature', ''), context
+            )
+            outputs += retried[0]
+            test_cases.update(retried[1])
+            batches += retried[2]
+            missing = [story for story in missing if not test_cases.get(story.key)]
+
+        generated = [story for story in stories if test_cases.get(story.key)]
+        for story in generated:
+            story.test_cases = test_cases[story.key]
+        if generated and input_data.get('save', True):
+            Story.objects.bulk_update(generated, ['test_cases'])
+
+        logger.info(
+            f"Generated test cases for {len(generated)} of {len(stories)} stories in {len(batches)} requests"
+        )
+        return {
+            'output': "\n\n".join(outputs),
+            'task_type': 'TEST_CASES',
+            'feature': input_data.get('feature', ''),
+            'test_cases': [case for story in generated for case in test_cases[story.key]],
+            'stories': {story.key: len(test_cases[story.key]) for story in generated},
+            'missing_stories': [story.key for story in missing],
+            'batches': batches,
         }
 
+    def _story_section(self, story: Story) -> str:
+        criteria = story.acceptance_criteria or []
+        if isinstance(criteria, list):
+            criteria = "\n".join(f"- {criterion}" for criterion in criteria)
+        return (
+            f"### Story {story.key}: {story.title}\n{story.description}\n"
+            + (f"Acceptance criteria:\n{criteria}\n" if criteria else "")
+        )
+
+    def _pack_stories(self, stories: List[Story], budget: int, max_stories: int) -> List[List[Tuple[Story, str]]]:
+        """Greedily group stories, in order, into batches of at most ``budget`` tokens."""
+        batches: List[List[Tuple[Story, str]]] = []
+        tokens = 0
+        for story in stories:
+            section = self._story_section(story)
+            size = self.provider.count_tokens(section)
+            if not batches or len(batches[-1]) >= max_stories or tokens + size > budget:
+                batches.append([])
+                tokens = 0
+            batches[-1].append((story, section))
+            tokens += size
+        return batches
+
+    def _run_batches(
+        self,
+        batches: List[List[Tuple[Story, str]]],
+        feature: str,
+        context: Dict[str, Any]
+    ) -> Tuple[List[str], Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        Request the batches in parallel.
+
+        Returns:
+            Tuple of (responses, test cases by story key, per-batch stats)
+        """
+        if not batches:
+            return [], {}, []
+
+        def run(batch):
+            started = time.perf_counter()
+            message = self._build_batch_prompt([section for _, section in batch], feature, context)
+            response = self.provider.generate(
+                messages=self.conversation_history + [Message(role="user", content=message)],
+                system_prompt=self.prompt.system_prompt
+            )
+            self.record_usage(response.tokens_used)
+            return response.content, {
+                'stories': [story.key for story, _ in batch],
+                'prompt_tokens': self.provider.count_tokens(message),
+                'seconds': round(time.perf_counter() - started, 3),
+            }
+
+        workers = min(getattr(settings, 'QA_BATCH_WORKERS', 4), len(batches))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            runs = list(executor.map(run, batches))
+
+        test_cases: Dict[str, List[Dict[str, Any]]] = {}
+        for (response, stats), batch in zip(runs, batches):
+            keys = set(stats['stories'])
+            for case in self.story_test_case_parser().parse(response):
+                if case.get('story') in keys:
+                    test_cases.setdefault(case['story'], []).append(case)
+        return [response for response, _ in runs], test_cases, [stats for _, stats in runs]
+
+    def _build_batch_prompt(self, sections: List[str], feature: str, context: Dict[str, Any]) -> str:
+        stories = "\n".join(sections)
+        return f"""
+I need you to generate detailed test cases for each of the following {len(sections)} user stories.
+{f"{chr(10)}Feature:{chr(10)}{feature}{chr(10)}" if feature else ""}
+{stories}
+
+Start the test cases of each story with a heading line `## Story <KEY>` using the story's key,
+and cover every story. For each test case, provide:
+1. **Test Case ID**: TC_<KEY>_XXX
+2. **Test Case Title**: Clear, descriptive title
+3. **Priority**: High/Medium/Low
+4. **Preconditions**: Setup required
+5. **Test Steps**: Numbered steps
+6. **Expected Result**: What should happen
+7. **Test Data**: Sample data needed
+8. **Type**: Positive/Negative/Edge Case
+
+Cover the happy path, negative scenarios, boundary values and edge cases of each story's
+acceptance criteria.
+
+Context: {context if context else 'None'}
+"""
+
     def _build_qa_prompt(
         self,
         task_type: str,
@@ -211,25 +417,35 @@ Context: {context if context else 'None'}
         else:
             return requirements
 
+    @staticmethod
+    def test_case_parser(on_item=None) -> StreamingLineParser:
+        """Build an incremental parser emitting one dict per test case."""
+        return StreamingLineParser([
+            LineRule.prefix('**Test Case ID', 'id', starts_item=True),
+            LineRule.prefix('**Test Case Title', 'title'),
+            LineRule.prefix('**Priority', 'priority'),
+        ], on_item=on_item)
+
+    @classmethod
+    def story_test_case_parser(cls, on_item=None) -> StreamingLineParser:
+        """
+        Build an incremental parser for batched test cases.
+
+        ``## Story <KEY>`` headings apply to the test cases that follow them.
+        """
+        def story_key(line: str):
+            match = cls._STORY_KEY_RE.search(line)
+            return match.group() if match else None
+
+        return StreamingLineParser([
+            LineRule.prefix('**Test Case ID', 'id', starts_item=True),
+            LineRule.prefix('**Test Case Title', 'title'),
+            LineRule.prefix('**Priority', 'priority'),
+            LineRule.prefix('**Expected Result', 'expected_result'),
+            LineRule.prefix('**Type', 'type'),
+            LineRule.prefix('#', 'story', match=lambda line: 'Story' in line, extract=story_key, sticky=True),
+        ], on_item=on_item)
+
     def _extract_test_cases(self, response: str) -> List[Dict[str, Any]]:
         """Extract test cases from the response."""
-        test_cases = []
-        current_case = {}
-
-        lines = response.split('\n')
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith('**Test Case ID'):
-                if current_case:
-                    test_cases.append(current_case)
-                current_case = {'id': line.split(':')[-1].strip()}
-            elif line.startswith('**Test Case Title'):
-                current_case['title'] = line.split(':')[-1].strip()
-            elif line.startswith('**Priority'):
-                current_case['priority'] = line.split(':')[-1].strip()
-
-        if current_case:
-            test_cases.append(current_case)
-
-        return test_cases
+        return self.test_case_parser().parse(response)
@@ -1,6 +1,11 @@
+import os
+import re
 from typing import Dict, Any
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from apps.projects.models import Story
+from libs.changelog import Changelog, iter_commits
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +37,15 @@ class ReleaseManagerAgent(BaseAgent):
             - release: Release details
             - requirements: Requirements
             - context: Additional context
+            - repository: (optional) Local git repository under RELEASE_REPO_ROOTS
+            - from_ref: (optional) Previous release tag/commit; default the whole history
+            - to_ref: (optional) Release tag/commit, default HEAD
+            - max_commits: (optional) Commits read at most, default RELEASE_MAX_COMMITS
+
+        With a repository, the commits between the two refs are streamed from
+        ``git log`` and only their grouped summary (by conventional-commit
+        type and linked story) is added to the prompt; it is also returned
+        under 'changelog'.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'PLAN')
@@ -41,15 +55,56 @@ class ReleaseManagerAgent(BaseAgent):
 
         logger.info(f"Executing Release Manager task: {task_type}")
 
+        changelog = None
+        if input_data.get('repository'):
+            changelog = self._changelog(input_data)
+            requirements = (
+                f"{requirements}\n\n"
+                f"Changes in this release (from git history):\n{changelog['summary']}"
+            ).strip()
+
         user_message = self._build_rm_prompt(task_type, release, requirements, context)
 
         response = self.generate_response(user_message, context)
 
-        return {
+        result = {
             'output': response,
             'task_type': task_type,
             'release': release
         }
+        if changelog:
+            result['changelog'] = changelog
+        return result
+
+    def _changelog(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize the release's commits, with the titles of the stories they reference."""
+        repository = os.path.realpath(input_data['repository'])
+        roots = [os.path.realpath(root) for root in getattr(settings, 'RELEASE_REPO_ROOTS', [])]
+        if not any(repository == root or repository.startswith(root + os.sep) for root in roots):
+            raise ValueError(f"Repository {input_data['repository']} is not under RELEASE_REPO_ROOTS")
+
+        changelog = Changelog(samples_per_type=getattr(settings, 'RELEASE_SAMPLES_PER_TYPE', 15))
+        changelog.extend(iter_commits(
+            repository,
+            input_data.get('from_ref'),
+            input_data.get('to_ref') or 'HEAD',
+            max_commits=input_data.get('max_commits') or getattr(settings, 'RELEASE_MAX_COMMITS', 20000)
+        ))
+
+        summary = changelog.summary()
+        stories = dict(
+            Story.objects.filter(key__in=list(changelog.story_commits))
+            .values_list('key', 'title')
+        )
+        if stories:
+            summary = re.sub(
+                r'^- ([A-Z][A-Z0-9]*-\d+): ',
+                lambda match: f"- {match.group(1)} {stories[match.group(1)]}: " if match.group(1) in stories else match.group(0),
+                summary,
+                flags=re.MULTILINE
+            )
+        logger.info(f"Summarized {changelog.total} commits into {len(summary)} characters")
+        return {**changelog.to_dict(), 'story_titles': stories, 'summary': summary}
 
     def _build_rm_prompt(
         self,
@@ -1,6 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from apps.projects.metrics import SprintMetrics
+from apps.projects.models import Sprint
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +34,12 @@ class ScrumMasterAgent(BaseAgent):
             - team_context: Team context
             - requirements: Requirements
             - context: Additional context
+            - project_id: (optional) Project whose tracker metrics are added to the team context
+            - sprint_id: (optional) Sprint to report on, default the project's active sprint
+
+        With a project or sprint, velocity, carry-over, cycle time and
+        burndown are computed from its stories and tasks and given to the
+        model as numbers, and returned under 'metrics'.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'SPRINT_PLAN')
@@ -41,15 +49,34 @@ class ScrumMasterAgent(BaseAgent):
 
         logger.info(f"Executing Scrum Master task: {task_type}")
 
-        user_message = self._build_sm_prompt(task_type, team_context, requirements, context)
+        metrics = self._sprint_metrics(input_data.get('project_id'), input_data.get('sprint_id'))
+        prompt_context = team_context
+        if metrics:
+            prompt_context = (
+                f"{team_context}\n\n"
+                "Sprint Metrics (computed from the tracker; use these figures rather than estimating them):\n"
+                f"{SprintMetrics.summary(metrics)}"
+            ).strip()
+
+        user_message = self._build_sm_prompt(task_type, prompt_context, requirements, context)
 
         response = self.generate_response(user_message, context)
 
-        return {
+        result = {
             'output': response,
             'task_type': task_type,
             'team_context': team_context
         }
+        if metrics:
+            result['metrics'] = metrics
+        return result
+
+    def _sprint_metrics(self, project_id: Optional[int], sprint_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        if sprint_id and not project_id:
+            project_id = Sprint.objects.filter(pk=sprint_id).values_list('project_id', flat=True).first()
+        if not project_id:
+            return None
+        return SprintMetrics().project(project_id, sprint_id)
 
     def _build_sm_prompt(
         self,
@@ -1,6 +1,11 @@
-from typing import Dict, Any, List
+import os
+from typing import Dict, Any, List, Optional
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
 from apps.agents.models import AgentTask, AgentType
+from apps.agents.pre_analysis import PreAnalyzer
+from libs.parsing import LineRule, StreamingLineParser
+from libs.static_analysis import ScanResult, SecretScanner, summarize_findings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,6 +41,35 @@ class SecurityAgent(BaseAgent):
         "Server-Side Request Forgery (SSRF)"
     ]
 
+    # Task types about the given code, which may be answered by static analysis alone.
+    CODE_TASK_TYPES = ('AUDIT', 'VULN_SCAN', 'CODE_REVIEW')
+
+    # Task types for which files and paths are scanned for secrets and vulnerable constructs.
+    SCAN_TASK_TYPES = ('AUDIT', 'VULN_SCAN')
+
+    output_schema = {
+        "type": "object",
+        "properties": {
+            "output": {"type": "string", "description": "Full markdown report"},
+            "vulnerabilities": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "severity": {"type": "string", "enum": ["Critical", "High", "Medium", "Low"]},
+                        "description": {"type": "string"},
+                        "impact": {"type": "string"},
+                        "fix": {"type": "string"},
+                        "cwe_id": {"type": "string"},
+                        "owasp_category": {"type": "string"}
+                    },
+                    "required": ["severity", "description"]
+                }
+            }
+        },
+        "required": ["output", "vulnerabilities"]
+    }
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a Security task.
@@ -45,25 +79,122 @@ class SecurityAgent(BaseAgent):
             - code: (optional) Code to review
             - system: System description
             - context: Additional context
+            - stream: (optional) Stream the response and publish vulnerabilities
+              on the task as soon as each one is parsed
+            - output_mode: (optional) 'structured' to request schema-validated JSON
+            - language: (optional) Language of the code, detected when omitted
+            - pre_analysis: (optional) Run the local static analysis first, default True
+            - files: (optional) List of {path, content} entries to scan (AUDIT, VULN_SCAN)
+            - paths: (optional) Server directories or files to scan; only paths
+              under SECURITY_SCAN_ROOTS are accepted (AUDIT, VULN_SCAN)
+
+        Findings of the static analysis and the secret scanner are listed in
+        the prompt and returned ahead of the model's vulnerabilities (with
+        'source': 'static', plus 'file' and 'line'). A small code-only task
+        without findings is answered without the provider.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'AUDIT')
         code = input_data.get('code', '')
         system = input_data.get('system', '')
         context = input_data.get('context', {})
+        stream = input_data.get('stream', False)
 
         logger.info(f"Executing Security task: {task_type}")
 
-        user_message = self._build_security_prompt(task_type, code, system, context)
+        analyzer = PreAnalyzer() if code and input_data.get('pre_analysis', True) else None
+        reports = analyzer.analyze(code, input_data.get('language')) if analyzer else []
+        static = {}
+        static_vulnerabilities = []
+
+        scan = self._scan(input_data) if task_type in self.SCAN_TASK_TYPES else None
+        if scan:
+            static['scan'] = scan.stats()
+            static_vulnerabilities.extend(scan.vulnerabilities())
+
+        if analyzer:
+            static['static_analysis'] = analyzer.output(reports)
+            static_vulnerabilities[:0] = [
+                finding.as_vulnerability()
+                for report in reports for finding in report.findings
+                if finding.category != 'complexity'
+            ]
+            if task_type in self.CODE_TASK_TYPES and not system and not scan and analyzer.can_skip_llm(reports):
+                logger.info("Static analysis found no issues, skipping the model audit")
+                return {
+                    'output': "Static analysis found no security issues in this code; no model audit was needed.",
+                    'task_type': task_type,
+                    'vulnerabilities': [],
+                    'llm_skipped': True,
+                    **static
+                }
 
-        response = self.generate_response(user_message, context)
+        user_message = self._build_security_prompt(task_type, code, system, context)
+        if analyzer:
+            user_message = f"{user_message}\n{analyzer.prompt_section(reports)}"
+        if scan:
+            user_message = (
+                f"{user_message}\nSecret and vulnerability scan of {scan.files_scanned} files "
+                f"(already detected locally; assess their impact instead of repeating them):\n"
+                f"{summarize_findings(scan.findings, 50)}\n"
+            )
+
+        if input_data.get('output_mode') == 'structured':
+            result = self.generate_structured_response(user_message, context)
+            return {
+                'output': result['output'],
+                'task_type': task_type,
+                'vulnerabilities': static_vulnerabilities + result['vulnerabilities'],
+                **static
+            }
+
+        parser = self.vulnerability_parser(
+            on_item=self.partial_result_publisher(task, 'vulnerabilities') if stream else None
+        )
+
+        response = self.generate_response(
+            user_message, context, stream=stream, on_chunk=parser.feed
+        )
 
         return {
             'output': response,
             'task_type': task_type,
-            'vulnerabilities': self._extract_vulnerabilities(response)
+            'vulnerabilities': static_vulnerabilities + parser.close(),
+            **static
         }
 
+    def _scan(self, input_data: Dict[str, Any]) -> Optional[ScanResult]:
+        """Scan the task's files and allowed paths with the multi-pattern scanner."""
+        files = input_data.get('files') or []
+        paths = self._allowed_paths(input_data.get('paths') or [])
+        if not files and not paths:
+            return None
+
+        scanner = SecretScanner(min_confidence=getattr(settings, 'SECURITY_SCAN_MIN_CONFIDENCE', 0.7))
+        result = scanner.scan_paths(paths, max_workers=getattr(settings, 'STATIC_ANALYSIS_WORKERS', None))
+        for index, file in enumerate(files):
+            content = file.get('content') or ''
+            result.findings.extend(scanner.scan_text(content, file.get('path') or f"file_{index + 1}"))
+            result.files_scanned += 1
+            result.bytes_scanned += len(content)
+
+        logger.info(
+            f"Scanned {result.files_scanned} files ({result.bytes_scanned} bytes) "
+            f"in {result.duration:.2f}s: {len(result.findings)} findings"
+        )
+        return result
+
+    def _allowed_paths(self, paths: List[str]) -> List[str]:
+        roots = [os.path.realpath(root) for root in getattr(settings, 'SECURITY_SCAN_ROOTS', [])]
+        allowed = []
+        for path in paths:
+            real = os.path.realpath(path)
+            if any(real == root or real.startswith(root + os.sep) for root in roots):
+                allowed.append(real)
+            else:
+                logger.warning(f"Refusing to scan {path}: not under SECURITY_SCAN_ROOTS")
+        return allowed
+
     def _build_security_prompt(
         self,
         task_type: str,
@@ -356,25 +487,15 @@ Context: {context if context else 'None'}
         else:
             return system or code
 
+    @staticmethod
+    def vulnerability_parser(on_item=None) -> StreamingLineParser:
+        """Build an incremental parser emitting one dict per vulnerability."""
+        return StreamingLineParser([
+            LineRule.contains(['**Severity**:', '**severity**:'], 'severity', starts_item=True),
+            LineRule.contains(['**Description**:'], 'description'),
+            LineRule.contains(['**Impact**:'], 'impact'),
+        ], on_item=on_item)
+
     def _extract_vulnerabilities(self, response: str) -> List[Dict[str, Any]]:
         """Extract vulnerabilities from response."""
-        vulnerabilities = []
-        current_vuln = {}
-
-        lines = response.split('\n')
-        for line in lines:
-            line = line.strip()
-
-            if '**Severity**:' in line or '**severity**:' in line:
-                if current_vuln:
-                    vulnerabilities.append(current_vuln)
-                current_vuln = {'severity': line.split(':')[-1].strip()}
-            elif '**Description**:' in line:
-                current_vuln['description'] = line.split(':')[-1].strip()
-            elif '**Impact**:' in line:
-                current_vuln['impact'] = line.split(':')[-1].strip()
-
-        if current_vuln:
-            vulnerabilities.append(current_vuln)
-
-        return vulnerabilities
+        return self.vulnerability_parser().parse(response)
@@ -1,6 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
+from django.conf import settings
 from apps.agents.base_agent import BaseAgent
+from apps.agents.knowledge import KnowledgeBase
 from apps.agents.models import AgentTask, AgentType
+from libs.retrieval import top_snippets
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +26,9 @@ class SupportAgent(BaseAgent):
         "ESCALATION_MANAGEMENT"
     ]
 
+    # Task types that may be answered directly from a past resolution.
+    DIRECT_ANSWER_TASK_TYPES = ('TROUBLESHOOT', 'ANSWER')
+
     def execute_task(self, task: AgentTask) -> Dict[str, Any]:
         """
         Execute a Support task.
@@ -31,34 +37,123 @@ class SupportAgent(BaseAgent):
             - task_type: TROUBLESHOOT | ANSWER | TICKET | ESCALATE | FEEDBACK
             - issue: User's issue or question
             - context: Additional context
+            - use_knowledge: (optional) Retrieve past resolutions and documentation, default True
+            - top_k: (optional) Number of knowledge snippets included in the prompt, default 3
+
+        Relevant past resolutions and documentation are retrieved from the
+        knowledge base. When a past TROUBLESHOOT/ANSWER task resolved an issue
+        similar enough to this one, its resolution is returned directly;
+        otherwise the top-k snippets are included in the prompt. Long text in
+        the context is cut down to the passages relevant to the issue.
         """
         input_data = task.input_data
         task_type = input_data.get('task_type', 'TROUBLESHOOT')
         issue = input_data.get('issue', '')
         user_context = input_data.get('user_context', {})
-        context = input_data.get('context', {})
+        context = self._relevant_context(issue, input_data.get('context', {}))
 
         logger.info(f"Executing Support task: {task_type}")
 
-        user_message = self._build_support_prompt(task_type, issue, user_context, context)
+        snippets: List[Dict[str, Any]] = []
+        if issue and input_data.get('use_knowledge', True):
+            knowledge = KnowledgeBase.shared()
+
+            if task_type in self.DIRECT_ANSWER_TASK_TYPES:
+                past = knowledge.best_resolution(issue, task_type)
+                threshold = getattr(settings, 'SUPPORT_DIRECT_ANSWER_THRESHOLD', 0.85)
+                if past and past['task_id'] != task.pk and past['confidence'] >= threshold:
+                    logger.info(
+                        f"Answering from task {past['task_id']} (confidence {past['confidence']})"
+                    )
+                    return {
+                        'output': past['content'],
+                        'task_type': task_type,
+                        'resolution': past['content'],
+                        'answered_from': past['task_id'],
+                        'confidence': past['confidence']
+                    }
+
+            snippets = [
+                snippet for snippet in knowledge.search(issue, input_data.get('top_k', 3))
+                if snippet['task_id'] != task.pk
+            ]
+
+        user_message = self._build_support_prompt(
+            task_type, issue, user_context, context, self._format_snippets(snippets)
+        )
 
         response = self.generate_response(user_message, context)
 
-        return {
+        result = {
             'output': response,
             'task_type': task_type,
             'resolution': response
         }
 
+        if snippets:
+            result['sources'] = [
+                {key: snippet[key] for key in ('source', 'task_id', 'path', 'title', 'score')}
+                for snippet in snippets
+            ]
+
+        return result
+
+    def on_task_completed(self, task: AgentTask, result: Dict[str, Any]):
+        """Index the resolution so similar issues can reuse it."""
+        if result.get('answered_from') or not task.input_data.get('issue'):
+            return
+        KnowledgeBase.shared().index_task(
+            task,
+            question=task.input_data['issue'],
+            answer=result.get('resolution', ''),
+            task_type=result.get('task_type', '')
+        )
+
+    def _relevant_context(self, issue: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace long pasted text in the context by the passages relevant to the issue."""
+        limit = getattr(settings, 'KNOWLEDGE_CHUNK_CHARS', 1500) * 2
+        if not issue or not isinstance(context, dict):
+            return context
+
+        relevant = {}
+        for key, value in context.items():
+            if isinstance(value, str) and len(value) > limit:
+                passages = top_snippets(issue, [value], k=3)
+                if passages:
+                    logger.info(f"Reduced context '{key}' from {len(value)} to {sum(map(len, passages))} characters")
+                    value = "\n[...]\n".join(passages)
+                else:
+                    # Nothing matches the issue's terms; keep the beginning rather than drop it.
+                    value = value[:limit] + "\n[...]"
+            relevant[key] = value
+        return relevant
+
+    def _format_snippets(self, snippets: List[Dict[str, Any]]) -> str:
+        sections = []
+        for snippet in snippets:
+            if snippet['source'] == 'TASK' and snippet['question']:
+                label = f"Past resolution (task #{snippet['task_id']}): {snippet['title']}"
+                body = f"Issue: {snippet['question']}\nResolution: {snippet['content']}"
+            else:
+                label = f"Documentation: {snippet['title']}"
+                body = snippet['content']
+            sections.append(f"### {label}\n{body[:2000]}")
+        return "\n\n".join(sections)
+
     def _build_support_prompt(
         self,
         task_type: str,
         issue: str,
         user_context: Dict[str, Any],
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        knowledge: str = ''
     ) -> str:
         """Build the prompt for support task."""
 
+        knowledge = (
+            f"Relevant Knowledge (past resolutions and documentation; use it where it applies):\n{knowledge}\n"
+        ) if knowledge else ""
+
         if task_type == 'TROUBLESHOOT':
             return f"""
 I need you to help troubleshoot this user issue.
@@ -69,6 +164,7 @@ User Issue:
 User Context:
 {user_context if user_context else 'None'}
 
+{knowledge}
 Please provide comprehensive troubleshooting:
 
 1. **Issue Understanding** 🔍
@@ -139,6 +235,7 @@ User Question:
 User Context:
 {user_context if user_context else 'None'}
 
+{knowledge}
 Please provide a helpful answer:
 
 1. **Direct Answer** 💡
@@ -190,6 +287,7 @@ Ticket Details:
 User Context:
 {user_context if user_context else 'None'}
 
+{knowledge}
 Please provide ticket analysis and response:
 
 1. **Ticket Classification** 🏷️
@@ -254,6 +352,7 @@ Issue:
 User Context:
 {user_context if user_context else 'None'}
 
+{knowledge}
 Please prepare escalation details:
 
 1. **Escalation Summary** 📋
@@ -310,6 +409,7 @@ Feedback:
 User Context:
 {user_context if user_context else 'None'}
 
+{knowledge}
 Please provide feedback analysis:
 
 1. **Feedback Classification** 🏷️
@@ -1,6 +1,6 @@
 from celery import shared_task
 from django.utils import timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
 import time
 
@@ -39,36 +39,53 @@ def get_ai_provider_instance(provider: AIProvider):
         raise ValueError(f"Unsupported provider type: {provider.provider_type}")
 
 
+def get_default_provider() -> AIProvider:
+    """The active provider used for agent tasks, preferring OpenAI."""
+    provider = AIProvider.objects.filter(
+        is_active=True,
+        provider_type='OPENAI'
+    ).first()
+
+    if not provider:
+        provider = AIProvider.objects.filter(is_active=True).first()
+
+    if not provider:
+        raise ValueError("No active AI provider found")
+
+    return provider
+
+
 @shared_task(bind=True, max_retries=3)
-def execute_agent_task(self, task_id: int) -> Dict[str, Any]:
+def execute_agent_task(self, task_id: int, dispatched_at: Optional[str] = None) -> Dict[str, Any]:
     """
     Execute an agent task asynchronously.
 
     Args:
         task_id: The AgentTask ID to execute
+        dispatched_at: Dispatch time the message was sent for (see TaskRouter.claim_filter)
 
     Returns:
         Dict containing execution results
     """
+    task = None
     try:
-        task = AgentTask.objects.get(id=task_id)
+        # Claim the task, so a message delivered twice (or a task dispatched
+        # by several requests) is executed once, and a message superseded by
+        # a later dispatch never runs it.
+        from .routing import TaskRouter
+
+        claimed = AgentTask.objects.filter(
+            TaskRouter.claim_filter(dispatched_at), id=task_id, status__in=['PENDING', 'FAILED']
+        ).update(status='IN_PROGRESS', started_at=timezone.now())
+        if not claimed:
+            logger.info(f"Task {task_id} was already claimed; skipping")
+            return {'task_id': task_id, 'status': 'skipped'}
 
-        task.status = 'IN_PROGRESS'
-        task.started_at = timezone.now()
-        task.save()
+        task = AgentTask.objects.get(id=task_id)
 
         logger.info(f"Starting execution of task {task_id}: {task.title}")
 
-        provider = AIProvider.objects.filter(
-            is_active=True,
-            provider_type='OPENAI'
-        ).first()
-
-        if not provider:
-            provider = AIProvider.objects.filter(is_active=True).first()
-
-        if not provider:
-            raise ValueError("No active AI provider found")
+        provider = get_default_provider()
 
         prompt = Prompt.objects.filter(
             agent_type=task.agent_type,
@@ -99,6 +116,10 @@ def execute_agent_task(self, task_id: int) -> Dict[str, Any]:
 
         execution_time = time.time() - start_time
 
+        if 'deferred' in result:
+            execution.delete()
+            return {'task_id': task_id, 'status': 'deferred', 'reason': result['deferred']}
+
         execution.execution_time_seconds = execution_time
         execution.success = True
         execution.save()
@@ -108,9 +129,6 @@ def execute_agent_task(self, task_id: int) -> Dict[str, Any]:
         task.execution_time_seconds = execution_time
         task.save()
 
-        if task.created_by:
-            task.created_by.increment_token_usage(execution.total_tokens)
-
         logger.info(f"Task {task_id} completed successfully in {execution_time:.2f}s")
 
         return {
@@ -131,6 +149,27 @@ def execute_agent_task(self, task_id: int) -> Dict[str, Any]:
         raise self.retry(exc=e, countdown=60)
 
 
+@shared_task
+def execute_agent_tasks(task_ids: List[int], dispatched_at: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Execute several agent tasks concurrently in this worker process.
+
+    The tasks share one asyncio loop (see AsyncAgentExecutor), so a single
+    prefork worker process serves up to AGENT_EXECUTOR_CONCURRENCY of them at
+    once instead of one.
+
+    Args:
+        task_ids: The AgentTask IDs to execute
+        dispatched_at: Dispatch time the message was sent for (see TaskRouter.claim_filter)
+
+    Returns:
+        One result summary per task
+    """
+    from .executor import AsyncAgentExecutor
+
+    return AsyncAgentExecutor().run(task_ids, dispatched_at)
+
+
 async def execute_agent_task_async(task_id: int) -> Dict[str, Any]:
     """
     Execute agent task asynchronously (for use in async contexts).
@@ -142,8 +181,10 @@ async def execute_agent_task_async(task_id: int) -> Dict[str, Any]:
         Dict containing execution results
     """
     from asgiref.sync import sync_to_async
+    from .routing import TaskRouter
 
-    result = await sync_to_async(execute_agent_task.apply_async)((task_id,))
+    dispatched_at = await sync_to_async(TaskRouter.mark_dispatched)([task_id])
+    result = await sync_to_async(execute_agent_task.apply_async)((task_id, dispatched_at))
 
     return await sync_to_async(result.get)(timeout=300)
 
@@ -211,6 +252,10 @@ Focus on accuracy and actionable insights.""",
         AgentType.SUPPORT: """You are a customer support specialist.
 Help users solve problems, answer questions, and provide excellent service.
 Be patient, clear, and helpful.""",
+
+        AgentType.REVIEW_ENSEMBLE: """You coordinate code review, security and performance reviewers.
+Combine their findings into a single report without repeating the same issue.
+Order issues by severity.""",
     }
 
     system_prompt = default_prompts.get(
@@ -231,6 +276,29 @@ Be patient, clear, and helpful.""",
     return prompt
 
 
+@shared_task(bind=True, max_retries=2)
+def summarize_conversation(self, session_id: int) -> Dict[str, Any]:
+    """
+    Fold the older turns of a conversation session into its rolling summary.
+
+    Args:
+        session_id: The ConversationSession ID
+    """
+    from .sessions import ConversationMemory
+
+    def generate(messages, system_prompt):
+        return provider_instance.generate(messages=messages, system_prompt=system_prompt).content
+
+    try:
+        provider_instance = get_ai_provider_instance(get_default_provider())
+        updated = ConversationMemory().summarize(session_id, generate)
+    except Exception as e:
+        logger.error(f"Summary of conversation session {session_id} failed: {str(e)}")
+        raise self.retry(exc=e, countdown=30)
+
+    return {'session_id': session_id, 'updated': updated}
+
+
 @shared_task
 def cleanup_old_tasks():
     """Cleanup old completed/failed tasks (older than 90 days)."""
@@ -251,6 +319,14 @@ def cleanup_old_tasks():
     return {'deleted_count': count}
 
 
+@shared_task
+def promote_starved_tasks():
+    """Promote and re-dispatch tasks pending for longer than AGENT_TASK_STARVATION_SECONDS."""
+    from .routing import TaskRouter
+
+    return {'promoted_count': TaskRouter().promote_starved()}
+
+
 @shared_task
 def reset_stuck_tasks():
     """Reset tasks that have been stuck in IN_PROGRESS for >1 hour."""
@@ -4,6 +4,7 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'tasks', views.AgentTaskViewSet, basename='agent-task')
+router.register(r'batches', views.TaskBatchViewSet, basename='task-batch')
 router.register(r'prompts', views.PromptViewSet, basename='prompt')
 router.register(r'providers', views.AIProviderViewSet, basename='ai-provider')
 router.register(r'executions', views.AgentExecutionViewSet, basename='execution')
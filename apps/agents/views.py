@@ -1,19 +1,77 @@
+import json
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import AgentTask, Prompt, AIProvider, AgentExecution
+from rest_framework.renderers import BaseRenderer
+from rest_framework.reverse import reverse
+from rest_framework.settings import api_settings
+from .bulk import BulkTaskSubmission
+from .models import AgentTask, Prompt, AIProvider, AgentExecution, TaskBatch, TaskStatus
+from .routing import TaskRouter
 from .serializers import (
     AgentTaskSerializer, PromptSerializer,
-    AIProviderSerializer, AgentExecutionSerializer
+    AIProviderSerializer, AgentExecutionSerializer, TaskBatchSerializer
 )
 
+JSON_LINES_TYPES = ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines')
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+# Long-polls and event streams hold a worker thread while they wait, so only
+# this many wait at once in a process; the others get the current status.
+_status_waiters = threading.BoundedSemaphore(getattr(settings, 'AGENT_STATUS_MAX_WAITERS', 1))
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets views answer ``Accept: text/event-stream``; the events themselves are streamed by the view."""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def _task_status(task: AgentTask):
+    return {
+        'task_id': task.id,
+        'status': task.status,
+        'error_message': task.error_message,
+        'started_at': task.started_at,
+        'completed_at': task.completed_at,
+        'updated_at': task.updated_at,
+    }
+
+
+def _status_changes(task_id: int, since, wait: float):
+    """
+    Poll the task for up to ``wait`` seconds, yielding its status whenever it
+    differs from the last one seen (``since`` to begin with); stops once the
+    task has finished.
+    """
+    deadline = time.monotonic() + wait
+    interval = getattr(settings, 'AGENT_STATUS_POLL_INTERVAL', 0.5)
+    fields = ['id', 'status', 'error_message', 'started_at', 'completed_at', 'updated_at']
+    while True:
+        task = AgentTask.objects.only(*fields).get(pk=task_id)
+        if task.status != since:
+            since = task.status
+            yield _task_status(task)
+        if task.status in FINISHED_STATUSES or time.monotonic() >= deadline:
+            return
+        time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+
 
 class AgentTaskViewSet(viewsets.ModelViewSet):
     queryset = AgentTask.objects.all()
     serializer_class = AgentTaskSerializer
     permission_classes = [IsAuthenticated]
-    filterset_fields = ['agent_type', 'status', 'created_by']
+    filterset_fields = ['agent_type', 'status', 'created_by', 'batch']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'priority', 'status']
 
@@ -22,12 +80,119 @@ class AgentTaskViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def execute(self, request, pk=None):
+        """
+        Enqueue the task for execution. An ``Idempotency-Key`` header (or
+        ``idempotency_key`` in the body) makes retries safe: a repeated request
+        with the same key returns the original dispatch without enqueuing the
+        task again. Returns a handle whose ``status_url`` can be long-polled
+        or streamed.
+        """
         task = self.get_object()
+        key = request.headers.get('Idempotency-Key') or (
+            request.data.get('idempotency_key') if isinstance(request.data, dict) else None
+        ) or str(uuid.uuid4())
+        if len(key) > 255:
+            return Response(
+                {'detail': 'Idempotency key must be at most 255 characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        dispatch, created = TaskRouter().dispatch_once(task, key, request.user)
+        if dispatch is None:
+            return Response(
+                {'detail': f'Task is {task.status.lower()} and cannot be executed', 'task_id': task.id},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        task.refresh_from_db(fields=['status'])
         return Response({
-            'message': 'Task execution initiated',
+            'message': 'Task execution initiated' if created else 'Task execution already requested',
             'task_id': task.id,
-            'status': task.status
-        })
+            'status': task.status,
+            'idempotency_key': dispatch.idempotency_key,
+            'celery_task_id': dispatch.celery_task_id,
+            'status_url': reverse('agent-task-execution-status', args=[task.id], request=request),
+        }, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+    @action(
+        detail=True, methods=['get'], url_path='status',
+        renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES + [EventStreamRenderer]
+    )
+    def execution_status(self, request, pk=None):
+        """
+        Lightweight execution status of the task.
+
+        ``?wait=<seconds>`` long-polls: the response is held until the status
+        differs from ``?since=<status>`` (default: the current status) or the
+        wait ends. With ``Accept: text/event-stream`` every status change is
+        streamed as a server-sent event until the task finishes or the wait ends.
+
+        Waiting holds a server thread, so at most AGENT_STATUS_MAX_WAITERS
+        requests wait at once per process. Beyond that the current status is
+        returned at once, with ``Retry-After`` or an event ``retry`` delay.
+        """
+        task = self.get_object()
+        max_wait = getattr(settings, 'AGENT_STATUS_MAX_WAIT', 10)
+        retry = getattr(settings, 'AGENT_STATUS_RETRY_AFTER', 2)
+        try:
+            wait = min(max(float(request.query_params.get('wait', 0)), 0), max_wait)
+        except ValueError:
+            return Response({'detail': 'wait must be a number of seconds'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.accepted_media_type == EventStreamRenderer.media_type:
+            def events():
+                # Acquired once streaming starts, so a stream never started holds no slot.
+                if not _status_waiters.acquire(blocking=False):
+                    payload = json.dumps(_task_status(task), cls=DjangoJSONEncoder)
+                    yield f"retry: {retry * 1000}\nevent: status\ndata: {payload}\n\n"
+                    return
+                try:
+                    for payload in _status_changes(task.id, None, wait or max_wait):
+                        yield f"event: status\ndata: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n"
+                finally:
+                    _status_waiters.release()
+
+            response = StreamingHttpResponse(events(), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            return response
+
+        if not wait:
+            return Response(_task_status(task))
+        if not _status_waiters.acquire(blocking=False):
+            return Response(_task_status(task), headers={'Retry-After': str(retry)})
+        try:
+            since = request.query_params.get('since', task.status)
+            return Response(next(_status_changes(task.id, since, wait), None) or _task_status(task))
+        finally:
+            _status_waiters.release()
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create many tasks at once from a JSON array (or {"tasks": [...]}) or a
+        JSON Lines body, one task per line. Returns the batch, whose progress
+        is available at /batches/<id>/.
+        """
+        if request.content_type.split(';')[0].strip() in JSON_LINES_TYPES:
+            # Read line by line instead of parsing the whole body.
+            items = iter(request.stream.readline, b'') if request.stream else []
+        else:
+            items = request.data.get('tasks') if isinstance(request.data, dict) else request.data
+            if not isinstance(items, list):
+                return Response(
+                    {'detail': 'Expected a list of tasks'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        batch = BulkTaskSubmission().submit(items, request.user)
+        return Response(TaskBatchSerializer(batch).data, status=status.HTTP_201_CREATED)
+
+
+class TaskBatchViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = TaskBatch.objects.all()
+    serializer_class = TaskBatchSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['created_by']
 
 
 class PromptViewSet(viewsets.ModelViewSet):
@@ -42,7 +42,8 @@ class StoryAdmin(admin.ModelAdmin):
         'status', 'priority', 'assigned_to_ai', 'generated_by_ai', 'created_at'
     ]
     search_fields = ['key', 'title', 'description']
-    raw_id_fields = ['project', 'epic', 'sprint', 'assignee', 'created_by']
+    raw_id_fields = ['project', 'epic', 'sprint', 'assignee', 'created_by', 'depends_on']
+    readonly_fields = ['started_at', 'completed_at', 'carry_over_count']
 
 
 @admin.register(Task)
@@ -50,7 +51,7 @@ class TaskAdmin(admin.ModelAdmin):
     list_display = ['id', 'title', 'story', 'status', 'assignee', 'assigned_to_ai']
     list_filter = ['status', 'assigned_to_ai', 'created_at']
     search_fields = ['title', 'description']
-    raw_id_fields = ['story', 'assignee']
+    raw_id_fields = ['story', 'assignee', 'depends_on']
 
 
 @admin.register(Comment)
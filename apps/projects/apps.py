@@ -5,3 +5,6 @@ class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.projects'
     verbose_name = 'Project Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
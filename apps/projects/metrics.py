@@ -0,0 +1,216 @@
+import statistics
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from .models import Sprint, Story, Task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SprintMetrics:
+    """
+    Velocity, carry-over, cycle time and burndown computed from the tracker.
+
+    Each sprint's metrics come from a few aggregate queries and are cached
+    under a per-sprint version number. Saving or deleting a story, task or
+    sprint bumps only the versions of the sprints it belongs to (see
+    signals.py), so the metrics of every other sprint stay cached: a
+    project's velocity over its last sprints is recomputed only for the
+    sprint that changed. Metrics of open sprints are also keyed by the date,
+    since their burndown grows every day. Every entry expires after
+    ``CACHE_TIMEOUT``, which bounds how long a change made without signals
+    (a queryset ``update``) goes unnoticed.
+
+    Attributes:
+        velocity_window: Number of completed sprints the velocity is averaged over
+    """
+
+    VERSION_KEY = 'projects:sprint_metrics:version:{}'
+    CACHE_KEY = 'projects:sprint_metrics:{}:{}:{}'
+    CACHE_TIMEOUT = 86400
+
+    def __init__(self, velocity_window: Optional[int] = None):
+        self.velocity_window = velocity_window or getattr(settings, 'SPRINT_VELOCITY_WINDOW', 3)
+
+    @classmethod
+    def invalidate(cls, *sprint_ids: Optional[int]):
+        """Mark the cached metrics of these sprints as stale."""
+        for sprint_id in set(sprint_ids) - {None}:
+            key = cls.VERSION_KEY.format(sprint_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+    def sprint(self, sprint: Sprint) -> Dict[str, Any]:
+        """The metrics of one sprint, from the cache when it has not changed."""
+        version = cache.get(self.VERSION_KEY.format(sprint.pk), 0)
+        day = '' if sprint.status in ('COMPLETED', 'CANCELLED') else timezone.localdate().isoformat()
+        key = self.CACHE_KEY.format(sprint.pk, version, day)
+
+        metrics = cache.get(key)
+        if metrics is None:
+            metrics = self.compute(sprint)
+            cache.set(key, metrics, self.CACHE_TIMEOUT)
+        return metrics
+
+    def compute(self, sprint: Sprint) -> Dict[str, Any]:
+        stories = Story.objects.filter(sprint=sprint).order_by()
+        done = Q(status='DONE')
+        carried = Q(carry_over_count__gt=0)
+        totals = stories.aggregate(
+            stories=Count('id'),
+            completed_stories=Count('id', filter=done),
+            committed_points=Coalesce(Sum('story_points'), 0),
+            completed_points=Coalesce(Sum('story_points', filter=done), 0),
+            carried_in_stories=Count('id', filter=carried),
+            carried_in_points=Coalesce(Sum('story_points', filter=carried), 0),
+        )
+        tasks = Task.objects.filter(story__sprint=sprint).order_by().aggregate(
+            tasks=Count('id'),
+            completed_tasks=Count('id', filter=Q(status='DONE')),
+            estimated_hours=Coalesce(Sum('estimated_hours'), 0.0),
+            actual_hours=Coalesce(Sum('actual_hours'), 0.0),
+        )
+
+        cycle_days = sorted(
+            (completed - started).total_seconds() / 86400
+            for started, completed in stories.filter(
+                done, started_at__isnull=False, completed_at__isnull=False
+            ).values_list('started_at', 'completed_at')
+        )
+        completed_by_day = dict(
+            stories.filter(done, completed_at__isnull=False)
+            .annotate(day=TruncDate('completed_at'))
+            .values('day')
+            .annotate(points=Coalesce(Sum('story_points'), 0))
+            .values_list('day', 'points')
+        )
+
+        unfinished_points = totals['committed_points'] - totals['completed_points']
+        return {
+            'sprint_id': sprint.pk,
+            'name': sprint.name,
+            'status': sprint.status,
+            'start_date': sprint.start_date.isoformat(),
+            'end_date': sprint.end_date.isoformat(),
+            **totals,
+            **{name: round(value, 1) if 'hours' in name else value for name, value in tasks.items()},
+            'unfinished_stories': totals['stories'] - totals['completed_stories'],
+            'unfinished_points': unfinished_points,
+            'by_status': dict(stories.values_list('status').annotate(count=Count('id'))),
+            'cycle_time_days': {
+                'count': len(cycle_days),
+                'mean': round(statistics.fmean(cycle_days), 1) if cycle_days else None,
+                'median': round(statistics.median(cycle_days), 1) if cycle_days else None,
+                'p85': round(cycle_days[int(0.85 * (len(cycle_days) - 1))], 1) if cycle_days else None,
+            },
+            'burndown': self._burndown(sprint, totals['committed_points'], completed_by_day),
+        }
+
+    def project(self, project_id: int, sprint_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Velocity over the project's last completed sprints, plus the metrics
+        of the given sprint (or the active one).
+        """
+        history = [
+            self.sprint(sprint) for sprint in
+            Sprint.objects.filter(project_id=project_id, status='COMPLETED')
+            .order_by('-end_date')[:self.velocity_window]
+        ]
+        velocities = [metrics['completed_points'] for metrics in history]
+        current = Sprint.objects.filter(project_id=project_id)
+        current = (
+            current.filter(pk=sprint_id) if sprint_id
+            else current.filter(status__in=('ACTIVE', 'PLANNING')).order_by('status', 'start_date')
+        ).first()
+
+        return {
+            'velocity': {
+                'sprints': len(velocities),
+                'mean': round(statistics.fmean(velocities), 1) if velocities else None,
+                'min': min(velocities) if velocities else None,
+                'max': max(velocities) if velocities else None,
+                'stdev': round(statistics.stdev(velocities), 1) if len(velocities) > 1 else None,
+                'history': [
+                    {'name': metrics['name'], 'committed_points': metrics['committed_points'],
+                     'completed_points': metrics['completed_points'],
+                     'unfinished_points': metrics['unfinished_points']}
+                    for metrics in history
+                ],
+            },
+            'sprint': self.sprint(current) if current else None,
+        }
+
+    @staticmethod
+    def _burndown(sprint: Sprint, committed: int, completed_by_day: Dict[date, int]) -> List[Dict[str, Any]]:
+        """Remaining and ideal points for each day of the sprint so far."""
+        days = (sprint.end_date - sprint.start_date).days
+        if days < 0:
+            return []
+        last = min(sprint.end_date, timezone.localdate())
+        remaining = committed - sum(points for day, points in completed_by_day.items() if day < sprint.start_date)
+
+        burndown = []
+        for offset in range((last - sprint.start_date).days + 1):
+            day = sprint.start_date + timedelta(days=offset)
+            remaining -= completed_by_day.get(day, 0)
+            burndown.append({
+                'date': day.isoformat(),
+                'remaining': remaining,
+                'ideal': round(committed * (1 - offset / days), 1) if days else 0,
+            })
+        return burndown
+
+    @staticmethod
+    def summary(metrics: Dict[str, Any]) -> str:
+        """The metrics as a few compact lines for an agent prompt."""
+        lines = []
+        velocity = metrics.get('velocity')
+        if velocity and velocity['sprints']:
+            lines.append(
+                f"Velocity (last {velocity['sprints']} sprints): mean {velocity['mean']} points, "
+                f"range {velocity['min']}-{velocity['max']}"
+                + (f", stdev {velocity['stdev']}" if velocity['stdev'] is not None else '')
+            )
+            lines.append("History: " + "; ".join(
+                f"{sprint['name']} {sprint['completed_points']}/{sprint['committed_points']} points done"
+                for sprint in velocity['history']
+            ))
+
+        sprint = metrics.get('sprint')
+        if sprint:
+            lines.append(
+                f"Sprint {sprint['name']} ({sprint['status']}, {sprint['start_date']} to {sprint['end_date']}): "
+                f"{sprint['completed_points']}/{sprint['committed_points']} points, "
+                f"{sprint['completed_stories']}/{sprint['stories']} stories done, "
+                f"{sprint['completed_tasks']}/{sprint['tasks']} tasks done"
+            )
+            lines.append(
+                f"Carry-over: {sprint['carried_in_stories']} stories ({sprint['carried_in_points']} points) "
+                f"carried in; {sprint['unfinished_stories']} stories ({sprint['unfinished_points']} points) unfinished"
+            )
+            cycle = sprint['cycle_time_days']
+            if cycle['count']:
+                lines.append(
+                    f"Cycle time: median {cycle['median']} days, mean {cycle['mean']}, "
+                    f"85th percentile {cycle['p85']} ({cycle['count']} stories)"
+                )
+            if sprint['tasks']:
+                lines.append(
+                    f"Hours: {sprint['estimated_hours']} estimated, {sprint['actual_hours']} spent"
+                )
+            burndown = sprint['burndown']
+            if burndown:
+                # At most ~10 samples keeps the line short for long sprints.
+                step = max(1, len(burndown) // 10)
+                samples = burndown[::step] + ([burndown[-1]] if (len(burndown) - 1) % step else [])
+                lines.append("Burndown (remaining/ideal): " + ", ".join(
+                    f"{point['date'][5:]} {point['remaining']}/{point['ideal']}" for point in samples
+                ))
+        return "\n".join(lines)
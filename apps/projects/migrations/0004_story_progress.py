@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_progress(apps, schema_editor):
+    # Best available history for stories finished before progress was tracked.
+    Story = apps.get_model('projects', 'Story')
+    Story.objects.filter(status='DONE').update(completed_at=F('updated_at'))
+    Story.objects.exclude(status__in=('BACKLOG', 'TODO')).update(started_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_add_security_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='carry_over_count',
+            field=models.PositiveIntegerField(default=0, help_text='Times the story was moved to another sprint unfinished'),
+        ),
+        migrations.AddField(
+            model_name='story',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, help_text='When the story was last moved to Done', null=True),
+        ),
+        migrations.AddField(
+            model_name='story',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='When work on the story first started', null=True),
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
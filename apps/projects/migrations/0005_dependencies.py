@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_story_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='depends_on',
+            field=models.ManyToManyField(blank=True, help_text='Stories that must be finished before this one can start', related_name='blocks', to='projects.story'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='depends_on',
+            field=models.ManyToManyField(blank=True, help_text='Tasks that must be finished before this one can start', related_name='blocks', to='projects.task'),
+        ),
+    ]
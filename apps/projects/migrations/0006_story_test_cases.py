@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_dependencies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='test_cases',
+            field=models.JSONField(blank=True, default=list, help_text='Test cases generated for the story by the QA agent'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.users.models import HishamOSUser
 
@@ -195,6 +196,32 @@ class Story(models.Model):
     generated_by_ai = models.BooleanField(default=False)
     ai_confidence = models.FloatField(null=True, blank=True)
     technical_notes = models.TextField(blank=True)
+    test_cases = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_('Test cases generated for the story by the QA agent')
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('When work on the story first started')
+    )
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('When the story was last moved to Done')
+    )
+    carry_over_count = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Times the story was moved to another sprint unfinished')
+    )
+    depends_on = models.ManyToManyField(
+        'self',
+        symmetrical=False,
+        blank=True,
+        related_name='blocks',
+        help_text=_('Stories that must be finished before this one can start')
+    )
     created_by = models.ForeignKey(
         HishamOSUser,
         on_delete=models.SET_NULL,
@@ -204,6 +231,9 @@ class Story(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Changes to these fields are tracked for the sprint metrics.
+    TRACKED_FIELDS = ('status', 'sprint_id', 'story_points')
+
     class Meta:
         db_table = 'stories'
         ordering = ['-created_at']
@@ -212,6 +242,46 @@ class Story(models.Model):
     def __str__(self):
         return f"{self.key} - {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            field: value for field, value in zip(field_names, values) if field in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.changed_fields():
+            stamped = self._track_progress(getattr(self, '_loaded_values', {}))
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | stamped
+
+        super().save(*args, **kwargs)
+        self._loaded_values = {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+
+    def changed_fields(self):
+        """Tracked fields that differ from the values loaded from the database."""
+        previous = getattr(self, '_loaded_values', {})
+        return [field for field in self.TRACKED_FIELDS if previous.get(field) != getattr(self, field)]
+
+    def _track_progress(self, previous):
+        """Stamp when work started and finished, and count unfinished moves between sprints."""
+        stamped = set()
+        now = timezone.now()
+        if self.status not in ('BACKLOG', 'TODO') and self.started_at is None:
+            self.started_at = now
+            stamped.add('started_at')
+        if self.status == 'DONE' and previous.get('status') != 'DONE':
+            self.completed_at = now
+            stamped.add('completed_at')
+        elif self.status != 'DONE' and self.completed_at is not None:
+            self.completed_at = None
+            stamped.add('completed_at')
+        if previous.get('sprint_id') and self.sprint_id != previous['sprint_id'] and self.status != 'DONE':
+            self.carry_over_count += 1
+            stamped.add('carry_over_count')
+        return stamped
+
 
 class Task(models.Model):
     """Task model - smaller unit of work within a story."""
@@ -238,9 +308,18 @@ class Task(models.Model):
     )
     estimated_hours = models.FloatField(null=True, blank=True)
     actual_hours = models.FloatField(null=True, blank=True)
+    depends_on = models.ManyToManyField(
+        'self',
+        symmetrical=False,
+        blank=True,
+        related_name='blocks',
+        help_text=_('Tasks that must be finished before this one can start')
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    TRACKED_FIELDS = ('status', 'estimated_hours', 'actual_hours', 'story_id')
+
     class Meta:
         db_table = 'tasks'
         ordering = ['story', 'created_at']
@@ -248,6 +327,23 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.story.key} - {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            field: value for field, value in zip(field_names, values) if field in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+
+    def changed_fields(self):
+        """Tracked fields that differ from the values loaded from the database."""
+        previous = getattr(self, '_loaded_values', {})
+        return [field for field in self.TRACKED_FIELDS if previous.get(field) != getattr(self, field)]
+
 
 class Comment(models.Model):
     """Comments on stories."""
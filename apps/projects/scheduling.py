@@ -0,0 +1,283 @@
+import hashlib
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from apps.users.models import HishamOSUser
+from .models import Epic, ProjectMembership, Story, Task
+from libs.scheduling import Activity, CycleError, critical_path, level_resources
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+TEAM = 'team'
+
+
+class ProjectScheduler:
+    """
+    Critical-path schedule of a project's epics, stories and tasks.
+
+    Tasks are scheduled from their remaining estimated hours; stories without
+    tasks from their story points. Story dependencies are expanded through
+    zero-length start/finish milestones per story rather than edges between
+    every pair of tasks, so the graph stays linear in the number of tasks and
+    dependencies. Work is then leveled so each assignee does one thing at a
+    time and unassigned work shares a pool of ``team_size`` people.
+
+    Results are cached per project revision: a fingerprint of the row counts,
+    latest updates and dependency edges, which changes with any edit.
+
+    Attributes:
+        hours_per_day: Working hours per person per day
+        hours_per_point: Hours assumed per story point for stories without tasks
+        default_task_hours: Hours assumed for tasks without an estimate
+    """
+
+    CACHE_KEY = 'projects:schedule:{}:{}'
+    CACHE_TIMEOUT = 86400
+
+    def __init__(
+        self,
+        hours_per_day: Optional[float] = None,
+        hours_per_point: Optional[float] = None,
+        default_task_hours: Optional[float] = None
+    ):
+        self.hours_per_day = hours_per_day or getattr(settings, 'SCHEDULE_HOURS_PER_DAY', 6.0)
+        self.hours_per_point = hours_per_point or getattr(settings, 'SCHEDULE_HOURS_PER_POINT', 6.0)
+        self.default_task_hours = default_task_hours or getattr(settings, 'SCHEDULE_DEFAULT_TASK_HOURS', 4.0)
+
+    def revision(self, project_id: int) -> str:
+        """A fingerprint of everything the schedule depends on."""
+        stories = Story.objects.filter(project_id=project_id).order_by()
+        tasks = Task.objects.filter(story__project_id=project_id).order_by()
+        return self._fingerprint(
+            stories.aggregate(count=Count('id'), updated=Max('updated_at')),
+            tasks.aggregate(count=Count('id'), updated=Max('updated_at')),
+            Epic.objects.filter(project_id=project_id).order_by().aggregate(count=Count('id'), updated=Max('updated_at')),
+            Story.depends_on.through.objects.filter(from_story__project_id=project_id).order_by().aggregate(
+                count=Count('id'), last=Max('id')
+            ),
+            Task.depends_on.through.objects.filter(from_task__story__project_id=project_id).order_by().aggregate(
+                count=Count('id'), last=Max('id')
+            ),
+            ProjectMembership.objects.filter(project_id=project_id).count(),
+        )
+
+    def schedule(
+        self,
+        project_id: int,
+        start: Optional[date] = None,
+        team_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        The project's schedule, computed once per project revision.
+
+        Raises:
+            CycleError: If the dependencies are cyclic
+        """
+        start = start or timezone.localdate()
+        key = self.CACHE_KEY.format(project_id, self._fingerprint(
+            self.revision(project_id), start, team_size,
+            self.hours_per_day, self.hours_per_point, self.default_task_hours
+        ))
+        result = cache.get(key)
+        if result is None:
+            result = self.compute(project_id, start, team_size)
+            cache.set(key, result, self.CACHE_TIMEOUT)
+        return result
+
+    def compute(self, project_id: int, start: date, team_size: Optional[int] = None) -> Dict[str, Any]:
+        if team_size is None:
+            team_size = ProjectMembership.objects.filter(project_id=project_id).count()
+        team_size = max(1, team_size)
+
+        stories = list(
+            Story.objects.filter(project_id=project_id).order_by('id')
+            .values('id', 'key', 'title', 'status', 'story_points', 'epic_id', 'assignee_id')
+        )
+        tasks = list(
+            Task.objects.filter(story__project_id=project_id).order_by('id')
+            .values('id', 'story_id', 'title', 'status', 'estimated_hours', 'actual_hours', 'assignee_id')
+        )
+        story_edges = Story.depends_on.through.objects.filter(
+            from_story__project_id=project_id
+        ).values_list('from_story_id', 'to_story_id')
+        task_edges = Task.depends_on.through.objects.filter(
+            from_task__story__project_id=project_id
+        ).values_list('from_task_id', 'to_task_id')
+
+        story_prerequisites: Dict[int, List[str]] = {}
+        for story_id, prerequisite in story_edges:
+            story_prerequisites.setdefault(story_id, []).append(f"story:{prerequisite}:finish")
+        task_prerequisites: Dict[int, List[str]] = {}
+        for task_id, prerequisite in task_edges:
+            task_prerequisites.setdefault(task_id, []).append(f"task:{prerequisite}")
+        story_tasks: Dict[int, List[str]] = {}
+
+        labels = {}
+        activities = []
+        for task in tasks:
+            node = f"task:{task['id']}"
+            story_tasks.setdefault(task['story_id'], []).append(node)
+            activities.append(Activity(
+                node,
+                self._remaining_task_hours(task),
+                [f"story:{task['story_id']}:start"] + task_prerequisites.get(task['id'], []),
+                task['assignee_id'] or TEAM
+            ))
+            labels[node] = {'type': 'task', 'id': task['id'], 'key': '', 'title': task['title']}
+
+        for story in stories:
+            start_node, finish_node = f"story:{story['id']}:start", f"story:{story['id']}:finish"
+            activities.append(Activity(start_node, 0, story_prerequisites.get(story['id'], [])))
+            work = story_tasks.get(story['id'])
+            if not work:
+                work = [f"story:{story['id']}"]
+                hours = 0 if story['status'] == 'DONE' else (story['story_points'] or 1) * self.hours_per_point
+                activities.append(Activity(work[0], hours, [start_node], story['assignee_id'] or TEAM))
+                labels[work[0]] = {'type': 'story', 'id': story['id'], 'key': story['key'], 'title': story['title']}
+            activities.append(Activity(finish_node, 0, work))
+            for node in story_tasks.get(story['id'], []):
+                labels[node]['key'] = story['key']
+
+        epic_stories: Dict[int, List[str]] = {}
+        for story in stories:
+            if story['epic_id']:
+                epic_stories.setdefault(story['epic_id'], []).append(f"story:{story['id']}:finish")
+        epics = dict(Epic.objects.filter(pk__in=epic_stories).values_list('id', 'key'))
+        for epic_id, finishes in epic_stories.items():
+            activities.append(Activity(f"epic:{epic_id}", 0, finishes))
+
+        try:
+            schedule = critical_path(activities)
+        except CycleError as e:
+            keys = {f"story:{story['id']}:finish": story['key'] for story in stories}
+            cycle = [keys[node] for node in e.cycle if node in keys]
+            raise CycleError(cycle or [labels[node]['title'] for node in e.cycle if node in labels]) from e
+        schedule = level_resources(schedule, lambda resource: team_size if resource == TEAM else 1)
+
+        day_hours = self.hours_per_day
+        load: Dict[Any, float] = {}
+        for activity in schedule.activities.values():
+            if activity.resource is not None:
+                load[activity.resource] = load.get(activity.resource, 0.0) + activity.duration
+        leveled_days = schedule.leveled_duration / day_hours
+        names = dict(HishamOSUser.objects.filter(
+            pk__in=[resource for resource in load if resource != TEAM]
+        ).values_list('id', 'username'))
+
+        items = []
+        for node, activity in schedule.activities.items():
+            if node not in labels:
+                continue
+            items.append({
+                **labels[node],
+                'hours': round(activity.duration, 1),
+                'resource': activity.resource if activity.resource == TEAM else names.get(activity.resource),
+                'start': self._date(start, activity.start / day_hours).isoformat(),
+                'finish': self._date(start, activity.finish / day_hours).isoformat(),
+                'slack_days': round(activity.slack / day_hours, 1),
+                'critical': activity.critical and activity.duration > 0,
+            })
+        items.sort(key=lambda item: (item['start'], -item['hours']))
+
+        return {
+            'start_date': start.isoformat(),
+            'finish_date': self._date(start, leveled_days).isoformat(),
+            'duration_days': round(leveled_days, 1),
+            'unleveled_duration_days': round(schedule.duration / day_hours, 1),
+            'remaining_hours': round(sum(load.values()), 1),
+            'team_size': team_size,
+            'critical_path': [
+                {**labels[node], 'days': round(schedule.activities[node].duration / day_hours, 1)}
+                for node in schedule.critical_path
+                if node in labels and schedule.activities[node].duration > 0
+            ],
+            'epics': sorted(
+                [
+                    {'key': epics.get(epic_id, str(epic_id)),
+                     'finish_date': self._date(start, schedule.activities[f"epic:{epic_id}"].finish / day_hours).isoformat()}
+                    for epic_id in epic_stories
+                ],
+                key=lambda epic: epic['finish_date']
+            ),
+            'resources': sorted(
+                [
+                    {'resource': names.get(resource, resource), 'hours': round(hours, 1),
+                     'utilization': round(
+                         hours / (schedule.leveled_duration * (team_size if resource == TEAM else 1)), 2
+                     ) if schedule.leveled_duration else 0.0}
+                    for resource, hours in load.items() if hours
+                ],
+                key=lambda entry: -entry['hours']
+            ),
+            'items': items,
+            'counts': {'stories': len(stories), 'tasks': len(tasks), 'dependencies': len(story_edges) + len(task_edges)},
+        }
+
+    @staticmethod
+    def _fingerprint(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _remaining_task_hours(self, task: Dict[str, Any]) -> float:
+        if task['status'] == 'DONE':
+            return 0.0
+        estimate = task['estimated_hours'] if task['estimated_hours'] is not None else self.default_task_hours
+        return max(estimate - (task['actual_hours'] or 0), 0.0)
+
+    @staticmethod
+    def _date(start: date, working_days: float) -> date:
+        """The calendar date ``working_days`` (Monday-Friday) after ``start``."""
+        day = start
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        whole_weeks, days = divmod(max(int(working_days - 1e-9), 0), 5)
+        day += timedelta(weeks=whole_weeks)
+        while days:
+            day += timedelta(days=1)
+            if day.weekday() < 5:
+                days -= 1
+        return day
+
+    @staticmethod
+    def summary(result: Dict[str, Any], limit: int = 25) -> str:
+        """The schedule as compact lines for an agent prompt."""
+        lines = [
+            f"Start {result['start_date']}, finish {result['finish_date']}: "
+            f"{result['duration_days']} working days with {result['team_size']} people "
+            f"({result['unleveled_duration_days']} days if resources were unlimited), "
+            f"{result['remaining_hours']} hours of work remaining, "
+            f"{result['counts']['tasks']} tasks in {result['counts']['stories']} stories, "
+            f"{result['counts']['dependencies']} dependencies"
+        ]
+        path = result['critical_path']
+        if path:
+            steps = [
+                f"{item['key'] or item['type']} {item['title'][:40]} ({item['days']}d)" for item in path[:limit]
+            ]
+            if len(path) > limit:
+                steps.append(f"... {len(path) - limit} more")
+            lines.append("Critical path: " + " -> ".join(steps))
+        if result['epics']:
+            lines.append("Epic finish dates: " + ", ".join(
+                f"{epic['key']} {epic['finish_date']}" for epic in result['epics'][:limit]
+            ))
+        if result['resources']:
+            lines.append("Load: " + ", ".join(
+                f"{entry['resource']} {entry['hours']}h ({int(entry['utilization'] * 100)}%)"
+                for entry in result['resources'][:10]
+            ))
+        near_critical = sorted(
+            (item for item in result['items'] if not item['critical'] and 0 < item['slack_days'] <= 2),
+            key=lambda item: item['slack_days']
+        )[:5]
+        if near_critical:
+            lines.append("Near-critical: " + ", ".join(
+                f"{item['key'] or item['type']} {item['title'][:40]} ({item['slack_days']}d slack)"
+                for item in near_critical
+            ))
+        return "\n".join(lines)
@@ -62,7 +62,7 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'story', 'title', 'description', 'assignee', 'assignee_name',
             'assigned_to_ai', 'status', 'estimated_hours', 'actual_hours',
-            'created_at', 'updated_at'
+            'depends_on', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -95,7 +95,11 @@ class StorySerializer(serializers.ModelSerializer):
             'sprint', 'sprint_name', 'key', 'title', 'description',
             'acceptance_criteria', 'story_points', 'assignee', 'assignee_name',
             'assigned_to_ai', 'status', 'priority', 'generated_by_ai',
-            'ai_confidence', 'technical_notes', 'created_by', 'created_by_name',
+            'ai_confidence', 'technical_notes', 'test_cases', 'depends_on', 'started_at', 'completed_at',
+            'carry_over_count', 'created_by', 'created_by_name',
             'created_at', 'updated_at', 'tasks', 'comments'
         ]
-        read_only_fields = ['id', 'key', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'key', 'started_at', 'completed_at', 'carry_over_count',
+            'created_by', 'created_at', 'updated_at'
+        ]
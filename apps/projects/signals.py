@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .metrics import SprintMetrics
+from .models import Sprint, Story, Task
+
+# post_save is sent before save() resets the loaded values, so the receivers
+# still see the sprint or story a story or task was moved away from. Deletes,
+# including queryset and cascade deletes, send post_delete for every row.
+
+
+@receiver(post_save, sender=Sprint)
+def sprint_saved(sender, instance, **kwargs):
+    SprintMetrics.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Story)
+def story_saved(sender, instance, **kwargs):
+    if instance.changed_fields():
+        SprintMetrics.invalidate(getattr(instance, '_loaded_values', {}).get('sprint_id'), instance.sprint_id)
+
+
+@receiver(post_delete, sender=Story)
+def story_deleted(sender, instance, **kwargs):
+    SprintMetrics.invalidate(instance.sprint_id)
+
+
+def _task_sprints(*story_ids):
+    return Story.objects.filter(pk__in=set(story_ids) - {None}).values_list('sprint_id', flat=True)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    if instance.changed_fields():
+        SprintMetrics.invalidate(*_task_sprints(
+            getattr(instance, '_loaded_values', {}).get('story_id'), instance.story_id
+        ))
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    # A cascade from a story deletes its tasks first, while the story is still there.
+    SprintMetrics.invalidate(*_task_sprints(instance.story_id))
@@ -2,7 +2,9 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from .metrics import SprintMetrics
 from .models import Project, Sprint, Epic, Story, Task
+from .scheduling import ProjectScheduler
 from .serializers import (
     ProjectSerializer, SprintSerializer, EpicSerializer,
     StorySerializer, TaskSerializer
@@ -32,6 +34,17 @@ class ProjectViewSet(viewsets.ModelViewSet):
             }
         })
 
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        project = self.get_object()
+        team_size = request.query_params.get('team_size')
+        try:
+            return Response(ProjectScheduler().schedule(
+                project.pk, team_size=int(team_size) if team_size else None
+            ))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 
 class SprintViewSet(viewsets.ModelViewSet):
     queryset = Sprint.objects.all()
@@ -53,6 +66,11 @@ class SprintViewSet(viewsets.ModelViewSet):
         sprint.save()
         return Response({'message': 'Sprint completed'})
 
+    @action(detail=True, methods=['get'])
+    def metrics(self, request, pk=None):
+        sprint = self.get_object()
+        return Response(SprintMetrics().project(sprint.project_id, sprint.pk))
+
 
 class EpicViewSet(viewsets.ModelViewSet):
     queryset = Epic.objects.all()
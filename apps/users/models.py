@@ -62,8 +62,9 @@ class HishamOSUser(AbstractUser):
         return self.ai_tokens_used < self.ai_token_limit
 
     def increment_token_usage(self, tokens):
-        self.ai_tokens_used += tokens
-        self.save(update_fields=['ai_tokens_used'])
+        # Increment in the database: tasks of one user complete concurrently.
+        type(self).objects.filter(pk=self.pk).update(ai_tokens_used=models.F('ai_tokens_used') + tokens)
+        self.refresh_from_db(fields=['ai_tokens_used'])
 
     def reset_token_usage(self):
         self.ai_tokens_used = 0
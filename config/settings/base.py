@@ -134,6 +134,55 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_TASK_DEFAULT_QUEUE = 'agents.default'
+CELERY_TASK_ROUTES = ('apps.agents.routing.route_task',)
+# Redis emulates priorities with one list per step; 0 is the highest.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+CELERY_TASK_QUEUE_MAX_PRIORITY = 10
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_BEAT_SCHEDULE = {
+    'promote-starved-agent-tasks': {
+        'task': 'apps.agents.tasks.promote_starved_tasks',
+        'schedule': 60.0,
+    },
+}
+
+# Tasks go to the queue of their priority band (1 is the highest priority)
+# unless their agent type has a dedicated queue.
+AGENT_PRIORITY_QUEUES = [(3, 'agents.high'), (7, 'agents.default'), (10, 'agents.low')]
+AGENT_TYPE_QUEUES = config(
+    'AGENT_TYPE_QUEUES',
+    default='DOCUMENTATION=agents.batch,RELEASE_MANAGER=agents.batch',
+    cast=lambda v: dict(item.strip().split('=', 1) for item in v.split(',') if '=' in item)
+)
+AGENT_QUEUE_CONCURRENCY = {
+    'agents.high': config('AGENT_HIGH_CONCURRENCY', default=32, cast=int),
+    'agents.default': config('AGENT_DEFAULT_CONCURRENCY', default=16, cast=int),
+    'agents.low': config('AGENT_LOW_CONCURRENCY', default=8, cast=int),
+    'agents.batch': config('AGENT_BATCH_CONCURRENCY', default=4, cast=int),
+}
+AGENT_TASK_STARVATION_SECONDS = config('AGENT_TASK_STARVATION_SECONDS', default=600, cast=int)
+
+AGENT_EXECUTOR_CONCURRENCY = config('AGENT_EXECUTOR_CONCURRENCY', default=32, cast=int)
+AGENT_EXECUTOR_POLL_INTERVAL = config('AGENT_EXECUTOR_POLL_INTERVAL', default=1.0, cast=float)
+AGENT_EXECUTOR_PROMPT_TTL = config('AGENT_EXECUTOR_PROMPT_TTL', default=60, cast=float)
+
+AGENT_BULK_BATCH_SIZE = config('AGENT_BULK_BATCH_SIZE', default=500, cast=int)
+AGENT_BULK_MAX_TASKS = config('AGENT_BULK_MAX_TASKS', default=10000, cast=int)
+AGENT_BULK_ENQUEUE_CHUNK = config('AGENT_BULK_ENQUEUE_CHUNK', default=25, cast=int)
+
+AGENT_STATUS_MAX_WAIT = config('AGENT_STATUS_MAX_WAIT', default=10, cast=int)
+# Long-polls and event streams waiting at once per web process; keep below the worker threads.
+AGENT_STATUS_MAX_WAITERS = config('AGENT_STATUS_MAX_WAITERS', default=1, cast=int)
+AGENT_STATUS_RETRY_AFTER = config('AGENT_STATUS_RETRY_AFTER', default=2, cast=int)
+AGENT_STATUS_POLL_INTERVAL = config('AGENT_STATUS_POLL_INTERVAL', default=0.5, cast=float)
+
+AGENT_SINGLE_FLIGHT_ENABLED = config('AGENT_SINGLE_FLIGHT_ENABLED', default=True, cast=bool)
+AGENT_SINGLE_FLIGHT_TIMEOUT = config('AGENT_SINGLE_FLIGHT_TIMEOUT', default=900, cast=int)
 
 CACHES = {
     'default': {
@@ -171,6 +220,67 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 ANTHROPIC_API_KEY = config('ANTHROPIC_API_KEY', default='')
 
+AGENT_SANDBOX_ENABLED = config('AGENT_SANDBOX_ENABLED', default=False, cast=bool)
+AGENT_SANDBOX_LIMITS = {
+    'timeout': config('AGENT_SANDBOX_TIMEOUT', default=30, cast=float),
+    'cpu_seconds': config('AGENT_SANDBOX_CPU_SECONDS', default=20, cast=int),
+    'memory_mb': config('AGENT_SANDBOX_MEMORY_MB', default=512, cast=int),
+}
+CODING_VERIFY_MAX_ROUNDS = config('CODING_VERIFY_MAX_ROUNDS', default=3, cast=int)
+CODING_VERIFY_WORKERS = config('CODING_VERIFY_WORKERS', default=2, cast=int)
+
+BUG_DUPLICATE_THRESHOLD = config('BUG_DUPLICATE_THRESHOLD', default=0.8, cast=float)
+CRASH_GROUP_WINDOW = config('CRASH_GROUP_WINDOW', default=600, cast=int)
+CRASH_GROUP_WAIT_TIMEOUT = config('CRASH_GROUP_WAIT_TIMEOUT', default=120, cast=int)
+
+KNOWLEDGE_CHUNK_CHARS = 1500
+KNOWLEDGE_DOC_PATHS = config(
+    'KNOWLEDGE_DOC_PATHS',
+    default='',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+SUPPORT_DIRECT_ANSWER_THRESHOLD = config('SUPPORT_DIRECT_ANSWER_THRESHOLD', default=0.85, cast=float)
+
+SESSION_RECENT_TOKENS = config('SESSION_RECENT_TOKENS', default=2000, cast=int)
+SESSION_RECENT_TURNS = config('SESSION_RECENT_TURNS', default=4, cast=int)
+SESSION_SUMMARY_THRESHOLD = config('SESSION_SUMMARY_THRESHOLD', default=3000, cast=int)
+
+DOCS_MAX_CONCURRENCY = config('DOCS_MAX_CONCURRENCY', default=4, cast=int)
+
+STATIC_ANALYSIS_COMPLEXITY_THRESHOLD = config('STATIC_ANALYSIS_COMPLEXITY_THRESHOLD', default=10, cast=int)
+STATIC_ANALYSIS_SKIP_MAX_LINES = config('STATIC_ANALYSIS_SKIP_MAX_LINES', default=30, cast=int)
+STATIC_ANALYSIS_WORKERS = config('STATIC_ANALYSIS_WORKERS', default=None, cast=lambda v: int(v) if v else None)
+
+SECURITY_SCAN_MIN_CONFIDENCE = config('SECURITY_SCAN_MIN_CONFIDENCE', default=0.7, cast=float)
+SECURITY_SCAN_ROOTS = config(
+    'SECURITY_SCAN_ROOTS',
+    default='',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+
+STORY_ESTIMATE_NEIGHBORS = config('STORY_ESTIMATE_NEIGHBORS', default=7, cast=int)
+STORY_ESTIMATE_MIN_CONFIDENCE = config('STORY_ESTIMATE_MIN_CONFIDENCE', default=0.35, cast=float)
+STORY_ESTIMATE_MIN_HISTORY = config('STORY_ESTIMATE_MIN_HISTORY', default=20, cast=int)
+STORY_ESTIMATE_HISTORY_LIMIT = config('STORY_ESTIMATE_HISTORY_LIMIT', default=5000, cast=int)
+
+SPRINT_VELOCITY_WINDOW = config('SPRINT_VELOCITY_WINDOW', default=3, cast=int)
+SCHEDULE_HOURS_PER_DAY = config('SCHEDULE_HOURS_PER_DAY', default=6.0, cast=float)
+SCHEDULE_HOURS_PER_POINT = config('SCHEDULE_HOURS_PER_POINT', default=6.0, cast=float)
+SCHEDULE_DEFAULT_TASK_HOURS = config('SCHEDULE_DEFAULT_TASK_HOURS', default=4.0, cast=float)
+
+QA_BATCH_TOKEN_BUDGET = config('QA_BATCH_TOKEN_BUDGET', default=4000, cast=int)
+QA_BATCH_MAX_STORIES = config('QA_BATCH_MAX_STORIES', default=8, cast=int)
+QA_BATCH_WORKERS = config('QA_BATCH_WORKERS', default=4, cast=int)
+DEVOPS_ARTIFACT_CACHE_ENABLED = config('DEVOPS_ARTIFACT_CACHE_ENABLED', default=True, cast=bool)
+
+RELEASE_REPO_ROOTS = config(
+    'RELEASE_REPO_ROOTS',
+    default='',
+    cast=lambda v: [s.strip() for s in v.split(',') if s.strip()]
+)
+RELEASE_MAX_COMMITS = config('RELEASE_MAX_COMMITS', default=20000, cast=int)
+RELEASE_SAMPLES_PER_TYPE = config('RELEASE_SAMPLES_PER_TYPE', default=15, cast=int)
+
 SUPABASE_URL = config('VITE_SUPABASE_URL', default='')
 SUPABASE_ANON_KEY = config('VITE_SUPABASE_SUPABASE_ANON_KEY', default='')
 
@@ -2,5 +2,9 @@ from .base import AIProviderBase
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
 from .ollama_provider import OllamaProvider
+from .structured import StructuredOutputError
 
-__all__ = ['AIProviderBase', 'OpenAIProvider', 'AnthropicProvider', 'OllamaProvider']
+__all__ = [
+    'AIProviderBase', 'OpenAIProvider', 'AnthropicProvider', 'OllamaProvider',
+    'StructuredOutputError',
+]
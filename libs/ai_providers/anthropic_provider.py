@@ -1,5 +1,6 @@
 import anthropic
-from typing import List, Optional
+import json
+from typing import Any, Dict, List, Optional
 from .base import AIProviderBase, Message, AIResponse
 import logging
 
@@ -78,6 +79,60 @@ class AnthropicProvider(AIProviderBase):
             logger.error(f"Anthropic streaming error: {str(e)}")
             raise
 
+    def _generate_json(
+        self,
+        messages: List[Message],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str],
+        schema_name: str,
+        **kwargs
+    ) -> AIResponse:
+        """Force a tool call whose input schema is the output schema."""
+        try:
+            formatted_messages = []
+            for msg in messages:
+                formatted_messages.append({"role": msg.role, "content": msg.content})
+
+            response = self.client.messages.create(
+                model=self.model,
+                max_tokens=kwargs.get('max_tokens', self.max_tokens),
+                temperature=kwargs.get('temperature', self.temperature),
+                system=system_prompt or "",
+                messages=formatted_messages,
+                tools=[{
+                    "name": schema_name,
+                    "description": "Record the complete result of the task.",
+                    "input_schema": schema,
+                }],
+                tool_choice={"type": "tool", "name": schema_name},
+            )
+
+            tool_inputs = [c.input for c in response.content if c.type == "tool_use"]
+            if tool_inputs:
+                content = json.dumps(tool_inputs[0])
+            else:
+                content = "".join(c.text for c in response.content if c.type == "text")
+
+            return AIResponse(
+                content=content,
+                tokens_used=response.usage.input_tokens + response.usage.output_tokens,
+                model=response.model,
+                finish_reason=response.stop_reason,
+                raw_response={
+                    "id": response.id,
+                    "model": response.model,
+                    "stop_reason": response.stop_reason,
+                    "usage": {
+                        "input_tokens": response.usage.input_tokens,
+                        "output_tokens": response.usage.output_tokens
+                    }
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Anthropic structured generation error: {str(e)}")
+            raise
+
     def count_tokens(self, text: str) -> int:
         try:
             response = self.client.count_tokens(text)
@@ -1,6 +1,10 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
+from .structured import StructuredOutputError, decode_structured, schema_instructions
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -16,6 +20,7 @@ class AIResponse:
     model: str
     finish_reason: str
     raw_response: Dict[str, Any]
+    parsed: Optional[Any] = None
 
 
 class AIProviderBase(ABC):
@@ -65,6 +70,83 @@ class AIProviderBase(ABC):
         """
         pass
 
+    def generate_structured(
+        self,
+        messages: List[Message],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        schema_name: str = "output",
+        max_repairs: int = 1,
+        **kwargs
+    ) -> AIResponse:
+        """
+        Generate a response decoded and validated against a JSON schema.
+
+        Uses the provider's native JSON mode via _generate_json. If the reply
+        still does not validate, the errors are sent back to the model and it
+        is asked to correct its reply, up to max_repairs times.
+
+        Args:
+            messages: List of conversation messages
+            schema: JSON schema the reply must validate against
+            system_prompt: Optional system prompt
+            schema_name: Name of the schema/tool exposed to the model
+            max_repairs: Number of repair round-trips before giving up
+            **kwargs: Additional provider-specific parameters
+
+        Returns:
+            AIResponse with the decoded value in ``parsed``
+
+        Raises:
+            StructuredOutputError: If no valid reply was produced
+        """
+        response = self._generate_json(messages, schema, system_prompt, schema_name, **kwargs)
+        tokens_used = response.tokens_used
+
+        for attempt in range(max_repairs + 1):
+            try:
+                response.parsed = decode_structured(response.content, schema)
+                response.tokens_used = tokens_used
+                return response
+            except StructuredOutputError as e:
+                if attempt == max_repairs:
+                    raise
+                logger.warning(
+                    f"Structured output from {self.model} did not validate, "
+                    f"repairing (attempt {attempt + 1}): {e.errors[:5]}"
+                )
+                messages = list(messages) + [
+                    Message(role="assistant", content=response.content),
+                    Message(role="user", content=(
+                        "Your reply did not validate against the required JSON schema:\n"
+                        + "\n".join(f"- {error}" for error in e.errors[:20])
+                        + "\nReply again with only the corrected JSON document."
+                    )),
+                ]
+                response = self._generate_json(messages, schema, system_prompt, schema_name, **kwargs)
+                tokens_used += response.tokens_used
+
+    def _generate_json(
+        self,
+        messages: List[Message],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str],
+        schema_name: str,
+        **kwargs
+    ) -> AIResponse:
+        """
+        Request a JSON reply; ``content`` of the result must hold the JSON text.
+
+        The default asks for JSON in the system prompt. Providers with a native
+        JSON or tool-call mode override this.
+        """
+        instructions = schema_instructions(schema)
+        return self.generate(
+            messages,
+            system_prompt=f"{system_prompt}\n\n{instructions}" if system_prompt else instructions,
+            **kwargs
+        )
+
     @abstractmethod
     def count_tokens(self, text: str) -> int:
         """
@@ -1,6 +1,7 @@
 import requests
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from .base import AIProviderBase, Message, AIResponse
+from .structured import schema_instructions
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,17 +34,21 @@ class OllamaProvider(AIProviderBase):
             for msg in messages:
                 formatted_messages.append({"role": msg.role, "content": msg.content})
 
+            payload = {
+                "model": self.model,
+                "messages": formatted_messages,
+                "stream": False,
+                "options": {
+                    "temperature": kwargs.get('temperature', self.temperature),
+                    "num_predict": kwargs.get('max_tokens', self.max_tokens),
+                }
+            }
+            if kwargs.get('format'):
+                payload["format"] = kwargs['format']
+
             response = requests.post(
                 f"{self.api_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": formatted_messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": kwargs.get('temperature', self.temperature),
-                        "num_predict": kwargs.get('max_tokens', self.max_tokens),
-                    }
-                },
+                json=payload,
                 timeout=120
             )
 
@@ -105,6 +110,25 @@ class OllamaProvider(AIProviderBase):
             logger.error(f"Ollama streaming error: {str(e)}")
             raise
 
+    def _generate_json(
+        self,
+        messages: List[Message],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str],
+        schema_name: str,
+        **kwargs
+    ) -> AIResponse:
+        # Ollama constrains decoding to the schema, but smaller local models still
+        # drift (missing required keys, wrong types), so the schema is also spelled
+        # out in the prompt and generate_structured repairs invalid replies.
+        instructions = schema_instructions(schema)
+        return self.generate(
+            messages,
+            system_prompt=f"{system_prompt}\n\n{instructions}" if system_prompt else instructions,
+            format=schema,
+            **kwargs
+        )
+
     def count_tokens(self, text: str) -> int:
         return len(text.split()) * 1.3
 
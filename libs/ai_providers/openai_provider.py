@@ -1,5 +1,5 @@
 import openai
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from .base import AIProviderBase, Message, AIResponse
 import logging
 
@@ -26,11 +26,16 @@ class OpenAIProvider(AIProviderBase):
             for msg in messages:
                 formatted_messages.append({"role": msg.role, "content": msg.content})
 
+            extra = {}
+            if kwargs.get('response_format'):
+                extra['response_format'] = kwargs['response_format']
+
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=formatted_messages,
                 temperature=kwargs.get('temperature', self.temperature),
                 max_tokens=kwargs.get('max_tokens', self.max_tokens),
+                **extra
             )
 
             return AIResponse(
@@ -76,6 +81,24 @@ class OpenAIProvider(AIProviderBase):
             logger.error(f"OpenAI streaming error: {str(e)}")
             raise
 
+    def _generate_json(
+        self,
+        messages: List[Message],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str],
+        schema_name: str,
+        **kwargs
+    ) -> AIResponse:
+        return self.generate(
+            messages,
+            system_prompt=system_prompt,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": schema_name, "schema": schema},
+            },
+            **kwargs
+        )
+
     def count_tokens(self, text: str) -> int:
         try:
             import tiktoken
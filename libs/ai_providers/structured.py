@@ -0,0 +1,118 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a model reply cannot be decoded into the requested schema."""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None, content: str = ''):
+        super().__init__(message)
+        self.errors = errors or []
+        self.content = content
+
+
+_FENCE_RE = re.compile(r'^```(?:json)?\s*(.*?)\s*```$', re.DOTALL)
+
+_TYPE_CHECKS = {
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+}
+
+
+def extract_json(content: str) -> Any:
+    """
+    Decode the JSON document in a model reply.
+
+    Tolerates markdown code fences and prose around a single top-level object.
+
+    Raises:
+        StructuredOutputError: If no JSON document can be decoded
+    """
+    text = content.strip()
+    fenced = _FENCE_RE.match(text)
+    if fenced:
+        text = fenced.group(1)
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        start, end = text.find('{'), text.rfind('}')
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+        raise StructuredOutputError(f"Reply is not valid JSON: {e}", [str(e)], content)
+
+
+def validate_schema(value: Any, schema: Dict[str, Any], path: str = '$') -> List[str]:
+    """
+    Validate a decoded value against the JSON Schema subset used by agents:
+    type, properties, required, additionalProperties (false), items, enum,
+    minimum and maximum.
+
+    Returns:
+        List of human-readable errors, empty when the value is valid
+    """
+    errors = []
+
+    expected = schema.get('type')
+    if expected:
+        types = expected if isinstance(expected, list) else [expected]
+        if not any(_TYPE_CHECKS[t](value) for t in types if t in _TYPE_CHECKS):
+            return [f"{path}: expected {' or '.join(types)}, got {type(value).__name__}"]
+
+    if 'enum' in schema and value not in schema['enum']:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+
+    if _TYPE_CHECKS['number'](value):
+        if 'minimum' in schema and value < schema['minimum']:
+            errors.append(f"{path}: {value} is below the minimum of {schema['minimum']}")
+        if 'maximum' in schema and value > schema['maximum']:
+            errors.append(f"{path}: {value} is above the maximum of {schema['maximum']}")
+
+    if isinstance(value, dict):
+        properties = schema.get('properties', {})
+        for name in schema.get('required', []):
+            if name not in value:
+                errors.append(f"{path}: missing required property '{name}'")
+        for name, item in value.items():
+            if name in properties:
+                errors.extend(validate_schema(item, properties[name], f"{path}.{name}"))
+            elif schema.get('additionalProperties') is False:
+                errors.append(f"{path}: unexpected property '{name}'")
+
+    if isinstance(value, list) and 'items' in schema:
+        for index, item in enumerate(value):
+            errors.extend(validate_schema(item, schema['items'], f"{path}[{index}]"))
+
+    return errors
+
+
+def decode_structured(content: str, schema: Dict[str, Any]) -> Any:
+    """
+    Decode and validate a model reply in one step.
+
+    Raises:
+        StructuredOutputError: If the reply is not JSON or does not match the schema
+    """
+    value = extract_json(content)
+    errors = validate_schema(value, schema)
+    if errors:
+        raise StructuredOutputError("Reply does not match the output schema", errors, content)
+    return value
+
+
+def schema_instructions(schema: Dict[str, Any]) -> str:
+    """Instructions appended to the system prompt for providers without a native JSON mode."""
+    return (
+        "Respond only with a single JSON document that validates against this JSON schema, "
+        "with no surrounding prose or code fences:\n"
+        f"{json.dumps(schema, indent=2)}"
+    )
@@ -0,0 +1,7 @@
+from .templating import ParameterizedRequest, canonicalize, make_template, render_template
+from .validation import ArtifactCheck, extract_artifacts, validate_artifacts, validate_dockerfile, validate_yaml
+
+__all__ = [
+    'ParameterizedRequest', 'canonicalize', 'make_template', 'render_template',
+    'ArtifactCheck', 'extract_artifacts', 'validate_artifacts', 'validate_dockerfile', 'validate_yaml',
+]
@@ -0,0 +1,160 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+
+# Runtimes whose version is a parameter of the request, e.g. "python 3.11".
+_RUNTIMES = (
+    'python', 'node', 'nodejs', 'java', 'jdk', 'go', 'golang', 'ruby', 'php', 'dotnet', 'rust',
+    'postgres', 'postgresql', 'mysql', 'mariadb', 'redis', 'mongo', 'mongodb', 'nginx',
+    'alpine', 'ubuntu', 'debian', 'kubernetes', 'terraform', 'helm',
+)
+
+# (kind, pattern); group 1 captures the value. Earlier kinds win on overlaps.
+_PARAMETER_PATTERNS: List[Tuple[str, 're.Pattern']] = [
+    ('domain', re.compile(
+        r'\b((?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+(?:com|net|org|io|dev|app|co|ai|cloud|tech)(?:\.[a-z]{2})?)\b',
+        re.IGNORECASE
+    )),
+    ('version', re.compile(
+        rf"\b(?:{'|'.join(_RUNTIMES)})(?:\.js)?[\s:@-]*v?(\d+(?:\.\d+){{0,2}})\b", re.IGNORECASE
+    )),
+    ('port', re.compile(r'\bports?\s*(?:[:=]|of|on|number)?\s*(\d{2,5})\b', re.IGNORECASE)),
+    ('name', re.compile(
+        r"""\b(?:named|called|name(?:d)?\s*[:=])\s*["'`]?([A-Za-z][\w.-]{1,62}[A-Za-z0-9])["'`]?"""
+    )),
+]
+
+_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'my', 'our', 'your', 'for', 'with', 'using', 'use', 'uses', 'and', 'to', 'of',
+    'i', 'we', 'need', 'needs', 'want', 'would', 'like', 'please', 'can', 'could', 'you', 'create',
+    'write', 'generate', 'make', 'set', 'up', 'setup', 'build', 'some', 'that', 'which', 'is', 'it',
+    'on', 'at', 'in', 'by', 'as', 'from', 'into', 'named', 'called', 'name',
+})
+
+_WORD_RE = re.compile(r'<\w+>|[a-z0-9]+(?:[.+#-][a-z0-9]+)*')
+
+
+@dataclass
+class ParameterizedRequest:
+    """
+    A free-text request split into a canonical form and its parameters.
+
+    Attributes:
+        canonical: Lower-cased request with filler words dropped and each
+            templatable parameter replaced by a placeholder such as <port_1>
+        parameters: Values of the placeholders, by name, as written in the request
+    """
+    canonical: str
+    parameters: Dict[str, str] = field(default_factory=dict)
+
+
+def _templatable(kind: str, value: str) -> bool:
+    """
+    Whether occurrences of the value in an output can safely be taken for the
+    parameter. Short numbers (port 80, node 18) are too likely to occur for
+    other reasons, so they stay part of the canonical text instead.
+    """
+    if kind in ('domain', 'name'):
+        return len(value) >= 3
+    return '.' in value or len(value) >= 4
+
+
+def canonicalize(text: str) -> ParameterizedRequest:
+    """
+    Canonicalize a request so near-identical ones map to the same text.
+
+    Domains, runtime versions, ports and names become numbered placeholders
+    holding their values; case, punctuation, whitespace and filler words are
+    normalized away.
+    """
+    spans: List[Tuple[int, int, str, str]] = []
+    for kind, pattern in _PARAMETER_PATTERNS:
+        for match in pattern.finditer(text):
+            start, end = match.span(1)
+            if any(start < taken_end and taken_start < end for taken_start, taken_end, _, _ in spans):
+                continue
+            if _templatable(kind, match.group(1)):
+                spans.append((start, end, kind, match.group(1)))
+    spans.sort()
+
+    parameters: Dict[str, str] = {}
+    counts: Dict[str, int] = {}
+    pieces = []
+    position = 0
+    for start, end, kind, value in spans:
+        counts[kind] = counts.get(kind, 0) + 1
+        name = f"{kind}_{counts[kind]}"
+        parameters[name] = value
+        pieces += [text[position:start].lower(), f" <{name}> "]
+        position = end
+    pieces.append(text[position:].lower())
+
+    words = [word for word in _WORD_RE.findall(''.join(pieces)) if word not in _STOPWORDS]
+    return ParameterizedRequest(' '.join(words), parameters)
+
+
+# How an occurrence of a value is cased in an output, so another value can be
+# rendered the same way: "named PaymentsApi" gives "PaymentsApi CI" and the
+# image "paymentsapi". Checked in order, lower-case first since image, host and
+# resource names must be; an occurrence cased any other way keeps the output
+# from becoming a template.
+_CASINGS = {
+    'lower': str.lower,
+    'upper': str.upper,
+    'exact': lambda value: value,
+    'capitalized': lambda value: value[:1].upper() + value[1:],
+}
+
+
+def _sentinel(name: str, casing: str) -> str:
+    return f"\x00{name}:{casing}\x00"
+
+
+def _occurrences(value: str) -> 're.Pattern':
+    # Not inside a longer word or version: 3.11 matches "python:3.11-slim" but not "3.11.4".
+    return re.compile(rf"(?<![\w.]){re.escape(value)}(?![\w]|\.\d)", re.IGNORECASE)
+
+
+def make_template(output: str, parameters: Dict[str, str]) -> Optional[str]:
+    """
+    Turn an output generated for a request into a template of its parameters
+    by replacing each occurrence of a parameter's value, in any case, with a
+    placeholder recording the occurrence's casing.
+
+    Returns None when two parameters share a value, since the template could
+    not tell them apart, and when a value is left in the template, inside a
+    longer word or cased in a way another value could not be rendered in,
+    since it would be served to other requests.
+    """
+    if len({value.lower() for value in parameters.values()}) < len(parameters):
+        return None
+
+    def placeholder(name: str, value: str, match: 're.Match') -> str:
+        for casing, apply in _CASINGS.items():
+            if match.group(0) == apply(value):
+                return _sentinel(name, casing)
+        raise ValueError(match.group(0))
+
+    # Longest first, so a value containing another is replaced whole.
+    template = output
+    for name, value in sorted(parameters.items(), key=lambda item: len(item[1]), reverse=True):
+        try:
+            template = _occurrences(value).sub(lambda match: placeholder(name, value, match), template)
+        except ValueError:
+            return None
+
+    # A value left inside a longer word (PAYMENTSAPI_URL) would leak into other requests.
+    remaining = template.lower()
+    if any(value.lower() in remaining for value in parameters.values()):
+        return None
+    return template
+
+
+def render_template(template: str, parameters: Dict[str, str]) -> str:
+    """Fill a template made by ``make_template`` with another request's parameters."""
+    return re.sub(
+        r'\x00(\w+):(\w+)\x00',
+        lambda match: _CASINGS[match.group(2)](parameters[match.group(1)]),
+        template
+    )
@@ -0,0 +1,158 @@
+import json
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import yaml as _yaml
+except ImportError:
+    _yaml = None
+
+
+DOCKERFILE_INSTRUCTIONS = frozenset({
+    'FROM', 'RUN', 'CMD', 'LABEL', 'MAINTAINER', 'EXPOSE', 'ENV', 'ADD', 'COPY', 'ENTRYPOINT',
+    'VOLUME', 'USER', 'WORKDIR', 'ARG', 'ONBUILD', 'STOPSIGNAL', 'HEALTHCHECK', 'SHELL',
+})
+_JSON_FORM_INSTRUCTIONS = ('RUN', 'CMD', 'ENTRYPOINT', 'SHELL', 'VOLUME')
+
+_FENCE_RE = re.compile(r'```([\w.+-]*)[ \t]*\n(.*?)```', re.DOTALL)
+_HEREDOC_RE = re.compile(r'<<-?\s*["\']?(\w+)["\']?')
+_EXPOSE_RE = re.compile(r'^(?:\d{1,5}(?:-\d{1,5})?(?:/(?:tcp|udp))?|\$\{?\w+\}?)$', re.IGNORECASE)
+
+_KINDS = {
+    'yaml': 'yaml', 'yml': 'yaml',
+    'dockerfile': 'dockerfile', 'docker': 'dockerfile',
+}
+
+
+@dataclass
+class ArtifactCheck:
+    """
+    Result of checking one infrastructure artifact.
+
+    Attributes:
+        kind: 'dockerfile' or 'yaml'
+        valid: Whether the artifact passed the syntax check
+        error: What is wrong, empty when valid
+        line: Line of the artifact the error is on, when known (1-based)
+    """
+    kind: str
+    valid: bool
+    error: str = ''
+    line: Optional[int] = None
+
+
+def extract_artifacts(text: str) -> List[Tuple[str, str]]:
+    """
+    The Dockerfiles and YAML documents in the fenced code blocks of a response.
+
+    Blocks are classified by their language tag; untagged blocks whose first
+    instruction is FROM count as Dockerfiles.
+
+    Returns:
+        List of (kind, content) pairs
+    """
+    artifacts = []
+    for language, content in _FENCE_RE.findall(text):
+        kind = _KINDS.get(language.lower())
+        if kind is None and not language:
+            first = next((line.strip() for line in content.splitlines() if line.strip()), '')
+            if first.upper().startswith('FROM '):
+                kind = 'dockerfile'
+        if kind:
+            artifacts.append((kind, content))
+    return artifacts
+
+
+def validate_dockerfile(content: str) -> ArtifactCheck:
+    """
+    Check Dockerfile syntax: known instructions with arguments, FROM before
+    anything but ARG, JSON-form arguments that parse, COPY/ADD with a source
+    and a destination and well-formed EXPOSE ports. Continuation lines and
+    heredocs are joined to their instruction.
+    """
+    lines = content.splitlines()
+    seen_from = False
+    index = 0
+    while index < len(lines):
+        number = index + 1
+        line = lines[index].strip()
+        index += 1
+        if not line or line.startswith('#'):
+            continue
+
+        while line.endswith('\\') and index < len(lines):
+            following = lines[index].strip()
+            index += 1
+            if not following.startswith('#'):
+                line = line[:-1].rstrip() + ' ' + following
+        heredoc = _HEREDOC_RE.search(line)
+        if heredoc:
+            while index < len(lines) and lines[index].strip() != heredoc.group(1):
+                index += 1
+            if index == len(lines):
+                return ArtifactCheck('dockerfile', False, f"Unterminated heredoc {heredoc.group(1)}", number)
+            index += 1
+
+        instruction, _, arguments = line.partition(' ')
+        instruction = instruction.upper()
+        arguments = arguments.strip()
+        if instruction not in DOCKERFILE_INSTRUCTIONS:
+            return ArtifactCheck('dockerfile', False, f"Unknown instruction {instruction}", number)
+        if not arguments:
+            return ArtifactCheck('dockerfile', False, f"{instruction} requires arguments", number)
+        if instruction == 'FROM':
+            seen_from = True
+        elif instruction != 'ARG' and not seen_from:
+            return ArtifactCheck('dockerfile', False, f"{instruction} before the first FROM", number)
+
+        if instruction in _JSON_FORM_INSTRUCTIONS and arguments.startswith('['):
+            try:
+                values = json.loads(arguments)
+            except ValueError:
+                return ArtifactCheck('dockerfile', False, f"{instruction} has an invalid JSON array", number)
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                return ArtifactCheck('dockerfile', False, f"{instruction} JSON form must be a list of strings", number)
+        elif instruction == 'SHELL':
+            return ArtifactCheck('dockerfile', False, "SHELL requires the JSON form", number)
+
+        if instruction in ('COPY', 'ADD') and not arguments.startswith('['):
+            paths = [part for part in arguments.split() if not part.startswith('--')]
+            if len(paths) < 2 and not heredoc:
+                return ArtifactCheck('dockerfile', False, f"{instruction} requires a source and a destination", number)
+        if instruction == 'EXPOSE':
+            invalid = [port for port in arguments.split() if not _EXPOSE_RE.match(port)]
+            if invalid:
+                return ArtifactCheck('dockerfile', False, f"Invalid port {invalid[0]}", number)
+
+    if not seen_from:
+        return ArtifactCheck('dockerfile', False, "No FROM instruction")
+    return ArtifactCheck('dockerfile', True)
+
+
+def validate_yaml(content: str) -> ArtifactCheck:
+    """
+    Check YAML syntax with PyYAML's safe loader, every document of a
+    multi-document stream included. Without PyYAML installed only the
+    indentation is checked for tabs, which YAML forbids.
+    """
+    for number, line in enumerate(content.splitlines(), 1):
+        if line[:len(line) - len(line.lstrip())].count('\t'):
+            return ArtifactCheck('yaml', False, "Tab used for indentation", number)
+    if _yaml is None:
+        return ArtifactCheck('yaml', True)
+
+    try:
+        for _ in _yaml.safe_load_all(content):
+            pass
+    except _yaml.YAMLError as e:
+        mark = getattr(e, 'problem_mark', None)
+        problem = getattr(e, 'problem', None) or str(e).splitlines()[0]
+        return ArtifactCheck('yaml', False, problem, mark.line + 1 if mark else None)
+    return ArtifactCheck('yaml', True)
+
+
+def validate_artifacts(text: str) -> List[Dict[str, Any]]:
+    """Check every Dockerfile and YAML block of a response, in order."""
+    validators = {'dockerfile': validate_dockerfile, 'yaml': validate_yaml}
+    return [asdict(validators[kind](content)) for kind, content in extract_artifacts(text)]
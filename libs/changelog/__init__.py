@@ -0,0 +1,3 @@
+from .git_log import COMMIT_TYPES, Changelog, Commit, GitLogError, iter_commits, parse_commit, validate_ref
+
+__all__ = ['COMMIT_TYPES', 'Changelog', 'Commit', 'GitLogError', 'iter_commits', 'parse_commit', 'validate_ref']
@@ -0,0 +1,223 @@
+import re
+import subprocess
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+
+FIELD_SEPARATOR = '\x1f'
+RECORD_SEPARATOR = '\x1e'
+LOG_FORMAT = f"%H{FIELD_SEPARATOR}%an{FIELD_SEPARATOR}%aI{FIELD_SEPARATOR}%s{FIELD_SEPARATOR}%b{RECORD_SEPARATOR}"
+
+_REF_RE = re.compile(r'^[A-Za-z0-9_./~^@{}+-]+$')
+_CONVENTIONAL_RE = re.compile(r'^(?P<type>[A-Za-z]+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s*(?P<description>.+)$')
+_STORY_KEY_RE = re.compile(r'\b[A-Z][A-Z0-9]{0,9}-\d+\b')
+
+# Section titles, in the order they are listed.
+COMMIT_TYPES = {
+    'feat': 'Features',
+    'fix': 'Bug Fixes',
+    'perf': 'Performance',
+    'security': 'Security',
+    'refactor': 'Refactoring',
+    'revert': 'Reverts',
+    'docs': 'Documentation',
+    'test': 'Tests',
+    'build': 'Build',
+    'ci': 'CI',
+    'style': 'Style',
+    'chore': 'Chores',
+    'other': 'Other Changes',
+}
+_TYPE_ALIASES = {'feature': 'feat', 'bugfix': 'fix', 'hotfix': 'fix', 'doc': 'docs', 'tests': 'test'}
+
+
+class GitLogError(RuntimeError):
+    pass
+
+
+@dataclass
+class Commit:
+    sha: str
+    author: str
+    date: str
+    subject: str
+    body: str = ''
+    type: str = 'other'
+    scope: str = ''
+    description: str = ''
+    breaking: bool = False
+    story_keys: List[str] = field(default_factory=list)
+
+
+def validate_ref(ref: str) -> str:
+    """Reject anything git could read as an option or a range expression other than a plain ref."""
+    if not ref or ref.startswith('-') or '..' in ref or not _REF_RE.match(ref):
+        raise ValueError(f"Invalid git ref: {ref!r}")
+    return ref
+
+
+def parse_commit(sha: str, author: str, date: str, subject: str, body: str = '') -> Commit:
+    """Classify a commit by its conventional-commit prefix and collect the story keys it mentions."""
+    commit = Commit(sha=sha, author=author, date=date, subject=subject, body=body, description=subject)
+    match = _CONVENTIONAL_RE.match(subject)
+    if match:
+        commit_type = match.group('type').lower()
+        commit_type = _TYPE_ALIASES.get(commit_type, commit_type)
+        if commit_type in COMMIT_TYPES:
+            commit.type = commit_type
+            commit.scope = match.group('scope') or ''
+            commit.description = match.group('description')
+            commit.breaking = bool(match.group('breaking'))
+    elif subject.startswith('Revert "'):
+        commit.type = 'revert'
+    commit.breaking = commit.breaking or 'BREAKING CHANGE' in body or 'BREAKING-CHANGE' in body
+    commit.story_keys = list(dict.fromkeys(_STORY_KEY_RE.findall(f"{subject}\n{body}")))
+    return commit
+
+
+def iter_commits(
+    repo_path: str,
+    from_ref: Optional[str] = None,
+    to_ref: str = 'HEAD',
+    max_commits: Optional[int] = None,
+    include_merges: bool = False,
+    timeout: float = 120.0
+) -> Iterator[Commit]:
+    """
+    Stream the commits reachable from ``to_ref`` but not ``from_ref``, newest first.
+
+    ``git log`` output is read incrementally from the pipe and each commit is
+    parsed and yielded as soon as it is complete, so memory use does not
+    grow with the size of the range.
+
+    Raises:
+        ValueError: If a ref is not a plain ref name
+        GitLogError: If git fails, e.g. the path is not a repository or a ref does not exist
+    """
+    revision = f"{validate_ref(from_ref)}..{validate_ref(to_ref)}" if from_ref else validate_ref(to_ref)
+    command = ['git', '-C', repo_path, 'log', f'--format={LOG_FORMAT}']
+    if not include_merges:
+        command.append('--no-merges')
+    if max_commits:
+        command.append(f'--max-count={int(max_commits)}')
+    command += [revision, '--']
+
+    process = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding='utf-8', errors='replace'
+    )
+    try:
+        buffer = ''
+        for chunk in iter(lambda: process.stdout.read(65536), ''):
+            buffer += chunk
+            *records, buffer = buffer.split(RECORD_SEPARATOR)
+            for record in records:
+                fields = record.lstrip('\n').split(FIELD_SEPARATOR, 4)
+                if len(fields) == 5:
+                    yield parse_commit(*fields[:4], fields[4].strip())
+        process.stdout.close()
+        stderr = process.stderr.read()
+        if process.wait(timeout=timeout) != 0:
+            raise GitLogError(stderr.strip() or f"git log exited with {process.returncode}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+class Changelog:
+    """
+    Running summary of a stream of commits, grouped by conventional-commit
+    type and by linked story key.
+
+    Only counts and a bounded sample of descriptions per group are kept, so a
+    release of any size summarizes into a prompt of roughly constant size.
+    Breaking changes are listed first, up to ``max_breaking`` of them.
+    """
+
+    def __init__(self, samples_per_type: int = 15, max_breaking: int = 20):
+        self.samples_per_type = samples_per_type
+        self.max_breaking = max_breaking
+        self.total = 0
+        self.type_counts: Counter = Counter()
+        self.samples: Dict[str, List[str]] = {}
+        self.story_commits: Counter = Counter()
+        self.story_types: Dict[str, Counter] = {}
+        self.authors: Counter = Counter()
+        self.breaking: List[str] = []
+        self.breaking_count = 0
+        self.first_date = ''
+        self.last_date = ''
+
+    def add(self, commit: Commit):
+        self.total += 1
+        self.type_counts[commit.type] += 1
+        self.authors[commit.author] += 1
+        samples = self.samples.setdefault(commit.type, [])
+        if len(samples) < self.samples_per_type:
+            samples.append(self._describe(commit))
+        for key in commit.story_keys:
+            self.story_commits[key] += 1
+            self.story_types.setdefault(key, Counter())[commit.type] += 1
+        if commit.breaking:
+            self.breaking_count += 1
+            if len(self.breaking) < self.max_breaking:
+                self.breaking.append(self._describe(commit))
+        # git log lists newest first.
+        self.last_date = self.last_date or commit.date
+        self.first_date = commit.date
+
+    def extend(self, commits) -> 'Changelog':
+        for commit in commits:
+            self.add(commit)
+        return self
+
+    @staticmethod
+    def _describe(commit: Commit) -> str:
+        scope = f"**{commit.scope}**: " if commit.scope else ''
+        return f"{scope}{commit.description} ({commit.sha[:8]})"
+
+    def to_dict(self) -> Dict:
+        return {
+            'commits': self.total,
+            'first_date': self.first_date,
+            'last_date': self.last_date,
+            'types': {
+                commit_type: {'count': self.type_counts[commit_type], 'samples': self.samples.get(commit_type, [])}
+                for commit_type in COMMIT_TYPES if self.type_counts[commit_type]
+            },
+            'stories': {key: count for key, count in self.story_commits.most_common()},
+            'authors': dict(self.authors.most_common()),
+            'breaking_changes': self.breaking,
+            'breaking_count': self.breaking_count,
+        }
+
+    def summary(self, max_stories: int = 40) -> str:
+        """The changelog as compact markdown for a prompt or release notes draft."""
+        if not self.total:
+            return "No commits in this range."
+        lines = [
+            f"{self.total} commits by {len(self.authors)} authors"
+            + (f", {self.first_date[:10]} to {self.last_date[:10]}" if self.first_date else '')
+        ]
+        if self.breaking:
+            lines += ["", f"### Breaking Changes ({self.breaking_count})"] + [f"- {item}" for item in self.breaking]
+            if self.breaking_count > len(self.breaking):
+                lines.append(f"- ... and {self.breaking_count - len(self.breaking)} more")
+        for commit_type, title in COMMIT_TYPES.items():
+            count = self.type_counts[commit_type]
+            if not count:
+                continue
+            samples = self.samples.get(commit_type, [])
+            lines += ["", f"### {title} ({count})"] + [f"- {item}" for item in samples]
+            if count > len(samples):
+                lines.append(f"- ... and {count - len(samples)} more")
+        if self.story_commits:
+            lines += ["", f"### Linked Stories ({len(self.story_commits)})"]
+            for key, count in self.story_commits.most_common(max_stories):
+                types = ", ".join(commit_type for commit_type, _ in self.story_types[key].most_common())
+                lines.append(f"- {key}: {count} commits ({types})")
+            if len(self.story_commits) > max_stories:
+                lines.append(f"- ... and {len(self.story_commits) - max_stories} more stories")
+        return "\n".join(lines)
@@ -0,0 +1,3 @@
+from .knn import FIBONACCI_POINTS, Estimate, HashingVectorizer, KNNEstimator, snap_to_scale
+
+__all__ = ['FIBONACCI_POINTS', 'Estimate', 'HashingVectorizer', 'KNNEstimator', 'snap_to_scale']
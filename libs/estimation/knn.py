@@ -0,0 +1,139 @@
+import math
+import zlib
+from dataclasses import dataclass, field
+from typing import List, Sequence
+
+import numpy as np
+
+from libs.retrieval import tokenize
+
+
+FIBONACCI_POINTS = (1, 2, 3, 5, 8, 13)
+
+
+def snap_to_scale(value: float, scale: Sequence[int] = FIBONACCI_POINTS) -> int:
+    """The scale value closest to ``value`` in log space (3.6 -> 3, 4.2 -> 5)."""
+    value = max(value, scale[0])
+    return min(scale, key=lambda point: abs(math.log(point) - math.log(value)))
+
+
+class HashingVectorizer:
+    """
+    TF-IDF over hashed unigram and bigram features.
+
+    Terms are hashed into a fixed number of columns, so no vocabulary has to
+    be kept and a new story can be vectorized without refitting. Hashed
+    counts are signed, so colliding terms blur similarities rather than bias
+    them. Rows are L2-normalized, so the dot product of two rows is their
+    cosine similarity.
+    """
+
+    def __init__(self, n_features: int = 1024):
+        self.n_features = n_features
+        self.idf = np.ones(n_features, dtype=np.float32)
+
+    def _counts(self, texts: Sequence[str]) -> np.ndarray:
+        counts = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            terms = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            for term in terms:
+                digest = zlib.crc32(term.encode())
+                counts[row, digest % self.n_features] += 1 if digest & 0x80000000 else -1
+        return counts
+
+    def fit_transform(self, texts: Sequence[str]) -> np.ndarray:
+        counts = self._counts(texts)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self._weigh(counts)
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        return self._weigh(self._counts(texts))
+
+    def _weigh(self, counts: np.ndarray) -> np.ndarray:
+        weights = np.sign(counts) * np.log1p(np.abs(counts)) * self.idf
+        norms = np.linalg.norm(weights, axis=1, keepdims=True)
+        return weights / np.where(norms == 0, 1, norms)
+
+
+@dataclass
+class Estimate:
+    """
+    A story point estimate from similar past stories.
+
+    Attributes:
+        points: Estimate snapped to the Fibonacci scale
+        raw: Similarity-weighted geometric mean of the neighbours' points
+        confidence: 0-1; high when the neighbours are similar and agree
+        neighbors: Indexes into the training set, most similar first
+        similarities: Cosine similarity of each neighbour
+    """
+    points: int
+    raw: float
+    confidence: float
+    neighbors: List[int] = field(default_factory=list)
+    similarities: List[float] = field(default_factory=list)
+
+
+class KNNEstimator:
+    """
+    k-nearest-neighbour story point estimator.
+
+    Each new story is compared with every historical story in one matrix
+    product; the estimate is the similarity-weighted geometric mean of the
+    points of its ``k`` most similar stories. Confidence is the mean
+    similarity of those neighbours scaled down by how much their points
+    disagree, so a story unlike anything seen before, or one whose look-alikes
+    were sized very differently, gets a low confidence.
+    """
+
+    def __init__(self, k: int = 7, n_features: int = 1024):
+        self.k = k
+        self.vectorizer = HashingVectorizer(n_features)
+        self._matrix = np.zeros((0, n_features), dtype=np.float32)
+        self._log_points = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._log_points)
+
+    def fit(self, texts: Sequence[str], points: Sequence[float]) -> 'KNNEstimator':
+        if len(texts) != len(points):
+            raise ValueError("texts and points must have the same length")
+        self._matrix = self.vectorizer.fit_transform(texts)
+        self._log_points = np.log(np.maximum(np.asarray(points, dtype=np.float32), 0.5))
+        return self
+
+    def predict(self, texts: Sequence[str]) -> List[Estimate]:
+        if not len(self) or not texts:
+            return [Estimate(points=snap_to_scale(3), raw=3.0, confidence=0.0) for _ in texts]
+
+        similarities = self.vectorizer.transform(texts) @ self._matrix.T
+        k = min(self.k, len(self))
+        nearest = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+
+        estimates = []
+        for row, candidates in enumerate(nearest):
+            order = candidates[np.argsort(-similarities[row, candidates])]
+            weights = np.clip(similarities[row, order], 0, None)
+            log_points = self._log_points[order]
+            if weights.sum() <= 0:
+                estimates.append(Estimate(
+                    points=snap_to_scale(3), raw=3.0, confidence=0.0, neighbors=order.tolist(),
+                    similarities=[0.0] * len(order)
+                ))
+                continue
+
+            mean = float(np.average(log_points, weights=weights))
+            spread = float(np.sqrt(np.average((log_points - mean) ** 2, weights=weights)))
+            # A spread of ln(2) means the neighbours are typically a full Fibonacci step apart.
+            agreement = max(0.0, 1.0 - spread / math.log(2) / 2)
+            raw = math.exp(mean)
+            estimates.append(Estimate(
+                points=snap_to_scale(raw),
+                raw=round(raw, 2),
+                confidence=round(float(weights.mean()) * agreement, 3),
+                neighbors=order.tolist(),
+                similarities=[round(float(value), 3) for value in similarities[row, order]],
+            ))
+        return estimates
@@ -0,0 +1,4 @@
+from .python_units import CodeUnit, extract_units
+from .streaming import LineRule, StreamingLineParser, after_colon
+
+__all__ = ['CodeUnit', 'LineRule', 'StreamingLineParser', 'after_colon', 'extract_units']
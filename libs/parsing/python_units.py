@@ -0,0 +1,132 @@
+import ast
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+
+@dataclass
+class CodeUnit:
+    """
+    A documentable piece of a Python module.
+
+    A module unit holds the module's docstring and top-level statements, a
+    class unit the class header, docstring and attributes, and each function
+    or method its own unit. Method bodies are left out of their class unit and
+    nested functions stay part of the function defining them, so editing a
+    method changes that method's digest only.
+
+    Attributes:
+        path: Path of the source file
+        kind: 'module', 'class', 'function' or 'method'
+        qualname: Dotted name within the module ('' for the module unit)
+        signature: Declaration line, e.g. 'def load(path: str) -> dict'
+        source: Source text of the unit
+        lineno: First line of the unit in the file (1-based)
+        parent: Qualified name of the enclosing class, for methods
+        digest: SHA-256 of the signature and source
+    """
+    path: str
+    kind: str
+    qualname: str
+    signature: str
+    source: str
+    lineno: int
+    parent: str = ''
+    digest: str = field(default='', init=False)
+
+    def __post_init__(self):
+        self.digest = hashlib.sha256(
+            f"{self.kind}\x00{self.qualname}\x00{self.signature}\x00{self.source}".encode('utf-8')
+        ).hexdigest()
+
+    @property
+    def name(self) -> str:
+        return self.qualname or self.path
+
+
+def _signature(node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(keyword) for keyword in node.keywords]
+        return f"class {node.name}({', '.join(bases)})" if bases else f"class {node.name}"
+
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns else ''
+    return f"{prefix} {node.name}({ast.unparse(node.args)}){returns}"
+
+
+def _span(node: ast.AST) -> Tuple[int, int]:
+    """First and last line of a definition, decorators included."""
+    decorators = getattr(node, 'decorator_list', [])
+    start = min([node.lineno] + [decorator.lineno for decorator in decorators])
+    return start, node.end_lineno
+
+
+def _lines_without(lines: List[str], start: int, end: int, holes: List[Tuple[int, int]]) -> str:
+    """Lines ``start``..``end`` (1-based, inclusive) with the ``holes`` replaced by '...'."""
+    kept = []
+    line = start
+    for hole_start, hole_end in sorted(holes):
+        kept.extend(lines[line - 1:hole_start - 1])
+        indent = lines[hole_start - 1][:len(lines[hole_start - 1]) - len(lines[hole_start - 1].lstrip())]
+        kept.append(f"{indent}...")
+        line = hole_end + 1
+    kept.extend(lines[line - 1:end])
+    return "\n".join(kept)
+
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def extract_units(source: str, path: str = '<module>') -> List[CodeUnit]:
+    """
+    Split a Python module into documentable units, in source order.
+
+    Raises:
+        SyntaxError: If the source does not parse
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    units: List[CodeUnit] = []
+
+    top_level = [node for node in tree.body if isinstance(node, _DEFINITIONS)]
+    units.append(CodeUnit(
+        path=path,
+        kind='module',
+        qualname='',
+        signature=f"module {path}",
+        source=_lines_without(lines, 1, len(lines), [_span(node) for node in top_level]),
+        lineno=1
+    ))
+
+    def visit(node: ast.AST, prefix: str, parent: str):
+        start, end = _span(node)
+        qualname = f"{prefix}{node.name}"
+
+        if isinstance(node, ast.ClassDef):
+            members = [child for child in node.body if isinstance(child, _DEFINITIONS)]
+            units.append(CodeUnit(
+                path=path,
+                kind='class',
+                qualname=qualname,
+                signature=_signature(node),
+                source=_lines_without(lines, start, end, [_span(child) for child in members]),
+                lineno=start,
+                parent=parent
+            ))
+            for child in members:
+                visit(child, f"{qualname}.", qualname)
+        else:
+            units.append(CodeUnit(
+                path=path,
+                kind='method' if parent else 'function',
+                qualname=qualname,
+                signature=_signature(node),
+                source="\n".join(lines[start - 1:end]),
+                lineno=start,
+                parent=parent
+            ))
+
+    for node in top_level:
+        visit(node, '', '')
+
+    return units
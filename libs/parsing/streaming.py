@@ -0,0 +1,241 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def after_colon(line: str) -> str:
+    """Return the text after the last colon of a line, stripped."""
+    return line.rpartition(':')[2].strip()
+
+
+@dataclass
+class LineRule:
+    """
+    A single extraction rule applied to each complete line of a response.
+
+    A line matches when it starts with one of ``prefixes`` or contains one of
+    ``needles`` (and passes ``match``, when given). Use the ``prefix`` and
+    ``contains`` constructors for the common cases.
+
+    Attributes:
+        field: Name of the field the extracted value is stored under, or None
+            when ``extract`` returns a dict of fields
+        prefixes: Literal line prefixes (leading whitespace is ignored)
+        needles: Literal substrings searched anywhere in the line
+        match: Optional extra predicate receiving the stripped line
+        extract: Function receiving the stripped line and returning the value;
+            returning None means the rule does not apply to this line
+        starts_item: Whether a match closes the current item and opens a new one
+        sticky: Whether the value is a section header applied to every item
+            opened afterwards instead of the current one
+        ignore_case: Whether ``needles`` are matched case-insensitively
+    """
+    field: Optional[str]
+    prefixes: Tuple[str, ...] = ()
+    needles: Tuple[str, ...] = ()
+    match: Optional[Callable[[str], bool]] = None
+    extract: Callable[[str], Any] = after_colon
+    starts_item: bool = False
+    sticky: bool = False
+    ignore_case: bool = False
+
+    def __post_init__(self):
+        if not self.prefixes and not self.needles:
+            raise ValueError(f"LineRule for {self.field!r} needs prefixes or needles")
+        if self.ignore_case:
+            self.needles = tuple(needle.lower() for needle in self.needles)
+
+    @classmethod
+    def prefix(cls, prefix: str, field: Optional[str], **kwargs) -> 'LineRule':
+        """Rule matching lines that start with ``prefix``."""
+        return cls(field=field, prefixes=(prefix,), **kwargs)
+
+    @classmethod
+    def contains(cls, needles: Sequence[str], field: Optional[str], **kwargs) -> 'LineRule':
+        """Rule matching lines that contain any of ``needles``."""
+        return cls(field=field, needles=tuple(needles), **kwargs)
+
+    def matches(self, line: str, lowered: str) -> bool:
+        if self.prefixes and line.startswith(self.prefixes):
+            pass
+        elif self.needles:
+            haystack = lowered if self.ignore_case else line
+            if not any(needle in haystack for needle in self.needles):
+                return False
+        else:
+            return False
+        return self.match is None or self.match(line)
+
+
+class StreamingLineParser:
+    """
+    Incremental, single-pass parser for line-oriented agent output.
+
+    Chunks are fed as they arrive from a streaming provider; only the trailing
+    incomplete line is buffered. The prefixes and needles of all rules are
+    compiled into one regular expression, so the regex engine skips the prose
+    between candidate lines and only those reach the rules, which are tried in
+    order with the first applicable one winning. Items are emitted as soon as
+    the next item starts, so callers can publish partial results before the
+    response has finished.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[LineRule],
+        on_item: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        if not rules:
+            raise ValueError("StreamingLineParser needs at least one rule")
+
+        self.rules = list(rules)
+        self.on_item = on_item
+        self.items: List[Dict[str, Any]] = []
+        self._needs_lower = any(rule.ignore_case for rule in self.rules)
+        self._prefix_only = not any(rule.needles for rule in self.rules)
+        self._trigger = self._compile_trigger()
+        self._dispatch = self._build_dispatch()
+        self._buffer = ''
+        self._current: Optional[Dict[str, Any]] = None
+        self._sticky: Dict[str, Any] = {}
+        self._closed = False
+
+    def _compile_trigger(self) -> 're.Pattern':
+        def alternation(literals):
+            # Longest first so that overlapping literals do not shadow each other.
+            return '|'.join(re.escape(literal) for literal in sorted(set(literals), key=len, reverse=True))
+
+        prefixes = [prefix for rule in self.rules for prefix in rule.prefixes]
+
+        if self._prefix_only:
+            # Anchoring on a literal newline keeps the scan in C; a multiline
+            # '^' anchor is several times slower.
+            return re.compile(rf'\n[ \t]*({alternation(prefixes)})([^\n]*)')
+
+        needles = prefixes + [needle for rule in self.rules for needle in rule.needles]
+        return re.compile(alternation(needles), re.IGNORECASE if self._needs_lower else 0)
+
+    def _build_dispatch(self) -> Dict[str, List[LineRule]]:
+        """
+        Map each prefix to the rules, in order, that a line starting with it
+        satisfies. The trigger alternation is longest-first, so the captured
+        prefix is the longest one and every shorter matching prefix is covered.
+        """
+        if not self._prefix_only:
+            return {}
+
+        literals = {prefix for rule in self.rules for prefix in rule.prefixes}
+        return {
+            literal: [rule for rule in self.rules if literal.startswith(rule.prefixes)]
+            for literal in literals
+        }
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of text.
+
+        Returns:
+            Items completed by this chunk
+        """
+        if self._closed:
+            raise ValueError("Cannot feed a closed parser")
+
+        newline = chunk.rfind('\n')
+        if newline == -1:
+            self._buffer += chunk
+            return []
+
+        block = self._buffer + chunk[:newline]
+        self._buffer = chunk[newline + 1:]
+        return self._process_block(block)
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Flush the buffered line and the open item.
+
+        Returns:
+            All items parsed from the stream
+        """
+        if not self._closed:
+            if self._buffer:
+                self._process_block(self._buffer)
+                self._buffer = ''
+            if self._current:
+                self._emit(self._current)
+            self._current = None
+            self._closed = True
+        return self.items
+
+    def parse(self, text: str) -> List[Dict[str, Any]]:
+        """Parse a complete response in one call."""
+        self.feed(text)
+        return self.close()
+
+    def _candidate_lines(self, block: str) -> List[Tuple[str, List[LineRule]]]:
+        """
+        Return the stripped lines of a block of complete lines that may match,
+        each with the rules to try on it.
+        """
+        if self._prefix_only:
+            dispatch = self._dispatch
+            return [
+                ((prefix + rest).rstrip(), dispatch[prefix])
+                for prefix, rest in self._trigger.findall('\n' + block)
+            ]
+
+        lines = []
+        search = self._trigger.search
+        match = search(block)
+        while match is not None:
+            start = block.rfind('\n', 0, match.start()) + 1
+            end = block.find('\n', match.end())
+            if end == -1:
+                end = len(block)
+            lines.append((block[start:end].strip(), self.rules))
+            match = search(block, end + 1)
+        return lines
+
+    def _process_block(self, block: str) -> List[Dict[str, Any]]:
+        completed = []
+        prefix_only = self._prefix_only
+        for line, rules in self._candidate_lines(block):
+            lowered = line.lower() if self._needs_lower else line
+
+            for rule in rules:
+                if not (prefix_only and rule.match is None) and not rule.matches(line, lowered):
+                    continue
+
+                value = rule.extract(line)
+                if value is None:
+                    continue
+
+                item = self._apply(rule, value)
+                if item is not None:
+                    completed.append(item)
+                break
+
+        return completed
+
+    def _apply(self, rule: LineRule, value: Any) -> Optional[Dict[str, Any]]:
+        target = self._sticky if rule.sticky else None
+        completed = None
+
+        if target is None:
+            if rule.starts_item or self._current is None:
+                if rule.starts_item and self._current:
+                    completed = self._emit(self._current)
+                self._current = dict(self._sticky)
+            target = self._current
+
+        # Sticky section headers land in _sticky and describe the items opened after them.
+        if rule.field is None:
+            target.update(value)
+        else:
+            target[rule.field] = value
+        return completed
+
+    def _emit(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        self.items.append(item)
+        if self.on_item:
+            self.on_item(item)
+        return item
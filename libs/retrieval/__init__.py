@@ -0,0 +1,3 @@
+from .bm25 import BM25Index, chunk_text, tokenize, top_snippets
+
+__all__ = ['BM25Index', 'chunk_text', 'tokenize', 'top_snippets']
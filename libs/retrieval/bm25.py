@@ -0,0 +1,191 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being
+but by can could did do does doing for from had has have having he her here hers
+him his how i if in into is it its just me more most my no not now of on once only
+or other our out over own same she should so some such than that the their them
+then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your
+""".split())
+
+
+def _stem(token: str) -> str:
+    """Strip common English suffixes so that e.g. 'errors' and 'error' match."""
+    if len(token) > 4:
+        if token.endswith('ies'):
+            return token[:-3] + 'y'
+        for suffix in ('ing', 'ed'):
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                stem = token[:-len(suffix)]
+                # "getting" -> "gett" -> "get"
+                if stem[-1] == stem[-2] and stem[-1] not in 'lsz':
+                    stem = stem[:-1]
+                return stem
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed and light stemming."""
+    return [
+        _stem(token) for token in _TOKEN_RE.findall(text.lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 index supporting incremental additions and removals.
+
+    Postings are kept per term, so a query only touches documents sharing at
+    least one term with it. Document frequencies and the average length are
+    maintained incrementally; adding a document with an existing id replaces it.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._lengths: Dict[Hashable, int] = {}
+        self._terms: Dict[Hashable, List[str]] = {}
+        self._metadata: Dict[Hashable, Any] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: Hashable, text: str, metadata: Any = None):
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+
+        counts = Counter(tokenize(text))
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._terms[doc_id] = list(counts)
+        self._metadata[doc_id] = metadata
+        self._total_length += length
+
+    def remove(self, doc_id: Hashable):
+        if doc_id not in self._lengths:
+            return
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        self._metadata.pop(doc_id, None)
+
+    def metadata(self, doc_id: Hashable) -> Any:
+        return self._metadata.get(doc_id)
+
+    def idf(self, term: str) -> float:
+        frequency = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._lengths) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        where: Optional[Any] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Return the ``k`` best matching document ids with their BM25 scores.
+
+        Args:
+            query: Free-text query
+            k: Number of results
+            where: Optional predicate on a document's metadata restricting the results
+        """
+        if not self._lengths:
+            return []
+
+        average_length = self._total_length / len(self._lengths) or 1
+        scores: Dict[Hashable, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if where is not None:
+            ranked = [item for item in ranked if where(self._metadata.get(item[0]))]
+        return ranked[:k]
+
+    def similarity(self, first: str, second: str) -> float:
+        """
+        Cosine similarity of the TF-IDF vectors of two texts, using this
+        index's document frequencies. Unlike BM25 scores it lies in [0, 1],
+        so it can be compared against a fixed threshold.
+        """
+        vectors = []
+        for text in (first, second):
+            counts = Counter(tokenize(text))
+            vectors.append({term: count * self.idf(term) for term, count in counts.items()})
+
+        dot = sum(weight * vectors[1].get(term, 0.0) for term, weight in vectors[0].items())
+        norms = [math.sqrt(sum(weight * weight for weight in vector.values())) for vector in vectors]
+        return dot / (norms[0] * norms[1]) if norms[0] and norms[1] else 0.0
+
+
+def chunk_text(text: str, max_chars: int = 1500) -> List[Tuple[str, str]]:
+    """
+    Split Markdown or plain text into chunks of at most ``max_chars``, breaking
+    at headings first and blank lines second.
+
+    Returns:
+        List of (heading, chunk text) tuples; heading is the nearest preceding
+        Markdown heading, or '' before the first one
+    """
+    sections: List[Tuple[str, List[str]]] = [('', [])]
+    for line in text.splitlines():
+        if re.match(r'^#{1,6}\s', line):
+            sections.append((line.lstrip('#').strip(), [line]))
+        else:
+            sections[-1][1].append(line)
+
+    chunks = []
+    for heading, lines in sections:
+        current = ''
+        for paragraph in re.split(r'\n\s*\n', '\n'.join(lines)):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if current and len(current) + len(paragraph) + 2 > max_chars:
+                chunks.append((heading, current))
+                current = ''
+            while len(paragraph) > max_chars:
+                chunks.append((heading, paragraph[:max_chars]))
+                paragraph = paragraph[max_chars:]
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append((heading, current))
+    return chunks
+
+
+def top_snippets(query: str, texts: Iterable[str], k: int = 3, max_chars: int = 1500) -> List[str]:
+    """Chunk the given texts and return the ``k`` chunks most relevant to the query."""
+    index = BM25Index()
+    for text_number, text in enumerate(texts):
+        for chunk_number, (_, chunk) in enumerate(chunk_text(text, max_chars)):
+            index.add((text_number, chunk_number), chunk, chunk)
+    return [index.metadata(doc_id) for doc_id, _ in index.search(query, k)]
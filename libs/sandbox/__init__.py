@@ -0,0 +1,9 @@
+from .runner import SandboxLimits, SandboxResult, run_python
+from .profiling import profile_snippet, compare_snippets, compare_reports, format_measurements
+from .testing import SOLUTION_MODULE, run_tests, format_test_report
+
+__all__ = [
+    'SandboxLimits', 'SandboxResult', 'run_python',
+    'profile_snippet', 'compare_snippets', 'compare_reports', 'format_measurements',
+    'SOLUTION_MODULE', 'run_tests', 'format_test_report',
+]
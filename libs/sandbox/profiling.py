@@ -0,0 +1,179 @@
+from typing import Any, Dict, List, Optional
+from .runner import SandboxLimits, run_python
+
+
+# Runs inside the sandbox. Reads {"code", "setup", "repeat", "top"} from stdin,
+# executes the snippet once to capture its result, profiles one run with
+# cProfile and times it with timeit, then writes result.json.
+_PROFILE_SCRIPT = r'''
+import contextlib, cProfile, hashlib, io, json, pstats, sys, timeit, traceback
+
+config = json.load(sys.stdin)
+report = {'ok': False}
+
+def fresh_namespace():
+    namespace = {'__name__': '__sandbox__'}
+    exec(compile(config['setup'], '<setup>', 'exec'), namespace)
+    return namespace
+
+try:
+    code = compile(config['code'], '<snippet>', 'exec')
+
+    namespace = fresh_namespace()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, namespace)
+    report['stdout'] = output.getvalue()[:2000]
+    if 'result' in namespace:
+        text = repr(namespace['result'])
+        report['result'] = text[:500]
+        report['result_hash'] = hashlib.sha256(text.encode('utf-8', 'replace')).hexdigest()
+
+    namespace = fresh_namespace()
+    profiler = cProfile.Profile()
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiler.runctx(code, namespace, namespace)
+    stats = pstats.Stats(profiler)
+    rows = sorted(
+        (item for item in stats.stats.items() if '_lsprof.Profiler' not in item[0][2]),
+        key=lambda item: item[1][2], reverse=True
+    )
+    report['hotspots'] = [
+        {
+            'function': name,
+            'location': f"{filename}:{line}" if line else filename,
+            'calls': calls,
+            'total_time': round(total, 6),
+            'cumulative_time': round(cumulative, 6),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows[:config['top']]
+    ]
+    report['profiled_total'] = round(stats.total_tt, 6)
+
+    namespace = fresh_namespace()
+    timer = timeit.Timer(lambda: exec(code, namespace))
+    with contextlib.redirect_stdout(io.StringIO()):
+        number, _ = timer.autorange()
+        runs = timer.repeat(repeat=config['repeat'], number=number)
+    per_run = [run / number for run in runs]
+    report['timing'] = {
+        'number': number,
+        'repeat': config['repeat'],
+        'best': min(per_run),
+        'mean': sum(per_run) / len(per_run),
+        'worst': max(per_run),
+    }
+    report['ok'] = True
+except BaseException:
+    report['error'] = traceback.format_exc(limit=5)[-2000:]
+
+with open('result.json', 'w') as f:
+    json.dump(report, f)
+'''
+
+
+def profile_snippet(
+    code: str,
+    setup: str = '',
+    limits: Optional[SandboxLimits] = None,
+    repeat: int = 5,
+    top: int = 10
+) -> Dict[str, Any]:
+    """
+    Measure a Python snippet in the sandbox with cProfile and timeit.
+
+    The snippet runs three times in fresh namespaces prepared by ``setup``:
+    once to capture its output and the value of a ``result`` variable (used
+    to check that optimized code is equivalent), once under cProfile, and
+    then repeatedly under timeit.
+
+    Returns:
+        Dictionary with 'ok', 'timing' (seconds per run: best/mean/worst),
+        'hotspots' (top functions by own time), 'result'/'result_hash' when the
+        snippet sets ``result``, or 'error' describing why the run failed
+    """
+    run = run_python(
+        _PROFILE_SCRIPT,
+        limits=limits,
+        stdin={'code': code, 'setup': setup, 'repeat': repeat, 'top': top},
+    )
+
+    report = run.data if isinstance(run.data, dict) else {'ok': False}
+    if not run.ok:
+        report['ok'] = False
+        report.setdefault('error', run.error)
+    report['wall_time'] = round(run.duration, 3)
+    return report
+
+
+def compare_snippets(
+    before: str,
+    after: str,
+    setup: str = '',
+    limits: Optional[SandboxLimits] = None,
+    repeat: int = 5,
+    top: int = 10
+) -> Dict[str, Any]:
+    """Profile original and optimized code under the same setup and compare them."""
+    return compare_reports(
+        profile_snippet(before, setup, limits, repeat, top),
+        profile_snippet(after, setup, limits, repeat, top)
+    )
+
+
+def compare_reports(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare two profile_snippet reports.
+
+    Returns:
+        Dictionary with the 'before' and 'after' reports, the measured
+        'speedup' (best time before / best time after, None if either run
+        failed) and 'equivalent' (whether both set the same ``result``,
+        None when neither sets one)
+    """
+    speedup = None
+    if before['ok'] and after['ok'] and after['timing']['best'] > 0:
+        speedup = round(before['timing']['best'] / after['timing']['best'], 3)
+
+    equivalent = None
+    if 'result_hash' in before or 'result_hash' in after:
+        equivalent = before.get('result_hash') == after.get('result_hash')
+
+    return {
+        'before': before,
+        'after': after,
+        'speedup': speedup,
+        'equivalent': equivalent,
+    }
+
+
+def format_measurements(report: Dict[str, Any], label: str = 'Code') -> str:
+    """Render a profile_snippet report as compact text for a prompt."""
+    if not report.get('ok'):
+        error = report.get('error', '').strip().splitlines()
+        return f"{label}: could not be executed in the sandbox ({error[-1] if error else 'unknown error'})"
+
+    timing = report['timing']
+    lines = [
+        f"{label}: best {_format_seconds(timing['best'])}, mean {_format_seconds(timing['mean'])} "
+        f"per run ({timing['repeat']} x {timing['number']} runs)",
+        "Hotspots by own time (cProfile):",
+    ]
+    lines.extend(
+        f"- {spot['function']} ({spot['location']}): {spot['calls']} calls, "
+        f"own {_format_seconds(spot['total_time'])}, cumulative {_format_seconds(spot['cumulative_time'])}"
+        for spot in _hotspots(report)
+    )
+    return "\n".join(lines)
+
+
+def _hotspots(report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [spot for spot in report.get('hotspots', []) if spot['total_time'] > 0] or report.get('hotspots', [])[:3]
+
+
+def _format_seconds(value: float) -> str:
+    if value >= 1:
+        return f"{value:.3f} s"
+    if value >= 1e-3:
+        return f"{value * 1e3:.3f} ms"
+    return f"{value * 1e6:.1f} µs"
@@ -0,0 +1,293 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import logging
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+# Exit status of a sandboxed process that could not isolate itself.
+ISOLATION_UNAVAILABLE = 86
+
+# Run at the top of every sandboxed script, before any user code, in the
+# single-threaded child (not via preexec_fn, which is unsafe in threaded
+# workers). It moves the process into new user, mount and network
+# namespaces, pivots into a fresh root holding only the read-only Python and
+# system directories and the writable working directory, drops its
+# privileges over those mounts and applies the resource limits. If any step
+# fails the script exits with ISOLATION_UNAVAILABLE before user code runs.
+_ISOLATION_PRELUDE = r"""
+def _isolate(config):
+    import ctypes, os, platform, resource, sys
+
+    MS_RDONLY, MS_NOSUID, MS_NODEV, MS_NOEXEC = 1, 2, 4, 8
+    MS_REMOUNT, MS_BIND, MS_REC, MS_PRIVATE = 32, 4096, 16384, 1 << 18
+    MNT_DETACH, PR_SET_NO_NEW_PRIVS = 2, 38
+    PIVOT_ROOT = {'x86_64': 155, 'aarch64': 41}
+
+    libc = ctypes.CDLL(None, use_errno=True)
+
+    def check(status, what):
+        if status != 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"{what}: {os.strerror(error)}")
+
+    def mount(source, target, fstype, flags, data=None):
+        check(libc.mount(
+            source and source.encode(), target.encode(), fstype and fstype.encode(),
+            flags, data and data.encode()
+        ), f"mount {target}")
+
+    try:
+        uid, gid = os.getuid(), os.getgid()
+        os.unshare(os.CLONE_NEWUSER | os.CLONE_NEWNS | os.CLONE_NEWNET)
+        for name, value in (('setgroups', 'deny'), ('uid_map', f'0 {uid} 1'), ('gid_map', f'0 {gid} 1')):
+            with open(f'/proc/self/{name}', 'w') as f:
+                f.write(value)
+
+        root = config['root']
+        mount(None, '/', None, MS_REC | MS_PRIVATE)
+        mount('tmpfs', root, 'tmpfs', MS_NOSUID | MS_NODEV, 'size=16m,mode=755')
+        for path in config['readonly'] + [config['workdir']]:
+            target = root + path
+            os.makedirs(target, exist_ok=True)
+            mount(path, target, None, MS_BIND | MS_REC)
+            if path != config['workdir']:
+                # Flags locked by the parent namespace (ST_* equal MS_*) must be kept.
+                locked = os.statvfs(path).f_flag & (MS_NOSUID | MS_NODEV | MS_NOEXEC)
+                mount(None, target, None, MS_REMOUNT | MS_BIND | MS_RDONLY | locked)
+        os.makedirs(root + '/dev', exist_ok=True)
+        for device in ('null', 'zero', 'urandom'):
+            open(f'{root}/dev/{device}', 'w').close()
+            mount(f'/dev/{device}', f'{root}/dev/{device}', None, MS_BIND)
+        os.makedirs(root + '/tmp', exist_ok=True)
+        os.chmod(root + '/tmp', 0o1777)
+
+        os.chdir(root)
+        os.mkdir('.old')
+        if platform.machine() not in PIVOT_ROOT:
+            raise OSError(f"pivot_root is not supported on {platform.machine()}")
+        check(libc.syscall(PIVOT_ROOT[platform.machine()], b'.', b'.old'), "pivot_root")
+        os.chdir('/')
+        check(libc.umount2(b'/.old', MNT_DETACH), "umount old root")
+        os.rmdir('/.old')
+        os.chdir(config['workdir'])
+
+        # Privileges in a nested user namespace do not extend to the mounts above.
+        os.unshare(os.CLONE_NEWUSER)
+        check(libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "prctl")
+    except (AttributeError, OSError) as e:
+        sys.stderr.write(f"Sandbox isolation unavailable: {e}\n")
+        sys.stderr.flush()
+        os._exit(config['unavailable'])
+
+    for name, value in config['rlimits']:
+        limit = getattr(resource, name)
+        hard = resource.getrlimit(limit)[1]
+        value = value if hard == resource.RLIM_INFINITY else min(value, hard)
+        resource.setrlimit(limit, (value, value))
+
+_isolate(%s)
+del _isolate
+"""
+
+# Directories the sandboxed interpreter can read, in addition to its own
+# installation (sys.prefix and friends); missing ones are skipped.
+_SYSTEM_DIRECTORIES = ('/usr', '/lib', '/lib64', '/bin')
+
+
+@dataclass
+class SandboxLimits:
+    """
+    Resource limits applied to a sandboxed process.
+
+    Attributes:
+        timeout: Wall-clock seconds before the process group is killed
+        cpu_seconds: CPU time limit (RLIMIT_CPU)
+        memory_mb: Address space limit in megabytes (RLIMIT_AS)
+        file_size_mb: Largest file the process may write (RLIMIT_FSIZE)
+        open_files: Maximum number of open file descriptors (RLIMIT_NOFILE)
+        max_output: Characters of stdout/stderr kept in the result
+    """
+    timeout: float = 30.0
+    cpu_seconds: int = 20
+    memory_mb: int = 512
+    file_size_mb: int = 16
+    open_files: int = 64
+    max_output: int = 10000
+
+    @classmethod
+    def from_dict(cls, values: Optional[Dict[str, Any]]) -> 'SandboxLimits':
+        """Build limits from a settings dict, ignoring unknown keys."""
+        values = values or {}
+        return cls(**{key: value for key, value in values.items() if key in cls.__dataclass_fields__})
+
+
+@dataclass
+class SandboxResult:
+    """Outcome of a sandboxed run."""
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    duration: float
+    timed_out: bool = False
+    data: Optional[Any] = None
+    files: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    @property
+    def error(self) -> str:
+        """Short description of why the run failed, empty when it succeeded."""
+        if self.timed_out:
+            return "Timed out"
+        if self.returncode is not None and self.returncode < 0:
+            return f"Killed by signal {-self.returncode} (resource limit exceeded)"
+        if self.returncode:
+            lines = self.stderr.strip().splitlines()
+            return lines[-1] if lines else f"Exited with status {self.returncode}"
+        return ""
+
+
+def _isolation_config(limits: SandboxLimits, workdir: str, root: str) -> Dict[str, Any]:
+    megabyte = 1024 * 1024
+    interpreter = [
+        sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix,
+        os.path.dirname(sys.executable), os.path.dirname(os.path.realpath(sys.executable)),
+    ]
+    readonly = []
+    for path in list(_SYSTEM_DIRECTORIES) + interpreter:
+        path = os.path.realpath(path)
+        if os.path.isdir(path) and path not in readonly:
+            readonly.append(path)
+    # Nested directories are covered by their parent's recursive bind.
+    readonly = [path for path in readonly if not any(
+        path != other and path.startswith(other.rstrip('/') + '/') for other in readonly
+    )]
+    return {
+        'root': root,
+        'workdir': workdir,
+        'readonly': readonly,
+        'unavailable': ISOLATION_UNAVAILABLE,
+        'rlimits': [
+            [name, value] for name, value in (
+                ('RLIMIT_CPU', limits.cpu_seconds),
+                ('RLIMIT_AS', limits.memory_mb * megabyte),
+                ('RLIMIT_FSIZE', limits.file_size_mb * megabyte),
+                ('RLIMIT_NOFILE', limits.open_files),
+                ('RLIMIT_CORE', 0),
+            ) if resource is not None and hasattr(resource, name)
+        ],
+    }
+
+
+def run_python(
+    source: str,
+    limits: Optional[SandboxLimits] = None,
+    stdin: Optional[Any] = None,
+    files: Optional[Dict[str, str]] = None,
+    collect: Optional[List[str]] = None
+) -> SandboxResult:
+    """
+    Run a Python script in a resource-limited, isolated subprocess.
+
+    The script runs in isolated mode (-I: no user site, no PYTHON* variables)
+    with an empty environment, in its own user, mount and network namespaces:
+    it sees only the Python installation, system libraries and a throwaway
+    working directory, and has no network. Without namespace support the run
+    fails (returncode ISOLATION_UNAVAILABLE) instead of running unisolated.
+    Data is exchanged through stdin and ``result.json`` in the working directory.
+
+    Args:
+        source: Python source to execute
+        limits: Resource limits, defaults to SandboxLimits()
+        stdin: Value passed to the script as JSON on stdin
+        files: Extra files written to the working directory before the run
+        collect: Names of files read back from the working directory afterwards
+
+    Returns:
+        SandboxResult; ``data`` holds the decoded result.json, if the script wrote one
+    """
+    limits = limits or SandboxLimits()
+
+    with tempfile.TemporaryDirectory(prefix='sandbox-') as workdir, \
+            tempfile.TemporaryDirectory(prefix='sandbox-root-') as root:
+        workdir, root = os.path.realpath(workdir), os.path.realpath(root)
+        script = os.path.join(workdir, 'main.py')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(_ISOLATION_PRELUDE % repr(_isolation_config(limits, workdir, root)) + '\n' + source)
+        for name, content in (files or {}).items():
+            path = os.path.join(workdir, os.path.basename(name))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-I', script],
+            cwd=workdir,
+            env={'PATH': os.defpath, 'PYTHONHASHSEED': '0', 'PYTHONDONTWRITEBYTECODE': '1'},
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        )
+
+        timed_out = False
+        try:
+            stdout, stderr = process.communicate(
+                json.dumps(stdin) if stdin is not None else '', timeout=limits.timeout
+            )
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            _kill_group(process)
+            stdout, stderr = process.communicate()
+        duration = time.perf_counter() - start
+        if process.returncode == ISOLATION_UNAVAILABLE and 'Sandbox isolation unavailable' in stderr:
+            logger.error(f"Refused to run sandboxed code: {stderr.strip().splitlines()[-1]}")
+
+        data = None
+        result_path = os.path.join(workdir, 'result.json')
+        if os.path.exists(result_path):
+            try:
+                with open(result_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError as e:
+                logger.warning(f"Sandbox result could not be decoded: {str(e)}")
+
+        collected = {}
+        for name in collect or []:
+            path = os.path.join(workdir, os.path.basename(name))
+            if os.path.exists(path):
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    collected[name] = f.read(limits.max_output)
+
+    return SandboxResult(
+        returncode=process.returncode,
+        stdout=stdout[:limits.max_output],
+        stderr=stderr[-limits.max_output:],
+        duration=duration,
+        timed_out=timed_out,
+        data=data,
+        files=collected,
+    )
+
+
+def _kill_group(process: subprocess.Popen):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.kill()
@@ -0,0 +1,199 @@
+import json
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+from .runner import SandboxLimits, run_python
+
+
+SOLUTION_MODULE = 'solution'
+
+# Characters of stdout kept for the report, which is most of it.
+_REPORT_MAX_OUTPUT = 1000000
+
+# Runs inside the sandbox. Reads {"modules", "nonce"} from stdin and moves
+# stdout to a private descriptor before anything else is imported, imports
+# each test module next to solution.py, runs its unittest cases and its plain
+# pytest-style ``test_*`` functions, then writes the report to that
+# descriptor as one line prefixed by the nonce. Output of the tested code goes
+# to /dev/null, and files it writes are not read, so it cannot pass off a
+# report by printing or writing one. This keeps honest-but-wrong code from
+# passing, not hostile code: the tests run in this process and can reach the
+# harness through introspection, so a passing run is not a security boundary.
+_TEST_SCRIPT = r'''
+import contextlib, importlib, inspect, io, json, os, sys, time, traceback, unittest
+
+def _report_channel(nonce):
+    out = os.dup(1)
+    null = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null, 1)
+    os.close(null)
+
+    def send(report):
+        with os.fdopen(out, 'w') as f:
+            f.write(nonce + json.dumps(report) + '\n')
+    return send
+
+def main(config, send):
+    sys.path.insert(0, '.')
+    report = {'tests': [], 'errors': []}
+
+    def record(name, started, error=None):
+        report['tests'].append({
+            'name': name,
+            'passed': error is None,
+            'duration': round(time.perf_counter() - started, 6),
+            'error': error,
+        })
+
+    def short_traceback():
+        return traceback.format_exc(limit=-3)[-1500:]
+
+    class Result(unittest.TestResult):
+        def startTest(self, test):
+            super().startTest(test)
+            self.started = time.perf_counter()
+
+        def addSuccess(self, test):
+            record(test.id(), self.started)
+
+        def addFailure(self, test, err):
+            record(test.id(), self.started, self._exc_info_to_string(err, test)[-1500:])
+
+        addError = addFailure
+
+        def addSubTest(self, test, subtest, err):
+            if err is not None:
+                record(subtest.id(), self.started, self._exc_info_to_string(err, test)[-1500:])
+
+    for name in config['modules']:
+        started = time.perf_counter()
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                module = importlib.import_module(name)
+        except BaseException:
+            report['errors'].append({'module': name, 'error': short_traceback()})
+            continue
+
+        with contextlib.redirect_stdout(output):
+            unittest.defaultTestLoader.loadTestsFromModule(module).run(Result())
+            for attr, function in sorted(vars(module).items()):
+                if not attr.startswith('test') or not inspect.isfunction(function):
+                    continue
+                if function.__module__ != name or inspect.signature(function).parameters:
+                    continue
+                started = time.perf_counter()
+                try:
+                    function()
+                except BaseException:
+                    record(f"{name}.{attr}", started, short_traceback())
+                else:
+                    record(f"{name}.{attr}", started)
+
+    send(report)
+    # Skip atexit handlers the tested code may have registered.
+    os._exit(0)
+
+_config = json.load(sys.stdin)
+main(_config, _report_channel(_config.pop('nonce')))
+'''
+
+
+def run_tests(
+    code: str,
+    tests: Dict[str, str],
+    limits: Optional[SandboxLimits] = None,
+    workers: int = 1
+) -> Dict[str, Any]:
+    """
+    Run test modules against a solution module in the sandbox.
+
+    The code is written as ``solution.py`` next to each test module, so the
+    tests import what they exercise from ``solution``. Test modules may hold
+    ``unittest.TestCase`` classes and plain ``test_*`` functions using
+    ``assert``. Each module runs in its own sandboxed process, up to
+    ``workers`` of them at a time.
+
+    Args:
+        code: Source of the solution module
+        tests: Test module sources by file name, e.g. {'test_solution.py': ...}
+        limits: Resource limits for each process
+        workers: Number of test modules run in parallel
+
+    Returns:
+        Dictionary with 'passed' (every test passed and at least one ran),
+        'total', 'failed', 'tests' (name, passed, duration, error per test),
+        'errors' (modules that could not be imported or runs that failed)
+        and 'duration' (wall-clock seconds)
+    """
+    modules = {
+        name if name.endswith('.py') else f"{name}.py": source
+        for name, source in tests.items()
+    }
+
+    nonce = secrets.token_hex(16)
+    limits = limits or SandboxLimits()
+    limits = replace(limits, max_output=max(limits.max_output, _REPORT_MAX_OUTPUT))
+
+    def run(name: str):
+        return name, run_python(
+            _TEST_SCRIPT,
+            limits=limits,
+            stdin={'modules': [name[:-3]], 'nonce': nonce},
+            files={f"{SOLUTION_MODULE}.py": code, name: modules[name]},
+        )
+
+    if workers > 1 and len(modules) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(modules))) as executor:
+            runs = list(executor.map(run, modules))
+    else:
+        runs = [run(name) for name in modules]
+
+    results: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for name, result in runs:
+        data = _report(result.stdout, nonce)
+        results.extend(data.get('tests', []))
+        errors.extend(data.get('errors', []))
+        if not result.ok or not data:
+            errors.append({'module': name[:-3], 'error': result.error or result.stderr[-1500:] or 'No test report'})
+
+    failed = sum(1 for test in results if not test['passed'])
+    return {
+        'passed': bool(results) and not failed and not errors,
+        'total': len(results),
+        'failed': failed,
+        'tests': results,
+        'errors': errors,
+        'duration': round(max((result.duration for _, result in runs), default=0.0), 3),
+    }
+
+
+def _report(stdout: str, nonce: str) -> Dict[str, Any]:
+    """The report line of a test run's stdout, or {} when there is none."""
+    for line in stdout.splitlines():
+        if line.startswith(nonce):
+            try:
+                data = json.loads(line[len(nonce):])
+            except ValueError:
+                return {}
+            return data if isinstance(data, dict) else {}
+    return {}
+
+
+def format_test_report(report: Dict[str, Any], limit: int = 10) -> str:
+    """Render a run_tests report as compact text for a prompt."""
+    if report['passed']:
+        return f"All {report['total']} tests passed."
+    lines = [f"{report['failed']} of {report['total']} tests failed."]
+    for error in report['errors'][:limit]:
+        lines.append(f"Error running {error['module']}:\n{error['error'].strip()}")
+    failures = [test for test in report['tests'] if not test['passed']]
+    for test in failures[:limit]:
+        lines.append(f"FAILED {test['name']}:\n{test['error'].strip()}")
+    if len(failures) > limit:
+        lines.append(f"... and {len(failures) - limit} more failures")
+    if not report['total'] and not report['errors']:
+        lines.append("No tests were found: define unittest.TestCase classes or test_* functions.")
+    return "\n\n".join(lines)
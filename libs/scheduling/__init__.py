@@ -0,0 +1,3 @@
+from .cpm import Activity, CycleError, Schedule, ScheduledActivity, critical_path, level_resources
+
+__all__ = ['Activity', 'CycleError', 'Schedule', 'ScheduledActivity', 'critical_path', 'level_resources']
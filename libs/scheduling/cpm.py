@@ -0,0 +1,209 @@
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+
+
+@dataclass
+class Activity:
+    """
+    A unit of work in a dependency graph.
+
+    Attributes:
+        id: Unique identifier
+        duration: Length in any consistent unit (e.g. hours); 0 for milestones
+        predecessors: Ids that must finish before this activity starts; unknown ids are ignored
+        resource: Who performs it; None means it needs no resource
+    """
+    id: Hashable
+    duration: float
+    predecessors: Sequence[Hashable] = ()
+    resource: Optional[Hashable] = None
+
+
+@dataclass
+class ScheduledActivity:
+    """
+    An activity's place in the schedule.
+
+    The earliest/latest times come from the critical path method and ignore
+    resources; ``start`` and ``finish`` are the resource-leveled times, equal
+    to the earliest ones until ``level_resources`` runs.
+    """
+    id: Hashable
+    duration: float
+    resource: Optional[Hashable]
+    earliest_start: float = 0.0
+    earliest_finish: float = 0.0
+    latest_start: float = 0.0
+    latest_finish: float = 0.0
+    start: float = 0.0
+    finish: float = 0.0
+
+    @property
+    def slack(self) -> float:
+        return self.latest_start - self.earliest_start
+
+    @property
+    def critical(self) -> bool:
+        return self.slack <= 1e-9
+
+
+@dataclass
+class Schedule:
+    activities: Dict[Hashable, ScheduledActivity]
+    order: List[Hashable]
+    successors: Dict[Hashable, List[Hashable]]
+    predecessors: Dict[Hashable, List[Hashable]]
+    duration: float = 0.0
+    critical_path: List[Hashable] = field(default_factory=list)
+
+    @property
+    def leveled_duration(self) -> float:
+        return max((activity.finish for activity in self.activities.values()), default=0.0)
+
+
+class CycleError(ValueError):
+    """The dependency graph has a cycle; ``cycle`` lists its activity ids in order."""
+
+    def __init__(self, cycle: List[Hashable]):
+        self.cycle = cycle
+        super().__init__(f"Dependency cycle: {' -> '.join(str(node) for node in cycle + cycle[:1])}")
+
+
+def critical_path(activities: Iterable[Activity]) -> Schedule:
+    """
+    Earliest and latest start/finish times, slack and one critical path.
+
+    A topological sort followed by a forward and a backward pass, each
+    visiting every activity and dependency once, so the cost is linear in
+    the size of the graph.
+
+    Raises:
+        CycleError: If the dependencies are cyclic
+    """
+    nodes = {activity.id: activity for activity in activities}
+    predecessors = {
+        node: list(dict.fromkeys(pred for pred in activity.predecessors if pred in nodes and pred != node))
+        for node, activity in nodes.items()
+    }
+    successors: Dict[Hashable, List[Hashable]] = {node: [] for node in nodes}
+    for node, preds in predecessors.items():
+        for pred in preds:
+            successors[pred].append(node)
+
+    order = _topological_order(nodes, predecessors, successors)
+    scheduled = {
+        node: ScheduledActivity(node, max(float(nodes[node].duration), 0.0), nodes[node].resource)
+        for node in nodes
+    }
+
+    for node in order:
+        activity = scheduled[node]
+        activity.earliest_start = max((scheduled[pred].earliest_finish for pred in predecessors[node]), default=0.0)
+        activity.earliest_finish = activity.earliest_start + activity.duration
+    duration = max((activity.earliest_finish for activity in scheduled.values()), default=0.0)
+
+    for node in reversed(order):
+        activity = scheduled[node]
+        activity.latest_finish = min((scheduled[succ].latest_start for succ in successors[node]), default=duration)
+        activity.latest_start = activity.latest_finish - activity.duration
+        activity.start, activity.finish = activity.earliest_start, activity.earliest_finish
+
+    schedule = Schedule(scheduled, order, successors, predecessors, duration)
+    schedule.critical_path = _trace_critical_path(schedule)
+    return schedule
+
+
+def level_resources(
+    schedule: Schedule,
+    capacity: Optional[Callable[[Hashable], int]] = None
+) -> Schedule:
+    """
+    Delay activities so no resource works on more than ``capacity(resource)``
+    activities at once (default 1).
+
+    A serial list schedule: activities become eligible once all their
+    predecessors are placed, and among the eligible ones the one with the
+    earliest latest-start (the least slack) goes first, onto whichever unit
+    of its resource frees up earliest. Costs O((V + E) log V).
+    """
+    capacity = capacity or (lambda resource: 1)
+    remaining = {node: len(preds) for node, preds in schedule.predecessors.items()}
+    ready_at = {node: 0.0 for node in schedule.activities}
+    pools: Dict[Hashable, List[float]] = {}
+    position = {node: index for index, node in enumerate(schedule.order)}
+
+    def priority(node):
+        activity = schedule.activities[node]
+        return activity.latest_start, activity.earliest_start, position[node]
+
+    eligible = [(*priority(node), node) for node, count in remaining.items() if count == 0]
+    heapq.heapify(eligible)
+    while eligible:
+        node = heapq.heappop(eligible)[-1]
+        activity = schedule.activities[node]
+        start = ready_at[node]
+        if activity.resource is not None and activity.duration > 0:
+            pool = pools.get(activity.resource)
+            if pool is None:
+                pool = pools[activity.resource] = [0.0] * max(1, capacity(activity.resource))
+            start = max(start, heapq.heappop(pool))
+            heapq.heappush(pool, start + activity.duration)
+        activity.start, activity.finish = start, start + activity.duration
+
+        for succ in schedule.successors[node]:
+            ready_at[succ] = max(ready_at[succ], activity.finish)
+            remaining[succ] -= 1
+            if remaining[succ] == 0:
+                heapq.heappush(eligible, (*priority(succ), succ))
+    return schedule
+
+
+def _topological_order(nodes, predecessors, successors) -> List[Hashable]:
+    indegree = {node: len(preds) for node, preds in predecessors.items()}
+    queue = deque(node for node in nodes if indegree[node] == 0)
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for succ in successors[node]:
+            indegree[succ] -= 1
+            if indegree[succ] == 0:
+                queue.append(succ)
+    if len(order) < len(nodes):
+        raise CycleError(_find_cycle({node for node, count in indegree.items() if count > 0}, predecessors))
+    return order
+
+
+def _find_cycle(blocked: set, predecessors) -> List[Hashable]:
+    """Walk predecessors inside the unsorted remainder until a node repeats."""
+    node = next(iter(blocked))
+    seen: Dict[Hashable, int] = {}
+    path = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = next(pred for pred in predecessors[node] if pred in blocked)
+    return list(reversed(path[seen[node]:]))
+
+
+def _trace_critical_path(schedule: Schedule) -> List[Hashable]:
+    """Follow zero-slack activities from a critical start to the project's end."""
+    activities = schedule.activities
+    starts = [
+        node for node in schedule.order
+        if activities[node].critical and not schedule.predecessors[node]
+    ]
+    if not starts:
+        return []
+    path = [max(starts, key=lambda node: activities[node].duration)]
+    while True:
+        current = activities[path[-1]]
+        following = [
+            succ for succ in schedule.successors[path[-1]]
+            if activities[succ].critical and abs(activities[succ].earliest_start - current.earliest_finish) <= 1e-9
+        ]
+        if not following:
+            return path
+        path.append(max(following, key=lambda node: activities[node].duration))
@@ -0,0 +1,3 @@
+from .minhash import MinHasher, estimate_jaccard, jaccard, lsh_buckets, normalize_text, shingles
+
+__all__ = ['MinHasher', 'estimate_jaccard', 'jaccard', 'lsh_buckets', 'normalize_text', 'shingles']
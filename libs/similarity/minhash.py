@@ -0,0 +1,100 @@
+import hashlib
+import re
+from typing import Iterable, List, Sequence, Set
+
+import numpy as np
+
+
+_MERSENNE_PRIME = (1 << 31) - 1
+
+_NORMALIZERS = [
+    (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'), ' <uuid> '),
+    (re.compile(r'0x[0-9a-f]+'), ' <addr> '),
+    (re.compile(r'\b\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}(?::\d{2})?(?:\.\d+)?z?'), ' <time> '),
+    (re.compile(r'(?:[a-z]:)?(?:[\\/][\w.@-]+){2,}'), ' <path> '),
+    (re.compile(r'\b\d+(?:\.\d+)*\b'), ' <num> '),
+]
+_WORD_RE = re.compile(r'<\w+>|\w+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase text and replace volatile details (UUIDs, addresses, timestamps,
+    paths, numbers) with placeholders, so reports of the same problem compare equal.
+    """
+    text = text.lower()
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return ' '.join(_WORD_RE.findall(text))
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Word n-grams of normalized text; the words themselves for very short texts."""
+    words = normalize_text(text).split()
+    if len(words) <= size:
+        return set(words)
+    return {' '.join(words[index:index + size]) for index in range(len(words) - size + 1)}
+
+
+def _token_hashes(tokens: Iterable[str]) -> np.ndarray:
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+            % _MERSENNE_PRIME
+            for token in tokens
+        ),
+        dtype=np.uint64
+    )
+
+
+class MinHasher:
+    """
+    MinHash signatures estimating the Jaccard similarity of token sets.
+
+    Uses universal hashing modulo a Mersenne prime, vectorized over all
+    permutations and tokens with NumPy. Signatures are only comparable between
+    hashers with the same ``num_perm`` and ``seed``.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, tokens: Iterable[str]) -> List[int]:
+        hashes = _token_hashes(tokens)
+        if hashes.size == 0:
+            return [_MERSENNE_PRIME] * self.num_perm
+        # Operands are below 2**31, so a * x + b fits in 64 bits.
+        permuted = (np.outer(hashes, self._a) + self._b) % np.uint64(_MERSENNE_PRIME)
+        return permuted.min(axis=0).tolist()
+
+
+def estimate_jaccard(first: Sequence[int], second: Sequence[int]) -> float:
+    """Fraction of equal MinHash slots, an unbiased estimate of Jaccard similarity."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return float(np.mean(np.asarray(first) == np.asarray(second)))
+
+
+def jaccard(first: Set, second: Set) -> float:
+    if not first and not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def lsh_buckets(signature: Sequence[int], bands: int = 16) -> List[str]:
+    """
+    Locality-sensitive hashing keys of a signature.
+
+    The signature is split into ``bands`` bands; two signatures share at least
+    one key with high probability when their similarity is above roughly
+    (1 / bands) ** (1 / rows per band).
+    """
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        values = ','.join(str(value) for value in signature[band * rows:(band + 1) * rows])
+        keys.append(f"{band}:{hashlib.blake2b(values.encode('ascii'), digest_size=8).hexdigest()}")
+    return keys
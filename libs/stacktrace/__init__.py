@@ -0,0 +1,7 @@
+from .parser import (
+    Frame, StackTrace, exception_type, grouping_fingerprint, parse_frames, parse_stacktrace
+)
+
+__all__ = [
+    'Frame', 'StackTrace', 'exception_type', 'grouping_fingerprint', 'parse_frames', 'parse_stacktrace',
+]
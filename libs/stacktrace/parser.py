@@ -0,0 +1,200 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    A stack frame normalized for comparison across reports.
+
+    Line numbers, directories, memory addresses and generated name parts are
+    stripped, so the same crash reported from different builds or machines
+    yields equal frames.
+
+    Attributes:
+        language: 'python', 'javascript' or 'java'
+        module: Module, file or class the function belongs to
+        function: Function or method name
+        in_app: False for frames in the standard library or third-party packages
+    """
+    language: str
+    module: str
+    function: str
+    in_app: bool = True
+
+    @property
+    def key(self) -> str:
+        return f"{self.module}:{self.function}"
+
+
+_PYTHON_FRAME_RE = re.compile(r'^\s*File "(?P<path>[^"]+)", line \d+, in (?P<function>\S+)', re.MULTILINE)
+_JAVA_FRAME_RE = re.compile(
+    r'^\s*at (?P<qualified>[\w$.<>/]+)\((?P<source>[^)]*)\)', re.MULTILINE
+)
+_JS_FRAME_RE = re.compile(
+    r'^\s*at (?:(?:new |async )?(?P<function>[^\s(]+) \((?P<path>[^)]+)\)|(?P<bare>\S+:\d+(?::\d+)?))\s*$',
+    re.MULTILINE
+)
+
+_ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]+')
+_LOCATION_RE = re.compile(r':\d+(?::\d+)?$')
+_BUILD_HASH_RE = re.compile(r'[.-][0-9a-f]{6,}(?=\.)')
+_JAVA_GENERATED_RE = re.compile(r'\$\$Lambda[$\d]*(?:/(?:0x)?[0-9a-fA-F]+)?|\$\d+')
+_JS_ANONYMOUS = {'<anonymous>', 'Object.<anonymous>', 'anonymous'}
+
+_PYTHON_LIBRARY_MARKERS = ('site-packages', 'dist-packages', '/lib/python', '\\lib\\python', '<frozen')
+_JS_LIBRARY_MARKERS = ('node_modules', 'node:', 'internal/')
+_JAVA_LIBRARY_PREFIXES = ('java.', 'javax.', 'jdk.', 'sun.', 'com.sun.', 'kotlin.', 'scala.')
+
+
+def _basename(path: str) -> str:
+    path = path.split('?')[0].split('#')[0]
+    return re.split(r'[\\/]', path.rstrip('/\\'))[-1]
+
+
+def _python_frame(path: str, function: str) -> Frame:
+    name = _basename(path)
+    module = name[:-3] if name.endswith('.py') else name
+    return Frame(
+        language='python',
+        module=module,
+        function=_ADDRESS_RE.sub('', function),
+        in_app=not any(marker in path for marker in _PYTHON_LIBRARY_MARKERS)
+    )
+
+
+def _java_frame(qualified: str) -> Frame:
+    qualified = _JAVA_GENERATED_RE.sub('', qualified)
+    module, _, function = qualified.rpartition('.')
+    # Strip the module prefix of JPMS frames such as "java.base/java.lang.Thread.run".
+    module = module.rpartition('/')[2]
+    return Frame(
+        language='java',
+        module=module,
+        function=function,
+        in_app=not module.startswith(_JAVA_LIBRARY_PREFIXES)
+    )
+
+
+def _js_frame(function: str, path: str) -> Frame:
+    path = _LOCATION_RE.sub('', path.strip())
+    module = _BUILD_HASH_RE.sub('', _basename(path))
+    function = _ADDRESS_RE.sub('', function or '')
+    if function in _JS_ANONYMOUS:
+        function = '<anonymous>'
+    return Frame(
+        language='javascript',
+        module=module,
+        function=function or '<anonymous>',
+        in_app=not any(marker in path for marker in _JS_LIBRARY_MARKERS)
+    )
+
+
+def parse_frames(text: str) -> List[Frame]:
+    """
+    Extract normalized frames from Python, JavaScript (V8) and Java stack traces
+    embedded anywhere in the text, in the order they appear.
+    """
+    if not text:
+        return []
+
+    found = []
+    for match in _PYTHON_FRAME_RE.finditer(text):
+        found.append((match.start(), _python_frame(match.group('path'), match.group('function'))))
+
+    for match in _JAVA_FRAME_RE.finditer(text):
+        source = match.group('source')
+        # Java frames name a .java/.kt source, "Native Method" or "Unknown Source";
+        # anything else with parentheses is left to the JavaScript pattern.
+        if re.search(r'\.(java|kt|scala|groovy):?\d*$|^Native Method$|^Unknown Source$', source):
+            found.append((match.start(), _java_frame(match.group('qualified'))))
+
+    java_starts = {start for start, frame in found if frame.language == 'java'}
+    for match in _JS_FRAME_RE.finditer(text):
+        if match.start() in java_starts:
+            continue
+        if match.group('bare'):
+            found.append((match.start(), _js_frame('', match.group('bare'))))
+        else:
+            found.append((match.start(), _js_frame(match.group('function'), match.group('path'))))
+
+    found.sort(key=lambda item: item[0])
+    return [frame for _, frame in found]
+
+
+_EXCEPTION_RE = re.compile(
+    r'^\s*(?:Caused by:\s*|Uncaught\s+)?'
+    r'(?P<type>[A-Za-z_$][\w$.]*(?:Error|Exception|Fault|Exit|Interrupt|Rejection))(?=:|\s*$)',
+    re.MULTILINE
+)
+
+
+@dataclass
+class StackTrace:
+    """
+    Stack trace extracted from a bug report.
+
+    Attributes:
+        exception_type: Type of the (root cause) exception, when present
+        frames: Normalized frames, innermost first
+        fingerprint: Grouping key shared by reports of the same crash
+    """
+    exception_type: str
+    frames: List[Frame]
+    fingerprint: str
+
+    @property
+    def signature_frames(self) -> List[Frame]:
+        """The frames the fingerprint is computed from."""
+        return _significant_frames(self.frames)
+
+
+def exception_type(text: str) -> str:
+    """
+    Type of the exception a stack trace ends in: the last exception line,
+    which is the raised exception in Python and the root cause ("Caused by")
+    in Java.
+    """
+    matches = _EXCEPTION_RE.findall(text or '')
+    return matches[-1] if matches else ''
+
+
+def _significant_frames(frames: List[Frame], depth: int = 5) -> List[Frame]:
+    in_app = [frame for frame in frames if frame.in_app]
+    return (in_app or frames)[:depth]
+
+
+def grouping_fingerprint(frames: List[Frame], exception: str = '', depth: int = 5) -> str:
+    """
+    Fingerprint of a crash: the exception type plus the innermost ``depth``
+    application frames (all frames if none are in-app). Line numbers and
+    paths are already normalized away, so the fingerprint survives unrelated
+    code changes and deployments.
+    """
+    parts = [exception] + [frame.key for frame in _significant_frames(frames, depth)]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def parse_stacktrace(text: str, depth: int = 5) -> Optional[StackTrace]:
+    """
+    Parse the stack trace in a bug report.
+
+    Returns:
+        The StackTrace, or None if the text contains no recognizable frames
+    """
+    frames = parse_frames(text)
+    if not frames:
+        return None
+
+    # Python prints the innermost frame last, JavaScript and Java first.
+    if frames[0].language == 'python':
+        frames = frames[::-1]
+
+    exception = exception_type(text)
+    return StackTrace(
+        exception_type=exception,
+        frames=frames,
+        fingerprint=grouping_fingerprint(frames, exception, depth)
+    )
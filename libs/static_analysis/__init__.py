@@ -0,0 +1,16 @@
+from .aho_corasick import AhoCorasick
+from .analyzer import (
+    AnalysisReport, analyze_files, analyze_source, detect_language, summarize_findings, summarize_reports
+)
+from .python_checks import check_python, cyclomatic_complexity
+from .rules import CODE_RULES, PATTERN_RULES, SECRET_RULES, SEVERITIES, Finding, PatternRule
+from .scanner import SIGNATURES, ScanResult, SecretScanner, Signature, shannon_entropy
+
+__all__ = [
+    'AhoCorasick',
+    'AnalysisReport', 'analyze_files', 'analyze_source', 'detect_language', 'summarize_findings',
+    'summarize_reports',
+    'check_python', 'cyclomatic_complexity',
+    'CODE_RULES', 'PATTERN_RULES', 'SECRET_RULES', 'SEVERITIES', 'Finding', 'PatternRule',
+    'SIGNATURES', 'ScanResult', 'SecretScanner', 'Signature', 'shannon_entropy',
+]
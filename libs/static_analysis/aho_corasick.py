@@ -0,0 +1,116 @@
+from collections import deque
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+try:
+    import ahocorasick as _native
+except ImportError:
+    _native = None
+
+
+class AhoCorasick:
+    """
+    Multi-pattern string matcher: finds every occurrence of any number of
+    keywords in a single pass over the text.
+
+    Uses the pyahocorasick C extension when it is installed; otherwise the
+    goto/failure automaton is built in Python and flattened into a DFA, so
+    matching costs one dict lookup per character however many keywords there
+    are.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Hashable]] = ()):
+        self._values: Dict[str, List[Hashable]] = {}
+        self._built = False
+        for keyword, value in keywords:
+            self.add(keyword, value)
+
+    def add(self, keyword: str, value: Hashable):
+        if not keyword:
+            raise ValueError("Empty keyword")
+        self._values.setdefault(keyword, []).append(value)
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def build(self) -> 'AhoCorasick':
+        if _native is not None:
+            automaton = _native.Automaton()
+            for keyword, values in self._values.items():
+                automaton.add_word(keyword, (len(keyword), tuple(values)))
+            if self._values:
+                automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            self._build_dfa()
+        self._built = True
+        return self
+
+    def _build_dfa(self):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[Tuple[int, Hashable]]] = [[]]
+        for keyword, values in self._values.items():
+            state = 0
+            for char in keyword:
+                following = goto[state].get(char)
+                if following is None:
+                    following = len(goto)
+                    goto.append({})
+                    output.append([])
+                    goto[state][char] = following
+                state = following
+            output[state].extend((len(keyword), value) for value in values)
+
+        # Breadth-first, so the failure state of every node is complete before its children need it.
+        fail = [0] * len(goto)
+        delta = [dict(transitions) for transitions in goto]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                queue.append(child)
+                fail[child] = delta[fail[state]].get(char, 0)
+                output[child].extend(output[fail[child]])
+            for char, target in delta[fail[state]].items():
+                delta[state].setdefault(char, target)
+
+        self._delta = delta
+        self._output = [tuple(matches) if matches else None for matches in output]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, Hashable]]:
+        """Yield (start offset, value) for every keyword occurrence, by end offset."""
+        if not self._built:
+            self.build()
+        if not self._values:
+            return
+        if _native is not None:
+            for end, (length, values) in self._automaton.iter(text):
+                for value in values:
+                    yield end - length + 1, value
+            return
+
+        delta, output = self._delta, self._output
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for length, value in output[state]:
+                    yield index - length + 1, value
+
+    def matches(self, text: str) -> Set[Any]:
+        """The set of values of the keywords occurring in the text."""
+        if not self._built:
+            self.build()
+        if not self._values:
+            return set()
+        if _native is not None:
+            return {value for _, (_, values) in self._automaton.iter(text) for value in values}
+
+        delta, output = self._delta, self._output
+        found = set()
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if output[state]:
+                found.update(value for _, value in output[state])
+        return found
@@ -0,0 +1,161 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .python_checks import check_python
+from .rules import PATTERN_RULES, SECRET_RULES, SEVERITIES, Finding, PatternRule
+
+logger = logging.getLogger(__name__)
+
+
+_EXTENSIONS = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.ts': 'typescript', '.tsx': 'typescript',
+    '.java': 'java', '.php': 'php', '.rb': 'ruby', '.go': 'go', '.cs': 'csharp',
+}
+
+
+@dataclass
+class AnalysisReport:
+    """
+    Findings and metrics of one source file.
+
+    Attributes:
+        path: File path ('' for an anonymous snippet)
+        language: Detected or given language, lowercase
+        lines: Number of lines
+        findings: Detected issues, in line order
+        metrics: Size and complexity metrics
+        parsed: Whether the source was analyzed with the Python AST rather
+            than line patterns only
+    """
+    path: str
+    language: str
+    lines: int
+    findings: List[Finding] = field(default_factory=list)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    parsed: bool = False
+
+    @property
+    def is_clean(self) -> bool:
+        return not self.findings
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'language': self.language,
+            'lines': self.lines,
+            'parsed': self.parsed,
+            'metrics': self.metrics,
+            'findings': [finding.to_dict() for finding in self.findings],
+        }
+
+
+def detect_language(path: str, language: Optional[str] = None) -> str:
+    if language:
+        return language.lower()
+    for extension, name in _EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return name
+    return ''
+
+
+def _match_patterns(source: str, path: str, rules: Sequence[PatternRule]) -> List[Finding]:
+    """One finding per category and line, from the first matching rule."""
+    findings = []
+    for number, line in enumerate(source.splitlines(), start=1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        matched = set()
+        for rule in rules:
+            if rule.category not in matched and rule.pattern.search(line):
+                matched.add(rule.category)
+                findings.append(Finding(
+                    rule.rule, rule.category, rule.severity, rule.message,
+                    path, number, stripped[:200], rule.cwe_id
+                ))
+    return findings
+
+
+def analyze_source(
+    source: str,
+    path: str = '',
+    language: Optional[str] = None,
+    complexity_threshold: int = 10
+) -> AnalysisReport:
+    """
+    Analyze one file: secret patterns on every line, plus the Python AST
+    checks for Python sources or the generic code patterns otherwise.
+    """
+    language = detect_language(path, language)
+    report = AnalysisReport(path=path, language=language, lines=source.count('\n') + 1 if source else 0)
+
+    checked = check_python(source, path, complexity_threshold) if language in ('python', '') else None
+    if checked is not None:
+        findings, metrics = checked
+        report.parsed = True
+        report.language = 'python'
+        report.metrics.update(metrics)
+        findings += _match_patterns(source, path, SECRET_RULES)
+    else:
+        findings = _match_patterns(source, path, PATTERN_RULES)
+
+    report.findings = sorted(findings, key=lambda finding: (finding.line, finding.rule))
+    report.metrics['lines'] = report.lines
+    return report
+
+
+def _analyze_entry(entry: Tuple[str, str, Optional[str], int]) -> AnalysisReport:
+    return analyze_source(*entry)
+
+
+def analyze_files(
+    files: Iterable[Tuple[str, str, Optional[str]]],
+    complexity_threshold: int = 10,
+    max_workers: Optional[int] = None,
+    parallel_min_bytes: int = 200_000
+) -> List[AnalysisReport]:
+    """
+    Analyze several files, in a process pool once their total size makes it
+    worthwhile. Falls back to analyzing in-process where child processes
+    cannot be started (e.g. inside a daemonic Celery worker process).
+
+    Args:
+        files: (path, source, language) tuples; language may be None
+        complexity_threshold: Cyclomatic complexity above which a function is reported
+        max_workers: Size of the process pool (default: CPU count)
+        parallel_min_bytes: Total source size below which no pool is started
+    """
+    entries = [(source, path, language, complexity_threshold) for path, source, language in files]
+
+    if len(entries) > 1 and sum(len(entry[0]) for entry in entries) >= parallel_min_bytes and max_workers != 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(_analyze_entry, entries, chunksize=max(1, len(entries) // 32)))
+        except (AssertionError, OSError, RuntimeError) as e:
+            logger.warning(f"Static analysis pool unavailable, analyzing in-process: {str(e)}")
+
+    return [_analyze_entry(entry) for entry in entries]
+
+
+def summarize_reports(reports: Sequence[AnalysisReport], limit: int = 30) -> str:
+    """Compact text of the findings for inclusion in a prompt, most severe first."""
+    return summarize_findings([finding for report in reports for finding in report.findings], limit)
+
+
+def summarize_findings(findings: Sequence[Finding], limit: int = 30) -> str:
+    """Compact text of the findings for inclusion in a prompt, most severe first."""
+    findings = list(findings)
+    if not findings:
+        return "No issues found by static analysis."
+
+    findings.sort(key=lambda finding: SEVERITIES.index(finding.severity))
+    lines = [
+        f"- [{finding.severity}] {finding.path + ':' if finding.path else 'line '}{finding.line} "
+        f"{finding.message}: `{finding.snippet[:120]}`"
+        for finding in findings[:limit]
+    ]
+    if len(findings) > limit:
+        lines.append(f"- ... and {len(findings) - limit} more")
+    return "\n".join(lines)
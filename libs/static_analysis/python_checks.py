@@ -0,0 +1,192 @@
+import ast
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .rules import Finding
+
+
+_SQL_RE = re.compile(r'(?i)^\s*(?:SELECT|INSERT\s+INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)\b|\bWHERE\b.*[=<>]')
+_SQL_SINKS = {'execute', 'executemany', 'executescript', 'raw', 'extra', 'RawSQL', 'text'}
+_DESERIALIZERS = {
+    ('pickle', 'load'), ('pickle', 'loads'), ('cPickle', 'load'), ('cPickle', 'loads'),
+    ('marshal', 'load'), ('marshal', 'loads'), ('shelve', 'open'),
+    ('dill', 'load'), ('dill', 'loads'), ('joblib', 'load'),
+}
+_BRANCHES = (
+    ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler,
+    ast.With, ast.AsyncWith, ast.Assert, ast.comprehension,
+)
+
+
+def _dotted(node: ast.AST) -> str:
+    """'a.b.c' for a Name/Attribute chain, '' otherwise."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    return ''
+
+
+def _literal_text(node: ast.AST) -> str:
+    """The constant string parts of a str literal, f-string, concatenation or format call."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return ''.join(_literal_text(value) for value in node.values)
+    if isinstance(node, ast.BinOp):
+        return _literal_text(node.left) + _literal_text(node.right)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'format':
+        return _literal_text(node.func.value)
+    return ''
+
+
+def _is_dynamic_string(node: ast.AST) -> bool:
+    """Whether the expression builds a string from non-literal parts."""
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        return bool(_literal_text(node)) and not (
+            isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant)
+        )
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'format':
+        return bool(_literal_text(node))
+    return False
+
+
+def cyclomatic_complexity(node: ast.AST) -> int:
+    """McCabe complexity of a function: 1 + its decision points, nested functions excluded."""
+    complexity = 1
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        if isinstance(child, _BRANCHES):
+            complexity += 1 + (len(child.ifs) if isinstance(child, ast.comprehension) else 0)
+        elif isinstance(child, ast.BoolOp):
+            complexity += len(child.values) - 1
+        elif isinstance(child, ast.match_case):
+            complexity += 1
+        stack.extend(ast.iter_child_nodes(child))
+    return complexity
+
+
+class _Checker(ast.NodeVisitor):
+
+    def __init__(self, path: str, lines: List[str], complexity_threshold: int):
+        self.path = path
+        self.lines = lines
+        self.complexity_threshold = complexity_threshold
+        self.findings: List[Finding] = []
+        self.complexities: List[Tuple[str, int]] = []
+        self._scope: List[str] = []
+        self._reported_sql = set()
+
+    def add(self, node: ast.AST, rule: str, category: str, severity: str, message: str, cwe_id: str = ''):
+        line = getattr(node, 'lineno', 0)
+        snippet = self.lines[line - 1].strip()[:200] if 0 < line <= len(self.lines) else ''
+        self.findings.append(Finding(rule, category, severity, message, self.path, line, snippet, cwe_id))
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_FunctionDef(self, node):
+        name = '.'.join(self._scope + [node.name])
+        complexity = cyclomatic_complexity(node)
+        self.complexities.append((name, complexity))
+        if complexity > self.complexity_threshold:
+            self.add(
+                node, 'high-complexity', 'complexity', 'Medium' if complexity <= 2 * self.complexity_threshold else 'High',
+                f"Function {name} has cyclomatic complexity {complexity} (threshold {self.complexity_threshold})"
+            )
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node: ast.Call):
+        name = _dotted(node.func)
+        base, _, attr = name.rpartition('.')
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords if keyword.arg}
+
+        if name in ('eval', 'exec'):
+            if not (node.args and isinstance(node.args[0], ast.Constant)):
+                self.add(node, f"{name}-call", 'code-execution', 'High',
+                         f"Dynamic code execution with {name}() on a non-literal argument", 'CWE-95')
+        elif (base.rpartition('.')[2], attr) in _DESERIALIZERS:
+            self.add(node, 'pickle-load', 'deserialization', 'High',
+                     f"{name}() deserializes arbitrary objects; never use it on untrusted data", 'CWE-502')
+        elif name in ('yaml.load', 'yaml.unsafe_load', 'yaml.load_all'):
+            loader = keywords.get('Loader') or (node.args[1] if len(node.args) > 1 else None)
+            if name == 'yaml.unsafe_load' or loader is None or 'Safe' not in _dotted(loader):
+                self.add(node, 'yaml-unsafe-load', 'deserialization', 'High',
+                         f"{name}() without SafeLoader can construct arbitrary objects", 'CWE-502')
+        elif name in ('os.system', 'os.popen') or (
+            base == 'subprocess' and isinstance(keywords.get('shell'), ast.Constant) and keywords['shell'].value is True
+        ):
+            dynamic = node.args and not isinstance(node.args[0], ast.Constant)
+            self.add(node, 'shell-true', 'command-injection', 'High' if dynamic else 'Low',
+                     f"{name}() runs a command through the shell", 'CWE-78')
+
+        if (attr or name) in _SQL_SINKS and node.args and _is_dynamic_string(node.args[0]):
+            if _SQL_RE.search(_literal_text(node.args[0])) or attr in ('execute', 'executemany', 'raw'):
+                self._reported_sql.add(id(node.args[0]))
+                self.add(node, 'sql-injection', 'sql-injection', 'High',
+                         f"Query passed to {attr or name}() is built from a formatted string; use parameters",
+                         'CWE-89')
+
+        self.generic_visit(node)
+
+    def _check_sql_string(self, node: ast.AST):
+        if id(node) in self._reported_sql or not _is_dynamic_string(node):
+            return
+        if _SQL_RE.search(_literal_text(node)):
+            self._reported_sql.add(id(node))
+            self.add(node, 'sql-concatenation', 'sql-injection', 'Medium',
+                     "SQL statement built by string formatting", 'CWE-89')
+
+    def visit_JoinedStr(self, node: ast.JoinedStr):
+        self._check_sql_string(node)
+        self.generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp):
+        self._check_sql_string(node)
+        # The operands of a reported concatenation are part of the same statement.
+        if id(node) in self._reported_sql:
+            self._reported_sql.update(id(child) for child in ast.walk(node))
+        self.generic_visit(node)
+
+
+def check_python(
+    source: str,
+    path: str = '',
+    complexity_threshold: int = 10
+) -> Optional[Tuple[List[Finding], Dict[str, float]]]:
+    """
+    Run the AST checks on Python source.
+
+    Returns:
+        Tuple of (findings, metrics), or None if the source does not parse
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    checker = _Checker(path, source.splitlines(), complexity_threshold)
+    checker.visit(tree)
+
+    complexities = [complexity for _, complexity in checker.complexities]
+    metrics = {
+        'functions': len(complexities),
+        'classes': sum(1 for node in ast.walk(tree) if isinstance(node, ast.ClassDef)),
+        'max_complexity': max(complexities, default=0),
+        'average_complexity': round(sum(complexities) / len(complexities), 2) if complexities else 0,
+    }
+    return checker.findings, metrics
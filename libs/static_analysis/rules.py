@@ -0,0 +1,110 @@
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Pattern
+
+
+SEVERITIES = ('Critical', 'High', 'Medium', 'Low')
+
+
+@dataclass
+class Finding:
+    """
+    An issue detected without the LLM.
+
+    Attributes:
+        rule: Identifier of the rule that fired, e.g. 'eval-call'
+        category: 'secret', 'code-execution', 'sql-injection', 'deserialization',
+            'command-injection' or 'complexity'
+        severity: 'Critical', 'High', 'Medium' or 'Low'
+        message: Human-readable description
+        path: File the finding is in
+        line: 1-based line number
+        snippet: The offending line, stripped and truncated
+        cwe_id: Related CWE, when there is one
+        confidence: How likely the finding is a real issue (0-1)
+    """
+    rule: str
+    category: str
+    severity: str
+    message: str
+    path: str = ''
+    line: int = 0
+    snippet: str = ''
+    cwe_id: str = ''
+    confidence: float = 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def as_vulnerability(self) -> Dict[str, Any]:
+        """The finding in the shape of the SecurityAgent's parsed vulnerabilities."""
+        location = f"{self.path}:{self.line}" if self.path else f"line {self.line}"
+        return {
+            'severity': self.severity,
+            'description': f"{self.message} ({location})",
+            'impact': self.snippet,
+            'cwe_id': self.cwe_id,
+            'file': self.path,
+            'line': self.line,
+            'rule': self.rule,
+            'confidence': self.confidence,
+            'source': 'static',
+        }
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """A regular expression applied to every line of a file, whatever its language."""
+    rule: str
+    category: str
+    severity: str
+    message: str
+    pattern: Pattern
+    cwe_id: str = ''
+
+
+def _rule(rule: str, category: str, severity: str, message: str, pattern: str, cwe_id: str = '') -> PatternRule:
+    return PatternRule(rule, category, severity, message, re.compile(pattern), cwe_id)
+
+
+SECRET_RULES: List[PatternRule] = [
+    _rule('private-key', 'secret', 'Critical', 'Private key committed in source',
+          r'-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP )?PRIVATE KEY', 'CWE-798'),
+    _rule('aws-access-key', 'secret', 'Critical', 'AWS access key id in source',
+          r'\b(?:AKIA|ASIA)[0-9A-Z]{16}\b', 'CWE-798'),
+    _rule('github-token', 'secret', 'Critical', 'GitHub token in source',
+          r'\bgh[pousr]_[A-Za-z0-9]{36,}\b', 'CWE-798'),
+    _rule('slack-token', 'secret', 'High', 'Slack token in source',
+          r'\bxox[abpors]-[A-Za-z0-9-]{10,}', 'CWE-798'),
+    _rule('api-key', 'secret', 'High', 'API key in source',
+          r'\b(?:sk|pk)_(?:live|test)_[A-Za-z0-9]{16,}|\bsk-[A-Za-z0-9_-]{20,}', 'CWE-798'),
+    _rule('hardcoded-password', 'secret', 'High', 'Hardcoded credential',
+          r'''(?i)\b(?:password|passwd|pwd|secret|api_?key|access_?token|auth_?token)\b["']?\s*[:=]\s*["'][^"'\s]{6,}["']''',
+          'CWE-798'),
+]
+
+CODE_RULES: List[PatternRule] = [
+    _rule('eval-call', 'code-execution', 'High', 'Dynamic code evaluation with eval()',
+          r'(?<![\w.])eval\s*\(', 'CWE-95'),
+    _rule('exec-call', 'code-execution', 'High', 'Dynamic code execution with exec()',
+          r'(?<![\w.])exec\s*\((?!\s*\))', 'CWE-95'),
+    _rule('new-function', 'code-execution', 'High', 'Dynamic code evaluation with new Function()',
+          r'\bnew\s+Function\s*\(', 'CWE-95'),
+    _rule('sql-concatenation', 'sql-injection', 'High', 'SQL statement built by string concatenation or formatting',
+          r'''(?i)["'](?:\s*(?:SELECT|INSERT|UPDATE|DELETE|REPLACE)\b[^"']*|[^"']*\b(?:WHERE|VALUES|SET)\b[^"']*)["']\s*(?:\+|%(?!\s*\()|\.format\s*\()''',
+          'CWE-89'),
+    _rule('sql-interpolation', 'sql-injection', 'High', 'SQL statement built by string interpolation',
+          r'''(?i)(?:\bf["']|`)\s*(?:SELECT|INSERT\s+INTO|UPDATE|DELETE\s+FROM)\b[^"'`]*(?:\{|\$\{)''', 'CWE-89'),
+    _rule('pickle-load', 'deserialization', 'High', 'Untrusted data deserialized with pickle/marshal/shelve',
+          r'\b(?:c?[Pp]ickle|marshal|shelve|dill|joblib)\.loads?\s*\(', 'CWE-502'),
+    _rule('yaml-unsafe-load', 'deserialization', 'High', 'yaml.load without a safe loader',
+          r'\byaml\.(?:unsafe_)?load\s*\((?![^)]*Safe)', 'CWE-502'),
+    _rule('java-deserialization', 'deserialization', 'High', 'Java native deserialization',
+          r'\bnew\s+ObjectInputStream\s*\(|\.readObject\s*\(\s*\)', 'CWE-502'),
+    _rule('php-unserialize', 'deserialization', 'High', 'PHP unserialize() of untrusted data',
+          r'(?<![\w>])unserialize\s*\(', 'CWE-502'),
+    _rule('shell-true', 'command-injection', 'High', 'Subprocess started through the shell',
+          r'\bsubprocess\.\w+\s*\([^#]*shell\s*=\s*True|\bos\.(?:system|popen)\s*\(', 'CWE-78'),
+]
+
+PATTERN_RULES: List[PatternRule] = SECRET_RULES + CODE_RULES
@@ -0,0 +1,406 @@
+import logging
+import math
+import mmap
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from .aho_corasick import AhoCorasick
+from .rules import Finding
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Signature:
+    """
+    A secret or vulnerability signature.
+
+    Lines are first matched against the lowercase ``anchors`` of all
+    signatures at once with an Aho-Corasick automaton; only the signatures
+    whose anchor occurs are confirmed with their ``pattern``, and secrets
+    additionally need the Shannon entropy of the matched value (the
+    ``secret`` group, or the whole match) to reach ``min_entropy``.
+
+    Attributes:
+        id: Rule identifier
+        category: Finding category, see Finding
+        severity: 'Critical', 'High', 'Medium' or 'Low'
+        message: Human-readable description
+        anchors: Lowercase literals, one of which every match contains
+        pattern: Regular expression confirming the match
+        cwe_id: Related CWE
+        confidence: How likely a confirmed match is a real issue (0-1)
+        min_entropy: Minimum entropy in bits per character of the matched value
+        ignore_case: Whether ``pattern`` is case-insensitive
+    """
+    id: str
+    category: str
+    severity: str
+    message: str
+    anchors: Tuple[str, ...]
+    pattern: str
+    cwe_id: str = ''
+    confidence: float = 0.9
+    min_entropy: float = 0.0
+    ignore_case: bool = False
+
+
+def _secret(id: str, severity: str, message: str, anchors: Sequence[str], pattern: str, **kwargs) -> Signature:
+    return Signature(id, 'secret', severity, message, tuple(anchors), pattern, 'CWE-798', **kwargs)
+
+
+def _vulnerability(
+    id: str, category: str, severity: str, message: str, cwe_id: str,
+    anchors: Sequence[str], pattern: str, **kwargs
+) -> Signature:
+    return Signature(id, category, severity, message, tuple(anchors), pattern, cwe_id, **kwargs)
+
+
+_ASSIGNED_VALUE = r'''["']?\s*(?::=|=>|[:=])\s*["'](?P<secret>[^"'\s]{8,})["']'''
+
+SIGNATURES: List[Signature] = [
+    # Keys and tokens with a recognizable format.
+    _secret('private-key', 'Critical', 'Private key in source', ['-----begin'],
+            r'-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY', confidence=1.0),
+    _secret('aws-access-key', 'Critical', 'AWS access key id', ['akia', 'asia', 'agpa', 'aida', 'aroa', 'anpa'],
+            r'\b(?:AKIA|ASIA|AGPA|AIDA|AROA|ANPA)[0-9A-Z]{16}\b', min_entropy=3.0),
+    _secret('aws-secret-key', 'Critical', 'AWS secret access key', ['aws_secret', 'aws-secret', 'awssecret'],
+            r'(?i)aws.?secret.?(?:access.?)?key' + _ASSIGNED_VALUE, min_entropy=4.0),
+    _secret('github-token', 'Critical', 'GitHub token', ['ghp_', 'gho_', 'ghu_', 'ghs_', 'ghr_'],
+            r'\bgh[pousr]_[A-Za-z0-9]{36,}\b', min_entropy=3.5),
+    _secret('github-fine-grained-token', 'Critical', 'GitHub fine-grained token', ['github_pat_'],
+            r'\bgithub_pat_[A-Za-z0-9_]{60,}'),
+    _secret('gitlab-token', 'Critical', 'GitLab personal access token', ['glpat-'],
+            r'\bglpat-[A-Za-z0-9_-]{20,}'),
+    _secret('slack-token', 'High', 'Slack token', ['xoxb-', 'xoxp-', 'xoxa-', 'xoxr-', 'xoxs-', 'xapp-'],
+            r'\bx(?:ox[abprs]|app)-[A-Za-z0-9-]{10,}'),
+    _secret('slack-webhook', 'High', 'Slack incoming webhook URL', ['hooks.slack.com/services/'],
+            r'hooks\.slack\.com/services/T[A-Za-z0-9]+/B[A-Za-z0-9]+/[A-Za-z0-9]+'),
+    _secret('discord-webhook', 'High', 'Discord webhook URL', ['discord.com/api/webhooks/', 'discordapp.com/api/webhooks/'],
+            r'discord(?:app)?\.com/api/webhooks/\d+/[\w-]{20,}'),
+    _secret('stripe-secret-key', 'Critical', 'Stripe secret key', ['sk_live_', 'rk_live_'],
+            r'\b[rs]k_live_[A-Za-z0-9]{20,}'),
+    _secret('stripe-test-key', 'Low', 'Stripe test key', ['sk_test_'],
+            r'\bsk_test_[A-Za-z0-9]{20,}', confidence=0.6),
+    _secret('anthropic-api-key', 'Critical', 'Anthropic API key', ['sk-ant-'],
+            r'\bsk-ant-(?:api|admin)\d{2}-[A-Za-z0-9_-]{40,}'),
+    _secret('openai-api-key', 'Critical', 'OpenAI API key', ['sk-'],
+            r'\bsk-(?:proj-|svcacct-|admin-)?[A-Za-z0-9_-]{32,}', min_entropy=4.0, confidence=0.85),
+    _secret('google-api-key', 'High', 'Google API key', ['aiza'],
+            r'\bAIza[0-9A-Za-z_-]{35}\b'),
+    _secret('google-oauth-token', 'High', 'Google OAuth access token', ['ya29.'],
+            r'\bya29\.[0-9A-Za-z_-]{30,}'),
+    _secret('gcp-service-account', 'Critical', 'GCP service account private key', ['"private_key_id"'],
+            r'"private_key_id"\s*:\s*"[0-9a-f]{40}"'),
+    _secret('azure-storage-key', 'Critical', 'Azure storage account key', ['accountkey='],
+            r'(?i)AccountKey=[A-Za-z0-9+/]{80,}={0,2}'),
+    _secret('sendgrid-api-key', 'High', 'SendGrid API key', ['sg.'],
+            r'\bSG\.[\w-]{22}\.[\w-]{43}\b'),
+    _secret('mailgun-api-key', 'High', 'Mailgun API key', ['key-'],
+            r'\bkey-[0-9a-f]{32}\b', min_entropy=3.5, confidence=0.75),
+    _secret('npm-token', 'High', 'npm access token', ['npm_'],
+            r'\bnpm_[A-Za-z0-9]{36}\b'),
+    _secret('pypi-token', 'High', 'PyPI upload token', ['pypi-ag'],
+            r'\bpypi-AgEIcHlwaS5vcmc[A-Za-z0-9_-]{50,}'),
+    _secret('shopify-token', 'High', 'Shopify access token', ['shpat_', 'shpss_', 'shpca_', 'shppa_'],
+            r'\bshp(?:at|ss|ca|pa)_[a-fA-F0-9]{32}\b'),
+    _secret('telegram-bot-token', 'High', 'Telegram bot token', [':aa'],
+            r'\b\d{8,10}:AA[0-9A-Za-z_-]{33}\b', confidence=0.8),
+    _secret('jwt', 'Medium', 'JSON Web Token in source', ['eyj'],
+            r'\beyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}', confidence=0.75),
+    _secret('credentials-in-url', 'High', 'Credentials embedded in a URL', ['://'],
+            r'\b[a-z][a-z0-9+.-]*://[^\s:/@"\']+:(?P<secret>[^\s:/@"\'$<{]{6,})@[\w.-]+', min_entropy=2.5,
+            confidence=0.8),
+    _secret('django-secret-key', 'High', 'Hardcoded Django SECRET_KEY', ['secret_key'],
+            r'\bSECRET_KEY\s*=\s*["\'](?P<secret>(?!django-insecure)[^"\']{20,})["\']', min_entropy=3.5),
+    _secret('hardcoded-password', 'High', 'Hardcoded password',
+            ['password', 'passwd', 'pwd'],
+            r'(?i)\b\w*(?:password|passwd|pwd)\w*' + _ASSIGNED_VALUE, min_entropy=3.0, confidence=0.7),
+    _secret('hardcoded-token', 'High', 'Hardcoded secret or token',
+            ['secret', 'token', 'api_key', 'apikey', 'api-key', 'access_key', 'private_key', 'auth_key'],
+            r'(?i)\b\w*(?:secret|token|api[_-]?key|access[_-]?key|private[_-]?key|auth[_-]?key)\w*' + _ASSIGNED_VALUE,
+            min_entropy=3.5, confidence=0.7),
+
+    # Dangerous calls and configuration.
+    _vulnerability('eval-call', 'code-execution', 'High', 'Dynamic code evaluation', 'CWE-95',
+                   ['eval('], r'(?<![\w.])eval\s*\((?!\s*["\'][^"\']*["\']\s*\))'),
+    _vulnerability('exec-call', 'code-execution', 'High', 'Dynamic code execution', 'CWE-95',
+                   ['exec('], r'(?<![\w.])exec\s*\((?!\s*["\'][^"\']*["\']\s*[,)])'),
+    _vulnerability('new-function', 'code-execution', 'High', 'Dynamic code evaluation with new Function()', 'CWE-95',
+                   ['new function('], r'\bnew\s+Function\s*\('),
+    _vulnerability('pickle-load', 'deserialization', 'High', 'Deserialization of arbitrary objects', 'CWE-502',
+                   ['pickle.load', 'marshal.load', 'dill.load', 'shelve.open', 'jsonpickle.decode'],
+                   r'\b(?:c?[Pp]ickle|marshal|dill)\.loads?\s*\(|\bshelve\.open\s*\(|\bjsonpickle\.decode\s*\('),
+    _vulnerability('yaml-unsafe-load', 'deserialization', 'High', 'yaml.load without a safe loader', 'CWE-502',
+                   ['yaml.load', 'yaml.unsafe_load'], r'\byaml\.(?:unsafe_load|load(?:_all)?)\s*\((?![^)]*Safe)'),
+    _vulnerability('java-deserialization', 'deserialization', 'High', 'Java native deserialization', 'CWE-502',
+                   ['objectinputstream', 'xmldecoder'], r'\bnew\s+(?:ObjectInputStream|XMLDecoder)\s*\('),
+    _vulnerability('php-unserialize', 'deserialization', 'High', 'PHP unserialize() of untrusted data', 'CWE-502',
+                   ['unserialize('], r'(?<![\w>])unserialize\s*\(\s*\$'),
+    _vulnerability('shell-command', 'command-injection', 'High', 'Command run through the shell', 'CWE-78',
+                   ['shell=true', 'shell = true', 'os.system(', 'os.popen(', 'child_process', 'runtime.getruntime().exec'],
+                   r'\bsubprocess\.\w+\s*\(.*shell\s*=\s*True|\bos\.(?:system|popen)\s*\((?!\s*["\'][^"\']*["\']\s*\))'
+                   r'|\bchild_process\b.*\bexec(?:Sync)?\s*\(|Runtime\.getRuntime\(\)\.exec\s*\('),
+    _vulnerability('sql-concatenation', 'sql-injection', 'High', 'SQL statement built from strings', 'CWE-89',
+                   ['select ', 'insert into', 'update ', 'delete from'],
+                   r'''["'`]\s*(?:SELECT\b[^"'`]*\bFROM|INSERT\s+INTO|UPDATE\b[^"'`]*\bSET|DELETE\s+FROM)\b[^"'`]*["'`]\s*'''
+                   r'''(?:\+|%\s*[\w(]|\.format\s*\()|(?:\bf["']|`)\s*(?:SELECT|INSERT|UPDATE|DELETE)\b[^"'`]*(?:\{|\$\{)''',
+                   ignore_case=True),
+    _vulnerability('dom-xss', 'xss', 'Medium', 'Unescaped HTML written to the DOM', 'CWE-79',
+                   ['.innerhtml', '.outerhtml', 'document.write(', 'dangerouslysetinnerhtml', 'insertadjacenthtml'],
+                   r'\.(?:inner|outer)HTML\s*=(?!=)|document\.write\s*\(|dangerouslySetInnerHTML|insertAdjacentHTML\s*\(',
+                   confidence=0.75),
+    _vulnerability('template-unescaped', 'xss', 'Medium', 'Template output marked safe', 'CWE-79',
+                   ['mark_safe(', '|safe', '{% autoescape off', 'v-html'],
+                   r'\bmark_safe\s*\(|\|\s*safe\b|\{%\s*autoescape\s+off|\bv-html\s*=', confidence=0.7),
+    _vulnerability('tls-verify-disabled', 'transport', 'High', 'TLS certificate verification disabled', 'CWE-295',
+                   ['verify=false', 'verify = false', '_create_unverified_context', 'rejectunauthorized',
+                    'insecureskipverify', 'check_hostname = false', 'check_hostname=false'],
+                   r'\bverify\s*=\s*False\b|_create_unverified_context|rejectUnauthorized\s*:\s*false'
+                   r'|InsecureSkipVerify\s*:\s*true|check_hostname\s*=\s*False'),
+    _vulnerability('weak-hash', 'cryptography', 'Medium', 'Weak hash algorithm', 'CWE-328',
+                   ['md5', 'sha1'], r'\b(?:hashlib\.(?:md5|sha1)|MessageDigest\.getInstance\(\s*"(?:MD5|SHA-?1)"|'
+                                    r'createHash\(\s*[\'"](?:md5|sha1)[\'"])', confidence=0.7),
+    _vulnerability('weak-cipher', 'cryptography', 'High', 'Broken cipher or ECB mode', 'CWE-327',
+                   ['des.new', 'rc4', 'blowfish.new', 'mode_ecb', '/ecb/', '"des"', 'des-ede'], r'\b(?:DES|RC4|ARC4|Blowfish)\.new\s*\(|MODE_ECB|/ECB/|"DES"|\bdes-ede\b',
+                   confidence=0.8),
+    _vulnerability('insecure-temp-file', 'filesystem', 'Medium', 'Race-prone temporary file', 'CWE-377',
+                   ['mktemp('], r'\btempfile\.mktemp\s*\('),
+    _vulnerability('xxe', 'xxe', 'High', 'XML parser resolving external entities', 'CWE-611',
+                   ['resolve_entities', 'external-general-entities', 'load_dtd'],
+                   r'resolve_entities\s*=\s*True|external-general-entities"\s*,\s*true|load_dtd\s*=\s*True'),
+    _vulnerability('django-debug', 'configuration', 'Medium', 'DEBUG enabled in settings', 'CWE-489',
+                   ['debug = true', 'debug=true'], r'^\s*DEBUG\s*=\s*True\b', confidence=0.7),
+    _vulnerability('allow-all-hosts', 'configuration', 'Medium', 'Any host or origin allowed', 'CWE-942',
+                   ['allowed_hosts', 'cors_origin_allow_all', 'cors_allow_all_origins', 'access-control-allow-origin'],
+                   r'ALLOWED_HOSTS\s*=\s*\[\s*["\']\*["\']|CORS_(?:ORIGIN_ALLOW_ALL|ALLOW_ALL_ORIGINS)\s*=\s*True'
+                   r'|Access-Control-Allow-Origin["\']?\s*[:,]\s*["\']\*', confidence=0.75),
+    _vulnerability('csrf-exempt', 'configuration', 'Low', 'CSRF protection disabled for a view', 'CWE-352',
+                   ['csrf_exempt'], r'@csrf_exempt\b', confidence=0.6),
+]
+
+_PLACEHOLDER_RE = re.compile(
+    r'(?i)^(?:x+|\*+|\.+|-+)$|example|changeme|change_me|placeholder|your[_-]|dummy|sample|test|redacted|'
+    r'^<.*>$|^\$\{.*\}$|^\{\{.*\}\}$|^%\(.*\)s$'
+)
+
+_SKIPPED_DIRECTORIES = {
+    '.git', '.hg', '.svn', 'node_modules', '__pycache__', '.venv', 'venv', 'env', '.tox',
+    'dist', 'build', '.mypy_cache', '.pytest_cache', 'staticfiles', 'coverage',
+}
+_SKIPPED_EXTENSIONS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.ico', '.webp', '.pdf', '.zip', '.gz', '.tar', '.tgz', '.jar',
+    '.class', '.pyc', '.so', '.dll', '.exe', '.woff', '.woff2', '.ttf', '.eot', '.mp3', '.mp4', '.lock',
+    '.sqlite3', '.db', '.bin',
+}
+
+
+def shannon_entropy(value: str) -> float:
+    """Shannon entropy of a string in bits per character."""
+    if not value:
+        return 0.0
+    length = len(value)
+    return -sum(count / length * math.log2(count / length) for count in Counter(value).values())
+
+
+@dataclass
+class ScanResult:
+    """Findings of a scan, with the amount of data it covered."""
+    findings: List[Finding] = field(default_factory=list)
+    files_scanned: int = 0
+    bytes_scanned: int = 0
+    duration: float = 0.0
+
+    def vulnerabilities(self) -> List[Dict[str, Any]]:
+        """The findings in the shape of the SecurityAgent's parsed vulnerabilities."""
+        return [finding.as_vulnerability() for finding in self.findings]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'files_scanned': self.files_scanned,
+            'bytes_scanned': self.bytes_scanned,
+            'findings': len(self.findings),
+            'duration': round(self.duration, 3),
+        }
+
+
+class SecretScanner:
+    """
+    Scans text and files for secrets and vulnerable constructs.
+
+    Every line is matched once against the anchors of all signatures; the
+    comparatively slow regular expressions only run for the few signatures
+    whose anchor occurs in the line, so scanning cost barely grows with the
+    number of signatures.
+
+    Attributes:
+        min_confidence: Signatures with a lower confidence are not reported
+        max_line_length: Longer lines (minified bundles, data blobs) are cut to this length
+        mmap_threshold: Files of at least this many bytes are memory-mapped instead of read
+        max_file_size: Larger files are skipped
+    """
+
+    def __init__(
+        self,
+        signatures: Optional[Sequence[Signature]] = None,
+        min_confidence: float = 0.7,
+        max_line_length: int = 4000,
+        mmap_threshold: int = 1 << 20,
+        max_file_size: int = 50 << 20
+    ):
+        self.signatures = [
+            signature for signature in (signatures if signatures is not None else SIGNATURES)
+            if signature.confidence >= min_confidence
+        ]
+        self.min_confidence = min_confidence
+        self.max_line_length = max_line_length
+        self.mmap_threshold = mmap_threshold
+        self.max_file_size = max_file_size
+
+        self._patterns: List[Pattern] = [
+            re.compile(signature.pattern, re.IGNORECASE if signature.ignore_case else 0)
+            for signature in self.signatures
+        ]
+        self._automaton = AhoCorasick(
+            (anchor, index) for index, signature in enumerate(self.signatures) for anchor in signature.anchors
+        ).build()
+
+    def scan_line(self, line: str, number: int = 0, path: str = '') -> List[Finding]:
+        line = line[:self.max_line_length]
+        candidates = self._automaton.matches(line.lower())
+        if not candidates:
+            return []
+
+        findings = []
+        categories = set()
+        for index in sorted(candidates):
+            signature = self.signatures[index]
+            if signature.category in categories:
+                continue
+            match = self._patterns[index].search(line)
+            if not match:
+                continue
+            if signature.min_entropy:
+                value = match.groupdict().get('secret') or match.group(0)
+                if _PLACEHOLDER_RE.search(value) or shannon_entropy(value) < signature.min_entropy:
+                    continue
+            categories.add(signature.category)
+            findings.append(Finding(
+                signature.id, signature.category, signature.severity, signature.message,
+                path, number, self._redact(line.strip(), match, signature)[:200], signature.cwe_id,
+                signature.confidence
+            ))
+        return findings
+
+    def scan_lines(self, lines: Iterable[str], path: str = '') -> List[Finding]:
+        findings = []
+        for number, line in enumerate(lines, start=1):
+            findings.extend(self.scan_line(line, number, path))
+        return findings
+
+    def scan_text(self, text: str, path: str = '') -> List[Finding]:
+        return self.scan_lines(text.splitlines(), path)
+
+    def scan_file(self, path: str) -> Tuple[List[Finding], int]:
+        """
+        Scan a file line by line without loading it into memory at once.
+
+        Returns:
+            Tuple of (findings, bytes scanned); binary and oversized files are skipped
+        """
+        try:
+            size = os.path.getsize(path)
+            if size == 0 or size > self.max_file_size:
+                return [], 0
+            with open(path, 'rb') as handle:
+                if b'\x00' in handle.read(8192):
+                    return [], 0
+                handle.seek(0)
+                if size >= self.mmap_threshold:
+                    with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        return self.scan_lines(self._decode(iter(mapped.readline, b'')), path), size
+                return self.scan_lines(self._decode(handle), path), size
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not scan {path}: {str(e)}")
+            return [], 0
+
+    def scan_paths(
+        self,
+        paths: Iterable[str],
+        max_workers: Optional[int] = None,
+        parallel_min_files: int = 8
+    ) -> ScanResult:
+        """
+        Scan files and directory trees, in a process pool when there are
+        enough files. Version control, dependency and build directories and
+        binary files are skipped.
+        """
+        started = time.monotonic()
+        files = list(self.iter_files(paths))
+        result = ScanResult()
+
+        outcomes = None
+        if len(files) >= parallel_min_files and max_workers != 1:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.signatures, self.min_confidence, self.max_line_length,
+                              self.mmap_threshold, self.max_file_size)
+                ) as executor:
+                    outcomes = list(executor.map(_scan_in_worker, files, chunksize=max(1, len(files) // 64)))
+            except (AssertionError, OSError, RuntimeError) as e:
+                logger.warning(f"Scanner pool unavailable, scanning in-process: {str(e)}")
+        if outcomes is None:
+            outcomes = [self.scan_file(path) for path in files]
+
+        for findings, size in outcomes:
+            result.findings.extend(findings)
+            result.bytes_scanned += size
+            result.files_scanned += 1 if size else 0
+        result.duration = time.monotonic() - started
+        return result
+
+    @staticmethod
+    def iter_files(paths: Iterable[str]) -> Iterator[str]:
+        for path in paths:
+            if os.path.isfile(path):
+                yield path
+                continue
+            for root, directories, names in os.walk(path):
+                directories[:] = sorted(
+                    directory for directory in directories if directory not in _SKIPPED_DIRECTORIES
+                )
+                for name in sorted(names):
+                    if os.path.splitext(name)[1].lower() not in _SKIPPED_EXTENSIONS:
+                        yield os.path.join(root, name)
+
+    @staticmethod
+    def _decode(lines: Iterable[bytes]) -> Iterator[str]:
+        for line in lines:
+            yield line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+    @staticmethod
+    def _redact(line: str, match: re.Match, signature: Signature) -> str:
+        """Mask the secret itself so it is not copied into results and prompts."""
+        if signature.category != 'secret':
+            return line
+        value = match.groupdict().get('secret') or match.group(0)
+        return line.replace(value, f"{value[:4]}{'*' * 8}")
+
+
+_worker_scanner: Optional[SecretScanner] = None
+
+
+def _init_worker(*args):
+    global _worker_scanner
+    _worker_scanner = SecretScanner(*args)
+
+
+def _scan_in_worker(path: str) -> Tuple[List[Finding], int]:
+    return _worker_scanner.scan_file(path)
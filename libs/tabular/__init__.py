@@ -0,0 +1,3 @@
+from .profiler import Table, parse_table, profile_table, format_profile
+
+__all__ = ['Table', 'parse_table', 'profile_table', 'format_profile']
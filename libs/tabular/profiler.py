@@ -0,0 +1,336 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+@dataclass
+class Table:
+    """Column-major table parsed from CSV or JSON input."""
+    columns: List[str]
+    values: Dict[str, List[Any]]
+    row_count: int
+
+    def row(self, index: int) -> List[Any]:
+        return [self.values[column][index] for column in self.columns]
+
+
+def parse_table(data: Union[str, list, dict]) -> Optional[Table]:
+    """
+    Parse tabular input into a Table.
+
+    Accepts CSV/TSV text, a JSON array of objects, a JSON object of equally
+    long arrays, or the same structures already decoded.
+
+    Returns:
+        The parsed Table, or None if the input does not look tabular
+    """
+    if isinstance(data, str):
+        text = data.strip()
+        if not text:
+            return None
+        if text[0] in '[{':
+            try:
+                return _table_from_json(json.loads(text))
+            except ValueError:
+                return None
+        return _table_from_csv(text)
+
+    return _table_from_json(data)
+
+
+def _table_from_json(data: Any) -> Optional[Table]:
+    if isinstance(data, dict):
+        lists = {str(key): value for key, value in data.items() if isinstance(value, list)}
+        lengths = {len(value) for value in lists.values()}
+        if not lists or len(lists) != len(data) or len(lengths) != 1:
+            return None
+        return Table(columns=list(lists), values=lists, row_count=lengths.pop())
+
+    if isinstance(data, list) and data and all(isinstance(row, dict) for row in data):
+        columns = list(dict.fromkeys(str(key) for row in data for key in row))
+        values = {column: [row.get(column) for row in data] for column in columns}
+        return Table(columns=columns, values=values, row_count=len(data))
+
+    return None
+
+
+def _table_from_csv(text: str) -> Optional[Table]:
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        return None
+
+    rows = list(csv.reader(io.StringIO(text), dialect))
+    if len(rows) < 2 or len(rows[0]) < 2:
+        return None
+
+    header = [name.strip() or f"column_{index + 1}" for index, name in enumerate(rows[0])]
+    width = len(header)
+    body = [row for row in rows[1:] if row]
+    if sum(1 for row in body[:100] if len(row) == width) < 0.9 * min(len(body), 100):
+        return None
+
+    body = [row[:width] + [''] * (width - len(row)) for row in body]
+    columns = list(zip(*body)) if body else [()] * width
+    return Table(
+        columns=header,
+        values={name: list(column) for name, column in zip(header, columns)},
+        row_count=len(body)
+    )
+
+
+def _as_numeric(values: Sequence[Any]) -> Optional[np.ndarray]:
+    """Convert a column to float64 with NaN for blanks, or None if it is not numeric."""
+    cleaned = [
+        np.nan if value is None or (isinstance(value, str) and not value.strip()) else value
+        for value in values
+    ]
+    if any(isinstance(value, bool) for value in cleaned):
+        return None
+    try:
+        array = np.asarray(cleaned, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    # Nested values, e.g. a list in every JSON record, are not a numeric column.
+    if array.ndim != 1:
+        return None
+    return array if np.isfinite(array).any() else None
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def profile_table(
+    table: Table,
+    group_by: Optional[Sequence[str]] = None,
+    sample_rows: int = 10,
+    top_categories: int = 10,
+    histogram_bins: int = 10,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Compute a compact statistical profile of a table with vectorized NumPy code.
+
+    Args:
+        table: The table to profile
+        group_by: Categorical columns to aggregate numeric columns by; chosen
+            automatically among low-cardinality columns when omitted
+        sample_rows: Number of randomly sampled rows to include
+        top_categories: Number of most frequent values reported per category
+        histogram_bins: Number of histogram bins for numeric columns
+        seed: Random seed for the row sample, so profiles are reproducible
+
+    Returns:
+        Dictionary with per-column statistics, correlations, group-bys and sample rows
+    """
+    numeric: Dict[str, np.ndarray] = {}
+    categorical: Dict[str, np.ndarray] = {}
+    columns = []
+
+    for name in table.columns:
+        values = table.values[name]
+        array = _as_numeric(values)
+
+        if array is not None:
+            numeric[name] = array
+            finite = array[np.isfinite(array)]
+            p25, median, p75 = np.percentile(finite, [25, 50, 75])
+            iqr = p75 - p25
+            outliers = int(np.count_nonzero((finite < p25 - 1.5 * iqr) | (finite > p75 + 1.5 * iqr)))
+            counts, edges = np.histogram(finite, bins=histogram_bins)
+            columns.append({
+                'name': name,
+                'type': 'numeric',
+                'count': int(finite.size),
+                'missing': int(np.count_nonzero(np.isnan(array))),
+                'infinite': int(np.count_nonzero(np.isinf(array))),
+                'mean': _round(finite.mean()),
+                'std': _round(finite.std()),
+                'min': _round(finite.min()),
+                'p25': _round(p25),
+                'median': _round(median),
+                'p75': _round(p75),
+                'max': _round(finite.max()),
+                'outliers': outliers,
+                'histogram': {
+                    'edges': [_round(edge) for edge in edges],
+                    'counts': counts.tolist(),
+                },
+            })
+            continue
+
+        labels = np.asarray(['' if value is None else str(value).strip() for value in values], dtype=object)
+        present = labels[labels != '']
+        categorical[name] = labels
+        uniques, counts = np.unique(present.astype(str), return_counts=True) if present.size else ([], np.array([]))
+        order = np.argsort(counts)[::-1][:top_categories]
+        columns.append({
+            'name': name,
+            'type': 'categorical',
+            'count': int(present.size),
+            'missing': int(labels.size - present.size),
+            'unique': int(len(uniques)),
+            'top_values': [
+                {'value': str(uniques[index]), 'count': int(counts[index])}
+                for index in order
+            ],
+        })
+
+    return {
+        'row_count': table.row_count,
+        'column_count': len(table.columns),
+        'columns': columns,
+        'correlations': _correlations(numeric),
+        'group_by': _group_by(table, numeric, categorical, group_by, top_categories),
+        'sample': _sample(table, sample_rows, seed),
+    }
+
+
+def _correlations(numeric: Dict[str, np.ndarray], limit: int = 10) -> List[Dict[str, Any]]:
+    """Strongest pairwise Pearson correlations over rows complete in both columns."""
+    names = list(numeric)
+    if len(names) < 2:
+        return []
+
+    matrix = np.vstack([numeric[name] for name in names])
+    complete = np.isfinite(matrix).all(axis=0)
+    if complete.sum() < 3:
+        return []
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = np.corrcoef(matrix[:, complete])
+
+    rows, cols = np.triu_indices(len(names), k=1)
+    values = corr[rows, cols]
+    valid = np.isfinite(values)
+    rows, cols, values = rows[valid], cols[valid], values[valid]
+    order = np.argsort(-np.abs(values))[:limit]
+
+    return [
+        {'columns': [names[rows[index]], names[cols[index]]], 'r': _round(values[index], 3)}
+        for index in order
+    ]
+
+
+def _group_by(
+    table: Table,
+    numeric: Dict[str, np.ndarray],
+    categorical: Dict[str, np.ndarray],
+    group_by: Optional[Sequence[str]],
+    top_categories: int
+) -> List[Dict[str, Any]]:
+    """Count and mean of every numeric column per group, via np.unique + np.bincount."""
+    if not numeric:
+        return []
+
+    if group_by is None:
+        group_by = [
+            name for name, labels in categorical.items()
+            if 2 <= len(np.unique(labels.astype(str))) <= 20
+        ][:2]
+
+    results = []
+    for name in group_by:
+        if name not in table.values:
+            continue
+        labels = categorical.get(name)
+        if labels is None:
+            labels = np.asarray([str(value) for value in table.values[name]], dtype=object)
+
+        keys, inverse, sizes = np.unique(labels.astype(str), return_inverse=True, return_counts=True)
+        order = np.argsort(sizes)[::-1][:top_categories]
+        means = {}
+        for column, array in numeric.items():
+            if column == name:
+                continue
+            finite = np.isfinite(array)
+            sums = np.bincount(inverse[finite], weights=array[finite], minlength=len(keys))
+            counts = np.bincount(inverse[finite], minlength=len(keys))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means[column] = sums / counts
+
+        results.append({
+            'column': name,
+            'groups': [
+                {
+                    'value': str(keys[index]),
+                    'count': int(sizes[index]),
+                    'means': {column: _round(values[index]) for column, values in means.items()},
+                }
+                for index in order
+            ],
+        })
+
+    return results
+
+
+def _sample(table: Table, sample_rows: int, seed: int) -> List[List[Any]]:
+    if table.row_count <= sample_rows:
+        indices = range(table.row_count)
+    else:
+        rng = np.random.default_rng(seed)
+        indices = np.sort(rng.choice(table.row_count, size=sample_rows, replace=False))
+    return [table.row(int(index)) for index in indices]
+
+
+def format_profile(profile: Dict[str, Any], columns: Sequence[str]) -> str:
+    """Render a profile as compact text for an LLM prompt."""
+    lines = [
+        f"Dataset profile computed locally over all {profile['row_count']} rows "
+        f"and {profile['column_count']} columns (raw data omitted).",
+        "",
+        "Columns:",
+    ]
+
+    for column in profile['columns']:
+        if column['type'] == 'numeric':
+            lines.append(
+                f"- {column['name']} (numeric): count {column['count']}, missing {column['missing']}, "
+                f"infinite {column['infinite']}, "
+                f"mean {column['mean']}, std {column['std']}, min {column['min']}, "
+                f"p25 {column['p25']}, median {column['median']}, p75 {column['p75']}, "
+                f"max {column['max']}, IQR outliers {column['outliers']}"
+            )
+            lines.append(
+                f"  histogram edges {column['histogram']['edges']} counts {column['histogram']['counts']}"
+            )
+        else:
+            top = ', '.join(f"{entry['value']} ({entry['count']})" for entry in column['top_values'])
+            lines.append(
+                f"- {column['name']} (categorical): count {column['count']}, missing {column['missing']}, "
+                f"unique {column['unique']}; top: {top}"
+            )
+
+    if profile['correlations']:
+        lines.extend(["", "Strongest correlations (Pearson r):"])
+        lines.extend(
+            f"- {pair['columns'][0]} ~ {pair['columns'][1]}: {pair['r']}"
+            for pair in profile['correlations']
+        )
+
+    for grouping in profile['group_by']:
+        lines.extend(["", f"Grouped by {grouping['column']} (count, mean of numeric columns):"])
+        lines.extend(
+            f"- {group['value']}: n={group['count']}, "
+            + ', '.join(f"{name}={value}" for name, value in group['means'].items())
+            for group in grouping['groups']
+        )
+
+    if profile['sample']:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(columns)
+        writer.writerows(profile['sample'])
+        lines.extend([
+            "",
+            f"Random sample of {len(profile['sample'])} rows (CSV):",
+            buffer.getvalue().rstrip('\n'),
+        ])
+
+    return "\n".join(lines)